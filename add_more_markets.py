@@ -15,7 +15,7 @@ def seed():
             "question": "Will Raila Odinga run for president in 2027?",
             "category": "Politics",
             "yes_probability": 62,
-            "volume": "KES 2.1M",
+            "volume_cents": 210_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -23,7 +23,7 @@ def seed():
             "question": "Will Kenya pass a new climate law by 2027?",
             "category": "Politics",
             "yes_probability": 45,
-            "volume": "KES 890K",
+            "volume_cents": 89_000_000,
             "end_date": "Jun 30, 2027",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -31,7 +31,7 @@ def seed():
             "question": "Will Wajir County finish the water project by June 2026?",
             "category": "Politics",
             "yes_probability": 35,
-            "volume": "KES 420K",
+            "volume_cents": 42_000_000,
             "end_date": "Jun 30, 2026",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -39,7 +39,7 @@ def seed():
             "question": "Will Uhuru Kenyatta run for office in 2027?",
             "category": "Politics",
             "yes_probability": 28,
-            "volume": "KES 1.5M",
+            "volume_cents": 150_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -47,7 +47,7 @@ def seed():
             "question": "Will Kenya's parliament pass the proposed tax reform by March 2026?",
             "category": "Politics",
             "yes_probability": 72,
-            "volume": "KES 950K",
+            "volume_cents": 95_000_000,
             "end_date": "Mar 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -55,7 +55,7 @@ def seed():
             "question": "Will Nairobi become the African financial hub by 2027?",
             "category": "Politics",
             "yes_probability": 55,
-            "volume": "KES 2.3M",
+            "volume_cents": 230_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -64,7 +64,7 @@ def seed():
             "question": "Will Liverpool win the Premier League in 2025-26 season?",
             "category": "Sports",
             "yes_probability": 48,
-            "volume": "KES 3.2M",
+            "volume_cents": 320_000_000,
             "end_date": "May 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?q=80&w=1000&auto=format&fit=crop"
         },
@@ -72,7 +72,7 @@ def seed():
             "question": "Will Manchester City retain the Premier League title?",
             "category": "Sports",
             "yes_probability": 42,
-            "volume": "KES 2.8M",
+            "volume_cents": 280_000_000,
             "end_date": "May 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?q=80&w=1000&auto=format&fit=crop"
         },
@@ -80,7 +80,7 @@ def seed():
             "question": "Will Serena Williams make a tennis comeback in 2026?",
             "category": "Sports",
             "yes_probability": 22,
-            "volume": "KES 670K",
+            "volume_cents": 67_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1554285201-be3f0ecda5cb?q=80&w=1000&auto=format&fit=crop"
         },
@@ -88,7 +88,7 @@ def seed():
             "question": "Will Kenya win a medal at the 2026 FIFA World Cup?",
             "category": "Sports",
             "yes_probability": 8,
-            "volume": "KES 120K",
+            "volume_cents": 12_000_000,
             "end_date": "Nov 30, 2026",
             "image_url": "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?q=80&w=1000&auto=format&fit=crop"
         },
@@ -96,7 +96,7 @@ def seed():
             "question": "Will Novak Djokovic win a Grand Slam in 2026?",
             "category": "Sports",
             "yes_probability": 38,
-            "volume": "KES 1.4M",
+            "volume_cents": 140_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1554285201-be3f0ecda5cb?q=80&w=1000&auto=format&fit=crop"
         },
@@ -104,7 +104,7 @@ def seed():
             "question": "Will Cristiano Ronaldo score more than 40 goals in 2026?",
             "category": "Sports",
             "yes_probability": 65,
-            "volume": "KES 2.1M",
+            "volume_cents": 210_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?q=80&w=1000&auto=format&fit=crop"
         },
@@ -113,7 +113,7 @@ def seed():
             "question": "Will Bitcoin reach $100,000 by June 2026?",
             "category": "Crypto",
             "yes_probability": 58,
-            "volume": "KES 4.5M",
+            "volume_cents": 450_000_000,
             "end_date": "Jun 30, 2026",
             "image_url": "https://images.unsplash.com/photo-1621761191319-c6fb62004040?q=80&w=1000&auto=format&fit=crop"
         },
@@ -121,7 +121,7 @@ def seed():
             "question": "Will Ethereum overtake Bitcoin in market cap by 2027?",
             "category": "Crypto",
             "yes_probability": 12,
-            "volume": "KES 890K",
+            "volume_cents": 89_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1621761191319-c6fb62004040?q=80&w=1000&auto=format&fit=crop"
         },
@@ -129,7 +129,7 @@ def seed():
             "question": "Will the Kenya shilling strengthen against the US dollar by 10%?",
             "category": "Economy",
             "yes_probability": 35,
-            "volume": "KES 2.1M",
+            "volume_cents": 210_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1460925895917-adf4e565db13?q=80&w=1000&auto=format&fit=crop"
         },
@@ -137,7 +137,7 @@ def seed():
             "question": "Will Kenya's GDP growth exceed 6% in 2026?",
             "category": "Economy",
             "yes_probability": 52,
-            "volume": "KES 1.8M",
+            "volume_cents": 180_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1460925895917-adf4e565db13?q=80&w=1000&auto=format&fit=crop"
         },
@@ -145,7 +145,7 @@ def seed():
             "question": "Will the NSE hit 25,000 points by 2027?",
             "category": "Economy",
             "yes_probability": 48,
-            "volume": "KES 2.4M",
+            "volume_cents": 240_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1460925895917-adf4e565db13?q=80&w=1000&auto=format&fit=crop"
         },
@@ -153,7 +153,7 @@ def seed():
             "question": "Will inflation in Kenya drop below 5% by June 2026?",
             "category": "Economy",
             "yes_probability": 68,
-            "volume": "KES 3.2M",
+            "volume_cents": 320_000_000,
             "end_date": "Jun 30, 2026",
             "image_url": "https://images.unsplash.com/photo-1460925895917-adf4e565db13?q=80&w=1000&auto=format&fit=crop"
         },
@@ -161,7 +161,7 @@ def seed():
             "question": "Will Safaricom's share price double by 2027?",
             "category": "Economy",
             "yes_probability": 42,
-            "volume": "KES 1.6M",
+            "volume_cents": 160_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1460925895917-adf4e565db13?q=80&w=1000&auto=format&fit=crop"
         },
@@ -170,7 +170,7 @@ def seed():
             "question": "Will Kenya's forest cover increase by 5% by 2027?",
             "category": "Environment",
             "yes_probability": 45,
-            "volume": "KES 980K",
+            "volume_cents": 98_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -178,7 +178,7 @@ def seed():
             "question": "Will Lake Turkana water levels rise by 2m by 2026?",
             "category": "Environment",
             "yes_probability": 38,
-            "volume": "KES 550K",
+            "volume_cents": 55_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -186,7 +186,7 @@ def seed():
             "question": "Will Kenya eliminate single-use plastics by 2027?",
             "category": "Environment",
             "yes_probability": 55,
-            "volume": "KES 1.2M",
+            "volume_cents": 120_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -194,7 +194,7 @@ def seed():
             "question": "Will Kenya record below-average temperatures in 2026?",
             "category": "Environment",
             "yes_probability": 32,
-            "volume": "KES 420K",
+            "volume_cents": 42_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -202,7 +202,7 @@ def seed():
             "question": "Will Mombasa Port expansion be completed by 2027?",
             "category": "Environment",
             "yes_probability": 48,
-            "volume": "KES 1.9M",
+            "volume_cents": 190_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -211,7 +211,7 @@ def seed():
             "question": "Will Tesla release a sub-$25,000 EV by 2026?",
             "category": "Crypto",
             "yes_probability": 72,
-            "volume": "KES 2.8M",
+            "volume_cents": 280_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1621761191319-c6fb62004040?q=80&w=1000&auto=format&fit=crop"
         },
@@ -219,7 +219,7 @@ def seed():
             "question": "Will Apple release an AR headset by 2026?",
             "category": "Crypto",
             "yes_probability": 68,
-            "volume": "KES 2.2M",
+            "volume_cents": 220_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1621761191319-c6fb62004040?q=80&w=1000&auto=format&fit=crop"
         },
@@ -227,7 +227,7 @@ def seed():
             "question": "Will OpenAI release GPT-5 before 2026?",
             "category": "Crypto",
             "yes_probability": 45,
-            "volume": "KES 1.8M",
+            "volume_cents": 180_000_000,
             "end_date": "Dec 31, 2026",
             "image_url": "https://images.unsplash.com/photo-1621761191319-c6fb62004040?q=80&w=1000&auto=format&fit=crop"
         },
@@ -235,7 +235,7 @@ def seed():
             "question": "Will commercial space tourism become mainstream by 2027?",
             "category": "Politics",
             "yes_probability": 35,
-            "volume": "KES 1.1M",
+            "volume_cents": 110_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -243,7 +243,7 @@ def seed():
             "question": "Will Starlink provide internet to all of East Africa by 2027?",
             "category": "Politics",
             "yes_probability": 52,
-            "volume": "KES 2.5M",
+            "volume_cents": 250_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1552521881-721fb61d4b8f?q=80&w=1000&auto=format&fit=crop"
         },
@@ -251,7 +251,7 @@ def seed():
             "question": "Will a new pandemic emerge before 2027?",
             "category": "Environment",
             "yes_probability": 25,
-            "volume": "KES 890K",
+            "volume_cents": 89_000_000,
             "end_date": "Dec 31, 2027",
             "image_url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?q=80&w=1000&auto=format&fit=crop"
         },
@@ -264,7 +264,7 @@ def seed():
             defaults={
                 'category': m['category'],
                 'yes_probability': m['yes_probability'],
-                'volume': m['volume'],
+                'volume_cents': m['volume_cents'],
                 'end_date': m['end_date'],
                 'description': m.get('description', ''),
                 'image_url': m['image_url'],
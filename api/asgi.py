@@ -3,6 +3,10 @@ ASGI config for api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Served by uvicorn workers when gunicorn runs with SERVER_MODE=asgi (see
+gunicorn_config.py). I/O-bound views are native async and share the pooled
+client in api.http_client; CPU-bound trading views stay sync.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
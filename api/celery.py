@@ -1,9 +1,14 @@
 """
 Celery configuration for CACHE
 Handles async tasks like market settlement and M-Pesa B2C payouts
+
+Tasks are routed onto the trading, settlement, payouts and notifications
+queues (CELERY_TASK_ROUTES); run one worker per queue, see api.task_queues.
+Start workers with PROCESS_TYPE=worker so they get worker-sized DB pools.
 """
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 # Set default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
@@ -36,6 +41,26 @@ app.conf.update(
     broker_connection_max_retries=10,
 )
 
+@worker_init.connect
+def _check_shared_cache(**kwargs):
+    """Task locks and payout slots live in the cache; LocMem would make them per-process."""
+    from api.task_queues import require_shared_cache
+    require_shared_cache()
+
+
+@worker_process_init.connect
+def _reset_db_pools(**kwargs):
+    """Prefork children open their own DB pools (DB_POOL_MODE=pool)."""
+    from api.db_pool import discard_inherited_pools
+    discard_inherited_pools()
+
+
+@worker_process_shutdown.connect
+def _report_db_pools(**kwargs):
+    from api.db_pool import log_pool_stats
+    log_pool_stats()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -0,0 +1,73 @@
+"""
+Database Connection Pool Metrics
+
+With DB_POOL_MODE=pool every process (web worker, Celery worker) keeps its
+own psycopg pool sized for its PROCESS_TYPE (see settings). `pool_stats`
+reports usage and wait time of the pools of the current process;
+/api/health/db/ serves it for the web worker that answers, and Celery
+workers log it at shutdown.
+
+Counters (requests_num, requests_wait_ms, ...) are cumulative since the
+pool opened, so they can be scraped as monotonically increasing metrics.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _is_pooled(connection) -> bool:
+    return bool(connection.settings_dict.get('OPTIONS', {}).get('pool'))
+
+
+def pool_stats() -> dict:
+    """
+    Connection usage of every database alias in this process.
+
+    Returns:
+        {alias: {'mode', 'process_type', ...}}; pooled aliases add the
+        psycopg pool counters plus in_use and avg_wait_ms
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            'mode': getattr(settings, 'DB_POOL_MODE', 'persistent'),
+            'process_type': getattr(settings, 'PROCESS_TYPE', 'web'),
+        }
+        if _is_pooled(connection):
+            counters = connection.pool.get_stats()
+            queued = counters.get('requests_queued', 0)
+            entry.update(counters)
+            entry['in_use'] = counters.get('pool_size', 0) - counters.get('pool_available', 0)
+            entry['avg_wait_ms'] = round(counters.get('requests_wait_ms', 0) / queued, 2) if queued else 0
+        else:
+            entry['connected'] = connection.connection is not None
+        stats[alias] = entry
+    return stats
+
+
+def discard_inherited_pools() -> None:
+    """
+    Forget pools copied from a parent process (call right after fork).
+
+    A forked child must not reuse, or close, its parent's pool sockets; it
+    opens its own pool on first use.
+    """
+    for alias in connections:
+        pools = getattr(type(connections[alias]), '_connection_pools', None)
+        if pools:
+            pools.pop(alias, None)
+
+
+def log_pool_stats() -> None:
+    for alias, entry in pool_stats().items():
+        if 'pool_size' in entry:
+            logger.info(
+                f"DB pool {alias} ({entry['process_type']}): size={entry['pool_size']}, "
+                f"in_use={entry['in_use']}, waiting={entry.get('requests_waiting', 0)}, "
+                f"avg_wait_ms={entry['avg_wait_ms']}"
+            )
@@ -0,0 +1,199 @@
+"""
+Read-Replica Routing
+
+Reads go to the primary unless code opts in, so trading paths (which read
+and then lock/write) never see replica lag. Opt-in points:
+- `@replica_reads_view` on read-only views (analytics, leaderboard, price
+  history, market details)
+- `with replica_reads():` in read-only management commands and tasks
+
+Inside an opted-in block, reads go to a healthy replica (DB_REPLICAS),
+except:
+- read-your-writes: a user who wrote within REPLICA_STICKY_SECONDS reads
+  from the primary (ReplicaStickinessMiddleware records the write)
+- lag: replicas lagging more than REPLICA_MAX_LAG_SECONDS, or whose lag
+  can't be measured, are skipped; with none left reads use the primary
+
+Writes always go to the primary. Any database alias can stand in for a
+replica (tests point one at a second local database); lag is only measured
+on PostgreSQL.
+"""
+
+import functools
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_use_replica = ContextVar('use_replica', default=False)
+# Per-request {'wrote': bool}, set by ReplicaStickinessMiddleware; a mutable
+# holder so writes made in sync_to_async threads are seen by the middleware
+_request_writes = ContextVar('request_writes', default=None)
+
+
+def _replicas() -> list:
+    return list(getattr(settings, 'DB_REPLICAS', []))
+
+
+def _sticky_key(user_id) -> str:
+    return f"db_sticky:{user_id}"
+
+
+# ============================================================================
+# REPLICA HEALTH
+# ============================================================================
+
+def replica_lag_seconds(alias: str):
+    """
+    Replication lag of a replica in seconds (0 for non-PostgreSQL stand-ins).
+
+    Returns:
+        float, or None when the replica can't be queried
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            # No replay timestamp means nothing replayed yet, or a primary
+            cursor.execute(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )
+            return float(cursor.fetchone()[0])
+    except Exception as e:
+        logger.error(f"Replica {alias} lag check failed: {str(e)}")
+        return None
+
+
+def _is_healthy(alias: str) -> bool:
+    key = f"db_replica_healthy:{alias}"
+    healthy = cache.get(key)
+    if healthy is None:
+        lag = replica_lag_seconds(alias)
+        healthy = lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10)
+        if not healthy:
+            logger.warning(f"Replica {alias} skipped, lag={lag}")
+        cache.set(key, healthy, getattr(settings, 'REPLICA_HEALTH_CHECK_SECONDS', 5))
+    return healthy
+
+
+def pick_replica():
+    """A healthy replica alias, or None to use the primary."""
+    healthy = [alias for alias in _replicas() if _is_healthy(alias)]
+    return random.choice(healthy) if healthy else None
+
+
+# ============================================================================
+# OPT-IN
+# ============================================================================
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """Route reads in this block to a replica (see module docstring)."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _is_sticky(request) -> bool:
+    from users.identity import get_authenticated_user
+    user = get_authenticated_user(request)
+    return bool(user and cache.get(_sticky_key(user.id)))
+
+
+def replica_reads_view(view_func):
+    """View decorator: read from a replica unless the caller just wrote."""
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(bool(_replicas()) and not _is_sticky(request)):
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+# ============================================================================
+# ROUTER / MIDDLEWARE
+# ============================================================================
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry; see module docstring."""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return pick_replica() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    After a request that wrote to the database, keep its user on the primary
+    for REPLICA_STICKY_SECONDS so they read their own writes.
+    Must come after IdentityMiddleware. Runs natively under sync and async
+    request handling.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        writes = {'wrote': False}
+        token = _request_writes.set(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_writes.reset(token)
+
+        if writes['wrote'] and _replicas():
+            self._mark_sticky(request)
+        return response
+
+    async def __acall__(self, request):
+        writes = {'wrote': False}
+        token = _request_writes.set(writes)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_writes.reset(token)
+
+        if writes['wrote'] and _replicas():
+            await sync_to_async(self._mark_sticky)(request)
+        return response
+
+    @staticmethod
+    def _mark_sticky(request) -> None:
+        from users.identity import get_authenticated_user
+        user = get_authenticated_user(request)
+        if user:
+            cache.set(_sticky_key(user.id), 1, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
@@ -1,8 +1,12 @@
 import json
+import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+logger = logging.getLogger(__name__)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def health_check(request):
@@ -12,3 +16,64 @@ def health_check(request):
         'message': 'Backend is running',
         'api_url': 'http://127.0.0.1:8000'
     }, status=200)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def queue_health(request):
+    """
+    Celery queue depths for monitoring.
+
+    GET /api/health/queues/
+    Returns 200 while every queue is below QUEUE_DEPTH_WARNING, 503 when one
+    is backlogged or the broker is unreachable.
+    """
+    from django.conf import settings
+    from api.task_queues import payout_slots, queue_depths
+
+    try:
+        depths = queue_depths()
+    except Exception as e:
+        logger.error(f"Queue depth check failed: {str(e)}")
+        return JsonResponse({'status': 'unavailable', 'error': str(e)}, status=503)
+
+    backlogged = sorted(queue for queue, depth in depths.items() if depth >= settings.QUEUE_DEPTH_WARNING)
+    return JsonResponse({
+        'status': 'backlogged' if backlogged else 'ok',
+        'queues': depths,
+        'backlogged_queues': backlogged,
+        'payout_slots': {
+            'in_use': payout_slots.in_use(),
+            'limit': settings.PAYOUT_MAX_CONCURRENCY,
+        },
+    }, status=503 if backlogged else 200)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def db_pool_health(request):
+    """
+    Database connection usage of the worker serving this request.
+
+    GET /api/health/db/
+    Returns 503 when requests are queueing for a pooled connection beyond
+    DB_POOL_WAITING_WARNING.
+    """
+    from django.conf import settings
+    from api.db_pool import pool_stats
+
+    try:
+        stats = pool_stats()
+    except Exception as e:
+        logger.error(f"DB pool stats failed: {str(e)}")
+        return JsonResponse({'status': 'unavailable', 'error': str(e)}, status=503)
+
+    saturated = sorted(
+        alias for alias, entry in stats.items()
+        if entry.get('requests_waiting', 0) >= settings.DB_POOL_WAITING_WARNING
+    )
+    return JsonResponse({
+        'status': 'saturated' if saturated else 'ok',
+        'databases': stats,
+        'saturated': saturated,
+    }, status=503 if saturated else 200)
@@ -0,0 +1,48 @@
+"""
+Pooled Async HTTP Client
+
+Async views that call third-party APIs (M-Pesa Daraja) share one
+httpx.AsyncClient per event loop, so keep-alive connections and TLS sessions
+are reused across requests instead of being set up per call.
+
+Under ASGI (uvicorn workers, see gunicorn_config.py) each worker process runs
+one event loop, so it keeps a single pool for its lifetime. Under WSGI, Django
+runs every async view in a fresh loop; the client then lives for one request,
+which is correct, just not pooled.
+"""
+
+import asyncio
+import logging
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    The shared httpx.AsyncClient of the running event loop.
+
+    Raises:
+        ImportError: httpx is not installed
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                getattr(settings, 'OUTBOUND_HTTP_TIMEOUT_SECONDS', 30),
+                connect=getattr(settings, 'OUTBOUND_HTTP_CONNECT_TIMEOUT_SECONDS', 5),
+            ),
+            limits=httpx.Limits(
+                max_connections=getattr(settings, 'OUTBOUND_HTTP_MAX_CONNECTIONS', 100),
+                max_keepalive_connections=getattr(settings, 'OUTBOUND_HTTP_MAX_KEEPALIVE', 20),
+            ),
+        )
+        _clients[loop] = client
+    return client
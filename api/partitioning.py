@@ -0,0 +1,390 @@
+"""
+Monthly Range Partitioning (PostgreSQL)
+
+The append-mostly history tables are partitioned by month on their
+creation timestamp:
+- markets_bet (timestamp)
+- markets_pricehistory (timestamp)
+- audit_auditlog (created_at)
+- notifications_notification (created_at)
+
+Migrations convert each table in place (`partition_table`); on other
+databases they are a no-op and the tables stay plain. Afterwards the
+`maintain_partitions` command (daily beat task) keeps
+PARTITION_MONTHS_AHEAD months of empty partitions ready and, for tables
+with a PARTITION_RETENTION_MONTHS, detaches older months, archives each one
+to a gzip'd CSV with a SHA-256 checksum, verifies the archive and drops
+the partition.
+
+Partition keys must be part of every primary key and unique constraint:
+the primary key becomes (id, <column>) and a unique column such as
+AuditLog.current_hash is unique together with the timestamp. Foreign keys
+can't point at a partitioned table by id alone, so references to Bet are
+kept without a database constraint (Django still applies on_delete).
+
+Queries only skip partitions when they filter on the partition column,
+e.g. PriceHistory by timestamp range.
+"""
+
+import csv
+import gzip
+import hashlib
+import logging
+import os
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = {
+    'markets_bet': 'timestamp',
+    'markets_pricehistory': 'timestamp',
+    'audit_auditlog': 'created_at',
+    'notifications_notification': 'created_at',
+}
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+# ============================================================================
+# NAMING / MONTHS
+# ============================================================================
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_pdefault"
+
+
+def _bound(month: date) -> str:
+    # Explicit UTC so bounds don't depend on the session time zone
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def _qn(name: str) -> str:
+    return default_connection.ops.quote_name(name)
+
+
+# ============================================================================
+# INSPECTION
+# ============================================================================
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+    row = cursor.fetchone()
+    return bool(row and row[0] == 'p')
+
+
+def list_partitions(cursor, table: str) -> dict:
+    """
+    Monthly partitions of `table`.
+
+    Returns:
+        {month (date): partition name}; the default partition is left out
+    """
+    cursor.execute(
+        """
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [table],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def default_partition_rows(cursor, table: str) -> int:
+    """Rows that fell outside every monthly partition (should stay 0)."""
+    cursor.execute("SELECT to_regclass(%s)", [default_partition_name(table)])
+    if cursor.fetchone()[0] is None:
+        return 0
+    cursor.execute(f"SELECT COUNT(*) FROM {_qn(default_partition_name(table))}")
+    return cursor.fetchone()[0]
+
+
+# ============================================================================
+# CREATION
+# ============================================================================
+
+def create_partition(cursor, table: str, month: date) -> bool:
+    """
+    Create the partition of `month` unless it exists.
+
+    Returns:
+        True when it was created
+    """
+    name = partition_name(table, month)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0] is not None:
+        return False
+    cursor.execute(
+        f"CREATE TABLE {_qn(name)} PARTITION OF {_qn(table)} "
+        f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+    )
+    return True
+
+
+def ensure_partitions(table: str, months_ahead: int = None, connection=None) -> list:
+    """
+    Create the partitions of the current month and the next `months_ahead`.
+
+    Returns:
+        Names of the partitions created
+    """
+    connection = connection or default_connection
+    months_ahead = getattr(settings, 'PARTITION_MONTHS_AHEAD', 3) if months_ahead is None else months_ahead
+    current = month_start(timezone.now())
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return created
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if create_partition(cursor, table, month):
+                created.append(partition_name(table, month))
+    return created
+
+
+# ============================================================================
+# RETENTION / ARCHIVE
+# ============================================================================
+
+def _copy_out(cursor, sql: str, out) -> None:
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):  # psycopg2
+        raw.copy_expert(sql, out)
+    else:  # psycopg 3
+        with raw.copy(sql) as copy:
+            for chunk in copy:
+                out.write(bytes(chunk))
+
+
+def archive_partition(cursor, name: str, archive_dir: str) -> dict:
+    """
+    Write a partition to <archive_dir>/<name>.csv.gz plus a .sha256 file
+    and verify the archive reads back with every row.
+
+    Returns:
+        {'path', 'rows', 'sha256'}
+
+    Raises:
+        RuntimeError: The archive does not match the partition
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+
+    with gzip.open(tmp_path, 'wb') as out:
+        _copy_out(cursor, f"COPY (SELECT * FROM {_qn(name)}) TO STDOUT WITH CSV HEADER", out)
+
+    cursor.execute(f"SELECT COUNT(*) FROM {_qn(name)}")
+    expected = cursor.fetchone()[0]
+    with gzip.open(tmp_path, 'rt', newline='') as archived:
+        rows = sum(1 for _ in csv.reader(archived)) - 1  # Header
+    if rows != expected:
+        os.remove(tmp_path)
+        raise RuntimeError(f"Archive of {name} has {rows} rows, partition has {expected}")
+
+    digest = hashlib.sha256()
+    with open(tmp_path, 'rb') as archived:
+        for block in iter(lambda: archived.read(1024 * 1024), b''):
+            digest.update(block)
+    os.replace(tmp_path, path)
+    with open(f"{path}.sha256", 'w') as checksum:
+        checksum.write(f"{digest.hexdigest()}  {os.path.basename(path)}\n")
+
+    return {'path': path, 'rows': rows, 'sha256': digest.hexdigest()}
+
+
+def detach_old_partitions(table: str, retention_months: int, archive_dir: str, connection=None) -> list:
+    """
+    Archive and drop the partitions older than `retention_months`.
+
+    Each partition is detached, archived and dropped in its own transaction,
+    so a failed archive leaves it attached.
+
+    Returns:
+        [archive info] of the partitions removed
+    """
+    connection = connection or default_connection
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    archived = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return archived
+        old = sorted((month, name) for month, name in list_partitions(cursor, table).items() if month < cutoff)
+
+    for month, name in old:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(name)}")
+            info = archive_partition(cursor, name, archive_dir)
+            cursor.execute(f"DROP TABLE {_qn(name)}")
+        logger.info(f"Archived partition {name}: {info['rows']} rows to {info['path']}")
+        archived.append(info)
+    return archived
+
+
+def maintain_partitions(months_ahead: int = None, archive_dir: str = None, dry_run: bool = False) -> dict:
+    """
+    Create upcoming partitions and archive expired ones on every table.
+
+    Returns:
+        {table: {'created', 'archived', 'default_rows'}}; empty off PostgreSQL
+    """
+    if default_connection.vendor != 'postgresql':
+        return {}
+
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+    current = month_start(timezone.now())
+    report = {}
+    for table in PARTITIONED_TABLES:
+        retention = settings.PARTITION_RETENTION_MONTHS.get(table)
+        with default_connection.cursor() as cursor:
+            if not is_partitioned(cursor, table):
+                continue
+            existing = list_partitions(cursor, table)
+            default_rows = default_partition_rows(cursor, table)
+
+        if dry_run:
+            wanted = [add_months(current, offset) for offset in range(months_ahead + 1)]
+            cutoff = add_months(current, -retention) if retention else None
+            entry = {
+                'created': [partition_name(table, month) for month in wanted if month not in existing],
+                'archived': [name for month, name in sorted(existing.items()) if cutoff and month < cutoff],
+            }
+        else:
+            entry = {
+                'created': ensure_partitions(table, months_ahead),
+                'archived': detach_old_partitions(table, retention, archive_dir) if retention else [],
+            }
+        entry['default_rows'] = default_rows
+        if default_rows:
+            logger.warning(f"{default_rows} rows of {table} are in its default partition")
+        report[table] = entry
+    return report
+
+
+# ============================================================================
+# CONVERSION (migrations)
+# ============================================================================
+
+def partition_table(schema_editor, table: str, column: str) -> None:
+    """
+    Convert a plain table into a monthly range-partitioned one in place.
+
+    For RunPython migrations: a no-op unless the database is PostgreSQL and
+    the table isn't partitioned yet. Rows are copied inside the migration
+    transaction, so run it in a maintenance window on large tables.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    qn = schema_editor.quote_name
+    legacy = f"{table}_unpartitioned"
+    with connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+
+        # Constraints and indexes are rebuilt on the new table under their names
+        cursor.execute(
+            """
+            SELECT con.conname, con.contype, pg_get_constraintdef(con.oid),
+                   ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+                         JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                         ORDER BY k.ord)
+            FROM pg_constraint con
+            WHERE con.conrelid = to_regclass(%s) AND con.contype IN ('p', 'u', 'f')
+            """,
+            [legacy],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = to_regclass(%s)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+            """,
+            [legacy],
+        )
+        indexes = cursor.fetchall()
+
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {qn(name)}")
+        for name, _, _, _ in constraints:
+            cursor.execute(f"ALTER TABLE {qn(legacy)} DROP CONSTRAINT {qn(name)}")
+
+        # Detach the id sequence from the old table so it survives the drop
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0), MIN({qn(column)}) FROM {qn(legacy)}")
+        max_id, oldest = cursor.fetchone()
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+            [legacy],
+        )
+        if cursor.fetchone()[0]:
+            cursor.execute(f"ALTER TABLE {qn(legacy)} ALTER COLUMN id DROP IDENTITY")
+            sequence = f"{table}_id_seq"
+            cursor.execute(f"CREATE SEQUENCE {qn(sequence)} AS bigint")
+        else:
+            cursor.execute(f"ALTER TABLE {qn(legacy)} ALTER COLUMN id DROP DEFAULT")
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        cursor.execute("SELECT setval(%s, %s, %s)", [sequence, max(max_id, 1), max_id > 0])
+
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence])
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.id")
+
+        first = month_start(oldest) if oldest else month_start(timezone.now())
+        last = add_months(month_start(timezone.now()), getattr(settings, 'PARTITION_MONTHS_AHEAD', 3))
+        month = first
+        while month <= last:
+            create_partition(cursor, table, month)
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        for name, kind, definition, columns in constraints:
+            if kind == 'p':
+                cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} PRIMARY KEY (id, {qn(column)})")
+            elif kind == 'u':
+                keys = list(columns) + ([] if column in columns else [column])
+                cursor.execute(
+                    f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} UNIQUE ({', '.join(qn(key) for key in keys)})"
+                )
+            else:
+                cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+        for name, definition in indexes:
+            cursor.execute(re.sub(r' ON (ONLY )?\S+ USING ', f' ON {qn(table)} USING ', definition, count=1))
+
+    logger.info(f"Partitioned {table} by month on {column}")
@@ -11,8 +11,9 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
-from decouple import config
+from decouple import Csv, config
 
 # Try to import crontab for Celery Beat schedule
 try:
@@ -69,6 +70,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.identity.IdentityMiddleware',
+    'api.db_router.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -110,7 +113,8 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
-        'CONN_MAX_AGE': 180,  # Reuse connections for 3 minutes
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=180, cast=int),  # Reuse connections for 3 minutes
+        'CONN_HEALTH_CHECKS': True,  # Drop dead connections before a request uses them
         'OPTIONS': {
             'connect_timeout': 10,
             'options': '-c statement_timeout=30000'  # 30 second statement timeout
@@ -118,6 +122,84 @@ DATABASES = {
     }
 }
 
+# Connection handling (DB_POOL_MODE), sized per process type (PROCESS_TYPE:
+# web, worker, beat - set it in each service's environment):
+# - persistent: one connection per process, kept CONN_MAX_AGE seconds
+# - pool: psycopg 3 pool per process (psycopg[pool]); Postgres sees at most
+#   processes x DB_POOL_MAX_SIZE_<TYPE> connections
+# - pgbouncer: connect to PgBouncer in transaction mode; server-side cursors
+#   are disabled and statement_timeout must be set on the database role,
+#   since PgBouncer rejects startup options
+# Usage and wait time: /api/health/db/ (api/db_pool.py)
+PROCESS_TYPE = config('PROCESS_TYPE', default='web')
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+DB_POOL_SIZES = {
+    # (min_size, max_size); sync web workers run one request at a time,
+    # ASGI workers and threaded Celery pools need more
+    'web': (config('DB_POOL_MIN_SIZE_WEB', default=1, cast=int), config('DB_POOL_MAX_SIZE_WEB', default=4, cast=int)),
+    'worker': (config('DB_POOL_MIN_SIZE_WORKER', default=1, cast=int), config('DB_POOL_MAX_SIZE_WORKER', default=2, cast=int)),
+    'beat': (0, 1),
+}
+DB_POOL_TIMEOUT_SECONDS = config('DB_POOL_TIMEOUT_SECONDS', default=10, cast=int)  # Wait for a free connection
+DB_POOL_MAX_IDLE_SECONDS = config('DB_POOL_MAX_IDLE_SECONDS', default=300, cast=int)
+DB_POOL_WAITING_WARNING = config('DB_POOL_WAITING_WARNING', default=5, cast=int)
+
+if DB_POOL_MODE == 'pool':
+    _pool_min, _pool_max = DB_POOL_SIZES.get(PROCESS_TYPE, DB_POOL_SIZES['web'])
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # The pool owns connection lifetime
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': _pool_min,
+        'max_size': _pool_max,
+        'timeout': DB_POOL_TIMEOUT_SECONDS,
+        'max_idle': DB_POOL_MAX_IDLE_SECONDS,
+        'name': f'{PROCESS_TYPE}-default',
+    }
+elif DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    DATABASES['default']['OPTIONS'].pop('options')
+
+# Read replicas (api/db_router.py): DB_REPLICA_HOSTS=host1,host2 adds the
+# aliases replica_0, replica_1, ... with the primary's credentials. Only
+# views and commands that opt in read from them.
+DB_REPLICAS = []
+for _index, _host in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv())):
+    _alias = f'replica_{_index}'
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'OPTIONS': copy.deepcopy(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},  # Test runs read the test primary
+    }
+    if 'pool' in DATABASES[_alias]['OPTIONS']:
+        DATABASES[_alias]['OPTIONS']['pool']['name'] = f'{PROCESS_TYPE}-{_alias}'
+    DB_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=10, cast=int)  # Lagging replicas are skipped
+REPLICA_HEALTH_CHECK_SECONDS = config('REPLICA_HEALTH_CHECK_SECONDS', default=5, cast=int)  # Lag is re-measured this often
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)  # Read-your-writes window after a write
+
+# Monthly partitions of the history tables (api/partitioning.py, PostgreSQL
+# only). maintain_partitions keeps PARTITION_MONTHS_AHEAD months ready and
+# archives partitions older than the table's retention (None keeps them).
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+PARTITION_RETENTION_MONTHS = {
+    'markets_bet': None,  # Positions of long-running markets
+    'markets_pricehistory': config('PRICE_HISTORY_RETENTION_MONTHS', default=13, cast=int),
+    'audit_auditlog': config('AUDIT_LOG_RETENTION_MONTHS', default=25, cast=int),
+    'notifications_notification': config('NOTIFICATION_RETENTION_MONTHS', default=6, cast=int),
+}
+PARTITION_ARCHIVE_DIR = config('PARTITION_ARCHIVE_DIR', default=os.path.join(BASE_DIR, 'archive', 'partitions'))
+
+# Settled markets older than MARKET_ARCHIVE_AFTER_DAYS move their bets, price
+# history, comments and fee distributions to one file each (markets/archive.py)
+MARKET_ARCHIVE_DIR = config('MARKET_ARCHIVE_DIR', default=os.path.join(BASE_DIR, 'archive', 'markets'))
+MARKET_ARCHIVE_AFTER_DAYS = config('MARKET_ARCHIVE_AFTER_DAYS', default=30, cast=int)
+MARKET_ARCHIVE_CACHE_SECONDS = config('MARKET_ARCHIVE_CACHE_SECONDS', default=300, cast=int)  # Decoded archives kept in cache
+
+# Hourly volume buckets behind the rolling 24h/7d market volume (markets/volume.py)
+VOLUME_BUCKET_RETENTION_DAYS = config('VOLUME_BUCKET_RETENTION_DAYS', default=8, cast=int)
+
 
 
 # Password validation
@@ -332,7 +414,18 @@ CSRF_COOKIE_SAMESITE = 'Strict'
 CSRF_COOKIE_HTTPONLY = True  # Prevent JS access to CSRF token
 SESSION_COOKIE_DOMAIN = None
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Cache-first sessions with lazy database writes (users/sessions.py) when a
+# shared cache is configured; plain database sessions otherwise, since a
+# logout on a per-process cache would leave the session alive on every other
+# worker. Set SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies
+# for stateless signed-cookie sessions instead (no server-side storage at all).
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='users.sessions' if config('CACHE_URL', default='') else 'django.contrib.sessions.backends.db',
+)
+SESSION_LAZY_DB_WRITES = config('SESSION_LAZY_DB_WRITES', default=bool(config('CACHE_URL', default='')), cast=bool)
+SESSION_DB_WRITE_INTERVAL_SECONDS = config('SESSION_DB_WRITE_INTERVAL_SECONDS', default=300, cast=int)
+SESSION_CLEANUP_BATCH_SIZE = config('SESSION_CLEANUP_BATCH_SIZE', default=5000, cast=int)
 
 # CSRF Protection
 CSRF_FAILURE_VIEW = 'api.views.csrf_failure'
@@ -357,8 +450,16 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Shared cache: set CACHE_URL (e.g. redis://127.0.0.1:6379/2) so web workers,
+# Celery workers and the price poller see the same cached state. Without it
+# each process gets its own in-memory cache (fine for local development).
+CACHE_URL = config('CACHE_URL', default='')
+
 CACHES = {
     'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
     },
@@ -369,6 +470,58 @@ CACHES = {
     }
 }
 
+# Whether every process sees the same default cache. Cross-process locks,
+# identity and session caching are only safe when it does.
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Header phone/email -> user id mappings are cached this long (users/identity.py,
+# only with a shared cache); user rows themselves are never cached
+IDENTITY_CACHE_TTL_SECONDS = config('IDENTITY_CACHE_TTL_SECONDS', default=300, cast=int)
+
+# Hot market state entries (markets/state_cache.py) live this long. Only on
+# by default with a shared cache: a per-process LocMem copy is never told
+# about trades other workers commit. 0 reads every market from the database.
+MARKET_STATE_CACHE_SECONDS = config('MARKET_STATE_CACHE_SECONDS', default=3600 if CACHE_URL else 0, cast=int)
+
+# ============================================================================
+# OUTBOUND HTTP (async views, api/http_client.py)
+# ============================================================================
+
+OUTBOUND_HTTP_TIMEOUT_SECONDS = config('OUTBOUND_HTTP_TIMEOUT_SECONDS', default=30, cast=int)
+OUTBOUND_HTTP_CONNECT_TIMEOUT_SECONDS = config('OUTBOUND_HTTP_CONNECT_TIMEOUT_SECONDS', default=5, cast=int)
+OUTBOUND_HTTP_MAX_CONNECTIONS = config('OUTBOUND_HTTP_MAX_CONNECTIONS', default=100, cast=int)
+OUTBOUND_HTTP_MAX_KEEPALIVE = config('OUTBOUND_HTTP_MAX_KEEPALIVE', default=20, cast=int)
+
+# ============================================================================
+# MARKET EVENT STREAMING (SSE)
+# ============================================================================
+
+# In-process fan-out for a single ASGI worker; use markets.events.CacheBroker
+# with a shared (Redis) cache when running several workers
+MARKET_EVENT_BROKER = config('MARKET_EVENT_BROKER', default='markets.events.InProcessBroker')
+MARKET_EVENT_BUFFER_SIZE = config('MARKET_EVENT_BUFFER_SIZE', default=500, cast=int)  # Replay window per market
+
+# ============================================================================
+# TRADE EXECUTION
+# ============================================================================
+
+# DIRECT: each request writes the Market row itself.
+# SEQUENCER: binary market orders are applied by one single-writer sequencer
+# per shard of market ids (markets/sequencer.py) and persisted in group commits.
+MARKET_EXECUTION_MODE = config('MARKET_EXECUTION_MODE', default='DIRECT')
+TRADE_SEQUENCER_SHARDS = config('TRADE_SEQUENCER_SHARDS', default=4, cast=int)
+TRADE_SEQUENCER_QUEUE = config('TRADE_SEQUENCER_QUEUE', default='markets.sequencer.LocalQueue')
+TRADE_SEQUENCER_BATCH_SIZE = config('TRADE_SEQUENCER_BATCH_SIZE', default=100, cast=int)  # Max fills per group commit
+TRADE_SEQUENCER_BATCH_WAIT_MS = config('TRADE_SEQUENCER_BATCH_WAIT_MS', default=5, cast=int)  # Linger before committing
+TRADE_SEQUENCER_TIMEOUT_SECONDS = config('TRADE_SEQUENCER_TIMEOUT_SECONDS', default=10, cast=int)
+
+# Markets with clearing_mode = BATCH_AUCTION collect orders for this long and
+# clear them at one uniform price
+BATCH_AUCTION_INTERVAL_MS = config('BATCH_AUCTION_INTERVAL_MS', default=500, cast=int)
+
 # ============================================================================
 # CELERY & REDIS CONFIGURATION
 # ============================================================================
@@ -397,6 +550,52 @@ CELERY_RESULT_EXPIRES = config('CELERY_RESULT_EXPIRES', default=3600, cast=int)
 CELERY_TASK_MAX_RETRIES = 5
 CELERY_TASK_DEFAULT_RETRY_DELAY = 60  # seconds
 
+# Queue routing (api.task_queues): one worker pool per queue, so a large
+# settlement or payout batch never delays limit-order matching.
+# Priorities follow the Redis transport: lower numbers are served first.
+CELERY_TASK_DEFAULT_QUEUE = 'celery'
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_ROUTES = {
+    'markets.tasks.fire_trigger_orders': {'queue': 'trading', 'priority': 0},
+    'markets.tasks.poll_bitcoin_price': {'queue': 'trading', 'priority': 1},
+    'markets.tasks.roll_bitcoin_market': {'queue': 'trading', 'priority': 1},
+    'markets.tasks.match_limit_orders': {'queue': 'trading', 'priority': 3},
+    'markets.tasks.close_due_markets': {'queue': 'trading', 'priority': 3},
+    'payments.settlement_tasks.settle_market': {'queue': 'settlement', 'priority': 3},
+    'payments.settlement_tasks.relay_outbox': {'queue': 'settlement', 'priority': 5},
+    'markets.tasks.expire_unmatched_limit_orders': {'queue': 'settlement', 'priority': 7},
+    'payments.tasks.process_withdrawal': {'queue': 'payouts', 'priority': 2},  # A user is waiting on it
+    'payments.settlement_tasks.send_b2c_payout': {'queue': 'payouts', 'priority': 3},
+    'payments.settlement_tasks.retry_failed_payouts': {'queue': 'payouts', 'priority': 7},
+    'payments.tasks.sweep_stale_withdrawals': {'queue': 'payouts', 'priority': 7},
+    'notifications.tasks.deliver_price_alerts': {'queue': 'notifications', 'priority': 3},
+}
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+# Reserve one message at a time so priorities and queue separation hold
+CELERY_WORKER_PREFETCH_MULTIPLIER = config('CELERY_WORKER_PREFETCH_MULTIPLIER', default=1, cast=int)
+
+# At most this many B2C calls in flight across all payout workers
+PAYOUT_MAX_CONCURRENCY = config('PAYOUT_MAX_CONCURRENCY', default=4, cast=int)
+PAYOUT_SLOT_TIMEOUT_SECONDS = config('PAYOUT_SLOT_TIMEOUT_SECONDS', default=120, cast=int)  # Frees a slot held by a killed worker
+PAYOUT_SLOT_RETRY_SECONDS = config('PAYOUT_SLOT_RETRY_SECONDS', default=5, cast=int)
+
+# Withdrawals still SUBMITTED this long after their B2C call are failed and
+# their holds released (payments.withdrawals.sweep_stale_withdrawals)
+WITHDRAWAL_RESULT_TIMEOUT_MINUTES = config('WITHDRAWAL_RESULT_TIMEOUT_MINUTES', default=60, cast=int)
+
+# /api/health/queues/ reports "backlogged" past this many waiting messages
+QUEUE_DEPTH_WARNING = config('QUEUE_DEPTH_WARNING', default=1000, cast=int)
+
+# Transactional outbox (payments.outbox): task dispatches are written with the
+# data they act on and relayed to the broker in batches after commit
+OUTBOX_RELAY_BATCH_SIZE = config('OUTBOX_RELAY_BATCH_SIZE', default=500, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=10, cast=int)
+OUTBOX_RELAY_INTERVAL_SECONDS = config('OUTBOX_RELAY_INTERVAL_SECONDS', default=10, cast=int)
+
 
 # ============================================================================
 # M-PESA DARAJA CONFIGURATION
@@ -415,6 +614,19 @@ MPESA_PRODUCTION = config('MPESA_PRODUCTION', default=False, cast=bool)
 # B2C Callback URL
 MPESA_CALLBACK_URL = config('MPESA_CALLBACK_URL', default='https://cache.co.ke/api/payments/b2c-callback/')
 
+# ============================================================================
+# BITCOIN PRICE FEED
+# ============================================================================
+
+# Upstream price APIs (override to point at a local fake price server in tests)
+BITCOIN_PRICE_API_URL = config('BITCOIN_PRICE_API_URL', default='https://api.coingecko.com/api/v3/simple/price')
+BITCOIN_FALLBACK_API_URL = config('BITCOIN_FALLBACK_API_URL', default='https://api.binance.com/api/v3/ticker/price')
+BITCOIN_PRICE_POLL_SECONDS = config('BITCOIN_PRICE_POLL_SECONDS', default=5, cast=int)
+BITCOIN_PRICE_HISTORY_SIZE = config('BITCOIN_PRICE_HISTORY_SIZE', default=120, cast=int)  # Ticks kept in the ring buffer
+BITCOIN_ROUND_MINUTES = config('BITCOIN_ROUND_MINUTES', default=5, cast=int)
+BITCOIN_CLEARING_MODE = config('BITCOIN_CLEARING_MODE', default='CONTINUOUS')  # BATCH_AUCTION for bursty rounds
+
+
 # Payout settings
 PAYOUT_PLATFORM_FEE_PCT = config('PAYOUT_PLATFORM_FEE_PCT', default='5.00')
 PAYOUT_MIN_AMOUNT = config('PAYOUT_MIN_AMOUNT', default='10')  # KES
@@ -430,10 +642,46 @@ if crontab is not None:
             'task': 'markets.tasks.match_limit_orders',
             'schedule': crontab(),  # Run every minute
         },
+        'close-due-markets': {
+            'task': 'markets.tasks.close_due_markets',
+            'schedule': crontab(),  # Safety net; run_market_lifecycle closes on the second
+        },
+        'relay-outbox': {
+            'task': 'payments.settlement_tasks.relay_outbox',
+            'schedule': float(OUTBOX_RELAY_INTERVAL_SECONDS),  # Post-commit relays handle the normal case
+        },
+        'sweep-stale-withdrawals': {
+            'task': 'payments.tasks.sweep_stale_withdrawals',
+            'schedule': crontab(minute='*/10'),  # Every 10 minutes
+        },
         'expire-unmatched-limit-orders': {
             'task': 'markets.tasks.expire_unmatched_limit_orders',
             'schedule': crontab(minute=0),  # Run every hour at minute 0
         },
+        'poll-bitcoin-price': {
+            'task': 'markets.tasks.poll_bitcoin_price',
+            'schedule': float(BITCOIN_PRICE_POLL_SECONDS),
+        },
+        'roll-bitcoin-market': {
+            'task': 'markets.tasks.roll_bitcoin_market',
+            'schedule': float(BITCOIN_PRICE_POLL_SECONDS),
+        },
+        'clear-expired-sessions': {
+            'task': 'users.tasks.clear_expired_sessions',
+            'schedule': crontab(minute=30, hour=3),  # Daily at 03:30 UTC
+        },
+        'maintain-partitions': {
+            'task': 'audit.tasks.maintain_partitions',
+            'schedule': crontab(minute=15, hour=4),  # Daily at 04:15 UTC
+        },
+        'archive-settled-markets': {
+            'task': 'markets.tasks.archive_settled_markets',
+            'schedule': crontab(minute=45, hour=4),  # Daily at 04:45 UTC
+        },
+        'prune-volume-buckets': {
+            'task': 'markets.tasks.prune_volume_buckets',
+            'schedule': crontab(minute=55, hour=4),  # Daily at 04:55 UTC
+        },
     }
 else:
     CELERY_BEAT_SCHEDULE = {}
@@ -0,0 +1,179 @@
+"""
+Celery Queues, Task Locks and Queue Metrics
+
+Tasks are routed (CELERY_TASK_ROUTES in settings) onto dedicated queues so
+latency-sensitive work never waits behind bulk jobs:
+- trading: limit-order matching, trigger orders, market closing, BTC feed
+- settlement: market settlement, outbox relay, limit-order expiry
+- payouts: M-Pesa B2C calls (slow external I/O, capped concurrency)
+- notifications: price alert fan-out
+
+Each queue is consumed by its own worker, e.g.:
+    celery -A api worker -Q trading -c 4 -n trading@%h
+    celery -A api worker -Q settlement -c 2 -n settlement@%h
+    celery -A api worker -Q payouts -c 4 -n payouts@%h
+    celery -A api worker -Q notifications,celery -c 2 -n notifications@%h
+
+Cross-worker coordination goes through the shared cache:
+- `singleton_lock` keeps a periodic task from overlapping itself when a beat
+  run outlasts its interval
+- `CacheSemaphore` caps how many tasks of a kind run at once across every
+  worker (payouts: PAYOUT_MAX_CONCURRENCY)
+
+Both are only as wide as the cache: on a per-process LocMem cache every
+worker process gets its own locks. Workers therefore refuse to start without
+a shared cache (`require_shared_cache`, called from api.celery on
+worker_init); eager and single-process development runs are unaffected.
+"""
+
+import logging
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+TRADING_QUEUE = 'trading'
+SETTLEMENT_QUEUE = 'settlement'
+PAYOUTS_QUEUE = 'payouts'
+NOTIFICATIONS_QUEUE = 'notifications'
+DEFAULT_QUEUE = 'celery'
+TASK_QUEUES = (TRADING_QUEUE, SETTLEMENT_QUEUE, PAYOUTS_QUEUE, NOTIFICATIONS_QUEUE, DEFAULT_QUEUE)
+
+
+# ============================================================================
+# LOCKS
+# ============================================================================
+
+def require_shared_cache() -> None:
+    """
+    Raise unless the default cache is shared between processes.
+
+    Raises:
+        ImproperlyConfigured: CACHE_URL is not set (per-process LocMem cache)
+    """
+    if not settings.SHARED_CACHE:
+        raise ImproperlyConfigured(
+            'Celery workers need a shared cache for task locks and payout slots; set CACHE_URL'
+        )
+
+
+def _release(key: str, token: str) -> None:
+    # Only the holder releases; an expired lock may already belong to someone else
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+@contextmanager
+def singleton_lock(name: str, timeout: int = None):
+    """
+    Hold a cluster-wide lock for the duration of a task run.
+
+    Yields True when the lock was acquired, False when another run holds it.
+    The lock expires after `timeout` seconds (default: the task hard time
+    limit), so a killed worker cannot block the task forever.
+
+    Usage:
+        with singleton_lock('match_limit_orders') as acquired:
+            if not acquired:
+                return {'status': 'skipped'}
+            ...
+    """
+    key = f"task_lock:{name}"
+    token = uuid.uuid4().hex
+    timeout = timeout or getattr(settings, 'CELERY_TASK_TIME_LIMIT', 900)
+    acquired = cache.add(key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _release(key, token)
+
+
+class CacheSemaphore:
+    """
+    Counting semaphore over `limit` cache slots.
+
+    Args:
+        name: Cache namespace
+        limit: Callable returning the number of slots (read per acquire, so
+            settings overrides apply without a restart of the importer)
+        timeout: Seconds before an abandoned slot frees itself
+    """
+
+    def __init__(self, name: str, limit, timeout: int):
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+
+    def _slot_key(self, slot: int) -> str:
+        return f"semaphore:{self.name}:{slot}"
+
+    def in_use(self) -> int:
+        keys = [self._slot_key(slot) for slot in range(self.limit())]
+        return len(cache.get_many(keys))
+
+    @contextmanager
+    def slot(self):
+        """Yields True while holding a slot, False when all slots are taken."""
+        token = uuid.uuid4().hex
+        held = None
+        for slot in range(self.limit()):
+            if cache.add(self._slot_key(slot), token, self.timeout):
+                held = self._slot_key(slot)
+                break
+        try:
+            yield held is not None
+        finally:
+            if held:
+                _release(held, token)
+
+
+payout_slots = CacheSemaphore(
+    'b2c_payout',
+    lambda: getattr(settings, 'PAYOUT_MAX_CONCURRENCY', 4),
+    timeout=getattr(settings, 'PAYOUT_SLOT_TIMEOUT_SECONDS', 120),
+)
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+def queue_depths() -> dict:
+    """
+    Number of messages waiting on each queue.
+
+    Uses a passive declare per queue, which every kombu transport answers
+    (Redis sums the priority sub-queues). A queue nobody has published to
+    yet does not exist on the broker and counts as 0.
+
+    Returns:
+        {queue_name: int}
+
+    Raises:
+        RuntimeError: Celery is not installed
+        Exception: Broker unreachable
+    """
+    from api import celery_app
+    if celery_app is None:
+        raise RuntimeError('Celery is not installed')
+
+    depths = {}
+    with celery_app.connection_for_read() as connection:
+        connection.ensure_connection(max_retries=1)
+        for queue in TASK_QUEUES:
+            channel = connection.channel()
+            try:
+                depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+            except Exception:
+                depths[queue] = 0
+            finally:
+                try:
+                    channel.close()
+                except Exception:
+                    pass
+    return depths
@@ -17,12 +17,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from api.health import health_check
+from api.health import db_pool_health, health_check, queue_health
 from api.views import get_csrf_token
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/health/', health_check, name='health_check'),
+    path('api/health/queues/', queue_health, name='queue_health'),
+    path('api/health/db/', db_pool_health, name='db_pool_health'),
     path('api/csrf-token/', get_csrf_token, name='csrf_token'),
 
     path('api/auth/', include('users.urls')),
@@ -19,6 +19,7 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 
+from api.db_router import replica_reads
 from audit.models import AuditLog, AuditAlert, AuditSummary
 from payments.models import Transaction
 from users.models import CustomUser
@@ -63,8 +64,9 @@ class Command(BaseCommand):
             except ValueError:
                 raise CommandError(f'Invalid date: {date_param}')
         
-        # Generate report
-        report = self.generate_report(target_date)
+        # Generate report (read-only, served by a replica when configured)
+        with replica_reads():
+            report = self.generate_report(target_date)
         
         # Output
         if output_file:
@@ -0,0 +1,65 @@
+"""
+Partition Maintenance Command
+
+Create the upcoming monthly partitions of the history tables and archive
+the ones past their retention (see api/partitioning.py). Runs daily from
+Celery beat; safe to re-run.
+
+Usage:
+    python manage.py maintain_partitions
+    python manage.py maintain_partitions --months-ahead 6
+    python manage.py maintain_partitions --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.partitioning import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions and archive expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='Months of partitions to keep ready (default PARTITION_MONTHS_AHEAD)'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            help='Directory for archived partitions (default PARTITION_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        report = maintain_partitions(
+            months_ahead=options['months_ahead'],
+            archive_dir=options['archive_dir'],
+            dry_run=options['dry_run'],
+        )
+        if not report:
+            self.stdout.write('No partitioned tables (PostgreSQL only)')
+            return
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        for table, entry in report.items():
+            for name in entry['created']:
+                self.stdout.write(f"{prefix}{table}: create {name}")
+            for archived in entry['archived']:
+                if isinstance(archived, dict):
+                    self.stdout.write(
+                        f"{table}: archived {archived['rows']} rows to {archived['path']} "
+                        f"(sha256 {archived['sha256']})"
+                    )
+                else:
+                    self.stdout.write(f"{prefix}{table}: archive {archived}")
+            if entry['default_rows']:
+                self.stdout.write(self.style.WARNING(
+                    f"{table}: {entry['default_rows']} rows in the default partition"
+                ))
+        self.stdout.write(self.style.SUCCESS('Partitions up to date'))
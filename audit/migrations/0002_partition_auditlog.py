@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    """Convert AuditLog to monthly range partitions (PostgreSQL only)."""
+    from api.partitioning import partition_table
+
+    partition_table(schema_editor, 'audit_auditlog', 'created_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        # Reversing keeps the partitioned table; it holds the same columns
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
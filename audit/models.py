@@ -130,13 +130,17 @@ class AuditLog(models.Model):
         # Verify chain if previous_hash exists
         if self.previous_hash:
             try:
-                prev_log = AuditLog.objects.get(current_hash=self.previous_hash)
+                # Bounded by created_at so only older partitions are searched
+                prev_log = AuditLog.objects.get(
+                    current_hash=self.previous_hash, created_at__lte=self.created_at
+                )
                 if not prev_log.hash_verified:
                     # Previous record tampered with
                     return False
             except AuditLog.DoesNotExist:
-                # Previous hash doesn't exist - corruption detected
-                return False
+                # Fine for the oldest record left after older partitions were
+                # archived; otherwise the previous hash is gone - corruption
+                return not AuditLog.objects.filter(created_at__lt=self.created_at).exists()
         
         return True
     
@@ -0,0 +1,41 @@
+"""
+Celery tasks for history table maintenance
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import celery - will be available in production
+try:
+    from celery import shared_task
+except ImportError:
+    # Development mode without Celery
+    def shared_task(*args, **kwargs):
+        """Dummy decorator when Celery is not installed"""
+        def decorator(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+def maintain_partitions_impl():
+    """Create upcoming monthly partitions and archive expired ones."""
+    from api.partitioning import maintain_partitions as maintain
+
+    report = maintain()
+    created = sum(len(entry['created']) for entry in report.values())
+    archived = sum(len(entry['archived']) for entry in report.values())
+    logger.info(f"Partition maintenance: {created} created, {archived} archived")
+    return {'status': 'success', 'created': created, 'archived': archived}
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def maintain_partitions():
+        """Celery wrapper for maintain_partitions_impl"""
+        return maintain_partitions_impl()
+except:
+    def maintain_partitions():
+        return maintain_partitions_impl()
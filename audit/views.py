@@ -19,6 +19,7 @@ from django.shortcuts import get_object_or_404
 
 from audit.models import AuditLog, AuditAlert, AccessLog, AuditSummary
 from users.models import CustomUser
+from markets.models import Bet
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +139,20 @@ def audit_log_detail(request, log_id):
     # Verify hash integrity
     hash_verified = log.verify_hash()
     
+    # Bets of archived markets are read back from the market archive
+    archived_object = None
+    market_id = (log.after_values or {}).get('market_id')
+    if log.content_type == 'markets.Bet' and market_id and not Bet.objects.filter(id=log.object_id).exists():
+        from django.core import serializers
+        from markets.archive import ArchiveError, find_archived_bet
+        try:
+            bet = find_archived_bet(int(log.object_id), market_id)
+        except ArchiveError as e:
+            logger.error(f"Audit detail {log.id}: {str(e)}")
+            bet = None
+        if bet:
+            archived_object = serializers.serialize('python', [bet])[0]['fields']
+    
     return JsonResponse({
         'id': log.id,
         'action': log.action,
@@ -156,6 +171,7 @@ def audit_log_detail(request, log_id):
         'current_hash': log.current_hash,
         'previous_hash': log.previous_hash,
         'hash_verified': hash_verified,
+        'archived_object': archived_object,
         'warning': None if hash_verified else '⚠️ HASH VERIFICATION FAILED - RECORD MAY BE TAMPERED WITH'
     })
 
@@ -327,18 +343,28 @@ def verify_audit_chain(request):
     Verify the integrity of the audit log chain.
     Checks that all hashes are valid and unbroken.
     
+    Query parameters:
+    - start_date: Verify from date (YYYY-MM-DD, default 30 days ago)
+    - end_date: Verify to date (YYYY-MM-DD)
+    
+    The date range keeps the scan to the matching monthly partitions.
     Returns the first point of corruption (if any) or all-clear.
     """
     
     if not is_admin_or_staff(request.user):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
-    logs = AuditLog.objects.all().order_by('created_at')
+    start_date = request.GET.get('start_date') or (timezone.now() - timedelta(days=30)).isoformat()
+    logs = AuditLog.objects.filter(created_at__gte=start_date)
+    
+    end_date = request.GET.get('end_date')
+    if end_date:
+        logs = logs.filter(created_at__lte=end_date)
     
     corrupted = []
     verified_count = 0
     
-    for log in logs:
+    for log in logs.order_by('created_at').iterator(chunk_size=2000):
         if not log.verify_hash():
             corrupted.append({
                 'id': log.id,
@@ -356,6 +382,8 @@ def verify_audit_chain(request):
     
     return JsonResponse({
         'status': 'OK' if not corrupted else 'CORRUPTED',
+        'start_date': start_date,
+        'end_date': end_date,
         'verified_count': verified_count,
         'corrupted_count': len(corrupted),
         'corrupted_records': corrupted[:10],  # Show first 10
@@ -1,6 +1,12 @@
 """
 Gunicorn configuration file for production
 Run with: gunicorn -c gunicorn_config.py api.wsgi
+
+Async mode (SERVER_MODE=asgi) serves api.asgi with uvicorn workers, so the
+async views (M-Pesa STK push and withdrawals, Bitcoin price) wait on
+upstream APIs without holding a worker. Sync trading views still run,
+in Django's thread pool:
+    SERVER_MODE=asgi gunicorn -c gunicorn_config.py api.asgi:application
 """
 
 import multiprocessing
@@ -10,9 +16,17 @@ import os
 bind = "127.0.0.1:8001"  # Listen on localhost:8001 (Nginx will proxy to this)
 backlog = 2048
 
+# Server mode: 'wsgi' (sync workers) or 'asgi' (uvicorn workers)
+server_mode = os.environ.get('SERVER_MODE', 'wsgi').lower()
+
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1  # Formula for optimal workers
-worker_class = "sync"
+if server_mode == 'asgi':
+    worker_class = "uvicorn.workers.UvicornWorker"
+    wsgi_app = "api.asgi:application"
+else:
+    worker_class = "sync"
+    wsgi_app = "api.wsgi:app"
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.safestring import mark_safe
 from django import forms
 from decimal import Decimal
-from .models import Market, Bet, PriceHistory, ChatMessage
+from .models import Market, MarketOption, Bet, PriceHistory, ChatMessage
 from .lmsr import price_yes, calculate_q_for_probability
 
 
@@ -25,14 +25,23 @@ class MarketAdminForm(forms.ModelForm):
         return cleaned_data
 
 
+class MarketOptionInline(admin.TabularInline):
+    """LMSR quantities for OPTION_LIST markets"""
+    model = MarketOption
+    extra = 0
+    fields = ('option_id', 'label', 'q')
+    readonly_fields = ('q',)
+
+
 @admin.register(Market)
 class MarketAdmin(admin.ModelAdmin):
     form = MarketAdminForm
+    inlines = [MarketOptionInline]
     
     list_display = ('question', 'category', 'status', 'market_type', 'yes_probability', 'q_display', 'volume', 'created_at')
     list_filter = ('status', 'category', 'market_type', 'created_at')
     search_fields = ('question', 'description')
-    readonly_fields = ('created_at', 'q_yes', 'q_no', 'b', 'q_display')
+    readonly_fields = ('created_at', 'q_yes', 'q_no', 'b', 'q_display', 'volume_cents', 'volume')
     
     fieldsets = (
         ('Market Info', {
@@ -49,8 +58,13 @@ class MarketAdmin(admin.ModelAdmin):
             'description': 'These are automatically calculated from yes_probability and should not be modified directly.',
             'classes': ('collapse',)
         }),
+        ('Liquidity & Execution', {
+            'fields': ('liquidity_mode', 'liquidity_alpha', 'clearing_mode'),
+            'description': 'FIXED keeps b constant. LS_LMSR grows b with volume (b = max(b, alpha * (q_yes + q_no)); alpha around 0.03-0.1). POOL derives b from LP capital. BATCH_AUCTION clears orders together at one uniform price.',
+        }),
         ('Statistics', {
-            'fields': ('volume',)
+            'fields': ('volume_cents', 'volume'),
+            'description': 'Traded volume, counted as trades are placed.',
         }),
     )
     
@@ -60,7 +74,8 @@ class MarketAdmin(admin.ModelAdmin):
         """Show current q values and corresponding price"""
         if obj.q_yes is not None and obj.q_no is not None and obj.b:
             try:
-                prob = price_yes(float(obj.q_yes), float(obj.q_no), float(obj.b)) * 100
+                alpha = float(obj.liquidity_alpha) if obj.liquidity_mode == 'LS_LMSR' else 0.0
+                prob = price_yes(float(obj.q_yes), float(obj.q_no), float(obj.b), alpha) * 100
                 return f"q_yes={obj.q_yes:.2f}, q_no={obj.q_no:.2f} → {prob:.1f}% YES"
             except:
                 return "Error calculating price"
@@ -81,6 +96,7 @@ class MarketAdmin(admin.ModelAdmin):
             # Use the centralized formula function
             obj.q_yes = calculate_q_for_probability(yes_prob, b)
             obj.q_no = 0.0
+            obj.trade_seq += 1
         
         super().save_model(request, obj, form, change)
     
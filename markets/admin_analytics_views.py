@@ -14,26 +14,12 @@ from django.db.models import Sum, Count, Q, F, Case, When
 from markets.models import Market, Bet
 from payments.models import Transaction
 from users.models import CustomUser
-
-
-def get_authenticated_user(request):
-    """Get authenticated user from session or header"""
-    if request.user and request.user.is_authenticated:
-        return request.user
-    
-    phone_number = request.headers.get('X-User-Phone-Number')
-    if phone_number:
-        try:
-            from api.validators import normalize_phone_number
-            phone_number = normalize_phone_number(phone_number)
-            return CustomUser.objects.get(phone_number=phone_number)
-        except CustomUser.DoesNotExist:
-            return None
-    
-    return None
+from users.identity import get_authenticated_user
+from api.db_router import replica_reads_view
 
 
 @require_http_methods(["GET"])
+@replica_reads_view
 def analytics_dashboard(request):
     """
     Get comprehensive analytics dashboard data.
@@ -149,6 +135,7 @@ def analytics_dashboard(request):
 
 
 @require_http_methods(["GET"])
+@replica_reads_view
 def financials_dashboard(request):
     """
     Get comprehensive financial metrics for the company.
@@ -9,9 +9,11 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from markets.models import Market, Bet
 from payments.models import Transaction
-from payments.settlement_tasks import settle_market, send_b2c_payout, retry_failed_payouts
+from payments.settlement_tasks import enqueue_payouts, enqueue_settlement, retry_failed_payouts
 
 logger = logging.getLogger(__name__)
 
@@ -57,22 +59,21 @@ def resolve_market(request, market_id):
         if outcome not in ['Yes', 'No']:
             return JsonResponse({'error': 'Outcome must be Yes or No'}, status=400)
         
-        # Update market
+        # Update market and record the settlement dispatch in one transaction;
+        # the outbox relays it to Celery after commit
         with transaction.atomic():
             market.resolved_outcome = outcome
             market.status = 'CLOSED'
             market.save()
+            settlement_task_id = enqueue_settlement(market_id, attempt=f"resolve-{timezone.now().timestamp()}")
         
         logger.info(f"Admin {request.user.phone_number} resolved market {market_id} to {outcome}")
         
-        # Enqueue settlement task
-        task = settle_market.delay(market_id)
-        
         return JsonResponse({
             'status': 'resolved',
             'market_id': market_id,
             'outcome': outcome,
-            'settlement_task_id': task.id
+            'settlement_task_id': settlement_task_id
         })
     
     except Market.DoesNotExist:
@@ -109,11 +110,14 @@ def settlement_status(request, market_id):
     try:
         market = Market.objects.get(id=market_id)
         
-        # Get payout transactions
-        payouts = Transaction.objects.filter(
-            related_bet__market=market,
-            type='PAYOUT'
-        )
+        # Get payout transactions (bets of an archived market are in its archive)
+        from markets.archive import get_archive, load_archive
+        archive = get_archive(market.id)
+        if archive:
+            bet_filter = Q(related_bet_id__in=[bet.id for bet in load_archive(archive, 'bets')])
+        else:
+            bet_filter = Q(related_bet__market=market)
+        payouts = Transaction.objects.filter(bet_filter, type='PAYOUT')
         
         completed = payouts.filter(status='COMPLETED')
         failed = payouts.filter(status='FAILED')
@@ -168,12 +172,13 @@ def retry_payout(request):
         
         tx = Transaction.objects.get(id=transaction_id, type='PAYOUT')
         
-        # Reset status to PENDING
-        tx.status = 'PENDING'
-        tx.save()
-        
-        # Re-enqueue B2C call
-        send_b2c_payout.delay(transaction_id)
+        # Reset status to PENDING and re-enqueue the B2C call atomically; the
+        # previous attempt's response is cleared so send_b2c_payout sends again
+        with transaction.atomic():
+            tx.status = 'PENDING'
+            tx.mpesa_response = {}
+            tx.save()
+            enqueue_payouts([tx.id], attempt=f"retry-{timezone.now().timestamp()}")
         
         logger.info(f"Admin {request.user.phone_number} retried payout transaction {transaction_id}")
         
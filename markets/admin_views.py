@@ -6,38 +6,18 @@ from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, timedelta
 from decimal import Decimal
 from .models import Market, Bet
+from .services import create_market_options
 from payments.models import Transaction
-from users.models import CustomUser
 from api.validators import (
     validate_market_question,
     validate_market_category,
     validate_date_string,
-    normalize_phone_number,
     ValidationError
 )
+from users.identity import get_header_user, is_admin
 
 logger = logging.getLogger(__name__)
 
-def is_admin(user, request=None):
-    """Check if user is admin - checks both session auth and phone header"""
-    # First try session-based auth
-    if user and user.is_authenticated and user.is_staff:
-        return True
-    
-    # Fallback to phone number header if session auth fails
-    if request and request.headers.get('X-User-Phone-Number'):
-        phone_number = request.headers.get('X-User-Phone-Number')
-        try:
-            # Normalize phone number
-            phone_number = normalize_phone_number(phone_number)
-            user_obj = CustomUser.objects.get(phone_number=phone_number)
-            return user_obj.is_staff and user_obj.is_superuser
-        except CustomUser.DoesNotExist:
-            return False
-    
-    return False
-
-
 @require_http_methods(["GET"])
 def admin_markets(request):
     """Get all markets for admin panel"""
@@ -305,13 +285,7 @@ def create_market(request):
                 })
         
         # Get user from header for created_by field
-        phone_number = request.headers.get('X-User-Phone-Number')
-        created_by = None
-        if phone_number:
-            try:
-                created_by = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                pass
+        created_by = get_header_user(request)
         
         # Create market
         market = Market.objects.create(
@@ -326,6 +300,9 @@ def create_market(request):
             created_by=created_by
         )
         
+        if market_type == 'OPTION_LIST':
+            create_market_options(market, options_data)
+        
         logger.info(f"Market {market.id} created by {request.user.id}: {question}")
         
         
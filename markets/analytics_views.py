@@ -12,31 +12,16 @@ from decimal import Decimal
 from .models import Market, Bet
 from payments.models import Transaction
 from users.models import CustomUser
-from api.validators import normalize_phone_number
+from users.identity import is_admin
+from api.db_router import replica_reads_view
 
 logger = logging.getLogger(__name__)
 
 COMMISSION_RATE = 0.02  # 2% fee
 
 
-def is_admin(user, request=None):
-    """Check if user is admin"""
-    if user and user.is_authenticated and user.is_staff:
-        return True
-    
-    if request and request.headers.get('X-User-Phone-Number'):
-        phone_number = request.headers.get('X-User-Phone-Number')
-        try:
-            phone_number = normalize_phone_number(phone_number)
-            user_obj = CustomUser.objects.get(phone_number=phone_number)
-            return user_obj.is_staff and user_obj.is_superuser
-        except CustomUser.DoesNotExist:
-            return False
-    
-    return False
-
-
 @require_http_methods(["GET"])
+@replica_reads_view
 def analytics_dashboard(request):
     """
     Get comprehensive analytics data for dashboard
@@ -147,28 +132,19 @@ def analytics_dashboard(request):
                 'commission': float(cat_bets['volume'] or 0) * COMMISSION_RATE
             }
         
-        # Top markets by volume
-        top_markets_data = []
-        markets = Market.objects.all()
-        for market in markets[:20]:
-            market_bets = Bet.objects.filter(market=market).aggregate(
-                volume=Sum('amount')
-            )
-            volume = float(market_bets['volume'] or 0)
-            if volume > 0:
-                top_markets_data.append({
-                    'id': market.id,
-                    'question': market.question,
-                    'volume': volume,
-                    'yes_probability': market.yes_probability,
-                    'status': market.status,
-                    'commission': float(volume * COMMISSION_RATE),
-                    'category': market.category,
-                })
-        
-        # Sort by volume
-        top_markets_data.sort(key=lambda x: x['volume'], reverse=True)
-        top_markets = top_markets_data[:10]
+        # Top markets by volume (indexed volume counter)
+        top_markets = []
+        for market in Market.objects.filter(volume_cents__gt=0).order_by('-volume_cents')[:10]:
+            volume = market.volume_cents / 100
+            top_markets.append({
+                'id': market.id,
+                'question': market.question,
+                'volume': volume,
+                'yes_probability': market.yes_probability,
+                'status': market.status,
+                'commission': float(volume * COMMISSION_RATE),
+                'category': market.category,
+            })
         
         # Daily volume for last 30 days
         daily_volume = []
@@ -211,6 +187,7 @@ def analytics_dashboard(request):
 
 
 @require_http_methods(["GET"])
+@replica_reads_view
 def risk_dashboard(request):
     """
     Get risk and exposure metrics
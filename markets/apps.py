@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class MarketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'markets'
+
+    def ready(self):
+        """Register signal handlers when app loads"""
+        import markets.signals  # Keep the market state cache write-through
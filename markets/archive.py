@@ -0,0 +1,417 @@
+"""
+Cold Archive of Settled Markets
+
+Once a market is RESOLVED, every bet is WON/LOST and no payout is pending,
+its history is rarely read. `archive_market` moves it out of the hot tables:
+1. Serialize its Bet, PriceHistory, ChatMessage and FeeDistribution rows
+   into one gzip'd JSON file, MARKET_ARCHIVE_DIR/market_<id>.json.gz
+2. Read the file back: row counts must match, its SHA-256 is recorded
+3. In one transaction, create the MarketArchive (with per-user totals for
+   statistics) and delete the rows
+
+Reads go through `load_archive`, which checks the SHA-256 and returns
+unsaved model instances (the decoded file is cached for
+MARKET_ARCHIVE_CACHE_SECONDS). Lookups that need a few rows don't rehydrate
+a whole table: holders, per-user bet positions and bet ids are derived once
+per archive checksum and cached alongside it. Market details, comments, activity and price
+history, admin activity, settlement status and audit log detail fall back to
+it for archived markets. Per-user pages never open every archive a user took
+part in: statistics and the dashboard summary come from
+MarketArchiveParticipant, and bets are read one archive (or one `limit`) at
+a time.
+
+Rows are deleted without Django's collector, so Transaction.related_bet
+keeps pointing at the archived bet ids (it has no DB constraint).
+"""
+
+import bisect
+import gzip
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import serializers
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Bet, ChatMessage, FeeDistribution, Market, MarketArchive,
+    MarketArchiveParticipant, PriceHistory,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_VERSION = 1
+
+
+class _ArchiveEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder without its truncation of datetimes to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ArchiveError(Exception):
+    """An archive file is missing, corrupt or doesn't match its market."""
+
+
+def _archive_path(market_id: int) -> str:
+    return os.path.join(settings.MARKET_ARCHIVE_DIR, f"market_{market_id}.json.gz")
+
+
+def _hot_rows(market_id: int) -> dict:
+    return {
+        'bets': Bet.objects.filter(market_id=market_id),
+        'price_history': PriceHistory.objects.filter(market_id=market_id),
+        'chat_messages': ChatMessage.objects.filter(market_id=market_id),
+        'fee_distributions': FeeDistribution.objects.filter(pool__market_id=market_id),
+    }
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# ============================================================================
+# ARCHIVING
+# ============================================================================
+
+def is_settled(market: Market) -> bool:
+    """RESOLVED, every bet settled and no payout still pending."""
+    from payments.models import Transaction
+
+    if market.status != 'RESOLVED':
+        return False
+    if Bet.objects.filter(market=market, result='PENDING').exists():
+        return False
+    pending_payouts = Transaction.objects.filter(
+        related_bet__market=market, type='PAYOUT', status='PENDING'
+    )
+    return not pending_payouts.exists()
+
+
+def archivable_markets(older_than_days: int = None):
+    """Resolved, unarchived markets resolved at least `older_than_days` ago."""
+    if older_than_days is None:
+        older_than_days = settings.MARKET_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Market.objects.filter(
+        status='RESOLVED', resolved_at__lte=cutoff, archive__isnull=True
+    ).order_by('resolved_at')
+
+
+def _participant_totals(bets: list) -> dict:
+    totals = defaultdict(lambda: {'bet_count': 0, 'total_wagered': Decimal('0'), 'wins': 0, 'losses': 0})
+    for bet in bets:
+        entry = totals[bet.user_id]
+        entry['bet_count'] += 1
+        if bet.result != 'PENDING':
+            entry['total_wagered'] += bet.amount
+        if bet.result == 'WON':
+            entry['wins'] += 1
+        elif bet.result == 'LOST':
+            entry['losses'] += 1
+    return totals
+
+
+def archive_market(market_id: int):
+    """
+    Move a settled market's history into its archive file.
+
+    Returns:
+        MarketArchive, or None when the market isn't settled or is
+        already archived
+
+    Raises:
+        ArchiveError: The written file didn't read back intact (nothing
+            is deleted)
+    """
+    from audit.signals import log_change
+    from .services import get_top_holders, invalidate_top_holders
+
+    market = Market.objects.get(id=market_id)
+    if MarketArchive.objects.filter(market=market).exists() or not is_settled(market):
+        return None
+
+    top_holders = get_top_holders(market_id)
+    tables = {
+        name: serializers.serialize('python', queryset.order_by('id'))
+        for name, queryset in _hot_rows(market_id).items()
+    }
+    counts = {name: len(rows) for name, rows in tables.items()}
+    data = gzip.compress(json.dumps({
+        'version': ARCHIVE_FORMAT_VERSION,
+        'market_id': market_id,
+        'tables': tables,
+    }, cls=_ArchiveEncoder).encode())
+
+    path = _archive_path(market_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'wb') as out:
+        out.write(data)
+    os.replace(f"{path}.tmp", path)
+
+    # Verify what is on disk before deleting anything
+    with open(path, 'rb') as archived:
+        written = archived.read()
+    digest = _sha256(written)
+    payload = json.loads(gzip.decompress(written))
+    if digest != _sha256(data) or {name: len(rows) for name, rows in payload['tables'].items()} != counts:
+        raise ArchiveError(f"Archive of market {market_id} did not verify")
+
+    bets = [row.object for row in serializers.deserialize('python', payload['tables']['bets'])]
+    with transaction.atomic():
+        market = Market.objects.select_for_update().get(id=market_id)
+        # Re-checked under the lock: nothing may have moved since the export
+        current = {name: queryset.count() for name, queryset in _hot_rows(market_id).items()}
+        if current != counts or not is_settled(market):
+            logger.warning(f"Market {market_id} changed while archiving, skipped")
+            return None
+
+        archive = MarketArchive.objects.create(
+            market=market,
+            path=path,
+            sha256=digest,
+            size_bytes=len(written),
+            row_counts=counts,
+            top_holders=top_holders,
+        )
+        MarketArchiveParticipant.objects.bulk_create([
+            MarketArchiveParticipant(archive=archive, user_id=user_id, **totals)
+            for user_id, totals in _participant_totals(bets).items()
+        ])
+
+        # Raw deletes: no collector, so references to the bets are kept as is
+        for name in ('fee_distributions', 'chat_messages', 'price_history', 'bets'):
+            queryset = _hot_rows(market_id)[name]
+            queryset._raw_delete(queryset.db)
+
+        log_change(
+            'markets.Market',
+            market,
+            action='SYSTEM_ACTION',
+            after_values={'archive_path': path, 'sha256': digest, 'row_counts': counts},
+            severity='LOW',
+            description=f"Market {market_id} history archived ({sum(counts.values())} rows)",
+        )
+        transaction.on_commit(lambda: invalidate_top_holders(market_id))
+
+    logger.info(f"Archived market {market_id}: {counts}, {len(written)} bytes")
+    return archive
+
+
+def archive_settled_markets(older_than_days: int = None, limit: int = None) -> dict:
+    """
+    Archive every settled market resolved `older_than_days` ago or earlier.
+
+    Returns:
+        {'archived': [market ids], 'skipped': [...], 'failed': [...]}
+    """
+    result = {'archived': [], 'skipped': [], 'failed': []}
+    market_ids = list(archivable_markets(older_than_days).values_list('id', flat=True)[:limit])
+    for market_id in market_ids:
+        try:
+            archived = archive_market(market_id)
+        except Exception as e:
+            logger.error(f"Archiving market {market_id} failed: {str(e)}")
+            result['failed'].append(market_id)
+            continue
+        result['archived' if archived else 'skipped'].append(market_id)
+    return result
+
+
+# ============================================================================
+# READ-THROUGH
+# ============================================================================
+
+def get_archive(market_id: int):
+    return MarketArchive.objects.filter(market_id=market_id).first()
+
+
+def _archive_tables(archive: MarketArchive) -> dict:
+    key = f"market_archive:{archive.market_id}:{archive.sha256[:16]}"
+    tables = cache.get(key)
+    if tables is None:
+        try:
+            with open(archive.path, 'rb') as archived:
+                data = archived.read()
+        except OSError as e:
+            raise ArchiveError(f"Archive of market {archive.market_id} unreadable: {str(e)}")
+        if _sha256(data) != archive.sha256:
+            logger.error(f"Archive of market {archive.market_id} failed its checksum: {archive.path}")
+            raise ArchiveError(f"Archive of market {archive.market_id} failed its checksum")
+        tables = json.loads(gzip.decompress(data))['tables']
+        cache.set(key, tables, settings.MARKET_ARCHIVE_CACHE_SECONDS)
+    return tables
+
+
+def load_archive(archive: MarketArchive, name: str) -> list:
+    """
+    Rehydrate one table of an archive as unsaved model instances, by id.
+
+    Args:
+        archive: MarketArchive
+        name: 'bets', 'price_history', 'chat_messages' or 'fee_distributions'
+
+    Raises:
+        ArchiveError: The file is missing or fails its checksum
+    """
+    return _deserialize(_archive_tables(archive)[name])
+
+
+def _deserialize(rows: list) -> list:
+    return [row.object for row in serializers.deserialize('python', rows)]
+
+
+def _archive_derived(archive: MarketArchive, name: str, build):
+    """`build()`, cached per archive checksum like the decoded file itself."""
+    key = f"market_archive:{archive.market_id}:{archive.sha256[:16]}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.MARKET_ARCHIVE_CACHE_SECONDS)
+    return value
+
+
+def _bet_positions_by_user(archive: MarketArchive) -> dict:
+    """{user_id: [index into the archived bet rows]}, read off the raw rows."""
+    def build():
+        positions = defaultdict(list)
+        for index, row in enumerate(_archive_tables(archive)['bets']):
+            positions[row['fields']['user']].append(index)
+        return dict(positions)
+
+    return _archive_derived(archive, 'bets_by_user', build)
+
+
+def attach_users(rows: list) -> list:
+    """Set `.user` on rehydrated rows with one query (no per-row lookups)."""
+    from users.models import CustomUser
+
+    users = CustomUser.objects.in_bulk({row.user_id for row in rows})
+    for row in rows:
+        row.user = users.get(row.user_id)
+    return rows
+
+
+def archived_holders(archive: MarketArchive, outcome: str) -> list:
+    """
+    Every holder of an outcome in an archived market, largest first (the
+    same rows `services.get_top_holders` builds for live markets).
+
+    The positions are aggregated once per archive checksum; only the user
+    names are read on each call.
+    """
+    from users.models import CustomUser
+
+    holders = _archive_derived(archive, f"holders:{outcome}", lambda: _aggregate_holders(archive, outcome))
+    users = CustomUser.objects.in_bulk([holder['user_id'] for holder in holders])
+    for holder in holders:
+        user = users.get(holder['user_id'])
+        holder['user_name'] = user.full_name if user else None
+    return holders
+
+
+def _aggregate_holders(archive: MarketArchive, outcome: str) -> list:
+    positions = defaultdict(lambda: {'bought': Decimal('0'), 'sold': Decimal('0'), 'spent': Decimal('0')})
+    bets = [
+        bet for bet in load_archive(archive, 'bets')
+        if bet.outcome == outcome and bet.order_status == 'FILLED'
+    ]
+    for bet in bets:
+        position = positions[bet.user_id]
+        if bet.action == 'BUY':
+            position['bought'] += bet.quantity
+            position['spent'] += bet.amount
+        elif bet.action == 'SELL':
+            position['sold'] += bet.quantity
+
+    holders = []
+    for user_id, position in positions.items():
+        shares = position['bought'] - position['sold']
+        if shares <= 0:
+            continue
+        bought = position['bought'] or Decimal('1')
+        holders.append({
+            'user_id': user_id,
+            'user_name': None,
+            'outcome': outcome,
+            'shares': float(shares),
+            'average_price': str((position['spent'] / bought).quantize(Decimal('0.01'))),
+        })
+    holders.sort(key=lambda holder: (-holder['shares'], holder['user_id']))
+    return holders
+
+
+def archived_markets_for_user(user) -> list:
+    """
+    A user's archived markets with their totals (MarketArchiveParticipant),
+    most recently resolved first. One query; no archive is opened.
+    """
+    return list(
+        MarketArchiveParticipant.objects.filter(user=user)
+        .select_related('archive__market')
+        .order_by('-archive__market__resolved_at', '-archive_id')
+    )
+
+
+def archived_bets_for_user(user, limit: int = None, market_id: int = None) -> list:
+    """
+    A user's bets in archived markets, newest first, with `.market` set.
+    An unreadable archive is logged and left out.
+
+    Archives are opened most recently resolved first and only as far as
+    needed: every bet of a market predates its resolution, so once `limit`
+    bets are at least as new as the next market's resolution, no later
+    archive can contribute.
+
+    Args:
+        limit: Newest bets to return (default: all)
+        market_id: Only this archived market
+    """
+    participations = MarketArchiveParticipant.objects.filter(user=user).select_related('archive__market')
+    if market_id is not None:
+        participations = participations.filter(archive__market_id=market_id)
+    participations = participations.order_by('-archive__market__resolved_at', '-archive_id')
+
+    bets = []
+    for participation in participations:
+        archive = participation.archive
+        resolved_at = archive.market.resolved_at
+        if limit is not None and len(bets) >= limit and resolved_at is not None:
+            bets.sort(key=lambda bet: bet.timestamp, reverse=True)
+            if bets[limit - 1].timestamp >= resolved_at:
+                break
+        try:
+            rows = _archive_tables(archive)['bets']
+            positions = _bet_positions_by_user(archive).get(user.id, [])
+        except ArchiveError as e:
+            logger.error(f"Archived bets of user {user.id}: {str(e)}")
+            continue
+        for bet in _deserialize([rows[index] for index in positions]):
+            bet.market = archive.market
+            bets.append(bet)
+    bets.sort(key=lambda bet: bet.timestamp, reverse=True)
+    return bets if limit is None else bets[:limit]
+
+
+def find_archived_bet(bet_id: int, market_id: int):
+    """An archived bet by id, given the market it was placed on (or None)."""
+    archive = get_archive(market_id)
+    if archive is None:
+        return None
+    # Bets are archived in id order, so the row is found by bisection
+    rows = _archive_tables(archive)['bets']
+    index = bisect.bisect_left(rows, bet_id, key=lambda row: row['pk'])
+    if index == len(rows) or rows[index]['pk'] != bet_id:
+        return None
+    return _deserialize([rows[index]])[0]
@@ -2,24 +2,38 @@ import requests
 from decimal import Decimal
 from .models import Market
 import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Shared-cache keys written by the price poller and read by the endpoints
+LATEST_TICK_CACHE_KEY = 'bitcoin_price_latest'
+TICK_HISTORY_CACHE_KEY = 'bitcoin_price_history'
+
 
 class BitcoinPriceService:
     """Service for fetching Bitcoin prices and managing Bitcoin markets"""
 
-    BITCOIN_API_URL = "https://api.coingecko.com/api/v3/simple/price"
-    FALLBACK_API_URL = "https://api.binance.com/api/v3/ticker/price"
+    BITCOIN_API_URL = getattr(settings, 'BITCOIN_PRICE_API_URL', "https://api.coingecko.com/api/v3/simple/price")
+    FALLBACK_API_URL = getattr(settings, 'BITCOIN_FALLBACK_API_URL', "https://api.binance.com/api/v3/ticker/price")
+    MARKET_QUESTION = "Bitcoin: Up or Down - Next 5 Minutes"
+    ROUND_MINUTES = getattr(settings, 'BITCOIN_ROUND_MINUTES', 5)
+    HISTORY_SIZE = getattr(settings, 'BITCOIN_PRICE_HISTORY_SIZE', 120)
+    TICK_TTL = getattr(settings, 'BITCOIN_PRICE_TICK_TTL', 300)  # Stale ticks expire instead of being served forever
 
     @staticmethod
-    def get_current_bitcoin_price():
+    def fetch_bitcoin_price():
         """
-        Fetch current Bitcoin price in USD
-        Tries CoinGecko first (no auth needed), falls back to Binance if needed
-        Returns: float or None
+        Fetch current Bitcoin price in USD from the upstream APIs.
+        Tries CoinGecko first (no auth needed), falls back to Binance if needed.
+
+        Blocking network call - only the background poller should use this.
+
+        Returns: (price: float, source: str) or (None, None)
         """
         try:
             # Try CoinGecko first
@@ -30,7 +44,7 @@ class BitcoinPriceService:
             )
             if response.status_code == 200:
                 data = response.json()
-                return float(data['bitcoin']['usd'])
+                return float(data['bitcoin']['usd']), 'coingecko'
         except Exception as e:
             logger.warning(f"CoinGecko API error: {e}")
 
@@ -43,43 +57,165 @@ class BitcoinPriceService:
             )
             if response.status_code == 200:
                 data = response.json()
-                return float(data['price'])
+                return float(data['price']), 'binance'
         except Exception as e:
             logger.error(f"Binance API error: {e}")
 
-        return None
+        return None, None
+
+    @staticmethod
+    def record_tick(price: float, source: str) -> dict:
+        """
+        Store a price tick as the latest price and append it to the history
+        ring buffer. The poller is the only writer, so read-modify-write of
+        the buffer is safe.
+        """
+        tick = {
+            'price': price,
+            'source': source,
+            'timestamp': timezone.now().isoformat(),
+        }
+        history = cache.get(TICK_HISTORY_CACHE_KEY) or []
+        history.append(tick)
+        history = history[-BitcoinPriceService.HISTORY_SIZE:]
+
+        cache.set_many({
+            LATEST_TICK_CACHE_KEY: tick,
+            TICK_HISTORY_CACHE_KEY: history,
+        }, BitcoinPriceService.TICK_TTL)
+        return tick
+
+    @staticmethod
+    def poll_price():
+        """Fetch one price from upstream and record it. Returns the tick or None."""
+        price, source = BitcoinPriceService.fetch_bitcoin_price()
+        if price is None:
+            logger.warning("Bitcoin price poll failed on all sources")
+            return None
+        return BitcoinPriceService.record_tick(price, source)
+
+    @staticmethod
+    def get_latest_tick():
+        """Latest cached tick ({'price', 'source', 'timestamp'}) or None. No network I/O."""
+        return cache.get(LATEST_TICK_CACHE_KEY)
+
+    @staticmethod
+    async def aget_latest_tick():
+        """Async get_latest_tick for async views."""
+        return await cache.aget(LATEST_TICK_CACHE_KEY)
+
+    @staticmethod
+    def get_price_history():
+        """Cached ring buffer of recent ticks, oldest first. No network I/O."""
+        return cache.get(TICK_HISTORY_CACHE_KEY) or []
+
+    @staticmethod
+    def get_current_bitcoin_price():
+        """
+        Current Bitcoin price in USD from the cached feed.
+        Returns: float or None (no tick yet, or poller stopped)
+        """
+        tick = BitcoinPriceService.get_latest_tick()
+        return tick['price'] if tick else None
+
+    @staticmethod
+    def _create_round(open_price=None):
+        """Create a new 5-minute Up/Down round, storing its opening price on the market."""
+        market = Market.objects.create(
+            question=BitcoinPriceService.MARKET_QUESTION,
+            category='Crypto',
+            description='Will the price of Bitcoin go up or down in the next 5 minutes?',
+            market_type='BINARY',
+            image_url='https://cryptologos.cc/logos/bitcoin-btc-logo.png',
+            yes_probability=50,
+            status='OPEN',
+            end_date='5 min',
+            trading_end_time=timezone.now() + timedelta(minutes=BitcoinPriceService.ROUND_MINUTES),
+            b=100.0,
+            q_yes=0.0,
+            q_no=0.0,
+            is_live=True,
+            clearing_mode=getattr(settings, 'BITCOIN_CLEARING_MODE', 'CONTINUOUS'),
+            round_open_price=open_price,
+        )
+        return market
 
     @staticmethod
     def get_bitcoin_market_or_create():
-        """Get or create the Bitcoin Up/Down market"""
-        # Define end_time as 5 minutes from now
-        end_time = timezone.now() + timedelta(minutes=5)
-
-        market, created = Market.objects.get_or_create(
-            question="Bitcoin: Up or Down - Next 5 Minutes",
-            defaults={
-                'category': 'Crypto',
-                'description': 'Will the price of Bitcoin go up or down in the next 5 minutes?',
-                'market_type': 'BINARY',
-                'image_url': 'https://cryptologos.cc/logos/bitcoin-btc-logo.png',
-                'yes_probability': 50,
-                'volume': 'KES 0',
-                'status': 'OPEN',
-                'end_date': '5 min',
-                'trading_end_time': end_time,
-                'b': 100.0,
-                'q_yes': 0.0,
-                'q_no': 0.0,
-                'is_live': True,
-            }
+        """
+        Get the current Bitcoin Up/Down round.
+
+        Read-only unless no round exists at all (first request before the
+        scheduler has run); rolling rounds over is `roll_bitcoin_market`'s job.
+        """
+        market = (
+            Market.objects.filter(question=BitcoinPriceService.MARKET_QUESTION, status='OPEN')
+            .order_by('-id')
+            .first()
         )
+        if market:
+            return market, False
 
-        # Update end_time periodically (refresh every time it's requested)
-        if not created and market.status == 'OPEN':
-            market.trading_end_time = timezone.now() + timedelta(minutes=5)
-            market.save(update_fields=['trading_end_time'])
+        return BitcoinPriceService._create_round(BitcoinPriceService.get_current_bitcoin_price()), True
 
-        return market, created
+    @staticmethod
+    def roll_bitcoin_market():
+        """
+        Close expired Up/Down rounds and open the next one.
+
+        An expired round is resolved Yes/No by comparing the cached price with
+        the round's opening price (Market.round_open_price), then handed to settlement. Rounds without a
+        known opening price are closed for manual resolution.
+
+        Returns: dict summary
+        """
+        now = timezone.now()
+        current_price = BitcoinPriceService.get_current_bitcoin_price()
+        closed_ids = []
+
+        with transaction.atomic():
+            expired = list(
+                Market.objects.select_for_update(skip_locked=True).filter(
+                    question=BitcoinPriceService.MARKET_QUESTION,
+                    status='OPEN',
+                    trading_end_time__lte=now,
+                )
+            )
+            for market in expired:
+                open_price = market.round_open_price
+                market.status = 'CLOSED'
+                market.is_live = False
+                if open_price is not None and current_price is not None:
+                    market.resolved_outcome = 'Yes' if current_price > open_price else 'No'
+                market.save(update_fields=['status', 'is_live', 'resolved_outcome'])
+                closed_ids.append(market.id)
+
+            has_open_round = Market.objects.filter(
+                question=BitcoinPriceService.MARKET_QUESTION,
+                status='OPEN',
+                trading_end_time__gt=now,
+            ).exists()
+            new_market = None if has_open_round else BitcoinPriceService._create_round(current_price)
+
+        for market in expired:
+            if market.resolved_outcome:
+                BitcoinPriceService._enqueue_settlement(market.id)
+
+        if closed_ids or new_market:
+            logger.info(f"Bitcoin market rolled: closed={closed_ids}, opened={new_market.id if new_market else None}")
+
+        return {
+            'closed_market_ids': closed_ids,
+            'opened_market_id': new_market.id if new_market else None,
+        }
+
+    @staticmethod
+    def _enqueue_settlement(market_id):
+        try:
+            from payments.settlement_tasks import enqueue_settlement
+            enqueue_settlement(market_id)
+        except ImportError:
+            logger.warning(f"Celery not available, Bitcoin market {market_id} left CLOSED for manual settlement")
 
     @staticmethod
     def update_bitcoin_market_price(current_price, previous_price):
@@ -139,7 +275,8 @@ class BitcoinPriceService:
         Returns dict with market data and current Bitcoin price
         """
         market, _ = BitcoinPriceService.get_bitcoin_market_or_create()
-        current_price = BitcoinPriceService.get_current_bitcoin_price()
+        tick = BitcoinPriceService.get_latest_tick()
+        current_price = tick['price'] if tick else None
 
         market_data = {
             'id': market.id,
@@ -156,6 +293,7 @@ class BitcoinPriceService:
             'trading_end_time': market.trading_end_time.isoformat() if market.trading_end_time else None,
             'current_bitcoin_price': current_price,
             'current_bitcoin_price_formatted': f"${current_price:,.2f}" if current_price else "N/A",
+            'price_timestamp': tick['timestamp'] if tick else None,
             'yes_multiplier': round(100 / market.yes_probability, 2) if market.yes_probability > 0 else 0,
             'no_multiplier': round(100 / (100 - market.yes_probability), 2) if market.yes_probability < 100 else 0,
             'q_yes': float(market.q_yes),
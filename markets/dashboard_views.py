@@ -5,53 +5,32 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from decimal import Decimal
 from .models import Market, Bet
+from .archive import archived_bets_for_user, archived_markets_for_user, get_archive
 from payments.models import Transaction
-from users.models import CustomUser
-from api.validators import normalize_phone_number
-from .utils.price_calculations import PAYOUT_PER_SHARE
+from users.identity import get_authenticated_user
+from .money import from_cents, position_value_cents, to_share_units
 
 logger = logging.getLogger(__name__)
 
-def get_authenticated_user(request):
-    """
-    Get authenticated user from either:
-    1. Session (if session cookie exists)
-    2. X-User-Phone-Number header (for phone auth development)
-    3. Email from localStorage sent via X-User-Email header (for Google OAuth users)
-    """
-    # First try session
-    if request.user and request.user.is_authenticated:
-        logger.info(f"User authenticated via session: {request.user.id}")
-        return request.user
-    
-    logger.debug(f"Session check failed - request.user: {request.user}, is_authenticated: {request.user.is_authenticated if request.user else 'N/A'}")
-    
-    # Fallback to phone number header (for traditional auth)
-    phone_number = request.headers.get('X-User-Phone-Number')
-    if phone_number:
-        try:
-            # Normalize phone number
-            phone_number = normalize_phone_number(phone_number)
-            user = CustomUser.objects.get(phone_number=phone_number)
-            if user.is_active:
-                logger.info(f"User authenticated via phone header: {phone_number}")
-                return user
-        except CustomUser.DoesNotExist:
-            logger.debug(f"Phone number not found: {phone_number}")
-    
-    # Fallback to email header (for Google OAuth users)
-    email = request.headers.get('X-User-Email')
-    if email:
-        try:
-            user = CustomUser.objects.get(email=email)
-            if user.is_active:
-                logger.info(f"User authenticated via email header: {email}")
-                return user
-        except CustomUser.DoesNotExist:
-            logger.debug(f"Email not found: {email}")
-    
-    logger.warning(f"No authentication method worked. Headers: {dict(request.headers)}")
-    return None
+
+def _bet_data(bet) -> dict:
+    return {
+        'id': bet.id,
+        'market_id': bet.market.id,
+        'market_question': bet.market.question,
+        'outcome': bet.outcome,
+        'amount': str(bet.amount),
+        'entry_probability': bet.entry_probability,
+        'result': bet.result,
+        'payout': str(bet.payout) if bet.payout else None,
+        'timestamp': bet.timestamp.isoformat(),
+        # Current market state for position value calculation
+        'current_yes_probability': bet.market.yes_probability,
+        'market_q_yes': float(bet.market.q_yes),
+        'market_q_no': float(bet.market.q_no),
+        'market_b': float(bet.market.b),
+    }
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -69,67 +48,71 @@ def user_dashboard(request):
         
         # Get user bets with market info - only BUY actions for portfolio
         bets = Bet.objects.filter(user=user).select_related('market').order_by('-timestamp')
+        # Archived markets are summarized from their per-user totals; their
+        # (settled) bets load per market from dashboard/archived/<market_id>/
+        archived_markets = [
+            {
+                'market_id': participation.archive.market_id,
+                'market_question': participation.archive.market.question,
+                'resolved_outcome': participation.archive.market.resolved_outcome,
+                'bet_count': participation.bet_count,
+                'total_wagered': str(participation.total_wagered),
+                'wins': participation.wins,
+                'losses': participation.losses,
+            }
+            for participation in archived_markets_for_user(user)
+        ]
         
         bets_data = []
-        portfolio_value = Decimal('0.00')
+        portfolio_value_cents = 0
         
-        # Track net positions for portfolio calculation: (market_id, outcome) -> net_quantity
+        # Track net positions for portfolio calculation: (market_id, outcome) -> net share units
         net_positions = {}
         
         for bet in bets:
-            bets_data.append({
-                'id': bet.id,
-                'market_id': bet.market.id,
-                'market_question': bet.market.question,
-                'outcome': bet.outcome,
-                'amount': str(bet.amount),
-                'entry_probability': bet.entry_probability,
-                'result': bet.result,
-                'payout': str(bet.payout) if bet.payout else None,
-                'timestamp': bet.timestamp.isoformat(),
-                # Current market state for position value calculation
-                'current_yes_probability': bet.market.yes_probability,
-                'market_q_yes': float(bet.market.q_yes),
-                'market_q_no': float(bet.market.q_no),
-                'market_b': float(bet.market.b),
-            })
+            bets_data.append(_bet_data(bet))
             
             # For PENDING bets, accumulate net positions (BUY adds, SELL subtracts)
             if bet.result == 'PENDING':
                 position_key = (bet.market.id, bet.outcome)
-                share_quantity = float(bet.quantity or 1)
+                share_units = to_share_units(bet.quantity or 1)
                 
                 if position_key not in net_positions:
                     net_positions[position_key] = {
-                        'net_quantity': 0,
+                        'net_units': 0,
                         'market': bet.market,
                         'outcome': bet.outcome,
                     }
                 
                 # Add for BUY, subtract for SELL
                 if bet.action == 'BUY':
-                    net_positions[position_key]['net_quantity'] += share_quantity
+                    net_positions[position_key]['net_units'] += share_units
                 elif bet.action == 'SELL':
-                    net_positions[position_key]['net_quantity'] -= share_quantity
+                    net_positions[position_key]['net_units'] -= share_units
+        
+        # Calculate portfolio value based on net positions, priced from the
+        # hot market state cache (fresher than the joined rows under load)
+        from markets.state_cache import get_market_states
+        market_states = get_market_states(market_id for market_id, _ in net_positions)
         
-        # Calculate portfolio value based on net positions
         for position_key, position_data in net_positions.items():
-            net_quantity = position_data['net_quantity']
-            market = position_data['market']
+            net_units = position_data['net_units']
+            market = market_states.get(position_key[0], position_data['market'])
             outcome = position_data['outcome']
             
             # Skip if net position is zero or negative (all shares sold or oversold)
-            if net_quantity <= 0:
+            if net_units <= 0:
                 continue
             
             # Calculate market probability
             from markets.lmsr import price_yes
+            from markets.services import lmsr_params
             
             try:
                 market_price = price_yes(
                     float(market.q_yes),
                     float(market.q_no),
-                    float(market.b)
+                    *lmsr_params(market)
                 )
             except:
                 market_price = float(market.yes_probability) / 100.0
@@ -140,9 +123,8 @@ def user_dashboard(request):
             else:
                 winning_prob = 1.0 - market_price
             
-            # Position value = net_quantity * max_payout * probability
-            position_value = Decimal(str(net_quantity)) * Decimal(str(PAYOUT_PER_SHARE)) * Decimal(str(winning_prob))
-            portfolio_value += position_value
+            # Position value = net shares * max_payout * probability
+            portfolio_value_cents += position_value_cents(net_units, winning_prob)
         
         # Get user statistics
         stats = user.get_user_statistics()
@@ -158,9 +140,10 @@ def user_dashboard(request):
             },
             'statistics': stats,
             'bets': bets_data,
-            'total_bets': len(bets_data),
+            'archived_markets': archived_markets,
+            'total_bets': len(bets_data) + sum(market['bet_count'] for market in archived_markets),
             'portfolio': {
-                'total_value': str(portfolio_value.quantize(Decimal('0.01')))
+                'total_value': str(from_cents(portfolio_value_cents))
             }
         })
     except Exception as e:
@@ -168,6 +151,28 @@ def user_dashboard(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def user_archived_bets(request, market_id):
+    """
+    The caller's bets in one archived market (opens only that archive).
+    
+    GET /api/markets/dashboard/archived/<market_id>/
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    try:
+        if get_archive(market_id) is None:
+            return JsonResponse({'error': 'Market is not archived'}, status=404)
+        bets = archived_bets_for_user(user, market_id=market_id)
+        return JsonResponse({'market_id': market_id, 'bets': [_bet_data(bet) for bet in bets]})
+    except Exception as e:
+        logger.error(f"Archived bets error for user {user.id}, market {market_id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to load archived bets'}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def transaction_history(request):
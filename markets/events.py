@@ -0,0 +1,269 @@
+"""
+Market Event Streaming
+
+Per-market pub/sub for price ticks, trades and limit order fills.
+
+Every event gets a monotonically increasing per-market sequence number and is
+kept in a short replay buffer, so a client that reconnects with the last
+sequence it saw (SSE `Last-Event-ID`) receives exactly the events it missed.
+
+Brokers are pluggable through settings.MARKET_EVENT_BROKER:
+- InProcessBroker: in-memory fan-out, single worker (default)
+- CacheBroker: event log in the shared cache, for multiple workers
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+EVENT_PRICE = 'price'
+EVENT_TRADE = 'trade'
+EVENT_ORDER_FILL = 'order_fill'
+EVENT_LIFECYCLE = 'lifecycle'
+
+
+class BaseBroker:
+    """Interface shared by all market event brokers."""
+
+    def __init__(self, buffer_size: int = 500):
+        self.buffer_size = buffer_size
+
+    def publish(self, market_id: int, event_type: str, data: dict) -> dict:
+        """Append an event to the market's log and wake subscribers."""
+        raise NotImplementedError
+
+    def events_since(self, market_id: int, seq: int) -> tuple:
+        """
+        Return buffered events after `seq`.
+
+        Returns:
+            (events: list, complete: bool) - complete is False when some
+            events after `seq` have already been evicted from the buffer
+        """
+        raise NotImplementedError
+
+    async def wait_for_events(self, market_id: int, seq: int, timeout: float) -> tuple:
+        """Block until events after `seq` exist or `timeout` seconds pass."""
+        raise NotImplementedError
+
+    def _make_event(self, market_id: int, seq: int, event_type: str, data: dict) -> dict:
+        return {
+            'seq': seq,
+            'market_id': market_id,
+            'type': event_type,
+            'timestamp': timezone.now().isoformat(),
+            'data': data,
+        }
+
+
+class InProcessBroker(BaseBroker):
+    """
+    In-memory broker. Fan-out only reaches subscribers in the same process,
+    so use it for a single ASGI worker or for development.
+    """
+
+    def __init__(self, buffer_size: int = 500):
+        super().__init__(buffer_size)
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._sequences = {}
+        self._waiters = {}
+
+    def publish(self, market_id: int, event_type: str, data: dict) -> dict:
+        with self._lock:
+            seq = self._sequences.get(market_id, 0) + 1
+            self._sequences[market_id] = seq
+            event = self._make_event(market_id, seq, event_type, data)
+            self._buffers.setdefault(market_id, deque(maxlen=self.buffer_size)).append(event)
+            waiters = self._waiters.pop(market_id, set())
+
+        # Publishers run in sync worker threads; wake each waiter on its own loop
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                pass  # Loop already closed (client went away)
+        return event
+
+    def events_since(self, market_id: int, seq: int) -> tuple:
+        with self._lock:
+            buffer = list(self._buffers.get(market_id, ()))
+            latest = self._sequences.get(market_id, 0)
+
+        if seq > latest:
+            return [], False  # Cursor from before a restart
+
+        events = [event for event in buffer if event['seq'] > seq]
+        oldest = buffer[0]['seq'] if buffer else latest + 1
+        complete = seq == latest or seq + 1 >= oldest
+        return events, complete
+
+    async def wait_for_events(self, market_id: int, seq: int, timeout: float) -> tuple:
+        waiter = asyncio.Event()
+        entry = (asyncio.get_running_loop(), waiter)
+        with self._lock:
+            self._waiters.setdefault(market_id, set()).add(entry)
+
+        try:
+            events, complete = self.events_since(market_id, seq)
+            if events or not complete:
+                return events, complete
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return self.events_since(market_id, seq)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(market_id)
+                if waiters is not None:
+                    waiters.discard(entry)
+
+
+class CacheBroker(BaseBroker):
+    """
+    Broker backed by the shared Django cache (Redis in production).
+
+    Sequence numbers come from an atomic cache.incr and each event is stored
+    under its own key, so every worker sees the same log. Subscribers poll the
+    sequence key at POLL_INTERVAL, which keeps delivery sub-second.
+    """
+
+    POLL_INTERVAL = 0.25
+    EVENT_TTL = 3600
+
+    def _seq_key(self, market_id: int) -> str:
+        return f"market_events_seq_{market_id}"
+
+    def _event_key(self, market_id: int, seq: int) -> str:
+        return f"market_event_{market_id}_{seq}"
+
+    def _latest_seq(self, market_id: int) -> int:
+        return cache.get(self._seq_key(market_id), 0)
+
+    def publish(self, market_id: int, event_type: str, data: dict) -> dict:
+        key = self._seq_key(market_id)
+        cache.add(key, 0, None)
+        seq = cache.incr(key)
+        event = self._make_event(market_id, seq, event_type, data)
+        cache.set(self._event_key(market_id, seq), event, self.EVENT_TTL)
+        return event
+
+    def events_since(self, market_id: int, seq: int) -> tuple:
+        latest = self._latest_seq(market_id)
+        if seq > latest:
+            return [], False  # Cursor from before the cache was flushed
+        if seq == latest:
+            return [], True
+
+        first = max(seq + 1, latest - self.buffer_size + 1)
+        keys = [self._event_key(market_id, s) for s in range(first, latest + 1)]
+        found = cache.get_many(keys)
+        events = [found[key] for key in keys if key in found]
+
+        complete = first == seq + 1 and len(events) == len(keys)
+        return events, complete
+
+    async def wait_for_events(self, market_id: int, seq: int, timeout: float) -> tuple:
+        deadline = time.monotonic() + timeout
+        while True:
+            # Cache reads only, no ORM: polls needn't queue on the shared sync thread
+            events, complete = await sync_to_async(self.events_since, thread_sensitive=False)(market_id, seq)
+            if events or not complete or time.monotonic() >= deadline:
+                return events, complete
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> BaseBroker:
+    """Return the process-wide broker configured by settings.MARKET_EVENT_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = import_string(
+                    getattr(settings, 'MARKET_EVENT_BROKER', 'markets.events.InProcessBroker')
+                )
+                _broker = broker_class(getattr(settings, 'MARKET_EVENT_BUFFER_SIZE', 500))
+    return _broker
+
+
+def publish_market_event(market_id: int, event_type: str, data: dict) -> None:
+    """
+    Publish an event once the surrounding DB transaction commits.
+
+    Streaming is best-effort: broker failures are logged and never break the
+    trade that produced the event.
+    """
+    def _publish():
+        try:
+            get_broker().publish(market_id, event_type, data)
+        except Exception as e:
+            logger.error(f"Failed to publish {event_type} event for market {market_id}: {str(e)}")
+
+    transaction.on_commit(_publish)
+
+
+def publish_price_tick(market) -> None:
+    """Publish the market's current LMSR state."""
+    data = {
+        'yes_probability': market.yes_probability,
+        'no_probability': 100 - market.yes_probability,
+        'q_yes': float(market.q_yes),
+        'q_no': float(market.q_no),
+        'b': float(market.b),
+        'volume': market.volume,
+    }
+    if market.market_type == 'OPTION_LIST':
+        from .services import get_option_prices
+        data['options'] = get_option_prices(market)
+    publish_market_event(market.id, EVENT_PRICE, data)
+
+
+def publish_trade(bet, result: dict = None) -> None:
+    """Publish an executed market order."""
+    data = {
+        'bet_id': bet.id,
+        'outcome': bet.outcome,
+        'option_id': bet.option_id,
+        'action': bet.action,
+        'amount': str(bet.amount),
+        'quantity': float(bet.quantity),
+    }
+    if result:
+        data['execution_price'] = result.get('execution_price')
+        data['new_yes_price'] = result.get('new_yes_price')
+    publish_market_event(bet.market_id, EVENT_TRADE, data)
+
+
+def publish_order_fill(bet) -> None:
+    """Publish a filled limit order."""
+    publish_market_event(bet.market_id, EVENT_ORDER_FILL, {
+        'bet_id': bet.id,
+        'outcome': bet.outcome,
+        'option_id': bet.option_id,
+        'action': bet.action,
+        'amount': str(bet.amount),
+        'quantity': float(bet.quantity),
+        'limit_price': str(bet.limit_price) if bet.limit_price is not None else None,
+        'filled_at': bet.filled_at.isoformat() if bet.filled_at else None,
+    })
+
+
+def publish_lifecycle(market_id: int, status: str) -> None:
+    """Publish a market status transition (e.g. OPEN -> CLOSED at trading end)."""
+    publish_market_event(market_id, EVENT_LIFECYCLE, {'status': status})
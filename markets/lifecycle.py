@@ -0,0 +1,135 @@
+"""
+Market Lifecycle Scheduler
+
+Moves markets from OPEN to CLOSED in the database at their trading_end_time,
+so nothing has to recompute an "effective status" per request.
+
+`close_due_markets` does the actual transition for every market whose
+deadline has passed: one UPDATE for the status flip, one UPDATE plus one bulk
+insert of notifications for their pending limit orders, cache invalidation and
+a `lifecycle` event per market on the SSE stream.
+
+`LifecycleScheduler` calls it exactly at each deadline: it keeps a heap of
+upcoming deadlines, refreshed from the database every REFRESH_SECONDS, and
+sleeps until the earliest one. Run it with `python manage.py
+run_market_lifecycle`; the `close_due_markets` beat task is a once-a-minute
+safety net for when the scheduler is not running.
+
+Bitcoin Up/Down rounds are left to BitcoinPriceService.roll_bitcoin_market,
+which closes and resolves them in one step.
+"""
+
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Market
+from .events import publish_lifecycle
+from .limit_orders import expire_pending_limit_orders
+from .state_cache import invalidate_market_state
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = 5
+HORIZON = timedelta(minutes=10)  # How far ahead the heap is filled on refresh
+
+
+def _schedulable_markets():
+    from .bitcoin_service import BitcoinPriceService
+
+    return Market.objects.filter(
+        status='OPEN',
+        trading_end_time__isnull=False,
+    ).exclude(question=BitcoinPriceService.MARKET_QUESTION)
+
+
+def close_due_markets(now=None) -> dict:
+    """
+    Close every OPEN market whose trading_end_time has passed.
+
+    Returns:
+        {'closed_market_ids': [...], 'expired_orders': int}
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        market_ids = list(
+            _schedulable_markets()
+            .filter(trading_end_time__lte=now)
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)
+        )
+        if not market_ids:
+            return {'closed_market_ids': [], 'expired_orders': 0}
+
+        Market.objects.filter(id__in=market_ids, status='OPEN').update(status='CLOSED', is_live=False)
+        expired_orders = expire_pending_limit_orders(market_ids)
+
+        for market_id in market_ids:
+            transaction.on_commit(lambda market_id=market_id: invalidate_market_state(market_id))
+            publish_lifecycle(market_id, 'CLOSED')
+
+    logger.info(f"Closed {len(market_ids)} markets at trading end, expired {expired_orders} limit orders")
+    return {'closed_market_ids': market_ids, 'expired_orders': expired_orders}
+
+
+class LifecycleScheduler:
+    """Heap of upcoming trading deadlines; closes markets as each one passes."""
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS, horizon: timedelta = HORIZON):
+        self.refresh_seconds = refresh_seconds
+        self.horizon = horizon
+        self._heap = []
+        self._scheduled = set()
+        self._next_refresh = 0.0
+
+    def refresh(self) -> None:
+        """Load deadlines up to `horizon` ahead (new markets, edited end times)."""
+        upcoming = _schedulable_markets().filter(
+            trading_end_time__lte=timezone.now() + self.horizon
+        ).values_list('trading_end_time', 'id')
+
+        for deadline, market_id in upcoming:
+            if (deadline, market_id) not in self._scheduled:
+                self._scheduled.add((deadline, market_id))
+                heapq.heappush(self._heap, (deadline, market_id))
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def seconds_until_next(self) -> float:
+        """How long the caller may sleep before calling tick() again."""
+        until_refresh = max(0.0, self._next_refresh - time.monotonic())
+        if not self._heap:
+            return until_refresh
+        until_deadline = (self._heap[0][0] - timezone.now()).total_seconds()
+        return max(0.0, min(until_refresh, until_deadline))
+
+    def tick(self) -> dict:
+        """Refresh if due, then close every market whose deadline has passed."""
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+
+        now = timezone.now()
+        due = False
+        while self._heap and self._heap[0][0] <= now:
+            self._scheduled.discard(heapq.heappop(self._heap))
+            due = True
+
+        if not due:
+            return {'closed_market_ids': [], 'expired_orders': 0}
+        # Re-checks status/deadline in the database, so stale heap entries
+        # (end time moved, market resolved early) are harmless
+        return close_due_markets(now)
+
+    def run_forever(self) -> None:
+        while True:
+            try:
+                result = self.tick()
+                if result['closed_market_ids']:
+                    logger.info(f"Lifecycle scheduler closed markets {result['closed_market_ids']}")
+            except Exception as e:
+                logger.error(f"Lifecycle scheduler error: {str(e)}")
+            time.sleep(self.seconds_until_next())
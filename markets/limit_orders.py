@@ -0,0 +1,279 @@
+"""
+Limit Order Lifecycle
+
+Set-based transitions for pending limit and trigger (stop-loss/take-profit)
+orders: expiry when a market stops trading, and user cancel / cancel-replace.
+
+Every transition locks the affected rows, flips them with one UPDATE and
+writes any notifications with one batched INSERT, so expiring the whole book
+of a large market is a single short transaction instead of a save() and a
+notification per order.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from api.validators import validate_amount, ValidationError
+from .models import Market, Bet
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 1000
+TRANSITION_BATCH_SIZE = 1000  # Order ids per UPDATE ... WHERE id IN (...)
+MAX_BULK_ORDERS = 500  # Per cancel/replace request
+
+PENDING_ORDER_TYPES = ('LIMIT', 'STOP_LOSS', 'TAKE_PROFIT')
+ORDER_TYPE_LABELS = {'LIMIT': 'limit', 'STOP_LOSS': 'stop-loss', 'TAKE_PROFIT': 'take-profit'}
+
+
+def _pending_limit_orders():
+    return Bet.objects.filter(order_type__in=PENDING_ORDER_TYPES, order_status='PENDING')
+
+
+def _transition_pending_orders(orders, new_status: str, fields=('id',)) -> list:
+    """
+    Lock `orders` and move them all to `new_status` with one UPDATE.
+
+    Must run inside a transaction. The first of `fields` must be 'id'.
+
+    Returns:
+        List of `fields` tuples for the orders that were transitioned
+    """
+    rows = list(
+        orders.select_for_update(of=('self',)).order_by('id').values_list(*fields)
+    )
+    # Update exactly the locked rows: re-running the filter could pick up
+    # orders inserted (or moved to PENDING) since the read, which were never
+    # locked or returned to the caller
+    for start in range(0, len(rows), TRANSITION_BATCH_SIZE):
+        ids = [row[0] for row in rows[start:start + TRANSITION_BATCH_SIZE]]
+        Bet.objects.filter(id__in=ids).update(order_status=new_status)
+    return rows
+
+
+def expire_pending_limit_orders(market_ids: list = None) -> int:
+    """
+    Expire pending limit orders in bulk and notify their owners.
+
+    Args:
+        market_ids: Markets whose orders expire (default: every market that
+            is no longer OPEN)
+
+    Returns:
+        Number of orders expired
+    """
+    from notifications.models import Notification
+
+    orders = _pending_limit_orders()
+    if market_ids is not None:
+        orders = orders.filter(market_id__in=market_ids)
+    else:
+        orders = orders.exclude(market__status='OPEN')
+
+    with transaction.atomic():
+        rows = _transition_pending_orders(
+            orders, 'EXPIRED', ('id', 'user_id', 'action', 'outcome', 'market_id', 'order_type')
+        )
+        if not rows:
+            return 0
+
+        questions = dict(
+            Market.objects.filter(id__in={row[4] for row in rows}).values_list('id', 'question')
+        )
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                type='LIMIT_ORDER_EXPIRED',
+                title='Limit Order Expired',
+                message=f'Your {ORDER_TYPE_LABELS[order_type]} {action.lower()} order for {outcome} on "{questions.get(market_id, "")}" expired without filling.',
+                color_class='orange',
+                related_market_id=market_id,
+                related_bet_id=order_id,
+            )
+            for order_id, user_id, action, outcome, market_id, order_type in rows
+        ], batch_size=NOTIFICATION_BATCH_SIZE)
+
+    return len(rows)
+
+
+def cancel_limit_orders(user, order_ids: list = None, market_id: int = None) -> list:
+    """
+    Cancel a user's pending limit and trigger orders with one UPDATE.
+
+    Args:
+        user: Order owner
+        order_ids: Orders to cancel (optional)
+        market_id: Cancel every pending order on this market (optional)
+
+    Returns:
+        Ids of the orders that were cancelled (already filled, expired or
+        foreign orders are skipped)
+    """
+    orders = _pending_limit_orders().filter(user=user)
+    if order_ids is not None:
+        orders = orders.filter(id__in=order_ids)
+    if market_id is not None:
+        orders = orders.filter(market_id=market_id)
+
+    with transaction.atomic():
+        rows = _transition_pending_orders(orders, 'CANCELLED')
+    return [row[0] for row in rows]
+
+
+def _parse_replacement(order: Bet, replacement: dict) -> dict:
+    """Validate a replacement's fields, defaulting to the order's current ones."""
+    limit_price = order.limit_price
+    if replacement.get('limit_price') not in (None, ''):
+        limit_price = validate_amount(
+            replacement['limit_price'], min_amount=Decimal('0.01'), max_amount=Decimal('100')
+        )
+
+    amount = order.amount
+    if replacement.get('amount') not in (None, ''):
+        if order.action == 'BUY':
+            amount = validate_amount(replacement['amount'], min_amount=Decimal('1'), max_amount=Decimal('100000'))
+        else:
+            try:
+                amount = Decimal(str(replacement['amount']))
+            except Exception:
+                raise ValidationError('Amount must be a number')
+            if amount <= 0:
+                raise ValidationError('Amount must be positive')
+            if amount > Decimal('1000000'):
+                raise ValidationError('Amount cannot exceed 1,000,000 shares')
+
+    trigger_price = order.trigger_price
+    if order.order_type != 'LIMIT':
+        if replacement.get('trigger_price') not in (None, ''):
+            trigger_price = validate_amount(
+                replacement['trigger_price'], min_amount=Decimal('0.01'), max_amount=Decimal('99.99')
+            )
+        # A trigger's size is its share count
+        return {'limit_price': limit_price, 'trigger_price': trigger_price, 'amount': amount, 'quantity': amount}
+
+    quantity = order.quantity
+    if replacement.get('quantity') not in (None, ''):
+        try:
+            quantity = Decimal(int(replacement['quantity']))
+        except (TypeError, ValueError):
+            raise ValidationError('Quantity must be an integer')
+        if quantity < 1:
+            raise ValidationError('Quantity must be at least 1')
+
+    return {'limit_price': limit_price, 'trigger_price': trigger_price, 'amount': amount, 'quantity': quantity}
+
+
+def available_shares(user, market_ids) -> dict:
+    """
+    Net shares a user holds per (market_id, outcome, option_id), in one grouped query.
+
+    Pending sell orders count as already sold, so shares cannot be committed
+    to two sell orders at once.
+    """
+    rows = Bet.objects.filter(
+        user=user,
+        market_id__in=market_ids,
+    ).exclude(
+        order_status__in=['CANCELLED', 'EXPIRED'],
+    ).values('market_id', 'outcome', 'option_id', 'action').annotate(total=Sum('quantity'))
+
+    available = {}
+    for row in rows:
+        key = (row['market_id'], row['outcome'], row['option_id'])
+        sign = 1 if row['action'] == 'BUY' else -1
+        available[key] = available.get(key, Decimal('0')) + sign * (row['total'] or Decimal('0'))
+    return available
+
+
+def replace_limit_orders(user, replacements: list) -> list:
+    """
+    Cancel/replace pending limit orders atomically.
+
+    Each order is cancelled and a new pending order with the updated price,
+    amount or quantity takes its place; either every replacement applies or
+    none does.
+
+    Args:
+        user: Order owner
+        replacements: [{'order_id': int, 'limit_price'?, 'trigger_price'?,
+            'amount'?, 'quantity'?}]
+
+    Returns:
+        List of (cancelled_order_id, new_order) tuples
+
+    Raises:
+        ValidationError: Unknown/non-pending order, invalid field, closed
+            market, insufficient balance or shares
+    """
+    from .services import get_market_prices, is_market_open
+    from .triggers import is_triggered, outcome_price, trigger_books
+
+    by_id = {}
+    for replacement in replacements:
+        try:
+            by_id[int(replacement.get('order_id'))] = replacement
+        except (TypeError, ValueError):
+            raise ValidationError('Each replacement needs a numeric order_id')
+
+    with transaction.atomic():
+        rows = _transition_pending_orders(
+            _pending_limit_orders().filter(user=user, id__in=list(by_id)), 'CANCELLED'
+        )
+        missing = set(by_id) - {row[0] for row in rows}
+        if missing:
+            raise ValidationError(f'Orders {sorted(missing)} are not pending limit or trigger orders')
+
+        orders = list(Bet.objects.filter(id__in=list(by_id)).select_related('market').order_by('id'))
+        for market in {order.market_id: order.market for order in orders}.values():
+            open_status, reason = is_market_open(market)
+            if not open_status:
+                raise ValidationError(f'Market {market.id}: {reason}')
+
+        available = None
+        new_orders = []
+        for order in orders:
+            fields = _parse_replacement(order, by_id[order.id])
+            if order.action == 'BUY':
+                if fields['amount'] > user.balance:
+                    raise ValidationError(f'Insufficient balance. Available: KES {user.balance}')
+            else:
+                if available is None:
+                    available = available_shares(user, {order.market_id for order in orders})
+                key = (order.market_id, order.outcome, order.option_id)
+                owned = available.get(key, Decimal('0'))
+                if fields['amount'] > owned:
+                    raise ValidationError(
+                        f'Cannot sell {fields["amount"]} shares. You only own {owned} shares of {order.outcome} on this market.'
+                    )
+                # Each replacement sell commits its shares before the next is checked
+                available[key] = owned - fields['amount']
+            if order.order_type != 'LIMIT':
+                price = outcome_price(get_market_prices(order.market)['yes_price_pct'], order.outcome)
+                if is_triggered(order.order_type, float(fields['trigger_price']), price):
+                    raise ValidationError(f'Trigger price {fields["trigger_price"]}% is already reached ({order.outcome} at {price}%)')
+
+            new_orders.append(Bet(
+                user=user,
+                market_id=order.market_id,
+                outcome=order.outcome,
+                amount=fields['amount'],
+                entry_probability=order.entry_probability,
+                option_id=order.option_id,
+                option_label=order.option_label,
+                order_type=order.order_type,
+                limit_price=fields['limit_price'],
+                trigger_price=fields['trigger_price'],
+                quantity=fields['quantity'],
+                action=order.action,
+                order_status='PENDING',
+            ))
+
+        created = Bet.objects.bulk_create(new_orders)
+        for market_id in {order.market_id for order in orders if order.order_type != 'LIMIT'}:
+            transaction.on_commit(lambda market_id=market_id: trigger_books.bump(market_id))
+
+    logger.info(f"User {user.id} replaced {len(created)} orders")
+    return [(order.id, new_order) for order, new_order in zip(orders, created)]
@@ -164,7 +164,7 @@ def calculate_pool_risk_score(pool: LiquidityPool) -> dict:
     
     # 3. VOLUME RISK (0-2 points)
     # Low volume = less trading = fewer fees
-    market_volume = float(market.volume.replace('KES', '').replace(',', '').strip() or 0)
+    market_volume = market.volume_cents / 100
     volume_score = max(0, 2.0 - (market_volume / 100000))  # 100k KES = no risk
     factors['volume'] = round(volume_score, 2)
     scores.append(volume_score)
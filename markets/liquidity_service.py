@@ -12,6 +12,7 @@ Phase 1 Implementation: All fees split equally among LPs
 
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Sum
 from django.utils import timezone
 from datetime import timedelta
 
@@ -26,7 +27,9 @@ from .lmsr import (
     price_yes as calc_price_yes,
     price_no as calc_price_no,
     cost as calc_cost,
+    b_for_pool_capital,
 )
+from .money import cents_to_float, from_cents, split_cents, to_cents
 from .utils.price_calculations import PAYOUT_PER_SHARE
 
 # ============================================================================
@@ -78,7 +81,7 @@ def initialize_liquidity_pool(market: Market) -> LiquidityPool:
 def deposit_liquidity(
     market: Market,
     user,
-    amount_kes: float,
+    amount_kes,
 ) -> dict:
     """
     User deposits capital into the liquidity pool.
@@ -89,7 +92,7 @@ def deposit_liquidity(
     Args:
         market: Market instance
         user: User depositing liquidity
-        amount_kes: Amount in KES to deposit
+        amount_kes: Amount in KES to deposit (rounded to the cent)
     
     Returns:
         {
@@ -101,40 +104,44 @@ def deposit_liquidity(
             'message': str,
         }
     """
-    if amount_kes <= 0:
+    amount_cents = to_cents(amount_kes)
+    if amount_cents <= 0:
         return {
             'success': False,
             'message': 'Deposit amount must be positive',
         }
+    amount = from_cents(amount_cents)
     
     # Check user balance
-    if user.balance < amount_kes:
+    if user.balance < amount:
         return {
             'success': False,
-            'message': f'Insufficient balance. You have {user.balance:.2f} KES but need {amount_kes:.2f} KES',
+            'message': f'Insufficient balance. You have {user.balance:.2f} KES but need {amount} KES',
         }
     
+    from .services import lmsr_params
+    
     # Get or create pool
     pool = initialize_liquidity_pool(market)
     
     # Get current market price
     q_yes = float(market.q_yes)
     q_no = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
-    p_yes = calc_price_yes(q_yes, q_no, b)
-    p_no = calc_price_no(q_yes, q_no, b)
+    p_yes = calc_price_yes(q_yes, q_no, b, alpha)
+    p_no = calc_price_no(q_yes, q_no, b, alpha)
     
-    # Split capital 50/50
-    half_capital = amount_kes / 2
+    # Split capital 50/50 (an odd cent goes to YES)
+    yes_capital_cents, no_capital_cents = split_cents(amount_cents, 2)
     
     # Calculate shares to buy at current prices
     # Cost = shares * probability * 100 (PAYOUT_PER_SHARE)
-    yes_shares = half_capital / (p_yes * PAYOUT_PER_SHARE)
-    no_shares = half_capital / (p_no * PAYOUT_PER_SHARE)
+    yes_shares = cents_to_float(yes_capital_cents) / (p_yes * PAYOUT_PER_SHARE)
+    no_shares = cents_to_float(no_capital_cents) / (p_no * PAYOUT_PER_SHARE)
     
     # Deduct balance from user
-    user.balance -= Decimal(str(amount_kes))
+    user.balance -= amount
     user.save()
     
     # Get or create LP provider record
@@ -142,7 +149,7 @@ def deposit_liquidity(
         user=user,
         pool=pool,
         defaults={
-            'capital_provided': Decimal(str(amount_kes)),
+            'capital_provided': amount,
             'yes_shares_owned': 0.0,
             'no_shares_owned': 0.0,
         }
@@ -150,7 +157,7 @@ def deposit_liquidity(
     
     # If LP already has position, add to it
     if not created:
-        lp_provider.capital_provided += Decimal(str(amount_kes))
+        lp_provider.capital_provided += amount
     
     # Update LP's share ownership
     lp_provider.yes_shares_owned += yes_shares
@@ -162,6 +169,9 @@ def deposit_liquidity(
     pool.total_no_shares += no_shares
     pool.save()
     
+    # POOL markets: the new capital deepens the book
+    rescale_market_liquidity(market)
+    
     return {
         'success': True,
         'lp_provider': lp_provider,
@@ -169,7 +179,7 @@ def deposit_liquidity(
         'no_shares': no_shares,
         'capital_provided': float(lp_provider.capital_provided),
         'lp_share_percent': lp_provider.lp_share_percent,
-        'message': f'Successfully deposited {amount_kes} KES. Received {yes_shares:.4f} YES + {no_shares:.4f} NO shares.',
+        'message': f'Successfully deposited {amount} KES. Received {yes_shares:.4f} YES + {no_shares:.4f} NO shares.',
     }
 
 
@@ -196,15 +206,17 @@ def withdraw_liquidity(lp_provider: LiquidityProvider) -> dict:
             'message': str,
         }
     """
+    from .services import lmsr_params
+    
     pool = lp_provider.pool
     market = pool.market
     
     q_yes = float(market.q_yes)
     q_no = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
-    p_yes = calc_price_yes(q_yes, q_no, b)
-    p_no = calc_price_no(q_yes, q_no, b)
+    p_yes = calc_price_yes(q_yes, q_no, b, alpha)
+    p_no = calc_price_no(q_yes, q_no, b, alpha)
     
     # Calculate current value of shares
     yes_value = lp_provider.yes_shares_owned * p_yes * PAYOUT_PER_SHARE
@@ -234,12 +246,15 @@ def withdraw_liquidity(lp_provider: LiquidityProvider) -> dict:
     
     # Refund user balance (net withdrawal + fees earned)
     user = lp_provider.user
-    user.balance += Decimal(str(total_payout))
+    user.balance += from_cents(to_cents(total_payout))
     user.save()
     
     # Mark LP provider as withdrawn (delete record)
     lp_provider.delete()
     
+    # POOL markets: depth shrinks with the withdrawn capital
+    rescale_market_liquidity(market)
+    
     return {
         'success': True,
         'withdrawal_amount_kes': total_shares_value,
@@ -252,12 +267,64 @@ def withdraw_liquidity(lp_provider: LiquidityProvider) -> dict:
     }
 
 
+# ============================================================================
+# ADAPTIVE LIQUIDITY (POOL mode)
+# ============================================================================
+
+def get_pool_capital(market: Market) -> float:
+    """Total KES capital currently provided to the market's pool."""
+    total = LiquidityProvider.objects.filter(pool__market=market).aggregate(
+        total=Sum('capital_provided')
+    )['total']
+    return float(total or 0)
+
+
+def pool_liquidity_b(market: Market) -> float:
+    """The `b` a POOL market's LP capital pays for."""
+    return round(b_for_pool_capital(get_pool_capital(market), DEFAULT_LIQUIDITY_PARAMETER_B), 6)
+
+
+@transaction.atomic
+def rescale_market_liquidity(market: Market) -> dict:
+    """
+    Re-derive `b` from LP capital for markets in POOL liquidity mode.
+    
+    Only `b` changes. q values are the shares issued, which sells are
+    checked against and which bound the market maker's loss at b * ln(n),
+    so they are never rescaled; prices (q / b) move toward even odds when
+    capital is added and away from them when it is withdrawn. Other modes
+    are left untouched.
+    
+    Args:
+        market: Market instance
+    
+    Returns:
+        {'rescaled': bool, 'old_b': float, 'new_b': float}
+    """
+    market = Market.objects.select_for_update().get(id=market.id)
+    old_b = float(market.b)
+    
+    if market.liquidity_mode != 'POOL':
+        return {'rescaled': False, 'old_b': old_b, 'new_b': old_b}
+    
+    new_b = pool_liquidity_b(market)
+    if abs(new_b - old_b) < 1e-9:
+        return {'rescaled': False, 'old_b': old_b, 'new_b': old_b}
+    
+    market.b = new_b
+    market.yes_probability = int(calc_price_yes(float(market.q_yes), float(market.q_no), new_b) * 100)
+    market.trade_seq += 1
+    market.save(update_fields=['b', 'yes_probability', 'trade_seq'])
+    
+    return {'rescaled': True, 'old_b': old_b, 'new_b': new_b}
+
+
 # ============================================================================
 # FEE DISTRIBUTION (Called when trades execute)
 # ============================================================================
 
 @transaction.atomic
-def distribute_trading_fee(pool: LiquidityPool, fee_amount_kes: float, source_bet: Bet = None) -> dict:
+def distribute_trading_fee(pool: LiquidityPool, fee_amount_kes, source_bet: Bet = None) -> dict:
     """
     Distribute a trading fee to all liquidity providers equally.
     
@@ -265,7 +332,7 @@ def distribute_trading_fee(pool: LiquidityPool, fee_amount_kes: float, source_be
     
     Args:
         pool: LiquidityPool instance
-        fee_amount_kes: Amount of fee to distribute
+        fee_amount_kes: Amount of fee to distribute (rounded to the cent)
         source_bet: The Bet that generated this fee (optional, for audit trail)
     
     Returns:
@@ -286,13 +353,18 @@ def distribute_trading_fee(pool: LiquidityPool, fee_amount_kes: float, source_be
             'message': 'No liquidity providers in pool',
         }
     
-    num_providers = providers.count()
-    per_provider_fee = fee_amount_kes / num_providers
+    providers = list(providers.order_by('id'))
+    num_providers = len(providers)
+    fee_cents = to_cents(fee_amount_kes)
+    # Whole cents per LP; the remainder cents go to the first LPs so the
+    # distributions add up to exactly what the pool records
+    shares = split_cents(fee_cents, num_providers)
     
     # Distribute fee to each LP equally
-    for provider in providers:
-        provider.total_fees_earned += Decimal(str(per_provider_fee))
-        provider.unclaimed_fees += Decimal(str(per_provider_fee))
+    for provider, share_cents in zip(providers, shares):
+        share = from_cents(share_cents)
+        provider.total_fees_earned += share
+        provider.unclaimed_fees += share
         provider.last_fee_update = timezone.now()
         provider.save()
         
@@ -300,22 +372,22 @@ def distribute_trading_fee(pool: LiquidityPool, fee_amount_kes: float, source_be
         FeeDistribution.objects.create(
             pool=pool,
             provider=provider,
-            fee_amount=Decimal(str(per_provider_fee)),
+            fee_amount=share,
             source_bet=source_bet,
             is_claimed=False,
         )
     
     # Update pool totals
-    pool.total_fees_collected += Decimal(str(fee_amount_kes))
-    pool.total_unclaimed_fees += Decimal(str(fee_amount_kes))
+    pool.total_fees_collected += from_cents(fee_cents)
+    pool.total_unclaimed_fees += from_cents(fee_cents)
     pool.save()
     
     return {
         'success': True,
         'num_providers': num_providers,
-        'per_provider_fee': per_provider_fee,
-        'total_distributed': fee_amount_kes,
-        'message': f'Fee {fee_amount_kes:.2f} KES distributed to {num_providers} providers',
+        'per_provider_fee': cents_to_float(shares[0]),
+        'total_distributed': cents_to_float(fee_cents),
+        'message': f'Fee {from_cents(fee_cents)} KES distributed to {num_providers} providers',
     }
 
 
@@ -359,7 +431,7 @@ def claim_fees(lp_provider: LiquidityProvider) -> dict:
     
     # Add claimed fees to user's balance
     user = lp_provider.user
-    user.balance += Decimal(str(amount_to_claim))
+    user.balance += from_cents(to_cents(amount_to_claim))
     user.save()
     
     # Mark distributions as claimed
@@ -506,12 +578,14 @@ def calculate_impermanent_loss(lp_provider: LiquidityProvider) -> dict:
     fees_earned = float(lp_provider.total_fees_earned)
     
     # Current market prices
+    from .services import lmsr_params
+    
     q_yes = float(market.q_yes)
     q_no = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
-    current_price_yes = calc_price_yes(q_yes, q_no, b)
-    current_price_no = calc_price_no(q_yes, q_no, b)
+    current_price_yes = calc_price_yes(q_yes, q_no, b, alpha)
+    current_price_no = calc_price_no(q_yes, q_no, b, alpha)
     
     # Estimate entry prices (50/50 split assumption)
     # This is approximate - ideal would store entry prices at deposit time
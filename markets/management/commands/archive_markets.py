@@ -0,0 +1,58 @@
+"""
+Management command that moves settled markets' history to archive files.
+
+Bets, price history, comments and fee distributions of resolved, fully paid
+markets are written to MARKET_ARCHIVE_DIR and deleted from the hot tables
+(see markets/archive.py):
+
+    python manage.py archive_markets
+    python manage.py archive_markets --older-than-days 90 --limit 50
+    python manage.py archive_markets --market 123
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from markets.archive import archive_market, archive_settled_markets
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Archive the history of settled markets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            help='Only markets resolved at least this many days ago (default MARKET_ARCHIVE_AFTER_DAYS)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Archive at most this many markets'
+        )
+        parser.add_argument(
+            '--market',
+            type=int,
+            help='Archive this market only (it must be settled)'
+        )
+
+    def handle(self, *args, **options):
+        if options['market']:
+            archive = archive_market(options['market'])
+            if archive is None:
+                raise CommandError(f"Market {options['market']} is not settled or already archived")
+            self.stdout.write(self.style.SUCCESS(
+                f"Archived market {options['market']} to {archive.path}: {archive.row_counts}"
+            ))
+            return
+
+        result = archive_settled_markets(options['older_than_days'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {len(result['archived'])} markets, skipped {len(result['skipped'])} "
+            f"not yet settled, {len(result['failed'])} failed"
+        ))
+        if result['failed']:
+            self.stdout.write(self.style.WARNING(f"Failed: {result['failed']}"))
@@ -2,12 +2,21 @@
 Management command to initialize q_yes and q_no for existing markets.
 
 This ensures all markets have LMSR parameters calculated from their yes_probability.
+
+With --liquidity-mode it also migrates markets between liquidity modes
+(FIXED, LS_LMSR, POOL) while keeping their current prices (POOL markets
+re-price at the b their LP capital pays for; issued shares are kept):
+
+    python manage.py initialize_market_q_values --liquidity-mode LS_LMSR --alpha 0.05
+    python manage.py initialize_market_q_values --market-id 7 --liquidity-mode POOL
 """
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from markets.models import Market
 from markets.bootstrap import bootstrap_market
+from markets.liquidity_service import rescale_market_liquidity
+from markets.lmsr import price_yes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,12 +36,30 @@ class Command(BaseCommand):
             type=int,
             help='Initialize specific market by ID'
         )
+        parser.add_argument(
+            '--liquidity-mode',
+            choices=[mode for mode, _ in Market.LIQUIDITY_MODE_CHOICES],
+            help='Migrate markets to this liquidity mode (prices are preserved)'
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=0.05,
+            help='LS-LMSR sensitivity used with --liquidity-mode LS_LMSR (default 0.05)'
+        )
 
     def handle(self, *args, **options):
         fix_all = options.get('fix_all', False)
         market_id = options.get('market_id')
+        liquidity_mode = options.get('liquidity_mode')
 
-        if market_id:
+        if liquidity_mode:
+            if liquidity_mode == 'LS_LMSR' and options['alpha'] <= 0:
+                self.stdout.write(self.style.ERROR("--alpha must be positive for LS_LMSR"))
+                return
+            markets = Market.objects.filter(id=market_id) if market_id else Market.objects.all()
+            self.migrate_liquidity_mode(markets, liquidity_mode, options['alpha'])
+        elif market_id:
             # Initialize single market
             self.initialize_market(market_id, force=fix_all)
         else:
@@ -62,6 +89,7 @@ class Command(BaseCommand):
             
             market.q_yes = q_yes
             market.q_no = q_no
+            market.trade_seq += 1
             market.save()
             
             self.stdout.write(
@@ -110,6 +138,7 @@ class Command(BaseCommand):
                     
                     market.q_yes = q_yes
                     market.q_no = q_no
+                    market.trade_seq += 1
                     market.save()
                     
                     self.stdout.write(
@@ -135,3 +164,68 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.WARNING(f"⚠ {errors} markets had errors")
             )
+
+    def migrate_liquidity_mode(self, markets, liquidity_mode, alpha):
+        """Switch markets to another liquidity mode without moving their prices"""
+        if not markets.exists():
+            self.stdout.write(self.style.WARNING("No markets to migrate"))
+            return
+
+        count = 0
+        errors = 0
+
+        for market in markets:
+            try:
+                with transaction.atomic():
+                    self.apply_liquidity_mode(market, liquidity_mode, alpha)
+                count += 1
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f"  ✗ Market {market.id}: {str(e)}")
+                )
+                errors += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\n✓ Migrated {count} markets to {liquidity_mode}")
+        )
+
+        if errors > 0:
+            self.stdout.write(
+                self.style.WARNING(f"⚠ {errors} markets had errors")
+            )
+
+    def apply_liquidity_mode(self, market, liquidity_mode, alpha):
+        """Set one market's liquidity mode, re-bootstrapping q if its price would shift"""
+        b = float(market.b) if market.b else 100.0
+        old_alpha = float(market.liquidity_alpha) if market.liquidity_mode == 'LS_LMSR' else 0.0
+        price_before = price_yes(float(market.q_yes), float(market.q_no), b, old_alpha)
+
+        market.liquidity_mode = liquidity_mode
+        market.liquidity_alpha = alpha if liquidity_mode == 'LS_LMSR' else 0.0
+        market.trade_seq += 1
+        market.save(update_fields=['liquidity_mode', 'liquidity_alpha', 'trade_seq'])
+
+        if liquidity_mode == 'POOL':
+            # The rescale changes only b, so prices move with the new depth
+            result = rescale_market_liquidity(market)
+            market.refresh_from_db()
+            self.stdout.write(
+                f"  Market {market.id}: POOL, b {result['old_b']:.2f} → {result['new_b']:.2f}, "
+                f"YES {price_before * 100:.1f}% → {market.yes_probability}%"
+            )
+            return
+
+        price_after = price_yes(float(market.q_yes), float(market.q_no), b, market.liquidity_alpha)
+        if abs(price_after - price_before) > 0.005:
+            # b(q) already exceeds the floor at the current quantities, so
+            # restart from the floor with the same probability
+            q_yes, q_no = bootstrap_market(min(0.99, max(0.01, price_before)), b)
+            market.q_yes = q_yes
+            market.q_no = q_no
+            market.trade_seq += 1
+            market.save(update_fields=['q_yes', 'q_no', 'trade_seq'])
+
+        self.stdout.write(
+            f"  Market {market.id}: {liquidity_mode} (alpha={market.liquidity_alpha}), "
+            f"YES {price_before * 100:.1f}%"
+        )
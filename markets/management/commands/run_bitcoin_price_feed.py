@@ -0,0 +1,78 @@
+"""
+Management command that runs the Bitcoin price poller and round scheduler.
+
+Keeps the latest tick and a short history in the shared cache, and rolls the
+5-minute Up/Down market over when a round expires. Use this as a standalone
+process when Celery Beat is not running, or point it at a local fake price
+server for testing:
+
+    BITCOIN_PRICE_API_URL=http://127.0.0.1:9000/price python manage.py run_bitcoin_price_feed
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from markets.bitcoin_service import BitcoinPriceService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Poll the Bitcoin price into the shared cache and roll the Up/Down market'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'BITCOIN_PRICE_POLL_SECONDS', 5),
+            help='Seconds between polls'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Poll and roll once, then exit'
+        )
+        parser.add_argument(
+            '--no-roll',
+            action='store_true',
+            help='Only poll prices; do not roll the Up/Down market'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            started = time.monotonic()
+            self.run_cycle(roll=not options['no_roll'])
+
+            if options['once']:
+                return
+
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def run_cycle(self, roll=True):
+        """Poll one tick and roll the market; errors are logged, never fatal."""
+        try:
+            tick = BitcoinPriceService.poll_price()
+            if tick:
+                self.stdout.write(f"BTC ${tick['price']:,.2f} ({tick['source']})")
+            else:
+                self.stdout.write(self.style.WARNING("Price poll failed on all sources"))
+        except Exception as e:
+            logger.error(f"Bitcoin price poll error: {str(e)}")
+
+        if not roll:
+            return
+
+        try:
+            result = BitcoinPriceService.roll_bitcoin_market()
+            if result['closed_market_ids'] or result['opened_market_id']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Rolled Bitcoin market: closed={result['closed_market_ids']}, "
+                    f"opened={result['opened_market_id']}"
+                ))
+        except Exception as e:
+            logger.error(f"Bitcoin market roll error: {str(e)}")
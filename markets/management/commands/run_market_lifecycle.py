@@ -0,0 +1,45 @@
+"""
+Management command that runs the market lifecycle scheduler.
+
+Closes markets exactly at their trading_end_time (status flip, bulk expiry of
+pending limit orders, cache invalidation and lifecycle events):
+
+    python manage.py run_market_lifecycle
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from markets.lifecycle import LifecycleScheduler, REFRESH_SECONDS, close_due_markets
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Close markets at their trading_end_time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh',
+            type=float,
+            default=REFRESH_SECONDS,
+            help='Seconds between reloads of upcoming deadlines'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Close markets that are already due, then exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            result = close_due_markets()
+            self.stdout.write(self.style.SUCCESS(
+                f"Closed {len(result['closed_market_ids'])} markets, "
+                f"expired {result['expired_orders']} limit orders"
+            ))
+            return
+
+        self.stdout.write(f"Lifecycle scheduler running (refresh every {options['refresh']}s)")
+        LifecycleScheduler(refresh_seconds=options['refresh']).run_forever()
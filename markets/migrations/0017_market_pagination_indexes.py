@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0016_liquiditypool_liquidityprovider_feedistribution'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['market', 'id'], name='markets_bet_market__57e6e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['market', 'id'], name='markets_cha_market__a692aa_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0017_market_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketOption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('option_id', models.IntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('q', models.FloatField(default=0.0)),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='market_options', to='markets.market')),
+            ],
+            options={
+                'ordering': ['option_id'],
+                'unique_together': {('market', 'option_id')},
+            },
+        ),
+    ]
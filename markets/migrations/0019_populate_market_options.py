@@ -0,0 +1,39 @@
+import math
+
+from django.db import migrations
+
+
+def populate_market_options(apps, schema_editor):
+    """Create MarketOption rows from the legacy options JSON of OPTION_LIST markets."""
+    Market = apps.get_model('markets', 'Market')
+    MarketOption = apps.get_model('markets', 'MarketOption')
+
+    rows = []
+    for market in Market.objects.filter(market_type='OPTION_LIST').exclude(options__isnull=True):
+        options = [opt for opt in (market.options or []) if isinstance(opt, dict) and opt.get('id') is not None]
+        if not options:
+            continue
+
+        b = float(market.b) if market.b else 100.0
+        weights = [max(1, min(99, int(opt.get('yes_probability', 50)))) for opt in options]
+        total = sum(weights)
+        for opt, weight in zip(options, weights):
+            rows.append(MarketOption(
+                market_id=market.id,
+                option_id=opt['id'],
+                label=opt.get('label') or f"Option {opt['id']}",
+                q=b * math.log(weight / total),
+            ))
+
+    MarketOption.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0018_marketoption'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_market_options, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0019_populate_market_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='liquidity_mode',
+            field=models.CharField(choices=[('FIXED', 'Fixed b'), ('LS_LMSR', 'Liquidity-sensitive (volume)'), ('POOL', 'LP pool capital')], default='FIXED', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='market',
+            name='liquidity_alpha',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
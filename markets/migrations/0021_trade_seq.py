@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0020_market_liquidity_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='trade_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bet',
+            name='trade_seq',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0021_trade_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='clearing_mode',
+            field=models.CharField(choices=[('CONTINUOUS', 'Continuous'), ('BATCH_AUCTION', 'Frequent batch auction')], default='CONTINUOUS', max_length=20),
+        ),
+    ]
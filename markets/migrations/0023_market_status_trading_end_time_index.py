@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0022_market_clearing_mode'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='market',
+            index=models.Index(fields=['status', 'trading_end_time'], name='markets_mar_status_d8e088_idx'),
+        ),
+    ]
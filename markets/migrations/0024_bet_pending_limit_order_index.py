@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0023_market_status_trading_end_time_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bet',
+            index=models.Index(fields=['order_status', 'order_type', 'market'], name='markets_bet_order_s_15fd71_idx'),
+        ),
+    ]
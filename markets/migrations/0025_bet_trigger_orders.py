@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0024_bet_pending_limit_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bet',
+            name='trigger_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bet',
+            name='order_type',
+            field=models.CharField(choices=[('MARKET', 'Market'), ('LIMIT', 'Limit'), ('STOP_LOSS', 'Stop Loss'), ('TAKE_PROFIT', 'Take Profit')], default='MARKET', max_length=20),
+        ),
+    ]
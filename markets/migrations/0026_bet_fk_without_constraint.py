@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0025_bet_trigger_orders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedistribution',
+            name='source_bet',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='markets.bet'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    """Convert Bet and PriceHistory to monthly range partitions (PostgreSQL only)."""
+    from api.partitioning import partition_table
+
+    partition_table(schema_editor, 'markets_bet', 'timestamp')
+    partition_table(schema_editor, 'markets_pricehistory', 'timestamp')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0026_bet_fk_without_constraint'),
+        # References to Bet must not be database constraints first
+        ('payments', '0005_bet_fk_without_constraint'),
+    ]
+
+    operations = [
+        # Reversing keeps the partitioned tables; they hold the same columns
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0027_partition_bet_pricehistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('row_counts', models.JSONField(default=dict)),
+                ('top_holders', models.JSONField(default=dict)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('market', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='markets.market')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarketArchiveParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bet_count', models.IntegerField(default=0)),
+                ('total_wagered', models.DecimalField(decimal_places=8, default=0, max_digits=15)),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='markets.marketarchive')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_markets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('archive', 'user')},
+            },
+        ),
+    ]
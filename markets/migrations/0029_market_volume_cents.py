@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _parse_volume(volume_str):
+    """KES amount of a legacy display string ("KES 1.2M", "KES 950K", "KES 300")."""
+    normalized = (volume_str or '').replace('KES', '').replace(' ', '').strip()
+    multiplier = 1
+    if normalized.endswith(('M', 'm')):
+        normalized, multiplier = normalized[:-1], 1_000_000
+    elif normalized.endswith(('K', 'k')):
+        normalized, multiplier = normalized[:-1], 1_000
+    try:
+        return int(round(float(normalized) * multiplier))
+    except ValueError:
+        return 0
+
+
+def copy_volume(apps, schema_editor):
+    """Carry the legacy volume strings over as cents (as precise as the strings were)."""
+    Market = apps.get_model('markets', 'Market')
+    markets = list(Market.objects.only('id', 'volume'))
+    for market in markets:
+        market.volume_cents = _parse_volume(market.volume) * 100
+    Market.objects.bulk_update(markets, ['volume_cents'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0028_market_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='volume_cents',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(copy_volume, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='market',
+            name='volume',
+        ),
+        migrations.CreateModel(
+            name='MarketVolumeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('volume_cents', models.BigIntegerField(default=0)),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='volume_buckets', to='markets.market')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket_start'], name='markets_mar_bucket__0f12ae_idx')],
+                'unique_together': {('market', 'bucket_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0029_market_volume_cents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='round_open_price',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -31,7 +31,7 @@ class Market(models.Model):
     market_type = models.CharField(max_length=20, choices=MARKET_TYPE_CHOICES, default='BINARY')
     yes_probability = models.IntegerField(default=50)  # For BINARY markets
     options = models.JSONField(null=True, blank=True)  # For OPTION_LIST markets: [{"id": 1, "label": "...", "yes_probability": 50}, ...]
-    volume = models.CharField(max_length=100, default="KES 0")
+    volume_cents = models.BigIntegerField(default=0, db_index=True)  # Traded volume in KES cents (markets/volume.py)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OPEN')
     end_date = models.CharField(max_length=100)
     resolved_outcome = models.CharField(max_length=10, choices=[('Yes', 'Yes'), ('No', 'No')], null=True, blank=True)
@@ -44,13 +44,84 @@ class Market(models.Model):
     q_yes = models.FloatField(default=0.0)  # YES quantity scalar
     q_no = models.FloatField(default=0.0)   # NO quantity scalar
     b = models.FloatField(default=100.0)    # Liquidity parameter (higher = more liquidity)
+
+    # Adaptive liquidity
+    # FIXED:    b never changes
+    # LS_LMSR:  b(q) = max(b, liquidity_alpha * (q_yes + q_no)) - depth grows with volume
+    # POOL:     b is re-derived from LP capital on every deposit/withdrawal
+    LIQUIDITY_MODE_CHOICES = [
+        ('FIXED', 'Fixed b'),
+        ('LS_LMSR', 'Liquidity-sensitive (volume)'),
+        ('POOL', 'LP pool capital'),
+    ]
+    liquidity_mode = models.CharField(max_length=10, choices=LIQUIDITY_MODE_CHOICES, default='FIXED')
+    liquidity_alpha = models.FloatField(default=0.0)  # LS-LMSR sensitivity (only used in LS_LMSR mode)
+
+    # Incremented by every write to the LMSR state; the trade sequencer uses
+    # it to detect that its in-memory copy is stale
+    trade_seq = models.BigIntegerField(default=0)
+
+    # CONTINUOUS: every order executes on arrival
+    # BATCH_AUCTION: orders are collected for BATCH_AUCTION_INTERVAL_MS, netted
+    # and cleared at one uniform price by the trade sequencer
+    CLEARING_MODE_CHOICES = [
+        ('CONTINUOUS', 'Continuous'),
+        ('BATCH_AUCTION', 'Frequent batch auction'),
+    ]
+    clearing_mode = models.CharField(max_length=20, choices=CLEARING_MODE_CHOICES, default='CONTINUOUS')
     
     # Market control fields
     trading_end_time = models.DateTimeField(null=True, blank=True)  # When trading closes
+    round_open_price = models.FloatField(null=True, blank=True)  # Underlying price when a timed round (Bitcoin Up/Down) opened
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'trading_end_time']),  # Lifecycle scheduler deadline scan
+        ]
 
     def __str__(self):
         return self.question
 
+    def save(self, *args, **kwargs):
+        # volume_cents only moves through F() increments (markets/volume.py):
+        # a full save of an instance loaded before a concurrent trade must
+        # not write the old total back
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            skipped = self.get_deferred_fields() | {'volume_cents'}
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def volume(self) -> str:
+        """Display string of volume_cents, e.g. "KES 1.2M"."""
+        from .volume import format_volume
+        return format_volume(self.volume_cents)
+
+class MarketOption(models.Model):
+    """
+    One outcome of an OPTION_LIST market.
+
+    Holds the option's LMSR quantity; all options of a market share the
+    market's liquidity parameter `b`. Prices are softmax(q / b) across the
+    market's options and are computed on read, so a trade only writes the
+    traded option's row.
+    """
+    market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name='market_options')
+    option_id = models.IntegerField()  # Matches Bet.option_id and the ids in Market.options
+    label = models.CharField(max_length=255)
+    q = models.FloatField(default=0.0)  # LMSR quantity for this option
+
+    class Meta:
+        ordering = ['option_id']
+        unique_together = ['market', 'option_id']
+
+    def __str__(self):
+        return f"{self.market_id} - Option {self.option_id}: {self.label}"
+
+
 class Bet(models.Model):
     RESULT_CHOICES = [
         ('PENDING', 'Pending'),
@@ -80,9 +151,12 @@ class Bet(models.Model):
     ORDER_TYPE_CHOICES = [
         ('MARKET', 'Market'),
         ('LIMIT', 'Limit'),
+        ('STOP_LOSS', 'Stop Loss'),  # Sell when the outcome price falls to trigger_price
+        ('TAKE_PROFIT', 'Take Profit'),  # Sell when the outcome price rises to trigger_price
     ]
-    order_type = models.CharField(max_length=10, choices=ORDER_TYPE_CHOICES, default='MARKET')
+    order_type = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES, default='MARKET')
     limit_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    trigger_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)  # STOP_LOSS/TAKE_PROFIT threshold (%)
     order_status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='FILLED')  # FILLED for market orders, PENDING for limit orders
     quantity = models.DecimalField(max_digits=15, decimal_places=8, default=1)  # Support fractional shares
     result = models.CharField(max_length=20, choices=RESULT_CHOICES, default='PENDING')
@@ -90,6 +164,13 @@ class Bet(models.Model):
     action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='BUY')
     timestamp = models.DateTimeField(auto_now_add=True)
     filled_at = models.DateTimeField(null=True, blank=True)  # When limit order was filled
+    trade_seq = models.BigIntegerField(null=True, blank=True)  # Market trade sequence number (sequencer fills)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['market', 'id']),  # Keyset pagination of market activity
+            models.Index(fields=['order_status', 'order_type', 'market']),  # Set-based limit order expiry/cancel
+        ]
     
     def __str__(self):
         return f"{self.user.phone_number} - {self.market.question} - {self.outcome}"
@@ -113,6 +194,22 @@ class PriceHistory(models.Model):
         return f"{self.market.id}{option_str} - Yes: {self.yes_probability}% at {self.timestamp}"
 
 
+class MarketVolumeBucket(models.Model):
+    """Volume traded on a market in one hour, for rolling 24h/7d volume (markets/volume.py)."""
+    market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name='volume_buckets')
+    bucket_start = models.DateTimeField()
+    volume_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['market', 'bucket_start']
+        indexes = [
+            models.Index(fields=['bucket_start']),  # Pruning
+        ]
+
+    def __str__(self):
+        return f"{self.market_id} @ {self.bucket_start}: {self.volume_cents}"
+
+
 class ChatMessage(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chat_messages')
     market = models.ForeignKey(Market, on_delete=models.CASCADE, related_name='chat_messages')
@@ -120,6 +217,11 @@ class ChatMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['market', 'id']),  # Keyset pagination of market comments
+        ]
+
     def __str__(self):
         if self.parent:
             return f"{self.user.phone_number} replied to {self.parent.user.phone_number} on {self.market.id}: {self.message[:40]}"
@@ -221,7 +323,8 @@ class FeeDistribution(models.Model):
     provider = models.ForeignKey(LiquidityProvider, on_delete=models.CASCADE, related_name='fee_history')
     
     fee_amount = models.DecimalField(max_digits=12, decimal_places=2)
-    source_bet = models.ForeignKey(Bet, on_delete=models.SET_NULL, null=True, blank=True)
+    # No DB constraint: Bet is partitioned, its key is (id, timestamp)
+    source_bet = models.ForeignKey(Bet, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False)
     
     # Tracking
     created_at = models.DateTimeField(auto_now_add=True)
@@ -230,3 +333,39 @@ class FeeDistribution(models.Model):
     
     def __str__(self):
         return f"Fee {self.fee_amount} KES to {self.provider.user.phone_number}"
+
+
+class MarketArchive(models.Model):
+    """
+    Cold-storage file holding a settled market's bets, price history,
+    comments and fee distributions (see markets/archive.py).
+    """
+    market = models.OneToOneField(Market, on_delete=models.CASCADE, related_name='archive')
+    path = models.CharField(max_length=500)
+    sha256 = models.CharField(max_length=64)
+    size_bytes = models.BigIntegerField(default=0)
+    row_counts = models.JSONField(default=dict)  # {'bets': 120, 'price_history': 900, ...}
+    top_holders = models.JSONField(default=dict)  # get_top_holders() at archive time
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of market {self.market_id}"
+
+
+class MarketArchiveParticipant(models.Model):
+    """
+    A user's totals in an archived market, so statistics and history can
+    find archived bets without opening every archive file.
+    """
+    archive = models.ForeignKey(MarketArchive, on_delete=models.CASCADE, related_name='participants')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_markets')
+    bet_count = models.IntegerField(default=0)
+    total_wagered = models.DecimalField(max_digits=15, decimal_places=8, default=0)  # Settled bets
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['archive', 'user']
+
+    def __str__(self):
+        return f"{self.user_id} in archive of market {self.archive.market_id}"
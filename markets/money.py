@@ -0,0 +1,112 @@
+"""
+Money and Share Quantities in Integer Minor Units
+
+Balances and ledgers are DecimalFields with 2 places and share quantities
+DecimalFields with 8, while the LMSR works in floats. Mixing them freely
+(Decimal(str(float)), unrounded Decimals saved into 2-place columns) left
+balances, transactions and fee ledgers rounded differently from each other.
+
+Hot paths instead do their arithmetic on plain ints:
+- cents: KES minor units (1 KES = 100 cents)
+- share units: shares in fixed point, SHARE_SCALE units per share (the
+  8 decimal places of Bet.quantity)
+
+and convert exactly at the edges:
+- to_cents / to_share_units: Decimal, str, int or float in, rounded half-up
+  once (a float is read as its shortest repr, so 0.1 is 10 cents, not 9)
+- from_cents / from_share_units: exact Decimals for the model fields
+- cents_to_float / share_units_to_float: the LMSR boundary
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from .utils.price_calculations import PAYOUT_PER_SHARE
+
+CENTS_PER_KES = 100
+SHARE_DECIMALS = 8
+SHARE_SCALE = 10 ** SHARE_DECIMALS
+PAYOUT_CENTS_PER_SHARE = PAYOUT_PER_SHARE * CENTS_PER_KES
+
+_CENT = Decimal('0.01')
+_SHARE_UNIT = Decimal(1).scaleb(-SHARE_DECIMALS)
+
+
+def _to_decimal(value) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _div_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half away from zero (denominator > 0)."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+# ============================================================================
+# MONEY (CENTS)
+# ============================================================================
+
+def to_cents(amount) -> int:
+    """KES amount (Decimal, str, int or float) to integer cents, half-up."""
+    return int((_to_decimal(amount) * CENTS_PER_KES).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Integer cents to an exact 2-place KES Decimal."""
+    return (Decimal(cents) / CENTS_PER_KES).quantize(_CENT)
+
+
+def cents_to_float(cents: int) -> float:
+    return cents / CENTS_PER_KES
+
+
+def percent_of(cents: int, percent) -> int:
+    """`percent`% of an amount in cents (e.g. a 0.5% fee), half-up."""
+    return int((Decimal(cents) * _to_decimal(percent) / 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def split_cents(total: int, parts: int) -> list:
+    """
+    Split an amount into `parts` shares that add back up to it exactly.
+
+    The remainder cents go one each to the first shares, so no share differs
+    from another by more than a cent.
+
+    Returns:
+        List of `parts` ints, largest first
+    """
+    base, remainder = divmod(total, parts)
+    return [base + 1 if i < remainder else base for i in range(parts)]
+
+
+# ============================================================================
+# SHARE QUANTITIES (FIXED POINT)
+# ============================================================================
+
+def to_share_units(shares) -> int:
+    """Share quantity (Decimal, str, int or float) to fixed-point units, half-up."""
+    return int((_to_decimal(shares) * SHARE_SCALE).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_share_units(units: int) -> Decimal:
+    """Fixed-point units to an exact Decimal for Bet.quantity."""
+    return (Decimal(units) / SHARE_SCALE).quantize(_SHARE_UNIT)
+
+
+def share_units_to_float(units: int) -> float:
+    """Fixed-point units to the float share count the LMSR takes."""
+    return units / SHARE_SCALE
+
+
+def payout_cents(units: int) -> int:
+    """Settlement payout of a winning position (PAYOUT_PER_SHARE per share), half-up."""
+    return _div_half_up(units * PAYOUT_CENTS_PER_SHARE, SHARE_SCALE)
+
+
+def position_value_cents(units: int, probability: float) -> int:
+    """Mark-to-market value of a position priced at `probability` (0-1), half-up."""
+    value = Decimal(units * PAYOUT_CENTS_PER_SHARE) / SHARE_SCALE * _to_decimal(probability)
+    return int(value.quantize(Decimal('1'), rounding=ROUND_HALF_UP))
@@ -0,0 +1,231 @@
+"""
+Order API Views
+
+Stop-loss/take-profit placement, and cancel and cancel/replace for pending
+limit and trigger orders:
+- POST /api/markets/orders/trigger/ - Place a stop-loss or take-profit
+- POST /api/markets/orders/<order_id>/cancel/ - Cancel one order
+- POST /api/markets/orders/cancel/ - Cancel several orders (or a whole market)
+- POST /api/markets/orders/<order_id>/replace/ - Replace one order
+- POST /api/markets/orders/replace/ - Replace several orders atomically
+"""
+
+import json
+import logging
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import csrf_exempt
+
+from api.validators import ValidationError, validate_bet_outcome
+from .limit_orders import MAX_BULK_ORDERS, cancel_limit_orders, replace_limit_orders
+from .models import Market
+from .triggers import create_trigger_order
+from .views import get_authenticated_user
+
+logger = logging.getLogger(__name__)
+
+
+def _serialize_order(bet) -> dict:
+    return {
+        'id': bet.id,
+        'market_id': bet.market_id,
+        'outcome': bet.outcome,
+        'option_id': bet.option_id,
+        'action': bet.action,
+        'amount': str(bet.amount),
+        'quantity': float(bet.quantity),
+        'order_type': bet.order_type,
+        'limit_price': str(bet.limit_price) if bet.limit_price is not None else None,
+        'trigger_price': str(bet.trigger_price) if bet.trigger_price is not None else None,
+        'order_status': bet.order_status,
+    }
+
+
+def _replace_response(user, replacements: list) -> JsonResponse:
+    try:
+        replaced = replace_limit_orders(user, replacements)
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+
+    return JsonResponse({
+        'replaced': [
+            {'cancelled_order_id': old_id, 'order': _serialize_order(new_order)}
+            for old_id, new_order in replaced
+        ],
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def place_trigger_order(request):
+    """
+    Place a stop-loss or take-profit on an existing position.
+
+    POST /api/markets/orders/trigger/
+    {
+        "market_id": int,
+        "outcome": "Yes" | "No",
+        "order_type": "STOP_LOSS" | "TAKE_PROFIT",
+        "trigger_price": float,  # Outcome price in %
+        "shares": float
+    }
+
+    The order sells `shares` through the LMSR as soon as a trade moves the
+    outcome price to or below (stop-loss) / to or above (take-profit) the
+    trigger price.
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    if not all([data.get('market_id'), data.get('outcome'), data.get('trigger_price'), data.get('shares')]):
+        return JsonResponse({'error': 'Missing order details: market_id, outcome, trigger_price, shares'}, status=400)
+
+    try:
+        market = Market.objects.get(id=data['market_id'])
+    except (Market.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({'error': 'Market not found'}, status=404)
+
+    try:
+        order = create_trigger_order(
+            user,
+            market,
+            validate_bet_outcome(data['outcome']),
+            str(data.get('order_type', '')).upper(),
+            data['trigger_price'],
+            data['shares'],
+        )
+        return JsonResponse({'order': _serialize_order(order)}, status=201)
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+    except Exception as e:
+        logger.error(f"Trigger order error for user {user.id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to place trigger order'}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def cancel_order(request, order_id):
+    """
+    Cancel one pending limit order.
+
+    POST /api/markets/orders/<order_id>/cancel/
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        cancelled = cancel_limit_orders(user, order_ids=[order_id])
+        if not cancelled:
+            return JsonResponse({'error': 'Order is not a pending limit or trigger order'}, status=404)
+        return JsonResponse({'cancelled_order_ids': cancelled})
+    except Exception as e:
+        logger.error(f"Cancel error for order {order_id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to cancel order'}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def cancel_orders(request):
+    """
+    Cancel several pending limit orders with one UPDATE.
+
+    POST /api/markets/orders/cancel/
+    {"order_ids": [1, 2, 3]} or {"market_id": 7} (every pending order on it)
+
+    Orders that are not pending (or not the caller's) are skipped; the
+    response lists the ids that were actually cancelled.
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        order_ids = data.get('order_ids')
+        market_id = data.get('market_id')
+        if order_ids is not None:
+            order_ids = [int(order_id) for order_id in order_ids]
+        if market_id is not None:
+            market_id = int(market_id)
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return JsonResponse({'error': 'order_ids must be a list of ids and market_id an id'}, status=400)
+
+    if order_ids is None and market_id is None:
+        return JsonResponse({'error': 'order_ids or market_id is required'}, status=400)
+    if order_ids is not None and not 0 < len(order_ids) <= MAX_BULK_ORDERS:
+        return JsonResponse({'error': f'order_ids must list 1 to {MAX_BULK_ORDERS} orders'}, status=400)
+
+    try:
+        return JsonResponse({'cancelled_order_ids': cancel_limit_orders(user, order_ids, market_id)})
+    except Exception as e:
+        logger.error(f"Bulk cancel error for user {user.id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to cancel orders'}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def replace_order(request, order_id):
+    """
+    Cancel/replace one pending limit order.
+
+    POST /api/markets/orders/<order_id>/replace/
+    {"limit_price": 42, "amount": 500, "quantity": 10} (any subset; trigger
+    orders take "trigger_price" and "amount" in shares)
+
+    The old order is cancelled and a new pending order with the updated
+    fields is returned in its place.
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    try:
+        return _replace_response(user, [{**data, 'order_id': order_id}])
+    except Exception as e:
+        logger.error(f"Replace error for order {order_id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to replace order'}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def replace_orders(request):
+    """
+    Cancel/replace several pending limit orders atomically.
+
+    POST /api/markets/orders/replace/
+    {"orders": [{"order_id": 1, "limit_price": 42}, {"order_id": 2, "amount": 300}]}
+
+    Either every replacement applies or none does.
+    """
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    try:
+        replacements = json.loads(request.body).get('orders')
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    if not isinstance(replacements, list) or not 0 < len(replacements) <= MAX_BULK_ORDERS:
+        return JsonResponse({'error': f'orders must list 1 to {MAX_BULK_ORDERS} replacements'}, status=400)
+    if not all(isinstance(replacement, dict) for replacement in replacements):
+        return JsonResponse({'error': 'Each replacement must be an object'}, status=400)
+
+    try:
+        return _replace_response(user, replacements)
+    except Exception as e:
+        logger.error(f"Bulk replace error for user {user.id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to replace orders'}, status=500)
@@ -0,0 +1,464 @@
+"""
+Single-Writer Trade Sequencer
+
+Optional execution mode (settings.MARKET_EXECUTION_MODE = 'SEQUENCER') for
+binary market orders. Instead of every request locking and rewriting the
+Market row, each market belongs to exactly one sequencer shard
+(market_id % TRADE_SEQUENCER_SHARDS). The shard's worker:
+
+1. keeps an in-memory copy of the market's LMSR state (q_yes, q_no, b),
+2. applies queued trades one at a time and gives each a monotonic per-market
+   trade sequence number (Market.trade_seq / Bet.trade_seq),
+3. persists the fills of a whole batch in one group commit - one Market
+   UPDATE and one PriceHistory row per market, one bulk update of the bets.
+
+Markets with clearing_mode = BATCH_AUCTION always go through the sequencer,
+whatever the execution mode: their orders are parked for
+BATCH_AUCTION_INTERVAL_MS, netted YES vs NO and cleared together at one
+uniform price (services.clear_binary_auction), so a whole burst costs one
+market write, one price point and one trade sequence number.
+
+Callers only get their fill after the group commit succeeds. The commit is
+guarded by the trade_seq the book was loaded at; any other writer (limit order
+matching, admin edits, LP rescaling) bumps trade_seq, in which case the book is
+reloaded and the batch re-applied, so mixing writers never loses a trade.
+
+Callers wait on a Future carried by the command, so sequencers are
+in-process: every web process runs its own sequencer per shard, and
+settings.TRADE_SEQUENCER_QUEUE may only swap in another in-process queue with
+the same put/get interface (LocalQueue is the default). With several
+processes each market has one writer per process rather than one overall;
+the trade_seq guard above keeps their commits correct, at the cost of
+reloads when they interleave.
+
+A command the caller stopped waiting for (TRADE_SEQUENCER_TIMEOUT_SECONDS) is
+cancelled if the sequencer has not taken it yet, so it never executes;
+once taken, the caller waits for its commit instead.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .models import Market, Bet, PriceHistory
+from .services import apply_binary_trade, clear_binary_auction
+from .state_cache import advance_market_state
+from .triggers import on_price_change
+from .money import to_cents
+from .volume import add_bucket_volume_cents
+
+logger = logging.getLogger(__name__)
+
+MODE_DIRECT = 'DIRECT'
+MODE_SEQUENCER = 'SEQUENCER'
+
+MAX_COMMIT_ATTEMPTS = 3
+
+
+class StaleBookError(Exception):
+    """The Market row was written by someone else since the book was loaded."""
+
+    def __init__(self, market_id: int):
+        super().__init__(f"Market {market_id} changed outside the sequencer")
+        self.market_id = market_id
+
+
+class TradeCommand:
+    """One market order waiting to be sequenced."""
+
+    __slots__ = ('market_id', 'bet_id', 'outcome', 'action', 'shares', 'amount', 'reply')
+
+    def __init__(self, market_id: int, bet_id: int, outcome: str, action: str, shares: float, amount: float):
+        self.market_id = market_id
+        self.bet_id = bet_id
+        self.outcome = outcome.upper()
+        self.action = action.upper()
+        self.shares = float(shares)
+        self.amount = float(amount)
+        self.reply = Future()
+
+
+class MarketBook:
+    """In-memory LMSR state of one market, owned by a single sequencer."""
+
+    __slots__ = (
+        'market_id', 'q_yes', 'q_no', 'b', 'alpha', 'volume_cents', 'pending_volume_cents',
+        'trade_seq', 'persisted_seq', 'batch_auction',
+    )
+
+    def __init__(self, market_id, q_yes, q_no, b, alpha, volume_cents, trade_seq, batch_auction=False):
+        self.market_id = market_id
+        self.q_yes = q_yes
+        self.q_no = q_no
+        self.b = b
+        self.alpha = alpha
+        self.volume_cents = volume_cents
+        self.pending_volume_cents = 0  # Traded since the last commit
+        self.trade_seq = trade_seq
+        self.persisted_seq = trade_seq
+        self.batch_auction = batch_auction
+
+    @classmethod
+    def load(cls, market_id: int) -> 'MarketBook':
+        market = Market.objects.get(id=market_id)
+        alpha = float(market.liquidity_alpha) if market.liquidity_mode == 'LS_LMSR' else 0.0
+        return cls(
+            market_id=market.id,
+            q_yes=float(market.q_yes),
+            q_no=float(market.q_no),
+            b=float(market.b),
+            alpha=alpha,
+            volume_cents=market.volume_cents,
+            trade_seq=market.trade_seq,
+            batch_auction=market.clearing_mode == 'BATCH_AUCTION',
+        )
+
+    def add_volume(self, amount) -> None:
+        cents = to_cents(amount)
+        self.volume_cents += cents
+        self.pending_volume_cents += cents
+
+
+class LocalQueue:
+    """In-process stand-in for a broker queue (one per shard)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._queue = queue.Queue()
+
+    def put(self, command: TradeCommand) -> None:
+        self._queue.put(command)
+
+    def get(self, timeout: float = None):
+        """Next command, or None if nothing arrives within `timeout` seconds."""
+        try:
+            if timeout == 0:
+                return self._queue.get_nowait()
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class TradeSequencer:
+    """Single writer for all markets in one shard."""
+
+    def __init__(self, shard: int, command_queue, batch_size: int = 100, batch_wait: float = 0.005,
+                 auction_interval: float = 0.5):
+        self.shard = shard
+        self.queue = command_queue
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.auction_interval = auction_interval
+        self.books = {}
+        self.auctions = {}  # market_id -> (clears_at, [commands])
+        self._thread = None
+        self._stopping = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Worker loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"trade-sequencer-{self.shard}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.run_once(timeout=1.0)
+            except Exception as e:
+                logger.error(f"Trade sequencer {self.shard} error: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def run_once(self, timeout: float = 1.0) -> int:
+        """
+        Collect one batch, apply it and group-commit it together with any
+        batch auctions that are due.
+
+        Returns:
+            Number of commands received
+        """
+        if self.auctions:
+            next_clear = min(clears_at for clears_at, _ in self.auctions.values())
+            timeout = min(timeout, max(0.0, next_clear - time.monotonic()))
+
+        batch = []
+        first = self.queue.get(timeout)
+        if first is not None:
+            batch.append(first)
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                command = self.queue.get(max(0.0, deadline - time.monotonic()) or 0)
+                if command is None:
+                    break
+                batch.append(command)
+
+        received = len(batch)
+        # Taking a command makes it uncancellable; ones whose caller already
+        # gave up are dropped unexecuted
+        batch = [command for command in batch if command.reply.set_running_or_notify_cancel()]
+        continuous = [command for command in batch if not self._park(command)]
+        due = self._due_auctions()
+        if continuous or due:
+            self.process_batch(continuous, due)
+        return received
+
+    def _park(self, command: TradeCommand) -> bool:
+        """Hold a batch-auction market's order until its auction clears."""
+        try:
+            book = self._book(command.market_id)
+        except Exception:
+            return False  # Reported by _apply
+        if not book.batch_auction:
+            return False
+
+        auction = self.auctions.get(command.market_id)
+        if auction is None:
+            auction = (time.monotonic() + self.auction_interval, [])
+            self.auctions[command.market_id] = auction
+        auction[1].append(command)
+        return True
+
+    def _due_auctions(self) -> list:
+        now = time.monotonic()
+        due = [market_id for market_id, (clears_at, _) in self.auctions.items() if clears_at <= now]
+        return [(market_id, self.auctions.pop(market_id)[1]) for market_id in due]
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _book(self, market_id: int) -> MarketBook:
+        book = self.books.get(market_id)
+        if book is None:
+            book = MarketBook.load(market_id)
+            self.books[market_id] = book
+        return book
+
+    def _apply(self, batch: list, auctions: list = ()) -> tuple:
+        """Apply a batch to the in-memory books; nothing is written yet."""
+        fills = []
+        errors = []
+        touched = {}
+
+        for market_id, commands in auctions:
+            try:
+                book = self._book(market_id)
+                cleared = clear_binary_auction(
+                    book.q_yes, book.q_no, book.b, book.alpha,
+                    [(command.outcome, command.action, command.shares) for command in commands],
+                )
+            except Exception as e:
+                errors.extend((command, e) for command in commands)
+                continue
+
+            book.q_yes = cleared['q_yes']
+            book.q_no = cleared['q_no']
+            book.trade_seq += 1  # One state transition for the whole auction
+            for command, result in zip(commands, cleared['fills']):
+                if result is None:
+                    errors.append((command, ValueError(
+                        f"Cannot sell {command.shares} {command.outcome} shares: "
+                        f"not enough {command.outcome} shares issued"
+                    )))
+                    continue
+                book.add_volume(command.amount)
+                result['trade_seq'] = book.trade_seq
+                fills.append((command, result))
+            touched[book.market_id] = book
+
+        for command in batch:
+            try:
+                book = self._book(command.market_id)
+                result, book.q_yes, book.q_no = apply_binary_trade(
+                    book.q_yes, book.q_no, book.b, book.alpha,
+                    command.outcome, command.action, command.shares,
+                )
+            except Exception as e:
+                errors.append((command, e))
+                continue
+
+            book.trade_seq += 1
+            book.add_volume(command.amount)
+            result['trade_seq'] = book.trade_seq
+            touched[book.market_id] = book
+            fills.append((command, result))
+
+        return fills, errors, touched
+
+    def _commit(self, fills: list, touched: dict) -> None:
+        """Persist one batch: one UPDATE and one price point per market."""
+        with transaction.atomic():
+            history = []
+            for book in touched.values():
+                yes_probability = int(fills_last_price(fills, book.market_id))
+                updated = Market.objects.filter(
+                    id=book.market_id, trade_seq=book.persisted_seq
+                ).update(
+                    q_yes=book.q_yes,
+                    q_no=book.q_no,
+                    yes_probability=yes_probability,
+                    volume_cents=F('volume_cents') + book.pending_volume_cents,
+                    trade_seq=book.trade_seq,
+                )
+                if not updated:
+                    raise StaleBookError(book.market_id)
+                add_bucket_volume_cents(book.market_id, book.pending_volume_cents)
+                history.append(PriceHistory(
+                    market_id=book.market_id,
+                    yes_probability=yes_probability,
+                    no_probability=100 - yes_probability,
+                ))
+
+            Bet.objects.bulk_update(
+                [Bet(id=command.bet_id, trade_seq=result['trade_seq']) for command, result in fills if command.bet_id],
+                ['trade_seq'],
+            )
+            PriceHistory.objects.bulk_create(history)
+
+        for book in touched.values():
+            book.persisted_seq = book.trade_seq
+            book.pending_volume_cents = 0
+            advance_market_state(
+                book.market_id, book.trade_seq, book.q_yes, book.q_no,
+                int(fills_last_price(fills, book.market_id)),
+            )
+            on_price_change(book.market_id, fills_last_price(fills, book.market_id))
+
+    def process_batch(self, batch: list, auctions: list = ()) -> None:
+        """Apply and commit a batch, reloading stale books and retrying."""
+        commands = list(batch) + [command for _, parked in auctions for command in parked]
+        for attempt in range(1, MAX_COMMIT_ATTEMPTS + 1):
+            fills, errors, touched = self._apply(batch, auctions)
+            try:
+                if fills:
+                    self._commit(fills, touched)
+                break
+            except StaleBookError as e:
+                logger.info(f"Sequencer {self.shard}: {str(e)}, reloading (attempt {attempt})")
+                for market_id in touched:
+                    self.books.pop(market_id, None)
+                if attempt == MAX_COMMIT_ATTEMPTS:
+                    self._fail(commands, e)
+                    return
+            except Exception as e:
+                logger.error(f"Sequencer {self.shard} group commit failed: {str(e)}")
+                for market_id in touched:
+                    self.books.pop(market_id, None)
+                self._fail(commands, e)
+                return
+
+        for command, result in fills:
+            book = self.books[command.market_id]
+            result.update({
+                'q_yes': book.q_yes,
+                'q_no': book.q_no,
+                'yes_probability': int(fills_last_price(fills, command.market_id)),
+                'volume_cents': book.volume_cents,
+            })
+            command.reply.set_result(result)
+        for command, error in errors:
+            command.reply.set_exception(error)
+
+    def _fail(self, batch: list, error: Exception) -> None:
+        for command in batch:
+            if not command.reply.done():
+                command.reply.set_exception(error)
+
+
+def fills_last_price(fills: list, market_id: int) -> float:
+    """YES price (%) after the last fill of `market_id` in a batch."""
+    for command, result in reversed(fills):
+        if command.market_id == market_id:
+            return result['new_yes_price']
+    raise KeyError(market_id)
+
+
+# ============================================================================
+# SHARD REGISTRY
+# ============================================================================
+
+_sequencers = {}
+_sequencers_lock = threading.Lock()
+
+
+def execution_mode() -> str:
+    return getattr(settings, 'MARKET_EXECUTION_MODE', MODE_DIRECT)
+
+
+def shard_for_market(market_id: int) -> int:
+    return market_id % max(1, getattr(settings, 'TRADE_SEQUENCER_SHARDS', 4))
+
+
+def get_sequencer(market_id: int, start: bool = True) -> TradeSequencer:
+    """Return (and lazily start) the sequencer that owns `market_id`."""
+    shard = shard_for_market(market_id)
+    sequencer = _sequencers.get(shard)
+    if sequencer is None:
+        with _sequencers_lock:
+            sequencer = _sequencers.get(shard)
+            if sequencer is None:
+                queue_class = import_string(
+                    getattr(settings, 'TRADE_SEQUENCER_QUEUE', 'markets.sequencer.LocalQueue')
+                )
+                sequencer = TradeSequencer(
+                    shard,
+                    queue_class(f"trade-sequencer-{shard}"),
+                    batch_size=getattr(settings, 'TRADE_SEQUENCER_BATCH_SIZE', 100),
+                    batch_wait=getattr(settings, 'TRADE_SEQUENCER_BATCH_WAIT_MS', 5) / 1000,
+                    auction_interval=getattr(settings, 'BATCH_AUCTION_INTERVAL_MS', 500) / 1000,
+                )
+                _sequencers[shard] = sequencer
+    if start:
+        sequencer.start()
+    return sequencer
+
+
+def submit_trade(market_id: int, bet_id: int, outcome: str, action: str, shares: float, amount: float) -> dict:
+    """
+    Route a binary market order through its shard's sequencer and wait for the fill.
+
+    Returns:
+        The buy_*/sell_* result dict plus trade_seq and the market state after
+        the fill (q_yes, q_no, yes_probability, volume_cents)
+
+    Raises:
+        ValueError: If the trade is invalid (e.g. selling more than issued)
+        TimeoutError: If the sequencer did not take the trade in time; it was
+            cancelled and will not execute
+    """
+    command = TradeCommand(market_id, bet_id, outcome, action, shares, amount)
+    get_sequencer(market_id).queue.put(command)
+    return await_fill(command, getattr(settings, 'TRADE_SEQUENCER_TIMEOUT_SECONDS', 10))
+
+
+def await_fill(command: TradeCommand, timeout: float) -> dict:
+    """
+    Wait for a queued command's fill.
+
+    Raises:
+        TimeoutError: Still queued after `timeout` seconds (it is cancelled)
+    """
+    try:
+        return command.reply.result(timeout=timeout)
+    except FutureTimeoutError:
+        if command.reply.cancel():
+            raise TimeoutError(f"Trade sequencer timed out for market {command.market_id}")
+    # Already taken by the sequencer: its group commit decides the outcome
+    logger.warning(f"Trade on market {command.market_id} still committing after {timeout}s, waiting")
+    return command.reply.result()
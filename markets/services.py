@@ -9,16 +9,26 @@ After trades execute, fees are automatically distributed to liquidity providers.
 """
 
 from decimal import Decimal
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from .models import Market, Bet
+from .models import Market, MarketOption, Bet
+from .money import cents_to_float, from_cents, percent_of, to_cents
 from .lmsr import (
     cost,
     price_yes,
     price_no,
     calculate_cost_to_buy_shares,
     calculate_payout_from_selling,
+    prices_multi,
+    calculate_cost_to_buy_option_shares,
+    calculate_payout_from_selling_option_shares,
+    calculate_q_for_probabilities,
     PAYOUT_PER_SHARE,
+    calculate_slippage_curve,
+    DEFAULT_QUOTE_SIZES_KES,
 )
 
 # Import LP configuration and service
@@ -31,6 +41,28 @@ except ImportError:
     TRADING_FEE_PERCENT = 0.5
     APPLY_TRADING_FEES = False
 
+# Quote curves are cached per market state version (trade_seq), so they never
+# need invalidating - a trade simply moves readers on to a new key
+QUOTE_CACHE_TTL = 300  # 5 minutes
+
+# Top holders are cached per market and dropped whenever a trade fills
+TOP_HOLDERS_LIMIT = 20
+TOP_HOLDERS_CACHE_TTL = 300  # 5 minutes
+
+
+def lmsr_params(market: Market) -> tuple:
+    """
+    LMSR pricing parameters for a binary market.
+    
+    Only LS_LMSR markets price with a volume-sensitive b(q); POOL markets
+    store their capital-derived b directly on `market.b`.
+    
+    Returns:
+        (b: float, alpha: float)
+    """
+    alpha = float(market.liquidity_alpha) if market.liquidity_mode == 'LS_LMSR' else 0.0
+    return float(market.b), alpha
+
 
 @transaction.atomic
 def buy_yes_shares(market: Market, shares: float) -> dict:
@@ -53,20 +85,21 @@ def buy_yes_shares(market: Market, shares: float) -> dict:
     """
     q_yes_before = float(market.q_yes)
     q_no_before = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
     # Calculate cost
-    cost_kes = calculate_cost_to_buy_shares(q_yes_before, q_no_before, shares, "YES", b)
+    cost_kes = calculate_cost_to_buy_shares(q_yes_before, q_no_before, shares, "YES", b, alpha)
     
     # Get prices before and after
-    price_before = price_yes(q_yes_before, q_no_before, b)
+    price_before = price_yes(q_yes_before, q_no_before, b, alpha)
     
     # Update market quantities
     market.q_yes = q_yes_before + shares
+    market.trade_seq += 1
     market.save()
     
     # Get new price
-    price_after = price_yes(float(market.q_yes), q_no_before, b)
+    price_after = price_yes(float(market.q_yes), q_no_before, b, alpha)
     execution_price = (price_before + price_after) / 2
     
     return {
@@ -98,20 +131,21 @@ def buy_no_shares(market: Market, shares: float) -> dict:
     """
     q_yes_before = float(market.q_yes)
     q_no_before = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
     # Calculate cost
-    cost_kes = calculate_cost_to_buy_shares(q_yes_before, q_no_before, shares, "NO", b)
+    cost_kes = calculate_cost_to_buy_shares(q_yes_before, q_no_before, shares, "NO", b, alpha)
     
     # Get prices
-    price_yes_before = price_yes(q_yes_before, q_no_before, b)
+    price_yes_before = price_yes(q_yes_before, q_no_before, b, alpha)
     
     # Update market quantities
     market.q_no = q_no_before + shares
+    market.trade_seq += 1
     market.save()
     
     # Get new price
-    price_yes_after = price_yes(q_yes_before, float(market.q_no), b)
+    price_yes_after = price_yes(q_yes_before, float(market.q_no), b, alpha)
     execution_price = (price_yes_before + price_yes_after) / 2
     
     return {
@@ -143,7 +177,7 @@ def sell_yes_shares(market: Market, shares: float) -> dict:
     """
     q_yes_before = float(market.q_yes)
     q_no_before = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
     if q_yes_before < shares:
         raise ValueError(
@@ -151,17 +185,18 @@ def sell_yes_shares(market: Market, shares: float) -> dict:
         )
     
     # Calculate payout
-    payout_kes = calculate_payout_from_selling(q_yes_before, q_no_before, shares, "YES", b)
+    payout_kes = calculate_payout_from_selling(q_yes_before, q_no_before, shares, "YES", b, alpha)
     
     # Get prices
-    price_yes_before = price_yes(q_yes_before, q_no_before, b)
+    price_yes_before = price_yes(q_yes_before, q_no_before, b, alpha)
     
     # Update market quantities
     market.q_yes = q_yes_before - shares
+    market.trade_seq += 1
     market.save()
     
     # Get new price
-    price_yes_after = price_yes(float(market.q_yes), q_no_before, b)
+    price_yes_after = price_yes(float(market.q_yes), q_no_before, b, alpha)
     execution_price = (price_yes_before + price_yes_after) / 2
     
     return {
@@ -193,7 +228,7 @@ def sell_no_shares(market: Market, shares: float) -> dict:
     """
     q_yes_before = float(market.q_yes)
     q_no_before = float(market.q_no)
-    b = float(market.b)
+    b, alpha = lmsr_params(market)
     
     if q_no_before < shares:
         raise ValueError(
@@ -201,17 +236,18 @@ def sell_no_shares(market: Market, shares: float) -> dict:
         )
     
     # Calculate payout
-    payout_kes = calculate_payout_from_selling(q_yes_before, q_no_before, shares, "NO", b)
+    payout_kes = calculate_payout_from_selling(q_yes_before, q_no_before, shares, "NO", b, alpha)
     
     # Get prices
-    price_yes_before = price_yes(q_yes_before, q_no_before, b)
+    price_yes_before = price_yes(q_yes_before, q_no_before, b, alpha)
     
     # Update market quantities
     market.q_no = q_no_before - shares
+    market.trade_seq += 1
     market.save()
     
     # Get new price
-    price_yes_after = price_yes(q_yes_before, float(market.q_no), b)
+    price_yes_after = price_yes(q_yes_before, float(market.q_no), b, alpha)
     execution_price = (price_yes_before + price_yes_after) / 2
     
     return {
@@ -222,6 +258,156 @@ def sell_no_shares(market: Market, shares: float) -> dict:
     }
 
 
+def apply_binary_trade(
+    q_yes: float,
+    q_no: float,
+    b: float,
+    alpha: float,
+    outcome: str,
+    action: str,
+    shares: float,
+) -> tuple:
+    """
+    Execute a binary trade against in-memory LMSR state (no DB access).
+    
+    Same pricing as buy_yes_shares/buy_no_shares/sell_yes_shares/sell_no_shares,
+    for callers that own the market state themselves (the trade sequencer).
+    
+    Args:
+        q_yes, q_no, b, alpha: LMSR state before the trade
+        outcome: "YES" or "NO"
+        action: "BUY" or "SELL"
+        shares: Number of shares
+    
+    Returns:
+        (result: dict, q_yes_after: float, q_no_after: float) - result has the
+        same keys as the buy_*/sell_* functions
+    
+    Raises:
+        ValueError: If selling more shares than the market has issued
+    """
+    outcome = outcome.upper()
+    action = action.upper()
+    delta = shares if action == 'BUY' else -shares
+    
+    if action == 'SELL':
+        issued = q_yes if outcome == 'YES' else q_no
+        if issued < shares:
+            raise ValueError(f"Cannot sell {shares} {outcome} shares when only {issued} exist")
+        amount_key = 'payout_kes'
+        amount_kes = calculate_payout_from_selling(q_yes, q_no, shares, outcome, b, alpha)
+    else:
+        amount_key = 'cost_kes'
+        amount_kes = calculate_cost_to_buy_shares(q_yes, q_no, shares, outcome, b, alpha)
+    
+    q_yes_after = q_yes + delta if outcome == 'YES' else q_yes
+    q_no_after = q_no + delta if outcome == 'NO' else q_no
+    
+    price_yes_before = price_yes(q_yes, q_no, b, alpha)
+    price_yes_after = price_yes(q_yes_after, q_no_after, b, alpha)
+    
+    return {
+        amount_key: amount_kes,
+        "shares": float(shares),
+        "execution_price": round((price_yes_before + price_yes_after) / 2 * 100, 2),
+        "new_yes_price": round(price_yes_after * 100, 2),
+    }, q_yes_after, q_no_after
+
+
+def clear_binary_auction(
+    q_yes: float,
+    q_no: float,
+    b: float,
+    alpha: float,
+    orders: list,
+) -> dict:
+    """
+    Clear a batch of binary orders at one uniform price (frequent batch auction).
+    
+    Orders are netted per outcome and only the residual is executed against
+    the LMSR. YES and NO clearing prices are chosen so the batch as a whole
+    pays exactly the LMSR cost of the net trade:
+    
+        net_yes * p_yes + net_no * p_no = C(q + net) - C(q),  p_no = 1 - p_yes
+    
+    which, for a residual in one outcome, is that residual's average price.
+    Offsetting orders cross at the current price.
+    
+    Args:
+        q_yes, q_no, b, alpha: LMSR state before the batch
+        orders: [(outcome "YES"/"NO", action "BUY"/"SELL", shares), ...]
+    
+    Returns:
+        {
+            'fills': [dict or None, ...],  # Per order, None if rejected
+            'yes_clearing_price': float,   # Probability (0-1)
+            'no_clearing_price': float,
+            'q_yes': float,                # State after the batch
+            'q_no': float,
+            'new_yes_price': float,        # YES price (%) after the batch
+        }
+    """
+    accepted = [True] * len(orders)
+    issued = {'YES': max(q_yes, 0.0), 'NO': max(q_no, 0.0)}
+    
+    while True:
+        net = {'YES': 0.0, 'NO': 0.0}
+        for i, (outcome, action, shares) in enumerate(orders):
+            if accepted[i]:
+                net[outcome] += shares if action == 'BUY' else -shares
+        
+        # Net sells can only be absorbed by shares the market has issued
+        # (bootstrapped markets can start with a negative q, so this is the
+        # change in shares outstanding, not the sign of q); an oversold
+        # side has its sells rejected
+        rejected = False
+        for i, (outcome, action, shares) in enumerate(orders):
+            if accepted[i] and action == 'SELL' and -net[outcome] > issued[outcome] + 1e-12:
+                accepted[i] = False
+                rejected = True
+        if not rejected:
+            break
+    
+    q_yes_after = q_yes + net['YES']
+    q_no_after = q_no + net['NO']
+    
+    price_before = price_yes(q_yes, q_no, b, alpha)
+    delta_cost = cost(q_yes_after, q_no_after, b, alpha) - cost(q_yes, q_no, b, alpha)
+    
+    if abs(net['YES'] - net['NO']) > 1e-12:
+        p_yes = (delta_cost - net['NO']) / (net['YES'] - net['NO'])
+    else:
+        p_yes = price_before
+    p_yes = min(1.0, max(0.0, p_yes))
+    p_no = 1.0 - p_yes
+    
+    new_yes_price = round(price_yes(q_yes_after, q_no_after, b, alpha) * 100, 2)
+    
+    fills = []
+    for i, (outcome, action, shares) in enumerate(orders):
+        if not accepted[i]:
+            fills.append(None)
+            continue
+        clearing = p_yes if outcome == 'YES' else p_no
+        amount_kes = round(shares * clearing * PAYOUT_PER_SHARE, 2)
+        fills.append({
+            ('cost_kes' if action == 'BUY' else 'payout_kes'): amount_kes,
+            'shares': float(shares),
+            'execution_price': round(p_yes * 100, 2),
+            'clearing_price': round(clearing * 100, 2),
+            'new_yes_price': new_yes_price,
+        })
+    
+    return {
+        'fills': fills,
+        'yes_clearing_price': p_yes,
+        'no_clearing_price': p_no,
+        'q_yes': q_yes_after,
+        'q_no': q_no_after,
+        'new_yes_price': new_yes_price,
+    }
+
+
 def get_market_prices(market: Market) -> dict:
     """
     Get current market prices without executing any trade.
@@ -239,8 +425,9 @@ def get_market_prices(market: Market) -> dict:
             'no_price_kes': float,   # NO price in KES
         }
     """
-    yes_prob = price_yes(float(market.q_yes), float(market.q_no), float(market.b))
-    no_prob = price_no(float(market.q_yes), float(market.q_no), float(market.b))
+    b, alpha = lmsr_params(market)
+    yes_prob = price_yes(float(market.q_yes), float(market.q_no), b, alpha)
+    no_prob = price_no(float(market.q_yes), float(market.q_no), b, alpha)
     
     return {
         "yes_price": round(yes_prob, 4),
@@ -252,6 +439,147 @@ def get_market_prices(market: Market) -> dict:
     }
 
 
+def get_market_quote(market, sizes_kes: list = None) -> dict:
+    """
+    Slippage curve / depth chart for a binary market.
+    
+    Args:
+        market: Market or MarketState (state cache entry)
+        sizes_kes: Trade sizes in KES (default DEFAULT_QUOTE_SIZES_KES)
+    
+    Returns:
+        calculate_slippage_curve() output plus market_id and trade_seq
+    """
+    sizes_kes = list(sizes_kes or DEFAULT_QUOTE_SIZES_KES)
+    cache_key = f"market_quote_{market.id}_{market.trade_seq}_{','.join(str(size) for size in sizes_kes)}"
+    
+    quote = cache.get(cache_key)
+    if quote is None:
+        b, alpha = lmsr_params(market)
+        quote = calculate_slippage_curve(float(market.q_yes), float(market.q_no), b, alpha, sizes_kes)
+        quote['market_id'] = market.id
+        quote['trade_seq'] = market.trade_seq
+        cache.set(cache_key, quote, QUOTE_CACHE_TTL)
+    return quote
+
+
+# ============================================================================
+# OPTION_LIST MARKETS (multi-outcome LMSR)
+# ============================================================================
+
+
+def create_market_options(market: Market, options: list) -> list:
+    """
+    Create MarketOption rows for a new OPTION_LIST market.
+
+    Args:
+        market: Market instance
+        options: [{'id': 1, 'label': '...', 'yes_probability': 50}, ...];
+                 probabilities are treated as relative weights
+
+    Returns:
+        List of created MarketOption instances
+    """
+    weights = [max(1, min(99, int(opt.get('yes_probability', 50)))) for opt in options]
+    q_values = calculate_q_for_probabilities(weights, float(market.b))
+    return MarketOption.objects.bulk_create([
+        MarketOption(market=market, option_id=opt['id'], label=opt['label'], q=q)
+        for opt, q in zip(options, q_values)
+    ])
+
+
+def get_option_prices(market: Market, option_rows: list = None) -> list:
+    """
+    Current price of every option in an OPTION_LIST market.
+
+    Args:
+        market: Market instance
+        option_rows: Pre-fetched MarketOption rows (avoids a query when
+                     the caller used prefetch_related('market_options'))
+
+    Returns:
+        [{'id', 'label', 'yes_probability', 'no_probability', 'price'}, ...]
+        with probabilities as whole percentages and price as 0-1
+    """
+    if option_rows is None:
+        option_rows = list(market.market_options.all())
+    if not option_rows:
+        return market.options or []
+
+    prices = prices_multi([row.q for row in option_rows], float(market.b))
+    return [
+        {
+            'id': row.option_id,
+            'label': row.label,
+            'yes_probability': int(round(price * 100)),
+            'no_probability': 100 - int(round(price * 100)),
+            'price': round(price, 4),
+        }
+        for row, price in zip(option_rows, prices)
+    ]
+
+
+@transaction.atomic
+def trade_option_shares(market: Market, option_id: int, shares: float, outcome: str, action: str) -> dict:
+    """
+    Buy or sell YES/NO shares on one option of an OPTION_LIST market.
+
+    All of the market's option rows are locked (in id order, so concurrent
+    trades on different options queue instead of deadlocking) because every
+    option's quantity prices the trade; only the traded option's row is written.
+
+    Args:
+        market: Market instance
+        option_id: Option being traded
+        shares: Number of shares
+        outcome: "YES" or "NO"
+        action: "buy" or "sell"
+
+    Returns:
+        {
+            'cost_kes' or 'payout_kes': float,
+            'shares': float,
+            'execution_price': float,  # Average of option price before/after (%)
+            'new_yes_price': float,    # Option's YES price after trade (%)
+            'option_id': int,
+        }
+    """
+    rows = list(MarketOption.objects.select_for_update().filter(market=market).order_by('id'))
+    option_ids = [row.option_id for row in rows]
+    if option_id not in option_ids:
+        raise ValueError(f"Option {option_id} is not tradable on market {market.id}")
+    index = option_ids.index(option_id)
+    option = rows[index]
+    q = [row.q for row in rows]
+    b = float(market.b)
+
+    price_before = prices_multi(q, b)[index]
+    delta = shares if outcome.upper() == "YES" else -shares
+
+    if action == 'buy':
+        amount_key = 'cost_kes'
+        amount_kes = calculate_cost_to_buy_option_shares(q, index, shares, outcome, b)
+        option.q = q[index] + delta
+    else:
+        amount_key = 'payout_kes'
+        amount_kes = calculate_payout_from_selling_option_shares(q, index, shares, outcome, b)
+        option.q = q[index] - delta
+
+    option.save(update_fields=['q'])
+
+    q[index] = option.q
+    price_after = prices_multi(q, b)[index]
+    execution_price = (price_before + price_after) / 2
+
+    return {
+        amount_key: amount_kes,
+        "shares": float(shares),
+        "execution_price": round(execution_price * 100, 2),
+        "new_yes_price": round(price_after * 100, 2),
+        "option_id": option_id,
+    }
+
+
 def is_market_open(market: Market) -> tuple:
     """
     Check if a market is currently open for trading.
@@ -265,6 +593,8 @@ def is_market_open(market: Market) -> tuple:
     if market.status != "OPEN":
         return False, f"Market is {market.status}"
     
+    # Guard for the gap between a deadline and the lifecycle scheduler's tick;
+    # markets.lifecycle moves the status itself
     if market.trading_end_time and timezone.now() >= market.trading_end_time:
         return False, "Trading has ended"
     
@@ -314,17 +644,117 @@ def process_trading_fee(market: Market, amount_kes: float, bet: Bet = None) -> d
             'message': 'Market has no liquidity pool',
         }
     
-    # Calculate fee
-    fee_charged = (amount_kes * TRADING_FEE_PERCENT) / 100
-    net_amount = amount_kes - fee_charged
+    # Calculate fee (in cents, so the LP ledgers add up to what is charged)
+    amount_cents = to_cents(amount_kes)
+    fee_cents = percent_of(amount_cents, TRADING_FEE_PERCENT)
     
     # Distribute fee to LPs
-    distribution_result = distribute_trading_fee(pool, fee_charged, bet)
+    distribution_result = distribute_trading_fee(pool, from_cents(fee_cents), bet)
     
     return {
         'success': distribution_result.get('success', False),
-        'fee_charged_kes': fee_charged,
-        'net_amount': net_amount,
+        'fee_charged_kes': cents_to_float(fee_cents),
+        'net_amount': cents_to_float(amount_cents - fee_cents),
         'num_providers': distribution_result.get('num_providers', 0),
         'message': distribution_result.get('message', 'Fee processed'),
     }
+
+
+def _top_holders_cache_key(market_id: int) -> str:
+    return f"market_top_holders_{market_id}"
+
+
+def _query_top_holders(market_id: int, outcome: str, limit: int, offset: int = 0) -> list:
+    """Aggregate net filled shares per user for one outcome in a single grouped query."""
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=15, decimal_places=8))
+    rows = (
+        Bet.objects.filter(market_id=market_id, outcome=outcome, order_status='FILLED')
+        .values('user_id', 'user__full_name')
+        .annotate(
+            bought=Coalesce(Sum('quantity', filter=Q(action='BUY')), zero),
+            sold=Coalesce(Sum('quantity', filter=Q(action='SELL')), zero),
+            spent=Coalesce(Sum('amount', filter=Q(action='BUY')), zero),
+        )
+        .annotate(shares=F('bought') - F('sold'))
+        .filter(shares__gt=0)
+        .order_by('-shares', 'user_id')[offset:offset + limit]
+    )
+
+    holders = []
+    for row in rows:
+        bought = row['bought'] or Decimal('1')
+        holders.append({
+            'user_id': row['user_id'],
+            'user_name': row['user__full_name'],
+            'outcome': outcome,
+            'shares': float(row['shares']),
+            'average_price': str((row['spent'] / bought).quantize(Decimal('0.01'))),
+        })
+    return holders
+
+
+def get_top_holders(market_id: int, limit: int = TOP_HOLDERS_LIMIT) -> dict:
+    """
+    Get the largest YES and NO holders for a market.
+
+    Results are computed by a grouped DB query and cached until the next
+    trade on the market (see `invalidate_top_holders`).
+
+    Args:
+        market_id: Market id
+        limit: Max holders per outcome (capped at TOP_HOLDERS_LIMIT)
+
+    Returns:
+        {'yes': [...], 'no': [...]}
+    """
+    holders = _cached_top_holders(market_id)
+    limit = min(limit, TOP_HOLDERS_LIMIT)
+    return {'yes': holders['yes'][:limit], 'no': holders['no'][:limit]}
+
+
+def _cached_top_holders(market_id: int) -> dict:
+    # One row past TOP_HOLDERS_LIMIT is kept so a page ending at the limit
+    # can tell from the cache alone whether another page follows
+    key = _top_holders_cache_key(market_id)
+    holders = cache.get(key)
+    if holders is None:
+        holders = {
+            'yes': _query_top_holders(market_id, 'Yes', TOP_HOLDERS_LIMIT + 1),
+            'no': _query_top_holders(market_id, 'No', TOP_HOLDERS_LIMIT + 1),
+        }
+        cache.set(key, holders, TOP_HOLDERS_CACHE_TTL)
+    return holders
+
+
+def get_holders_page(market_id: int, outcome: str, cursor: int = None, limit: int = TOP_HOLDERS_LIMIT) -> tuple:
+    """
+    One page of a market's holders of an outcome, largest first.
+
+    Holders are ranked by an aggregate, so the cursor is the rank of the last
+    holder on the previous page. The first page comes from the top holders
+    cache.
+
+    Args:
+        market_id: Market id
+        outcome: 'Yes' or 'No'
+        cursor: Rank of the last holder already returned
+        limit: Page size
+
+    Returns:
+        (holders: list, next_cursor: int or None)
+    """
+    offset = cursor or 0
+    if offset + limit <= TOP_HOLDERS_LIMIT:
+        # Fully inside the cached top holders
+        cached = _cached_top_holders(market_id)['yes' if outcome == 'Yes' else 'no']
+        page = cached[offset:offset + limit + 1]
+    else:
+        page = _query_top_holders(market_id, outcome, limit + 1, offset)
+
+    next_cursor = offset + limit if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def invalidate_top_holders(market_id: int) -> None:
+    """Drop cached top holders after a trade changes positions on a market."""
+    cache.delete(_top_holders_cache_key(market_id))
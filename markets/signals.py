@@ -0,0 +1,28 @@
+"""
+Market signal handlers.
+
+Keep the hot market state cache (markets/state_cache.py) in step with every
+saved Market.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Market
+from .state_cache import invalidate_market_state, merge_market_state, store_market_state
+
+
+@receiver(post_save, sender=Market)
+def cache_market_state(sender, instance, update_fields=None, **kwargs):
+    """Write the saved state through to the cache once it is committed."""
+    if update_fields:
+        fields = list(update_fields)
+        transaction.on_commit(lambda: merge_market_state(instance, fields))
+    else:
+        transaction.on_commit(lambda: store_market_state(instance))
+
+
+@receiver(post_delete, sender=Market)
+def drop_market_state(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_market_state(instance.id))
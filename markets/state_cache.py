@@ -0,0 +1,199 @@
+"""
+Hot Market State Cache
+
+Compact copy of every binary market's LMSR state and trading status in the
+shared Django cache (Redis in production), so quotes, previews and portfolio
+valuation can price trades without reading the Market row.
+
+Each entry is versioned by Market.trade_seq. Writers go through
+`store_market_state`/`merge_market_state` (post_save on Market) or
+`advance_market_state` (the trade sequencer, which writes with
+queryset.update()); an entry is only ever replaced by one with the same or a
+newer version. Readers that have seen a newer trade (e.g. from the SSE stream or their own fill) pass it as
+`min_version` and a stale entry is reloaded from the database.
+
+Entries are only correct while every process writes through the same cache,
+so the cache is off (MARKET_STATE_CACHE_SECONDS = 0, the default without
+CACHE_URL) unless a shared cache is configured; reads then go straight to
+the database.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Market
+
+logger = logging.getLogger(__name__)
+
+MARKET_STATE_CACHE_KEY = 'market_state_{market_id}'
+
+
+class MarketState:
+    """
+    LMSR state of one market.
+
+    Has the attributes `get_market_prices`, `lmsr_params` and `is_market_open`
+    read from a Market, so it can be passed to them directly.
+    """
+
+    __slots__ = (
+        'id', 'market_type', 'status', 'trading_end_time', 'q_yes', 'q_no', 'b',
+        'liquidity_mode', 'liquidity_alpha', 'yes_probability', 'trade_seq',
+    )
+
+    def __init__(self, id, market_type, status, trading_end_time, q_yes, q_no, b,
+                 liquidity_mode, liquidity_alpha, yes_probability, trade_seq):
+        self.id = id
+        self.market_type = market_type
+        self.status = status
+        self.trading_end_time = trading_end_time
+        self.q_yes = q_yes
+        self.q_no = q_no
+        self.b = b
+        self.liquidity_mode = liquidity_mode
+        self.liquidity_alpha = liquidity_alpha
+        self.yes_probability = yes_probability
+        self.trade_seq = trade_seq
+
+    @classmethod
+    def from_market(cls, market: Market) -> 'MarketState':
+        return cls(
+            market.id,
+            market.market_type,
+            market.status,
+            market.trading_end_time,
+            float(market.q_yes),
+            float(market.q_no),
+            float(market.b),
+            market.liquidity_mode,
+            float(market.liquidity_alpha),
+            market.yes_probability,
+            market.trade_seq,
+        )
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> 'MarketState':
+        return cls(*values)
+
+
+def _cache_key(market_id: int) -> str:
+    return MARKET_STATE_CACHE_KEY.format(market_id=market_id)
+
+
+def _ttl() -> int:
+    """Entry lifetime in seconds; 0 when the cache is disabled."""
+    return settings.MARKET_STATE_CACHE_SECONDS
+
+
+def _cached(market_id: int):
+    if not _ttl():
+        return None
+    values = cache.get(_cache_key(market_id))
+    return MarketState.from_tuple(values) if values else None
+
+
+def _put(state: MarketState) -> None:
+    if _ttl():
+        cache.set(_cache_key(state.id), state.to_tuple(), _ttl())
+
+
+def load_market_state(market_id: int) -> MarketState:
+    """
+    Read a market's state from the database and cache it.
+
+    Raises:
+        Market.DoesNotExist
+    """
+    state = MarketState.from_market(Market.objects.get(id=market_id))
+    _put(state)
+    return state
+
+
+def get_market_state(market_id: int, min_version: int = None) -> MarketState:
+    """
+    Current state of one market, from the cache when it is fresh enough.
+
+    Args:
+        market_id: Market id
+        min_version: Lowest acceptable trade_seq (entries behind it are reloaded)
+
+    Raises:
+        Market.DoesNotExist
+    """
+    state = _cached(market_id)
+    if state is None or (min_version is not None and state.trade_seq < min_version):
+        return load_market_state(market_id)
+    return state
+
+
+def get_market_states(market_ids) -> dict:
+    """States for many markets with one cache round trip (misses load in one query)."""
+    market_ids = list(set(market_ids))
+    found = cache.get_many([_cache_key(market_id) for market_id in market_ids]) if _ttl() else {}
+
+    states = {}
+    for market_id in market_ids:
+        values = found.get(_cache_key(market_id))
+        if values:
+            states[market_id] = MarketState.from_tuple(values)
+
+    missing = [market_id for market_id in market_ids if market_id not in states]
+    if missing:
+        loaded = {market.id: MarketState.from_market(market) for market in Market.objects.filter(id__in=missing)}
+        if _ttl():
+            cache.set_many({_cache_key(market_id): state.to_tuple() for market_id, state in loaded.items()}, _ttl())
+        states.update(loaded)
+
+    return states
+
+
+def store_market_state(market: Market) -> None:
+    """Write-through from a saved Market; never replaces a newer version."""
+    try:
+        current = _cached(market.id)
+        if current is not None and current.trade_seq > market.trade_seq:
+            return  # Saved from a stale instance
+        _put(MarketState.from_market(market))
+    except Exception as e:
+        logger.error(f"Failed to cache state for market {market.id}: {str(e)}")
+
+
+def merge_market_state(market: Market, fields) -> None:
+    """Write-through for save(update_fields=...): copy only the saved fields."""
+    try:
+        current = _cached(market.id)
+        if current is None or current.trade_seq > market.trade_seq:
+            return
+        for field in fields:
+            if field in MarketState.__slots__:
+                value = getattr(market, field)
+                setattr(current, field, float(value) if field in ('q_yes', 'q_no', 'b', 'liquidity_alpha') else value)
+        _put(current)
+    except Exception as e:
+        logger.error(f"Failed to cache state for market {market.id}: {str(e)}")
+
+
+def advance_market_state(market_id: int, trade_seq: int, q_yes: float, q_no: float, yes_probability: int) -> None:
+    """Write-through for trades persisted with queryset.update() (trade sequencer)."""
+    try:
+        current = _cached(market_id)
+        if current is None:
+            return  # Next reader loads the committed row
+        if current.trade_seq > trade_seq:
+            return
+        current.q_yes = q_yes
+        current.q_no = q_no
+        current.yes_probability = yes_probability
+        current.trade_seq = trade_seq
+        _put(current)
+    except Exception as e:
+        logger.error(f"Failed to cache state for market {market_id}: {str(e)}")
+
+
+def invalidate_market_state(market_id: int) -> None:
+    cache.delete(_cache_key(market_id))
@@ -0,0 +1,86 @@
+"""
+Server-Sent Events stream of market activity.
+
+Native async view: each open stream holds no worker thread while idle when
+served through api/asgi.py (uvicorn/daphne). Clients resume after a reconnect
+by sending the standard `Last-Event-ID` header (browsers' EventSource does
+this automatically) or `?since=<seq>`.
+"""
+
+import json
+import logging
+import time
+
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from .events import get_broker
+from .models import Market
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+MAX_STREAM_SECONDS = 300  # Clients reconnect (and resume) after this
+
+
+def _format_sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(market_id: int, since: int):
+    broker = get_broker()
+    seq = since
+    started = time.monotonic()
+
+    yield "retry: 1000\n\n"
+
+    while time.monotonic() - started < MAX_STREAM_SECONDS:
+        events, complete = await broker.wait_for_events(market_id, seq, HEARTBEAT_SECONDS)
+
+        if not complete:
+            # Events were evicted from the replay buffer - the client must
+            # reload a snapshot (list_markets / market_details) and continue
+            latest = events[-1]['seq'] if events else 0
+            yield f"event: reset\ndata: {json.dumps({'market_id': market_id, 'seq': latest})}\n\n"
+            seq = latest
+            continue
+
+        if not events:
+            yield ": heartbeat\n\n"
+            continue
+
+        for event in events:
+            yield _format_sse(event)
+        seq = events[-1]['seq']
+
+
+async def stream_market_events(request, market_id):
+    """
+    Stream price ticks, trades and order fills for one market.
+
+    GET /api/markets/<market_id>/stream/?since=<seq>
+
+    Events:
+        price       - new LMSR state after a trade
+        trade       - executed market order
+        order_fill  - filled limit order
+        lifecycle   - status change (e.g. closed at trading_end_time)
+        reset       - replay gap; reload the market snapshot
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since') or 0
+    try:
+        since = int(since)
+        if since < 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'since must be a non-negative integer'}, status=400)
+
+    if not await Market.objects.filter(id=market_id).aexists():
+        return JsonResponse({'error': 'Market not found'}, status=404)
+
+    response = StreamingHttpResponse(_event_stream(market_id, since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx response buffering
+    return response
@@ -6,6 +6,8 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction as db_transaction
 from markets.models import Market, Bet
+from markets.services import invalidate_top_holders
+from markets.events import publish_order_fill
 from payments.models import Transaction
 from notifications.views import create_notification
 
@@ -62,9 +64,14 @@ try:
     @shared_task(bind=True, max_retries=3, default_retry_delay=60)
     def match_limit_orders(self):
         """Celery wrapper for match_limit_orders_impl"""
+        from api.task_queues import singleton_lock
         try:
-            result = match_limit_orders_impl()
-            return result
+            # A slow run must not overlap the next beat tick and fill orders twice
+            with singleton_lock('match_limit_orders') as acquired:
+                if not acquired:
+                    logger.info("match_limit_orders already running, skipping this run")
+                    return {'status': 'skipped', 'executed_orders': 0}
+                return match_limit_orders_impl()
         except Exception as e:
             logger.error(f"Error in match_limit_orders task: {str(e)}")
             raise self.retry(exc=e, countdown=60)
@@ -80,32 +87,10 @@ def expire_unmatched_limit_orders_impl():
     Called by Celery task or manually for testing.
     """
     try:
-        # Get all PENDING limit orders for CLOSED/RESOLVED markets
-        expired_orders = Bet.objects.filter(
-            order_type='LIMIT',
-            order_status='PENDING'
-        ).exclude(
-            market__status='OPEN'
-        )
-        
-        expired_count = 0
-        
-        for bet in expired_orders:
-            bet.order_status = 'EXPIRED'
-            bet.save()
-            
-            # Create notification
-            create_notification(
-                user=bet.user,
-                type_choice='LIMIT_ORDER_EXPIRED',
-                title='Limit Order Expired',
-                message=f'Your limit {bet.action.lower()} order for {bet.outcome} on "{bet.market.question}" expired without filling.',
-                color_class='orange',
-                related_market_id=bet.market.id,
-                related_bet_id=bet.id
-            )
-            
-            expired_count += 1
+        # All PENDING limit orders on CLOSED/RESOLVED markets, in one UPDATE
+        # plus one batched notification insert
+        from markets.limit_orders import expire_pending_limit_orders
+        expired_count = expire_pending_limit_orders()
         
         logger.info(f"Expired {expired_count} unmatched limit orders")
         return {'status': 'success', 'expired_orders': expired_count}
@@ -127,6 +112,86 @@ except:
         return expire_unmatched_limit_orders_impl()
 
 
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def fire_trigger_orders(market_id, order_ids):
+        """Execute stop-loss/take-profit orders crossed by a price change"""
+        from markets.triggers import fire_trigger_orders as fire
+        return fire(market_id, order_ids)
+except:
+    def fire_trigger_orders(market_id, order_ids):
+        from markets.triggers import fire_trigger_orders as fire
+        return fire(market_id, order_ids)
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def close_due_markets():
+        """Safety net for the lifecycle scheduler: close markets past trading_end_time"""
+        from markets.lifecycle import close_due_markets as close_due
+        return close_due()
+except:
+    def close_due_markets():
+        from markets.lifecycle import close_due_markets as close_due
+        return close_due()
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def poll_bitcoin_price():
+        """Refresh the cached Bitcoin price tick from upstream APIs"""
+        from markets.bitcoin_service import BitcoinPriceService
+        tick = BitcoinPriceService.poll_price()
+        return {'status': 'success' if tick else 'failed', 'tick': tick}
+except:
+    def poll_bitcoin_price():
+        from markets.bitcoin_service import BitcoinPriceService
+        tick = BitcoinPriceService.poll_price()
+        return {'status': 'success' if tick else 'failed', 'tick': tick}
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def roll_bitcoin_market():
+        """Close expired Bitcoin Up/Down rounds and open the next one"""
+        from markets.bitcoin_service import BitcoinPriceService
+        return BitcoinPriceService.roll_bitcoin_market()
+except:
+    def roll_bitcoin_market():
+        from markets.bitcoin_service import BitcoinPriceService
+        return BitcoinPriceService.roll_bitcoin_market()
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def archive_settled_markets():
+        """Move settled markets' history to their archive files"""
+        from markets.archive import archive_settled_markets as archive
+        return archive()
+except:
+    def archive_settled_markets():
+        from markets.archive import archive_settled_markets as archive
+        return archive()
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def prune_volume_buckets():
+        """Delete hourly volume buckets past the rolling windows"""
+        from markets.volume import prune_volume_buckets as prune
+        return prune()
+except:
+    def prune_volume_buckets():
+        from markets.volume import prune_volume_buckets as prune
+        return prune()
+
+
 def _should_execute_limit_order(bet: Bet) -> bool:
     """
     Check if a limit order should be executed based on current market price.
@@ -233,4 +298,7 @@ def _execute_limit_order(bet: Bet):
             related_bet_id=bet.id
         )
         
+        invalidate_top_holders(bet.market_id)
+        publish_order_fill(bet)
+        
         logger.info(f"Executed limit order {bet.id} for user {user.phone_number}")
@@ -0,0 +1,87 @@
+"""
+Per-Market Threshold Books
+
+Process-local ThresholdIndex per market (trigger orders, price alerts),
+consulted on every committed price change.
+
+With a shared cache (SHARED_CACHE) each book is versioned through a counter
+in it: whoever adds entries bumps it, and every process reloads its copy
+from the database on its next check. A per-process cache would only ever
+see its own bumps, so without one the version is read from the database
+instead (`db_version`, e.g. the highest id and count of the active rows),
+which changes whenever any process adds an entry. Entries that leave the book (filled, cancelled) only need to
+be discarded locally: firing always re-checks the rows in the database, so a
+stale entry elsewhere costs one no-op claim and is then dropped.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils.threshold_index import ThresholdIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ThresholdBooks:
+    """
+    Registry of one kind of threshold book.
+
+    Args:
+        name: Cache namespace (e.g. 'trigger_book')
+        loader: Callable(market_id) -> iterable of (id, direction, threshold)
+        db_version: Callable(market_id) -> hashable version of the active
+            rows, used when there is no shared cache (None: reload the book
+            on every check)
+    """
+
+    def __init__(self, name: str, loader, db_version=None):
+        self.name = name
+        self.loader = loader
+        self.db_version = db_version
+        self._books = {}
+        self._lock = threading.Lock()
+
+    def _version_key(self, market_id: int) -> str:
+        return f"{self.name}_version_{market_id}"
+
+    def _current_version(self, market_id: int):
+        if not settings.SHARED_CACHE:
+            return self.db_version(market_id) if self.db_version else None
+        key = self._version_key(market_id)
+        cache.add(key, 0, None)
+        return cache.get(key, 0)
+
+    def get(self, market_id: int) -> ThresholdIndex:
+        """This process's book for a market, reloaded when it is out of date."""
+        version = self._current_version(market_id)
+        book = self._books.get(market_id)
+        if book is not None and version is not None and book.version == version:
+            return book
+
+        book = ThresholdIndex(self.loader(market_id), version)
+        with self._lock:
+            self._books[market_id] = book
+        return book
+
+    def bump(self, market_id: int) -> None:
+        """Mark every process's copy of the market's book as stale."""
+        if not settings.SHARED_CACHE:
+            return  # The database version already moved with the new row
+        key = self._version_key(market_id)
+        try:
+            cache.add(key, 0, None)
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)  # Evicted between add and incr
+
+    def discard(self, market_id: int, entry_ids) -> None:
+        book = self._books.get(market_id)
+        if book is not None and entry_ids:
+            with self._lock:
+                book.discard(entry_ids)
+
+    def crossed(self, market_id: int, price: float) -> list:
+        return self.get(market_id).crossed(price)
@@ -0,0 +1,284 @@
+"""
+Stop-Loss / Take-Profit Trigger Orders
+
+Conditional sell orders on an existing binary position:
+- STOP_LOSS sells when the outcome's price falls to or below trigger_price
+- TAKE_PROFIT sells when it rises to or above trigger_price
+
+Pending triggers of a market live in a ThresholdIndex sorted by trigger
+price (expressed on the YES price, see `trigger_threshold`). On every
+committed LMSR price change `on_price_change` bisects the book for the new
+price, so only the triggers whose threshold was crossed are touched; no scan
+of conditional orders runs after a trade. The books are per process and
+versioned through the cache (markets.threshold_books).
+
+Crossed triggers are fired by the `fire_trigger_orders` task (trading
+queue, highest priority) through the normal LMSR sell path (lock the market,
+sell_*_shares, trading fee, balance credit, volume, transaction, price history,
+events). Firing re-checks each order under the lock, so stale book entries
+are harmless.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from api.validators import validate_amount, ValidationError
+from .models import Market, Bet, PriceHistory
+from .threshold_books import ThresholdBooks
+from .utils.threshold_index import FALLS, RISES
+
+logger = logging.getLogger(__name__)
+
+STOP_LOSS = 'STOP_LOSS'
+TAKE_PROFIT = 'TAKE_PROFIT'
+TRIGGER_ORDER_TYPES = (STOP_LOSS, TAKE_PROFIT)
+
+
+def outcome_price(yes_price_pct: float, outcome: str) -> float:
+    """Price of `outcome` in % given the YES price in %."""
+    return yes_price_pct if outcome == 'Yes' else 100 - yes_price_pct
+
+
+def is_triggered(order_type: str, trigger_price: float, price: float) -> bool:
+    if order_type == STOP_LOSS:
+        return price <= trigger_price
+    return price >= trigger_price
+
+
+def trigger_threshold(order_type: str, outcome: str, trigger_price) -> tuple:
+    """
+    A trigger as a threshold on the YES price.
+
+    A No-side trigger at p fires when the YES price crosses 100 - p in the
+    opposite direction, so one index per market covers both outcomes.
+
+    Returns:
+        (direction, yes_threshold)
+    """
+    falls = order_type == STOP_LOSS
+    if outcome == 'Yes':
+        return (FALLS if falls else RISES), float(trigger_price)
+    return (RISES if falls else FALLS), 100 - float(trigger_price)
+
+
+def _pending_triggers(market_id: int):
+    return Bet.objects.filter(
+        market_id=market_id,
+        order_status='PENDING',
+        order_type__in=TRIGGER_ORDER_TYPES,
+    )
+
+
+def _load_trigger_book(market_id: int):
+    orders = _pending_triggers(market_id).values_list('id', 'order_type', 'outcome', 'trigger_price')
+    return [
+        (order_id, *trigger_threshold(order_type, outcome, trigger_price))
+        for order_id, order_type, outcome, trigger_price in orders
+    ]
+
+
+def _trigger_book_version(market_id: int) -> tuple:
+    totals = _pending_triggers(market_id).aggregate(top=Max('id'), count=Count('id'))
+    return totals['top'], totals['count']
+
+
+trigger_books = ThresholdBooks('trigger_book', _load_trigger_book, _trigger_book_version)
+
+
+def on_price_change(market_id: int, yes_price_pct: float) -> None:
+    """
+    Dispatch the trigger orders and price alerts a new LMSR price crossed,
+    once the trade commits.
+
+    Best-effort like event publishing: failures are logged and never break the
+    trade that moved the price.
+    """
+    def _check():
+        try:
+            crossed = trigger_books.crossed(market_id, yes_price_pct)
+            if crossed:
+                from .tasks import fire_trigger_orders
+                if hasattr(fire_trigger_orders, 'delay'):
+                    fire_trigger_orders.delay(market_id, crossed)
+                else:
+                    fire_trigger_orders(market_id, crossed)
+        except Exception as e:
+            logger.error(f"Trigger check failed for market {market_id}: {str(e)}")
+
+        try:
+            # Fan-out runs on the notifications queue; only the bisection runs here
+            from notifications.alerts import alert_books
+            if alert_books.crossed(market_id, yes_price_pct):
+                from notifications.tasks import deliver_price_alerts
+                if hasattr(deliver_price_alerts, 'delay'):
+                    deliver_price_alerts.delay(market_id, yes_price_pct)
+                else:
+                    deliver_price_alerts(market_id, yes_price_pct)
+        except Exception as e:
+            logger.error(f"Price alert check failed for market {market_id}: {str(e)}")
+
+    transaction.on_commit(_check)
+
+
+def create_trigger_order(user, market: Market, outcome: str, order_type: str, trigger_price, shares) -> Bet:
+    """
+    Place a stop-loss or take-profit on the user's position.
+
+    Raises:
+        ValidationError: Invalid fields, closed or non-binary market, a
+            trigger that is already reached, or not enough shares
+    """
+    from .limit_orders import available_shares
+    from .services import get_market_prices, is_market_open
+
+    if order_type not in TRIGGER_ORDER_TYPES:
+        raise ValidationError('order_type must be STOP_LOSS or TAKE_PROFIT')
+    if market.market_type != 'BINARY':
+        raise ValidationError('Trigger orders are only available on binary markets')
+    open_status, reason = is_market_open(market)
+    if not open_status:
+        raise ValidationError(reason)
+
+    trigger_price = validate_amount(trigger_price, min_amount=Decimal('0.01'), max_amount=Decimal('99.99'))
+    try:
+        shares = Decimal(str(shares))
+    except Exception:
+        raise ValidationError('Shares must be a number')
+    if shares <= 0:
+        raise ValidationError('Shares must be positive')
+
+    current_price = outcome_price(get_market_prices(market)['yes_price_pct'], outcome)
+    if is_triggered(order_type, float(trigger_price), current_price):
+        side = 'below' if order_type == STOP_LOSS else 'above'
+        raise ValidationError(f'Trigger price must be {side} the current {outcome} price of {current_price}%')
+
+    with transaction.atomic():
+        owned = available_shares(user, [market.id]).get((market.id, outcome, None), Decimal('0'))
+        if shares > owned:
+            raise ValidationError(f'Cannot sell {shares} shares. You only own {owned} shares of {outcome} on this market.')
+
+        order = Bet.objects.create(
+            user=user,
+            market=market,
+            outcome=outcome,
+            amount=shares,
+            quantity=shares,
+            entry_probability=int(current_price),
+            order_type=order_type,
+            trigger_price=trigger_price,
+            action='SELL',
+            order_status='PENDING',
+        )
+        transaction.on_commit(lambda: trigger_books.bump(market.id))
+
+    return order
+
+
+def fire_trigger_orders(market_id: int, order_ids: list) -> list:
+    """
+    Execute crossed trigger orders as market sells.
+
+    Runs under the market row lock and re-checks every order against the
+    price at that moment (earlier fills in the same call move it), so orders
+    that were cancelled, already fired, or are no longer crossed are skipped.
+
+    Returns:
+        Ids of the orders that were filled
+    """
+    from notifications.views import create_notification
+    from payments.models import Transaction
+    from .events import publish_price_tick, publish_trade
+    from .services import (
+        get_market_prices, invalidate_top_holders, is_market_open, process_trading_fee,
+        sell_no_shares, sell_yes_shares,
+    )
+    from .volume import record_volume
+
+    filled, dropped = [], []
+    with transaction.atomic():
+        market = Market.objects.select_for_update().get(id=market_id)
+        open_status, _ = is_market_open(market)
+        orders = list(
+            Bet.objects.select_for_update(of=('self',)).filter(
+                id__in=order_ids, market_id=market_id,
+                order_status='PENDING', order_type__in=TRIGGER_ORDER_TYPES,
+            ).select_related('user').order_by('id')
+        )
+        dropped = set(order_ids) - {order.id for order in orders}
+        if not open_status:
+            orders = []  # Expired with the rest of the book when the market closes
+
+        for order in orders:
+            price = outcome_price(get_market_prices(market)['yes_price_pct'], order.outcome)
+            if not is_triggered(order.order_type, float(order.trigger_price), price):
+                continue
+
+            try:
+                with transaction.atomic():
+                    shares = float(order.quantity)
+                    if order.outcome == 'Yes':
+                        result = sell_yes_shares(market, shares)
+                    else:
+                        result = sell_no_shares(market, shares)
+                    process_trading_fee(market, result['payout_kes'], order)
+
+                    # F() so several fills for one user in this batch all land
+                    payout = Decimal(str(result['payout_kes']))
+                    user = order.user
+                    type(user).objects.filter(id=user.id).update(balance=F('balance') + payout)
+                    record_volume(market, payout)
+
+                    order.order_status = 'FILLED'
+                    order.filled_at = timezone.now()
+                    order.save(update_fields=['order_status', 'filled_at'])
+
+                    label = 'Stop-loss' if order.order_type == STOP_LOSS else 'Take-profit'
+                    Transaction.objects.create(
+                        user=user,
+                        type='BET_SELL',
+                        amount=payout,
+                        phone_number=user.phone_number,
+                        status='COMPLETED',
+                        description=f'{label} triggered on: {market.question} @ {result["execution_price"]}%',
+                        related_bet=order,
+                    )
+                    create_notification(
+                        user=user,
+                        type_choice='BET_SOLD',
+                        title=f'{label} Triggered',
+                        message=f'Your {label.lower()} on {order.outcome} sold {order.quantity} shares for KES {payout:.2f}',
+                        color_class='orange' if order.order_type == STOP_LOSS else 'green',
+                        related_market_id=market.id,
+                        related_bet_id=order.id,
+                    )
+                    publish_trade(order, result)
+                    filled.append(order.id)
+            except ValueError as e:
+                logger.error(f"Trigger order {order.id} could not sell: {str(e)}")
+                order.order_status = 'CANCELLED'
+                order.save(update_fields=['order_status'])
+                dropped.add(order.id)
+
+        transaction.on_commit(lambda: trigger_books.discard(market_id, filled + list(dropped)))
+
+        if filled:
+            prices = get_market_prices(market)
+            market.yes_probability = int(prices['yes_price_pct'])
+            market.save(update_fields=['yes_probability'])
+            PriceHistory.objects.create(
+                market=market,
+                yes_probability=market.yes_probability,
+                no_probability=100 - market.yes_probability,
+            )
+            invalidate_top_holders(market.id)
+            publish_price_tick(market)
+            # Selling can cross further triggers (stop cascades)
+            on_price_change(market.id, prices['yes_price_pct'])
+
+    if filled:
+        logger.info(f"Fired {len(filled)} trigger orders on market {market_id}")
+    return filled
@@ -4,13 +4,21 @@ from .views import (
     place_bet, 
     market_chat, 
     market_details, 
+    market_comments,
+    market_activity,
+    market_holders,
     get_price_history, 
     preview_trade_price, 
+    market_quote,
+    market_quotes,
     get_user_available_shares,
     get_bitcoin_market,
     get_bitcoin_price,
+    get_bitcoin_price_history,
 )
-from .dashboard_views import user_dashboard, transaction_history, initiate_withdrawal
+from .stream_views import stream_market_events
+from .order_views import place_trigger_order, cancel_order, cancel_orders, replace_order, replace_orders
+from .dashboard_views import user_dashboard, user_archived_bets, transaction_history, initiate_withdrawal
 from .admin_views import admin_markets, resolve_market, create_market, delete_market
 from .analytics_views import analytics_dashboard, risk_dashboard
 from .csrf_views import get_csrf_token
@@ -33,14 +41,28 @@ urlpatterns = [
     path('csrf/', get_csrf_token, name='get_csrf_token'),
     path('<int:market_id>/chat/', market_chat, name='market_chat'),
     path('<int:market_id>/details/', market_details, name='market_details'),
+    path('<int:market_id>/comments/', market_comments, name='market_comments'),
+    path('<int:market_id>/activity/', market_activity, name='market_activity'),
+    path('<int:market_id>/holders/', market_holders, name='market_holders'),
+    path('<int:market_id>/stream/', stream_market_events, name='market_stream'),
     path('<int:market_id>/price-history/', get_price_history, name='price_history'),
     path('<int:market_id>/available-shares/', get_user_available_shares, name='available_shares'),
     path('<int:market_id>/add-liquidity/', add_liquidity_to_market, name='add_liquidity_to_market'),
+    path('<int:market_id>/quote/', market_quote, name='market_quote'),
     path('preview-price/', preview_trade_price, name='preview_price'),
+    path('quotes/', market_quotes, name='market_quotes'),
+    
+    # Limit / trigger order endpoints
+    path('orders/trigger/', place_trigger_order, name='place_trigger_order'),
+    path('orders/cancel/', cancel_orders, name='cancel_orders'),
+    path('orders/replace/', replace_orders, name='replace_orders'),
+    path('orders/<int:order_id>/cancel/', cancel_order, name='cancel_order'),
+    path('orders/<int:order_id>/replace/', replace_order, name='replace_order'),
     
     # Bitcoin market endpoints
     path('bitcoin/', get_bitcoin_market, name='bitcoin_market'),
     path('bitcoin/price/', get_bitcoin_price, name='bitcoin_price'),
+    path('bitcoin/price/history/', get_bitcoin_price_history, name='bitcoin_price_history'),
     
     # Liquidity provider endpoints
     path('liquidity/deposit/', deposit_liquidity_view, name='liquidity_deposit'),
@@ -55,6 +77,7 @@ urlpatterns = [
     
     # Dashboard endpoints
     path('dashboard/', user_dashboard, name='user_dashboard'),
+    path('dashboard/archived/<int:market_id>/', user_archived_bets, name='user_archived_bets'),
     path('history/', transaction_history, name='transaction_history'),
     path('withdraw/', initiate_withdrawal, name='initiate_withdrawal'),
     
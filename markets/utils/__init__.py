@@ -1,11 +1,21 @@
 """Market utilities package."""
 
 from .price_calculations import (
+    effective_b,
+    b_for_pool_capital,
+    calculate_shares_for_cost,
+    calculate_slippage_curve,
+    DEFAULT_QUOTE_SIZES_KES,
     cost,
     price_yes,
     price_no,
     calculate_cost_to_buy_shares,
     calculate_payout_from_selling,
+    cost_multi,
+    prices_multi,
+    calculate_cost_to_buy_option_shares,
+    calculate_payout_from_selling_option_shares,
+    calculate_q_for_probabilities,
     calculate_settlement_payout,
     calculate_settlement_profit,
     calculate_q_for_probability,
@@ -14,11 +24,21 @@ from .price_calculations import (
 )
 
 __all__ = [
+    'effective_b',
+    'b_for_pool_capital',
+    'calculate_shares_for_cost',
+    'calculate_slippage_curve',
+    'DEFAULT_QUOTE_SIZES_KES',
     'cost',
     'price_yes',
     'price_no',
     'calculate_cost_to_buy_shares',
     'calculate_payout_from_selling',
+    'cost_multi',
+    'prices_multi',
+    'calculate_cost_to_buy_option_shares',
+    'calculate_payout_from_selling_option_shares',
+    'calculate_q_for_probabilities',
     'calculate_settlement_payout',
     'calculate_settlement_profit',
     'calculate_q_for_probability',
@@ -0,0 +1,95 @@
+"""
+Cursor Pagination Helpers
+
+Keyset pagination over auto-increment primary keys. Cursors are the id of the
+last row on the previous page, so every page is a single indexed range scan
+regardless of how deep the client has scrolled.
+"""
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def parse_page_params(request, default_limit: int = DEFAULT_PAGE_SIZE, max_limit: int = MAX_PAGE_SIZE) -> tuple:
+    """
+    Read `cursor` and `limit` from the query string.
+
+    Args:
+        request: Django request
+        default_limit: Page size when `limit` is missing
+        max_limit: Upper bound on page size
+
+    Returns:
+        (cursor: int or None, limit: int)
+
+    Raises:
+        ValueError: If cursor or limit is not a positive integer
+    """
+    cursor = request.GET.get('cursor')
+    limit = request.GET.get('limit')
+
+    if cursor in (None, ''):
+        cursor = None
+    else:
+        cursor = int(cursor)
+        if cursor < 1:
+            raise ValueError('cursor must be a positive integer')
+
+    if limit in (None, ''):
+        limit = default_limit
+    else:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+
+    return cursor, min(limit, max_limit)
+
+
+def paginate_by_id(queryset, cursor: int = None, limit: int = DEFAULT_PAGE_SIZE, descending: bool = True) -> tuple:
+    """
+    Fetch one page of a queryset ordered by id.
+
+    One extra row is fetched to know whether a next page exists, so no
+    COUNT(*) query is needed.
+
+    Args:
+        queryset: Base queryset (filters already applied)
+        cursor: id of the last row of the previous page
+        limit: Page size
+        descending: Newest first when True
+
+    Returns:
+        (rows: list, next_cursor: int or None)
+    """
+    if descending:
+        if cursor is not None:
+            queryset = queryset.filter(id__lt=cursor)
+        queryset = queryset.order_by('-id')
+    else:
+        if cursor is not None:
+            queryset = queryset.filter(id__gt=cursor)
+        queryset = queryset.order_by('id')
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+
+    return rows, next_cursor
+
+
+def paginate_list_by_id(rows: list, cursor: int = None, limit: int = DEFAULT_PAGE_SIZE, descending: bool = True) -> tuple:
+    """
+    `paginate_by_id` over rows already in memory (e.g. rehydrated from a
+    market archive); same cursor semantics.
+
+    Returns:
+        (rows: list, next_cursor: int or None)
+    """
+    rows = sorted(rows, key=lambda row: row.id, reverse=descending)
+    if cursor is not None:
+        rows = [row for row in rows if (row.id < cursor if descending else row.id > cursor)]
+
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
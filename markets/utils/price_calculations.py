@@ -17,20 +17,63 @@ import math
 PAYOUT_PER_SHARE = 100  # KES per share
 
 
-def cost(q_yes: float, q_no: float, b: float) -> float:
+def effective_b(q_yes: float, q_no: float, b: float, alpha: float = 0.0) -> float:
+    """
+    Liquidity parameter actually used for pricing.
+    
+    Fixed LMSR (alpha = 0): b itself.
+    Liquidity-sensitive LMSR (alpha > 0): b(q) = max(b, alpha * (q_yes + q_no)),
+    so depth grows with outstanding quantity and `b` acts as the floor for
+    young markets.
+    
+    Args:
+        q_yes: YES quantity issued
+        q_no: NO quantity issued
+        b: Liquidity parameter (floor when alpha > 0)
+        alpha: LS-LMSR sensitivity (0 disables)
+    
+    Returns:
+        Effective liquidity parameter
+    """
+    if alpha <= 0:
+        return b
+    return max(b, alpha * (q_yes + q_no))
+
+
+def b_for_pool_capital(capital_kes: float, b_min: float) -> float:
+    """
+    Liquidity parameter a pool of LP capital can underwrite.
+    
+    The binary LMSR market maker's worst-case loss is b * ln(2) shares,
+    i.e. b * ln(2) * 100 KES, so capital C supports b = C / (100 * ln 2).
+    
+    Args:
+        capital_kes: LP capital backing the market
+        b_min: Floor (markets without LPs keep their default depth)
+    
+    Returns:
+        Liquidity parameter
+    """
+    return max(b_min, capital_kes / (PAYOUT_PER_SHARE * math.log(2)))
+
+
+def cost(q_yes: float, q_no: float, b: float, alpha: float = 0.0) -> float:
     """
     Calculate the total cost (or wealth) of the market.
     
     Formula: C(q_yes, q_no) = b * ln(exp(q_yes/b) + exp(q_no/b))
+    with b replaced by b(q) (see `effective_b`) for liquidity-sensitive markets.
     
     Args:
         q_yes: YES quantity issued
         q_no: NO quantity issued
         b: Liquidity parameter (higher = more liquidity, less price impact)
+        alpha: LS-LMSR sensitivity (0 = fixed b)
     
     Returns:
         Total cost in KES (when multiplied by share value 100)
     """
+    b = effective_b(q_yes, q_no, b, alpha)
     try:
         exp_yes = math.exp(q_yes / b)
         exp_no = math.exp(q_no / b)
@@ -40,20 +83,40 @@ def cost(q_yes: float, q_no: float, b: float) -> float:
         return b * max(q_yes, q_no) / b + b
 
 
-def price_yes(q_yes: float, q_no: float, b: float) -> float:
+def price_yes(q_yes: float, q_no: float, b: float, alpha: float = 0.0) -> float:
     """
     Calculate the current YES price (probability).
     
     Formula: P_yes = exp(q_yes/b) / (exp(q_yes/b) + exp(q_no/b))
     
+    For liquidity-sensitive markets where alpha * (q_yes + q_no) exceeds the
+    floor, the price is the gradient of the LS-LMSR cost function:
+    
+        P_yes = alpha * ln(Z) + (S * E_yes - (q_yes * E_yes + q_no * E_no)) / (S * Z)
+    
+    where S = q_yes + q_no, E_x = exp(q_x / b(q)) and Z = E_yes + E_no.
+    YES and NO prices then sum to slightly more than 1 (the market maker's
+    spread), bounded by 1 + 2 * alpha * ln(2).
+    
     Args:
         q_yes: YES quantity issued
         q_no: NO quantity issued
         b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
     
     Returns:
         Price as probability between 0 and 1
     """
+    b_eff = effective_b(q_yes, q_no, b, alpha)
+    if b_eff > b:
+        total = q_yes + q_no
+        peak = max(q_yes, q_no) / b_eff
+        e_yes = math.exp(q_yes / b_eff - peak)
+        e_no = math.exp(q_no / b_eff - peak)
+        z = e_yes + e_no
+        log_z = peak + math.log(z)
+        return alpha * log_z + (total * e_yes - (q_yes * e_yes + q_no * e_no)) / (total * z)
+    
     try:
         exp_yes = math.exp(q_yes / b)
         exp_no = math.exp(q_no / b)
@@ -67,20 +130,23 @@ def price_yes(q_yes: float, q_no: float, b: float) -> float:
         return 0.5
 
 
-def price_no(q_yes: float, q_no: float, b: float) -> float:
+def price_no(q_yes: float, q_no: float, b: float, alpha: float = 0.0) -> float:
     """
     Calculate the current NO price (probability).
     
-    Formula: P_no = 1 - P_yes
+    Formula: P_no = 1 - P_yes (fixed b); by symmetry for LS-LMSR
     
     Args:
         q_yes: YES quantity issued
         q_no: NO quantity issued
         b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
     
     Returns:
         Price as probability between 0 and 1
     """
+    if effective_b(q_yes, q_no, b, alpha) > b:
+        return price_yes(q_no, q_yes, b, alpha)
     return 1.0 - price_yes(q_yes, q_no, b)
 
 
@@ -89,7 +155,8 @@ def calculate_cost_to_buy_shares(
     q_no_before: float,
     shares: float,
     outcome: str,
-    b: float
+    b: float,
+    alpha: float = 0.0
 ) -> float:
     """
     Calculate the KES cost to buy a given quantity of shares.
@@ -103,6 +170,7 @@ def calculate_cost_to_buy_shares(
         shares: Number of shares to buy
         outcome: "YES" or "NO"
         b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
     
     Returns:
         Cost in KES
@@ -114,8 +182,8 @@ def calculate_cost_to_buy_shares(
         q_yes_after = q_yes_before
         q_no_after = q_no_before + shares
     
-    cost_before = cost(q_yes_before, q_no_before, b)
-    cost_after = cost(q_yes_after, q_no_after, b)
+    cost_before = cost(q_yes_before, q_no_before, b, alpha)
+    cost_after = cost(q_yes_after, q_no_after, b, alpha)
     
     # Cost difference multiplied by share value (100 KES per share)
     cost_kes = (cost_after - cost_before) * PAYOUT_PER_SHARE
@@ -127,7 +195,8 @@ def calculate_payout_from_selling(
     q_no_before: float,
     shares: float,
     outcome: str,
-    b: float
+    b: float,
+    alpha: float = 0.0
 ) -> float:
     """
     Calculate the KES payout from selling shares back to the market.
@@ -141,6 +210,7 @@ def calculate_payout_from_selling(
         shares: Number of shares to sell
         outcome: "YES" or "NO"
         b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
     
     Returns:
         Payout in KES
@@ -152,14 +222,284 @@ def calculate_payout_from_selling(
         q_yes_after = q_yes_before
         q_no_after = q_no_before - shares
     
-    cost_before = cost(q_yes_before, q_no_before, b)
-    cost_after = cost(q_yes_after, q_no_after, b)
+    cost_before = cost(q_yes_before, q_no_before, b, alpha)
+    cost_after = cost(q_yes_after, q_no_after, b, alpha)
     
     # Payout is the difference
     payout_kes = (cost_before - cost_after) * PAYOUT_PER_SHARE
     return round(payout_kes, 2)
 
 
+# ============================================================================
+# SLIPPAGE / DEPTH FORMULAS
+# ============================================================================
+
+# Default trade-size grid (KES) for quote curves and depth charts
+DEFAULT_QUOTE_SIZES_KES = [100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]
+
+
+def calculate_shares_for_cost(
+    q_yes: float,
+    q_no: float,
+    amount_kes: float,
+    outcome: str,
+    b: float,
+    alpha: float = 0.0
+) -> float:
+    """
+    Inverse of `calculate_cost_to_buy_shares`: shares a KES budget buys.
+    
+    Fixed b has a closed form:
+        s = b * ln(exp((C0 + x) / b) - exp(q_other / b)) - q_self
+    where x = amount_kes / 100 and C0 is the current cost. LS-LMSR markets are
+    solved by bisection on the cost function.
+    
+    Args:
+        q_yes: YES quantity issued
+        q_no: NO quantity issued
+        amount_kes: KES to spend
+        outcome: "YES" or "NO"
+        b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
+    
+    Returns:
+        Number of shares
+    """
+    if amount_kes <= 0:
+        return 0.0
+    
+    x = amount_kes / PAYOUT_PER_SHARE
+    q_self, q_other = (q_yes, q_no) if outcome == "YES" else (q_no, q_yes)
+    
+    if alpha <= 0:
+        t = (cost(q_yes, q_no, b) + x) / b
+        return b * (t + math.log1p(-math.exp(q_other / b - t))) - q_self
+    
+    def spent(shares):
+        q_y, q_n = (q_yes + shares, q_no) if outcome == "YES" else (q_yes, q_no + shares)
+        return cost(q_y, q_n, b, alpha) - cost(q_yes, q_no, b, alpha)
+    
+    low, high = 0.0, max(x, 1.0)
+    while spent(high) < x:
+        high *= 2
+    for _ in range(60):
+        mid = (low + high) / 2
+        if spent(mid) < x:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def calculate_slippage_curve(
+    q_yes: float,
+    q_no: float,
+    b: float,
+    alpha: float = 0.0,
+    sizes_kes: list = None
+) -> dict:
+    """
+    Exact LMSR execution over a grid of trade sizes, for both outcomes.
+    
+    Buy rows spend each size in KES. Sell rows sell the number of shares
+    worth that size at the current price (capped at the shares issued).
+    Current prices and costs are computed once and shared by every row.
+    
+    Args:
+        q_yes: YES quantity issued
+        q_no: NO quantity issued
+        b: Liquidity parameter
+        alpha: LS-LMSR sensitivity (0 = fixed b)
+        sizes_kes: Trade sizes in KES (default DEFAULT_QUOTE_SIZES_KES)
+    
+    Returns:
+        {
+            'yes_price': float, 'no_price': float,  # Current prices (%)
+            'YES': {'buy': [row, ...], 'sell': [row, ...]},
+            'NO': {'buy': [...], 'sell': [...]},
+        }
+        where each row is {size_kes, shares, amount_kes, average_price,
+        price_after, price_impact, slippage} with prices in % of 100 KES.
+    """
+    sizes_kes = sizes_kes or DEFAULT_QUOTE_SIZES_KES
+    current = {
+        "YES": price_yes(q_yes, q_no, b, alpha),
+        "NO": price_no(q_yes, q_no, b, alpha),
+    }
+    issued = {"YES": q_yes, "NO": q_no}
+    
+    def row(size_kes, outcome, shares, amount_kes, signed_shares):
+        q_y = q_yes + signed_shares if outcome == "YES" else q_yes
+        q_n = q_no + signed_shares if outcome == "NO" else q_no
+        after = price_yes(q_y, q_n, b, alpha) if outcome == "YES" else price_no(q_y, q_n, b, alpha)
+        average = amount_kes / (shares * PAYOUT_PER_SHARE) if shares > 0 else current[outcome]
+        return {
+            'size_kes': size_kes,
+            'shares': round(shares, 6),
+            'amount_kes': round(amount_kes, 2),
+            'average_price': round(average * 100, 4),
+            'price_after': round(after * 100, 4),
+            'price_impact': round((after - current[outcome]) * 100, 4),
+            'slippage': round((average - current[outcome]) * 100, 4),
+        }
+    
+    curve = {
+        'yes_price': round(current["YES"] * 100, 4),
+        'no_price': round(current["NO"] * 100, 4),
+    }
+    for outcome in ("YES", "NO"):
+        buys = []
+        sells = []
+        for size_kes in sizes_kes:
+            shares = calculate_shares_for_cost(q_yes, q_no, size_kes, outcome, b, alpha)
+            buys.append(row(size_kes, outcome, shares, size_kes, shares))
+            
+            shares = min(size_kes / (current[outcome] * PAYOUT_PER_SHARE), max(issued[outcome], 0.0))
+            payout = calculate_payout_from_selling(q_yes, q_no, shares, outcome, b, alpha) if shares > 0 else 0.0
+            sells.append(row(size_kes, outcome, shares, payout, -shares))
+        curve[outcome] = {'buy': buys, 'sell': sells}
+    
+    return curve
+
+
+# ============================================================================
+# MULTI-OUTCOME FORMULAS (OPTION_LIST markets)
+# ============================================================================
+#
+# An option list market has one quantity q_i per option and a single shared
+# liquidity parameter b:
+#
+#     C(q) = b * ln(sum_i exp(q_i / b))
+#     P_i  = exp(q_i / b) / sum_j exp(q_j / b)        (softmax of q / b)
+#
+# Prices sum to 1 across options. Because C(q + k) = C(q) + k, a "No" share on
+# option i (pays out when any other option wins) is equivalent to lowering q_i,
+# so every trade touches exactly one option's quantity.
+
+
+def cost_multi(q: list, b: float) -> float:
+    """
+    Multi-outcome LMSR cost function, computed with log-sum-exp so large
+    quantities cannot overflow.
+
+    Args:
+        q: Quantity issued for each option
+        b: Liquidity parameter
+
+    Returns:
+        Cost function value
+    """
+    scaled = [qi / b for qi in q]
+    peak = max(scaled)
+    return b * (peak + math.log(sum(math.exp(x - peak) for x in scaled)))
+
+
+def prices_multi(q: list, b: float) -> list:
+    """
+    Current price (probability) of every option: softmax(q / b).
+
+    Args:
+        q: Quantity issued for each option
+        b: Liquidity parameter
+
+    Returns:
+        List of probabilities between 0 and 1, summing to 1
+    """
+    scaled = [qi / b for qi in q]
+    peak = max(scaled)
+    weights = [math.exp(x - peak) for x in scaled]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _option_delta(outcome: str, shares: float) -> float:
+    # YES on option i raises q_i; NO (every other option) lowers it
+    return shares if outcome.upper() == "YES" else -shares
+
+
+def calculate_cost_to_buy_option_shares(
+    q: list,
+    index: int,
+    shares: float,
+    outcome: str,
+    b: float
+) -> float:
+    """
+    Calculate the KES cost to buy YES or NO shares on one option.
+
+    YES: Cost = (C(q + s*e_i) - C(q)) * 100
+    NO:  Cost = (s + C(q - s*e_i) - C(q)) * 100
+
+    Args:
+        q: Quantities for every option before the trade
+        index: Position of the traded option in q
+        shares: Number of shares to buy
+        outcome: "YES" or "NO"
+        b: Liquidity parameter
+
+    Returns:
+        Cost in KES
+    """
+    q_after = list(q)
+    q_after[index] += _option_delta(outcome, shares)
+    delta_cost = cost_multi(q_after, b) - cost_multi(q, b)
+    if outcome.upper() != "YES":
+        delta_cost += shares
+    return round(delta_cost * PAYOUT_PER_SHARE, 2)
+
+
+def calculate_payout_from_selling_option_shares(
+    q: list,
+    index: int,
+    shares: float,
+    outcome: str,
+    b: float
+) -> float:
+    """
+    Calculate the KES payout from selling YES or NO shares on one option.
+
+    YES: Payout = (C(q) - C(q - s*e_i)) * 100
+    NO:  Payout = (s + C(q) - C(q + s*e_i)) * 100
+
+    Args:
+        q: Quantities for every option before the trade
+        index: Position of the traded option in q
+        shares: Number of shares to sell
+        outcome: "YES" or "NO"
+        b: Liquidity parameter
+
+    Returns:
+        Payout in KES
+    """
+    q_after = list(q)
+    q_after[index] -= _option_delta(outcome, shares)
+    delta_cost = cost_multi(q, b) - cost_multi(q_after, b)
+    if outcome.upper() != "YES":
+        delta_cost += shares
+    return round(delta_cost * PAYOUT_PER_SHARE, 2)
+
+
+def calculate_q_for_probabilities(probabilities: list, b: float) -> list:
+    """
+    Quantities that produce the given option probabilities.
+
+    Formula: q_i = b * ln(p_i), after normalizing p to sum to 1
+    (any constant can be added to every q_i without changing prices).
+
+    Args:
+        probabilities: Desired probability (or weight) per option, all > 0
+        b: Liquidity parameter
+
+    Returns:
+        List of q values
+    """
+    if not probabilities or any(p <= 0 for p in probabilities):
+        raise ValueError(f"Probabilities must all be positive, got {probabilities}")
+
+    total = sum(probabilities)
+    return [b * math.log(p / total) for p in probabilities]
+
+
 # ============================================================================
 # SETTLEMENT FORMULAS
 # ============================================================================
@@ -0,0 +1,66 @@
+"""
+Sorted Threshold Index
+
+Keeps entries that fire once a price reaches their threshold, in two lists
+sorted by threshold:
+- FALLS entries fire when the price drops to or below the threshold
+- RISES entries fire when the price climbs to or above the threshold
+
+Finding what a new price crossed is two bisections plus a slice, so a check
+costs O(log n + k) for k crossed entries, however many are waiting.
+"""
+
+import bisect
+
+FALLS = 'FALLS'
+RISES = 'RISES'
+
+
+class ThresholdIndex:
+    """Entries keyed by id, sorted by threshold per direction."""
+
+    __slots__ = ('_falls', '_rises', '_entries', 'version')
+
+    def __init__(self, entries=(), version: int = 0):
+        self._falls = []
+        self._rises = []
+        self._entries = {}
+        self.version = version
+        for entry_id, direction, threshold in entries:
+            self.add(entry_id, direction, threshold)
+
+    def _side(self, direction: str) -> list:
+        return self._falls if direction == FALLS else self._rises
+
+    def add(self, entry_id, direction: str, threshold: float) -> None:
+        if entry_id in self._entries:
+            self.discard([entry_id])
+        threshold = float(threshold)
+        bisect.insort(self._side(direction), (threshold, entry_id))
+        self._entries[entry_id] = (direction, threshold)
+
+    def discard(self, entry_ids) -> None:
+        for entry_id in entry_ids:
+            found = self._entries.pop(entry_id, None)
+            if found is None:
+                continue
+            direction, threshold = found
+            side = self._side(direction)
+            position = bisect.bisect_left(side, (threshold, entry_id))
+            if position < len(side) and side[position] == (threshold, entry_id):
+                del side[position]
+
+    def crossed(self, price: float) -> list:
+        """Ids of the entries the given price has reached."""
+        price = float(price)
+        # FALLS fire at threshold >= price: the tail of the ascending list
+        falls = self._falls[bisect.bisect_left(self._falls, (price,)):]
+        # RISES fire at threshold <= price: the head
+        rises = self._rises[:bisect.bisect_right(self._rises, (price, float('inf')))]
+        return [entry_id for _, entry_id in falls] + [entry_id for _, entry_id in rises]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._entries
@@ -6,7 +6,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
-from .models import Market, Bet, ChatMessage
+from .models import Market, Bet, ChatMessage, MarketArchive
+from .archive import archived_holders, attach_users, get_archive, load_archive
 from .services import (
     buy_yes_shares,
     buy_no_shares,
@@ -14,89 +15,49 @@ from .services import (
     sell_no_shares,
     get_market_prices,
     is_market_open,
+    get_option_prices,
+    process_trading_fee,
+    trade_option_shares,
+    get_holders_page,
+    get_top_holders,
+    get_market_quote,
+    invalidate_top_holders,
 )
+from .utils.pagination import DEFAULT_PAGE_SIZE, paginate_by_id, paginate_list_by_id, parse_page_params
 from .bitcoin_service import BitcoinPriceService
+from .events import publish_price_tick, publish_trade
+from .limit_orders import available_shares
+from .sequencer import MODE_SEQUENCER, execution_mode, submit_trade
+from .state_cache import get_market_state, get_market_states
+from .triggers import on_price_change
+from .money import from_cents, from_share_units, share_units_to_float, to_cents, to_share_units
+from .volume import ROLLING_WINDOWS, record_volume, rolling_volumes, volume_fields
 from payments.models import Transaction
 from api.validators import validate_amount, validate_bet_outcome, ValidationError
-from users.models import CustomUser
+from users.identity import get_authenticated_user
+from api.db_router import replica_reads_view
 from notifications.views import create_notification
 
 
-def parse_volume_value(volume_str: str) -> int:
-    """Convert a formatted volume string to an integer amount in KES."""
-    if not volume_str:
-        return 0
-    normalized = volume_str.replace('KES', '').replace('KES', '').replace(' ', '').strip()
-    if normalized.endswith(('M', 'm')):
-        try:
-            return int(float(normalized[:-1]) * 1_000_000)
-        except ValueError:
-            return 0
-    if normalized.endswith(('K', 'k')):
-        try:
-            return int(float(normalized[:-1]) * 1_000)
-        except ValueError:
-            return 0
-    try:
-        return int(float(normalized))
-    except ValueError:
-        return 0
-
-
-def format_volume_value(amount: int) -> str:
-    """Format a KES amount into a human-readable volume string."""
-    if amount >= 1_000_000:
-        return f"KES {amount / 1_000_000:.1f}M".replace('.0M', 'M')
-    if amount >= 1_000:
-        return f"KES {amount / 1_000:.1f}K".replace('.0K', 'K')
-    return f"KES {amount}"
-
 logger = logging.getLogger(__name__)
 
-def get_authenticated_user(request):
-    """
-    Get authenticated user from either:
-    1. Session (if session cookie exists)
-    2. X-User-Phone-Number header (for phone auth)
-    3. X-User-Email header (for Google OAuth users)
-    """
-    # Try session-based auth first
-    if request.user and request.user.is_authenticated:
-        return request.user
-    
-    # Fall back to phone number header (phone auth)
-    phone_number = request.headers.get('X-User-Phone-Number')
-    if phone_number:
-        try:
-            user = CustomUser.objects.get(phone_number=phone_number)
-            if user.is_active:
-                return user
-        except CustomUser.DoesNotExist:
-            pass
-    
-    # Fall back to email header (Google OAuth)
-    email = request.headers.get('X-User-Email')
-    if email:
-        try:
-            user = CustomUser.objects.get(email=email)
-            if user.is_active:
-                return user
-        except CustomUser.DoesNotExist:
-            pass
-    
-    return None
+# ?sort= orderings of list_markets; total volume is an indexed column
+MARKET_SORTS = {
+    'volume': ('-volume_cents', 'id'),
+    'newest': ('-created_at',),
+}
 
 
 def list_markets(request):
-    markets = Market.objects.all()
+    markets = Market.objects.prefetch_related('market_options')
+    sort = request.GET.get('sort')
+    if sort in MARKET_SORTS:
+        markets = markets.order_by(*MARKET_SORTS[sort])
+    markets = list(markets)
+    rolling = rolling_volumes(market.id for market in markets)
     markets_data = []
     
     for market in markets:
-        # Determine effective status based on trading_end_time
-        effective_status = market.status
-        if market.status == 'OPEN' and market.trading_end_time and timezone.now() >= market.trading_end_time:
-            effective_status = 'CLOSED'
-        
         market_dict = {
             'id': market.id,
             'question': market.question,
@@ -105,9 +66,9 @@ def list_markets(request):
             'image_url': market.image_url,
             'market_type': market.market_type,
             'yes_probability': market.yes_probability,
-            'options': market.options,
-            'volume': market.volume,
-            'status': effective_status,  # Use effective status
+            'options': get_option_prices(market, list(market.market_options.all())) if market.market_type == 'OPTION_LIST' else market.options,
+            **volume_fields(market, rolling.get(market.id)),
+            'status': market.status,  # Closed at trading_end_time by markets.lifecycle
             'trading_end_time': market.trading_end_time.isoformat() if market.trading_end_time else None,
             'end_date': market.end_date,
             'resolved_outcome': market.resolved_outcome,
@@ -127,6 +88,10 @@ def list_markets(request):
         
         markets_data.append(market_dict)
     
+    if sort in ROLLING_WINDOWS:
+        # Rolling windows are sums over buckets, ranked after the grouped query
+        markets_data.sort(key=lambda market: market[f"{sort}_cents"], reverse=True)
+    
     return JsonResponse(markets_data, safe=False)
 
 @csrf_exempt
@@ -178,13 +143,11 @@ def place_bet(request):
         except Market.DoesNotExist:
             return JsonResponse({'error': 'Market not found'}, status=404)
         
-        # Check if market is open (both status and trading_end_time)
-        if market.status != 'OPEN':
-            return JsonResponse({'error': f'Market is {market.status.lower()}'}, status=400)
-        
-        # Check if trading has ended
-        if market.trading_end_time and timezone.now() >= market.trading_end_time:
-            return JsonResponse({'error': 'Trading for this market has ended'}, status=400)
+        # Markets are closed at trading_end_time by the lifecycle scheduler;
+        # is_market_open only covers the moments before its tick lands
+        open_status, reason = is_market_open(market)
+        if not open_status:
+            return JsonResponse({'error': reason}, status=400)
         
         # Handle OPTION_LIST markets
         option_id = None
@@ -196,23 +159,29 @@ def place_bet(request):
             if not option_id:
                 return JsonResponse({'error': 'option_id is required for option list markets'}, status=400)
             
-            # Find the option and get its probability
-            if market.options and isinstance(market.options, list):
-                matching_option = next((opt for opt in market.options if opt.get('id') == option_id), None)
-                if not matching_option:
-                    return JsonResponse({'error': f'Option {option_id} not found'}, status=400)
-                
-                option_label = matching_option.get('label')
-                if outcome == 'Yes':
-                    entry_probability = matching_option.get('yes_probability', 50)
-                else:
-                    entry_probability = matching_option.get('no_probability', 50)
+            # Find the option and get its current LMSR probability
+            option_rows = list(market.market_options.all())
+            matching_option = next((opt for opt in get_option_prices(market, option_rows) if opt.get('id') == option_id), None)
+            if not matching_option:
+                return JsonResponse({'error': f'Option {option_id} not found'}, status=400)
+            
+            option_label = matching_option.get('label')
+            if outcome == 'Yes':
+                entry_probability = matching_option.get('yes_probability', 50)
+            else:
+                entry_probability = matching_option.get('no_probability', 50)
         
         # Get order type (MARKET or LIMIT)
         order_type = data.get('order_type', 'MARKET')
         if order_type not in ['MARKET', 'LIMIT']:
             order_type = 'MARKET'
 
+        # Market orders trade against the option's LMSR row; without one the
+        # trade cannot execute, so refuse before any balance is touched
+        if market.market_type == 'OPTION_LIST' and order_type == 'MARKET':
+            if not any(row.option_id == option_id for row in option_rows):
+                return JsonResponse({'error': f'Option {option_id} is not open for trading'}, status=400)
+
         try:
             quantity = int(data.get('quantity', 1))
         except (TypeError, ValueError):
@@ -233,20 +202,23 @@ def place_bet(request):
         
         # For MARKET BUY orders with KES amounts, calculate fractional shares
         # For SELL orders, amount is already in shares
-        calculated_quantity = Decimal(str(quantity))
-        if order_type == 'MARKET' and action == 'buy' and market.market_type == 'BINARY':
+        # Quantities are fixed to Bet.quantity's precision once, here, so the
+        # LMSR trades exactly the shares that are recorded
+        quantity_units = to_share_units(quantity)
+        if order_type == 'MARKET' and action == 'buy':
             # Calculate shares based on amount and current probability
             current_price = Decimal(str(entry_probability))
             if current_price > 0:
-                calculated_quantity = amount / current_price
+                quantity_units = to_share_units(amount / current_price)
             else:
-                calculated_quantity = Decimal('1')
+                quantity_units = to_share_units(1)
         elif order_type == 'MARKET' and action == 'sell':
             # For SELL orders, amount is already in shares
-            calculated_quantity = amount
+            quantity_units = to_share_units(amount)
+        calculated_quantity = from_share_units(quantity_units)
         
         # Handle balance for MARKET orders only (LIMIT orders don't deduct balance immediately)
-        lmsr_result = None  # Will store LMSR result for balance updates
+        result = None  # Will store LMSR result for balance updates
         
         if order_type == 'MARKET':
             if action == 'buy':
@@ -257,24 +229,8 @@ def place_bet(request):
                 user.balance -= amount
                 user.save()
             else:  # sell - must validate user owns these shares
-                # Calculate available shares to sell for this market/outcome
-                buy_quantity = Bet.objects.filter(
-                    user=user,
-                    market=market,
-                    outcome=outcome,
-                    action='BUY',
-                    option_id=option_id
-                ).aggregate(total=models.Sum('quantity'))['total'] or 0
-                
-                sell_quantity = Bet.objects.filter(
-                    user=user,
-                    market=market,
-                    outcome=outcome,
-                    action='SELL',
-                    option_id=option_id
-                ).aggregate(total=models.Sum('quantity'))['total'] or 0
-                
-                available_quantity = buy_quantity - sell_quantity
+                # Pending sell orders count as sold; cancelled and expired ones don't
+                available_quantity = available_shares(user, [market.id]).get((market.id, outcome, option_id), Decimal('0'))
                 
                 # Check if user is trying to sell more than they own
                 if amount > Decimal(str(available_quantity)):
@@ -290,24 +246,8 @@ def place_bet(request):
                 if amount > user.balance:
                     return JsonResponse({'error': f'Insufficient balance. Available: KES {user.balance}'}, status=400)
             else:  # sell
-                # Validate ownership
-                buy_quantity = Bet.objects.filter(
-                    user=user,
-                    market=market,
-                    outcome=outcome,
-                    action='BUY',
-                    option_id=option_id
-                ).aggregate(total=models.Sum('quantity'))['total'] or 0
-                
-                sell_quantity = Bet.objects.filter(
-                    user=user,
-                    market=market,
-                    outcome=outcome,
-                    action='SELL',
-                    option_id=option_id
-                ).aggregate(total=models.Sum('quantity'))['total'] or 0
-                
-                available_quantity = buy_quantity - sell_quantity
+                # Validate ownership, net of the user's other pending sell orders
+                available_quantity = available_shares(user, [market.id]).get((market.id, outcome, option_id), Decimal('0'))
                 
                 if amount > Decimal(str(available_quantity)):
                     return JsonResponse({
@@ -371,6 +311,15 @@ def place_bet(request):
             related_bet_id=bet.id
         )
         
+        # Binary market orders go through the per-market single writer when enabled
+        # (always for batch-auction markets); it persists q, probability, volume
+        # and price history in group commits
+        sequenced = (
+            market.market_type == 'BINARY'
+            and order_type == 'MARKET'
+            and (execution_mode() == MODE_SEQUENCER or market.clearing_mode == 'BATCH_AUCTION')
+        )
+        
         # LMSR-based price update for all markets
         # Execute the trade through LMSR services and update market state
         if market.market_type == 'BINARY':
@@ -379,9 +328,7 @@ def place_bet(request):
             if not open_status:
                 logger.warning(f"Market {market.id} is not open for trading: {reason}")
                 # Still update volume
-                current_volume = parse_volume_value(market.volume)
-                market.volume = format_volume_value(current_volume + int(amount))
-                market.save()
+                record_volume(market, amount)
                 # Return early - trade was recorded as limit order
                 return JsonResponse({
                     'status': 'market_closed',
@@ -390,10 +337,16 @@ def place_bet(request):
                 })
             
             try:
-                shares = float(calculated_quantity)
+                shares = share_units_to_float(quantity_units)
                 
                 # Execute trade based on action
-                if action == 'buy':
+                if sequenced:
+                    result = submit_trade(market.id, bet.id, outcome, action, shares, amount)
+                    market.q_yes = result['q_yes']
+                    market.q_no = result['q_no']
+                    market.trade_seq = result['trade_seq']
+                    market.volume_cents = result['volume_cents']
+                elif action == 'buy':
                     if outcome.upper() == 'YES':
                         result = buy_yes_shares(market, shares)
                     else:
@@ -406,14 +359,13 @@ def place_bet(request):
                 
                 # Process trading fee and distribute to LPs
                 if result:
-                    from markets.services import process_trading_fee
                     cost_or_payout = result.get('cost_kes') or result.get('payout_kes', 0)
                     process_trading_fee(market, cost_or_payout, bet)
                 
                 # Update balance for SELL orders with actual LMSR payout
                 if action == 'sell' and result:
-                    sell_payout_kes = result.get('payout_kes', Decimal('0'))
-                    user.balance += Decimal(str(sell_payout_kes))
+                    sell_payout_kes = from_cents(to_cents(result.get('payout_kes', 0)))
+                    user.balance += sell_payout_kes
                     user.save()
                     logger.info(
                         f"SELL balance updated for user {user.id}: "
@@ -429,46 +381,83 @@ def place_bet(request):
                     f"outcome={outcome}, action={action}, "
                     f"shares={shares}, new_price={market.yes_probability}%"
                 )
-                
+
+            except TimeoutError as e:
+                # The sequencer never took the order (it was cancelled): undo it
+                logger.error(f"Sequenced trade timed out for market {market.id}: {str(e)}")
+                if action == 'buy':
+                    user.balance += amount
+                    user.save()
+                Bet.objects.filter(id=bet.id).update(order_status='CANCELLED')
+                Transaction.objects.filter(related_bet=bet).update(status='FAILED')
+                return JsonResponse({
+                    'error': 'Market is busy and the order was cancelled, please try again',
+                    'bet_id': bet.id,
+                    'new_balance': str(user.balance),
+                }, status=503)
             except ValueError as e:
                 logger.error(f"Invalid LMSR trade for market {market.id}: {str(e)}")
                 # Trade still recorded, but market price doesn't move
+                sequenced = False
             except Exception as e:
                 logger.error(f"LMSR calculation error for market {market.id}: {str(e)}")
+                sequenced = False
         
-        elif market.market_type == 'OPTION_LIST' and market.options:
-            # LMSR for option markets (TODO: implement per-option LMSR)
-            # For now, simple probability adjustment
-            for opt in market.options:
-                if opt.get('id') == option_id:
-                    if outcome == 'Yes':
-                        opt['yes_probability'] = min(99, opt.get('yes_probability', 50) + 1)
-                    else:
-                        opt['no_probability'] = min(99, opt.get('no_probability', 50) + 1)
-                        opt['yes_probability'] = 100 - opt['no_probability']
-                    break
-            market.options = market.options  # Trigger update
+        elif market.market_type == 'OPTION_LIST' and order_type == 'MARKET':
+            # Multi-outcome LMSR: the market's option rows are locked, the traded one updated
+            open_status, reason = is_market_open(market)
+            if not open_status:
+                logger.warning(f"Market {market.id} is not open for trading: {reason}")
+            else:
+                try:
+                    result = trade_option_shares(market, option_id, share_units_to_float(quantity_units), outcome, action)
+                    
+                    cost_or_payout = result.get('cost_kes') or result.get('payout_kes', 0)
+                    process_trading_fee(market, cost_or_payout, bet)
+                    
+                    if action == 'sell':
+                        user.balance += from_cents(to_cents(result.get('payout_kes', 0)))
+                        user.save()
+                    
+                    logger.info(
+                        f"LMSR option trade executed: market={market.id}, option={option_id}, "
+                        f"outcome={outcome}, action={action}, new_price={result['new_yes_price']}%"
+                    )
+                except ValueError as e:
+                    logger.error(f"Invalid LMSR option trade for market {market.id}: {str(e)}")
+                except Exception as e:
+                    logger.error(f"LMSR option calculation error for market {market.id}: {str(e)}")
 
-        current_volume = parse_volume_value(market.volume)
-        market.volume = format_volume_value(current_volume + int(amount))
-        market.save()
+        if not sequenced:
+            market.save(update_fields=['yes_probability'])
+            record_volume(market, amount)
         
         # Record price history after market is updated
         from markets.models import PriceHistory
-        if market.market_type == 'BINARY':
+        # (sequenced trades get theirs from the sequencer's group commit)
+        if market.market_type == 'BINARY' and not sequenced:
             PriceHistory.objects.create(
                 market=market,
                 yes_probability=market.yes_probability,
                 no_probability=100 - market.yes_probability
             )
-        elif market.market_type == 'OPTION_LIST' and market.options:
-            for opt in market.options:
-                PriceHistory.objects.create(
-                    market=market,
-                    option_id=opt.get('id'),
-                    yes_probability=opt.get('yes_probability', 50),
-                    no_probability=opt.get('no_probability', 50)
-                )
+            if result:
+                on_price_change(market.id, result['new_yes_price'])
+        elif market.market_type == 'OPTION_LIST' and result:
+            # Only the traded option's snapshot changes hands
+            new_option_probability = int(round(result['new_yes_price']))
+            PriceHistory.objects.create(
+                market=market,
+                option_id=option_id,
+                yes_probability=new_option_probability,
+                no_probability=100 - new_option_probability
+            )
+        
+        invalidate_top_holders(market.id)
+        
+        if order_type == 'MARKET':
+            publish_trade(bet, result if isinstance(result, dict) else None)
+            publish_price_tick(market)
         
         action_verb = 'sold' if action == 'sell' else 'placed'
         logger.info(f"Bet {action_verb} by {user.phone_number}: {outcome} {amount} on market {market_id}")
@@ -480,8 +469,12 @@ def place_bet(request):
             'q_yes': float(market.q_yes),
             'q_no': float(market.q_no),
             'yes_probability': market.yes_probability,
+            'trade_seq': market.trade_seq,  # Pass to preview/quotes for read-your-writes
         }
         
+        if market.market_type == 'OPTION_LIST':
+            market_response['options'] = get_option_prices(market)
+        
         # Include execution price if available from LMSR trade
         if result and isinstance(result, dict):
             market_response['execution_price'] = result.get('execution_price', market.yes_probability)
@@ -564,29 +557,26 @@ def get_user_available_shares(request, market_id):
 def market_chat(request, market_id):
     """Chat messages for a single market."""
     try:
+        if request.method == 'GET':
+            # Same pages as /comments/, archived markets included
+            try:
+                cursor, limit = parse_page_params(request)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+            exists, archive = _lookup_market(market_id)
+            if not exists:
+                return JsonResponse({'error': 'Market not found'}, status=404)
+            messages, next_cursor = _comments_page(market_id, cursor, limit, archive)
+            return JsonResponse({
+                'messages': messages,
+                'next_cursor': next_cursor,
+            })
+
         try:
             market = Market.objects.get(id=market_id)
         except Market.DoesNotExist:
             return JsonResponse({'error': 'Market not found'}, status=404)
 
-        if request.method == 'GET':
-            messages = ChatMessage.objects.filter(market=market).select_related('user', 'parent__user').order_by('created_at')
-            return JsonResponse({
-                'messages': [
-                    {
-                        'id': msg.id,
-                        'user_id': msg.user.id,
-                        'user_name': msg.user.full_name,
-                        'phone_number': msg.user.phone_number,
-                        'message': msg.message,
-                        'created_at': msg.created_at.isoformat(),
-                        'parent_id': msg.parent_id,
-                        'parent_user_name': msg.parent.user.full_name if msg.parent else None,
-                    }
-                    for msg in messages
-                ]
-            })
-
         # POST
         user = get_authenticated_user(request)
         if not user:
@@ -614,16 +604,7 @@ def market_chat(request, market_id):
         )
 
         return JsonResponse({
-            'message': {
-                'id': chat_message.id,
-                'user_id': user.id,
-                'user_name': user.full_name,
-                'phone_number': user.phone_number,
-                'message': chat_message.message,
-                'created_at': chat_message.created_at.isoformat(),
-                'parent_id': chat_message.parent_id,
-                'parent_user_name': chat_message.parent.user.full_name if chat_message.parent else None,
-            }
+            'message': _serialize_comment(chat_message)
         }, status=201)
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -632,115 +613,215 @@ def market_chat(request, market_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _serialize_comment(msg: ChatMessage) -> dict:
+    return {
+        'id': msg.id,
+        'user_id': msg.user.id,
+        'user_name': msg.user.full_name,
+        'phone_number': msg.user.phone_number,
+        'message': msg.message,
+        'created_at': msg.created_at.isoformat(),
+        'parent_id': msg.parent_id,
+        'parent_user_name': msg.parent.user.full_name if msg.parent else None,
+    }
+
+
+def _serialize_activity(bet: Bet) -> dict:
+    verb = 'sold' if bet.action == 'SELL' else 'bought'
+    return {
+        'id': bet.id,
+        'user_id': bet.user.id,
+        'user_name': bet.user.full_name,
+        'action': f"{verb} {bet.quantity or 1} {bet.outcome}",
+        'outcome': bet.outcome,
+        'option_id': bet.option_id,
+        'quantity': float(bet.quantity) if bet.quantity is not None else None,
+        'amount': str(bet.amount),
+        'entry_probability': bet.entry_probability,
+        'limit_price': str(bet.limit_price) if bet.limit_price is not None else None,
+        'order_type': bet.order_type,
+        'order_status': bet.order_status,
+        'result': bet.result,
+        'timestamp': bet.timestamp.isoformat(),
+    }
+
+
+def _lookup_market(market_id: int) -> tuple:
+    """
+    (exists, MarketArchive or None) of a market in one query; archived
+    markets are read from their archive file (markets/archive.py).
+    """
+    row = Market.objects.filter(id=market_id).values_list('id', 'archive__id').first()
+    if row is None:
+        return False, None
+    return True, (MarketArchive.objects.get(id=row[1]) if row[1] else None)
+
+
+def _comments_page(market_id: int, cursor: int = None, limit: int = DEFAULT_PAGE_SIZE, archive=None) -> tuple:
+    if archive:
+        messages = attach_users(load_archive(archive, 'chat_messages'))
+        by_id = {msg.id: msg for msg in messages}
+        for msg in messages:
+            msg.parent = by_id.get(msg.parent_id)
+        rows, next_cursor = paginate_list_by_id(messages, cursor, limit, descending=False)
+    else:
+        queryset = ChatMessage.objects.filter(market_id=market_id).select_related('user', 'parent__user')
+        rows, next_cursor = paginate_by_id(queryset, cursor, limit, descending=False)
+    return [_serialize_comment(msg) for msg in rows], next_cursor
+
+
+def _activity_page(market_id: int, cursor: int = None, limit: int = DEFAULT_PAGE_SIZE, archive=None) -> tuple:
+    if archive:
+        rows, next_cursor = paginate_list_by_id(load_archive(archive, 'bets'), cursor, limit, descending=True)
+        attach_users(rows)
+    else:
+        queryset = Bet.objects.filter(market_id=market_id).select_related('user')
+        rows, next_cursor = paginate_by_id(queryset, cursor, limit, descending=True)
+    return [_serialize_activity(bet) for bet in rows], next_cursor
+
+
 @require_http_methods(["GET"])
+@replica_reads_view
 def market_details(request, market_id):
-    """Return market public details for comments, top holders, positions, and activity."""
+    """
+    Return the first page of each public section of a market.
+
+    Each section is bounded; clients follow `next_cursor` on the
+    comments/activity sub-resources to load more. `positions` is the first
+    activity page (it used to list every bet).
+    """
     try:
-        try:
-            market = Market.objects.get(id=market_id)
-        except Market.DoesNotExist:
+        exists, archive = _lookup_market(market_id)
+        if not exists:
             return JsonResponse({'error': 'Market not found'}, status=404)
 
-        comments = ChatMessage.objects.filter(market=market).select_related('user', 'parent__user').order_by('created_at')
-        bets = Bet.objects.filter(market=market).select_related('user').order_by('-timestamp')
+        comments, comments_cursor = _comments_page(market_id, archive=archive)
+        activity, activity_cursor = _activity_page(market_id, archive=archive)
 
-        # Build comment list
-        comment_data = [
-            {
-                'id': msg.id,
-                'user_id': msg.user.id,
-                'user_name': msg.user.full_name,
-                'phone_number': msg.user.phone_number,
-                'message': msg.message,
-                'created_at': msg.created_at.isoformat(),
-                'parent_id': msg.parent_id,
-                'parent_user_name': msg.parent.user.full_name if msg.parent else None,
-            }
-            for msg in comments
-        ]
+        return JsonResponse({
+            'market_id': market_id,
+            'comments': comments,
+            'top_holders': archive.top_holders if archive else get_top_holders(market_id),
+            'activity': activity,
+            # Kept for older clients: the same first page as `activity`
+            'positions': activity,
+            'next_cursors': {
+                'comments': comments_cursor,
+                'activity': activity_cursor,
+            },
+        })
+    except Exception as e:
+        logger.error(f"Market details error: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
 
-        # Public positions list
-        positions = [
-            {
-                'id': bet.id,
-                'user_id': bet.user.id,
-                'user_name': bet.user.full_name,
-                'outcome': bet.outcome,
-                'order_type': bet.order_type,
-                'limit_price': str(bet.limit_price) if bet.limit_price is not None else None,
-                'quantity': bet.quantity,
-                'amount': str(bet.amount),
-                'entry_probability': bet.entry_probability,
-                'result': bet.result,
-                'timestamp': bet.timestamp.isoformat(),
-            }
-            for bet in bets
-        ]
 
-        # Group top holders by user and outcome
-        holder_map = {}
-        for bet in bets:
-            key = (bet.user.id, bet.outcome)
-            if key not in holder_map:
-                holder_map[key] = {
-                    'user_id': bet.user.id,
-                    'user_name': bet.user.full_name,
-                    'outcome': bet.outcome,
-                    'shares': 0,
-                    'average_price': Decimal('0.00'),
-                    'amount_total': Decimal('0.00'),
-                }
-            holder_map[key]['shares'] += bet.quantity or 1
-            holder_map[key]['amount_total'] += bet.amount
-
-        for holder in holder_map.values():
-            shares = Decimal(holder['shares']) if holder['shares'] else Decimal('1')
-            holder['average_price'] = str((holder['amount_total'] / shares).quantize(Decimal('0.01')))
-            holder['shares'] = int(holder['shares'])
-            holder.pop('amount_total', None)
-
-        yes_holders = sorted(
-            [holder for holder in holder_map.values() if holder['outcome'] == 'Yes'],
-            key=lambda h: h['shares'],
-            reverse=True
-        )
-        no_holders = sorted(
-            [holder for holder in holder_map.values() if holder['outcome'] == 'No'],
-            key=lambda h: h['shares'],
-            reverse=True
-        )
+HOLDER_OUTCOMES = {'yes': 'Yes', 'no': 'No'}
 
-        # Build activity stream
-        activity = [
-            {
-                'id': bet.id,
-                'user_id': bet.user.id,
-                'user_name': bet.user.full_name,
-                'action': f"bought {bet.quantity or 1} {bet.outcome}",
-                'amount': str(bet.amount),
-                'limit_price': str(bet.limit_price) if bet.limit_price is not None else None,
-                'order_type': bet.order_type,
-                'timestamp': bet.timestamp.isoformat(),
-            }
-            for bet in bets
-        ]
 
+@require_http_methods(["GET"])
+def market_comments(request, market_id):
+    """
+    Cursor-paginated comments for a market, oldest first.
+
+    GET /api/markets/<market_id>/comments/?cursor=<id>&limit=20
+    """
+    try:
+        cursor, limit = parse_page_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    exists, archive = _lookup_market(market_id)
+    if not exists:
+        return JsonResponse({'error': 'Market not found'}, status=404)
+
+    comments, next_cursor = _comments_page(market_id, cursor, limit, archive)
+    return JsonResponse({
+        'market_id': market_id,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    })
+
+
+@require_http_methods(["GET"])
+def market_activity(request, market_id):
+    """
+    Cursor-paginated trade activity for a market, newest first.
+
+    GET /api/markets/<market_id>/activity/?cursor=<id>&limit=20
+    """
+    try:
+        cursor, limit = parse_page_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    exists, archive = _lookup_market(market_id)
+    if not exists:
+        return JsonResponse({'error': 'Market not found'}, status=404)
+
+    activity, next_cursor = _activity_page(market_id, cursor, limit, archive)
+    return JsonResponse({
+        'market_id': market_id,
+        'activity': activity,
+        'next_cursor': next_cursor,
+    })
+
+
+@require_http_methods(["GET"])
+def market_holders(request, market_id):
+    """
+    Holders of a market, largest position first.
+
+    Without `outcome`, returns the first page of YES and NO holders plus a
+    cursor for each; with it, pages through that outcome's holders.
+
+    GET /api/markets/<market_id>/holders/?limit=20
+    GET /api/markets/<market_id>/holders/?outcome=yes&cursor=<rank>&limit=20
+    """
+    try:
+        cursor, limit = parse_page_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    outcome = request.GET.get('outcome')
+    if outcome is not None and outcome.lower() not in HOLDER_OUTCOMES:
+        return JsonResponse({'error': 'outcome must be yes or no'}, status=400)
+
+    exists, archive = _lookup_market(market_id)
+    if not exists:
+        return JsonResponse({'error': 'Market not found'}, status=404)
+
+    def holders_page(key: str, page_cursor: int = None) -> tuple:
+        if archive:
+            offset = page_cursor or 0
+            holders = archived_holders(archive, HOLDER_OUTCOMES[key])
+            return holders[offset:offset + limit], (offset + limit if len(holders) > offset + limit else None)
+        return get_holders_page(market_id, HOLDER_OUTCOMES[key], page_cursor, limit)
+
+    try:
+        if outcome is not None:
+            holders, next_cursor = holders_page(outcome.lower(), cursor)
+            return JsonResponse({
+                'market_id': market_id,
+                'outcome': HOLDER_OUTCOMES[outcome.lower()],
+                'holders': holders,
+                'next_cursor': next_cursor,
+            })
+
+        top_holders, next_cursors = {}, {}
+        for key in HOLDER_OUTCOMES:
+            top_holders[key], next_cursors[key] = holders_page(key)
         return JsonResponse({
-            'market_id': market.id,
-            'comments': comment_data,
-            'positions': positions,
-            'top_holders': {
-                'yes': yes_holders,
-                'no': no_holders,
-            },
-            'activity': activity,
+            'market_id': market_id,
+            'top_holders': top_holders,
+            'next_cursors': next_cursors,
         })
     except Exception as e:
-        logger.error(f"Market details error: {str(e)}")
+        logger.error(f"Market holders error: {str(e)}")
         return JsonResponse({'error': str(e)}, status=500)
 
 
 @require_http_methods(['GET'])
+@replica_reads_view
 def get_price_history(request, market_id):
     """Get historical price data for a market based on time period"""
     try:
@@ -763,37 +844,39 @@ def get_price_history(request, market_id):
         }
         
         start_time = time_ranges.get(period, now - timedelta(days=365))
+        # Nothing predates the market: keeps the scan to its monthly partitions
+        start_time = max(start_time, market.created_at)
         
         # Fetch price history
         from markets.models import PriceHistory
         query = PriceHistory.objects.filter(
             market=market,
-            timestamp__gte=start_time
+            timestamp__gte=start_time,
+            timestamp__lte=now
         )
         if option_id:
             query = query.filter(option_id=option_id)
         else:
             query = query.filter(option_id__isnull=True)  # For BINARY markets
         
-        history = query.order_by('timestamp')
-        
-        # If no history, return empty array
-        if not history.exists():
-            return JsonResponse({
-                'market_id': market.id,
-                'period': period,
-                'option_id': option_id,
-                'data': []
-            })
+        history = query.order_by('timestamp').values_list('timestamp', 'yes_probability', 'no_probability')
+        archive = get_archive(market.id) if market.status == 'RESOLVED' else None
+        if archive:
+            wanted_option = int(option_id) if option_id else None
+            history = sorted(
+                (h.timestamp, h.yes_probability, h.no_probability)
+                for h in load_archive(archive, 'price_history')
+                if h.option_id == wanted_option and start_time <= h.timestamp <= now
+            )
         
-        # Format data for frontend
+        # Format data for frontend (empty array if no history)
         data = [
             {
-                'timestamp': h.timestamp.isoformat(),
-                'yes_probability': h.yes_probability,
-                'no_probability': h.no_probability,
+                'timestamp': timestamp.isoformat(),
+                'yes_probability': yes_probability,
+                'no_probability': no_probability,
             }
-            for h in history
+            for timestamp, yes_probability, no_probability in history
         ]
         
         return JsonResponse({
@@ -820,8 +903,12 @@ def preview_trade_price(request):
         "market_id": 1,
         "outcome": "Yes",
         "amount": 5000,
-        "action": "buy"  // or "sell"
+        "action": "buy",  // or "sell"
+        "trade_seq": 42  // optional: newest trade the client has seen
     }
+    
+    Answered from the hot market state cache; an entry older than `trade_seq`
+    is reloaded from the database.
     """
     try:
         data = json.loads(request.body)
@@ -850,7 +937,14 @@ def preview_trade_price(request):
         except ValidationError as e:
             return JsonResponse({'error': e.message}, status=400)
         
-        market = Market.objects.get(id=market_id)
+        min_version = data.get('trade_seq')
+        if min_version is not None:
+            try:
+                min_version = int(min_version)
+            except (TypeError, ValueError):
+                return JsonResponse({'error': 'trade_seq must be an integer'}, status=400)
+        
+        market = get_market_state(market_id, min_version=min_version)
         
         # Check if market is open
         open_status, reason = is_market_open(market)
@@ -881,6 +975,7 @@ def preview_trade_price(request):
                     'current_no_price': current_prices['no_price_kes'],
                     'estimated_execution_price': current_price_kes,
                     'estimated_shares': round(estimated_shares, 2),
+                    'trade_seq': market.trade_seq,
                     'is_lmsr': True,
                     'message': f"You'll receive approximately {estimated_shares:.2f} shares at KES {current_price_kes} per share"
                 })
@@ -899,6 +994,7 @@ def preview_trade_price(request):
                     'current_no_price': current_prices['no_price_kes'],
                     'estimated_execution_price': current_price_kes,
                     'estimated_proceeds_kes': round(estimated_proceeds, 2),
+                    'trade_seq': market.trade_seq,
                     'is_lmsr': True,
                     'message': f"You'll receive approximately {estimated_proceeds:.2f} KES for {shares_to_sell} shares"
                 })
@@ -915,6 +1011,89 @@ def preview_trade_price(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+MAX_QUOTE_MARKETS = 50
+MAX_QUOTE_SIZES = 25
+
+
+def _parse_quote_sizes(request) -> list:
+    """Read `sizes` (comma-separated KES amounts); None means the default grid."""
+    raw = request.GET.get('sizes')
+    if not raw:
+        return None
+    sizes = sorted({int(size) for size in raw.split(',') if size.strip()})
+    if not sizes or len(sizes) > MAX_QUOTE_SIZES:
+        raise ValueError(f'sizes must list 1 to {MAX_QUOTE_SIZES} amounts')
+    if sizes[0] < 1 or sizes[-1] > 1000000:
+        raise ValueError('sizes must be between 1 and 1,000,000 KES')
+    return sizes
+
+
+def _quote_or_error(market_id: int, market, sizes: list) -> dict:
+    """Quote for a market state, or an `error` entry (market is None if not found)."""
+    if market is None:
+        return {'market_id': market_id, 'error': 'Market not found'}
+    if market.market_type != 'BINARY':
+        return {'market_id': market_id, 'error': 'Quotes are only available for binary markets'}
+    return get_market_quote(market, sizes)
+
+
+@require_http_methods(["GET"])
+def market_quote(request, market_id):
+    """
+    Exact LMSR slippage curve and depth chart for one market.
+    
+    GET /api/markets/<market_id>/quote/?sizes=100,1000,10000
+    
+    For each outcome, `buy` rows spend each size in KES and `sell` rows sell the
+    shares worth that size at the current price. Each row has the shares, the
+    average and post-trade prices, the price impact and the slippage (in %).
+    Served from the market state cache and cached per trade_seq.
+    """
+    try:
+        sizes = _parse_quote_sizes(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    try:
+        try:
+            market = get_market_state(market_id)
+        except Market.DoesNotExist:
+            market = None
+        quote = _quote_or_error(market_id, market, sizes)
+        if 'error' in quote:
+            return JsonResponse({'error': quote['error']}, status=404 if quote['error'] == 'Market not found' else 400)
+        return JsonResponse(quote)
+    except Exception as e:
+        logger.error(f"Quote error for market {market_id}: {str(e)}")
+        return JsonResponse({'error': 'Failed to compute quote'}, status=500)
+
+
+@require_http_methods(["GET"])
+def market_quotes(request):
+    """
+    Slippage curves for several markets in one call.
+    
+    GET /api/markets/quotes/?market_ids=1,2,3&sizes=100,1000,10000
+    
+    Returns {"quotes": [...]}; markets that cannot be quoted carry an `error`.
+    """
+    try:
+        sizes = _parse_quote_sizes(request)
+        market_ids = [int(market_id) for market_id in request.GET.get('market_ids', '').split(',') if market_id.strip()]
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    if not market_ids or len(market_ids) > MAX_QUOTE_MARKETS:
+        return JsonResponse({'error': f'market_ids must list 1 to {MAX_QUOTE_MARKETS} markets'}, status=400)
+    
+    try:
+        states = get_market_states(market_ids)
+        return JsonResponse({'quotes': [_quote_or_error(market_id, states.get(market_id), sizes) for market_id in market_ids]})
+    except Exception as e:
+        logger.error(f"Quotes error: {str(e)}")
+        return JsonResponse({'error': 'Failed to compute quotes'}, status=500)
+
+
 @require_http_methods(["POST"])
 @csrf_exempt
 def bootstrap_market_liquidity(request):
@@ -926,7 +1105,9 @@ def bootstrap_market_liquidity(request):
     {
         "market_id": 1,
         "initial_probability": 50,  # YES probability (0-100)
-        "b": 100.0  # Liquidity parameter (optional, defaults to 100)
+        "b": 100.0,  # Liquidity parameter (optional, defaults to 100)
+        "liquidity_mode": "FIXED",  # FIXED, LS_LMSR or POOL (optional)
+        "liquidity_alpha": 0.05  # LS_LMSR sensitivity (optional)
     }
     """
     try:
@@ -934,6 +1115,8 @@ def bootstrap_market_liquidity(request):
         market_id = data.get('market_id')
         initial_probability = data.get('initial_probability', 50)
         b = float(data.get('b', 100.0))
+        liquidity_mode = data.get('liquidity_mode', 'FIXED')
+        liquidity_alpha = float(data.get('liquidity_alpha', 0.0))
         
         # Check if user is authenticated and is staff/admin
         user = get_authenticated_user(request)
@@ -950,12 +1133,23 @@ def bootstrap_market_liquidity(request):
         except (ValueError, TypeError):
             return JsonResponse({'error': 'Invalid initial probability'}, status=400)
         
+        if liquidity_mode not in dict(Market.LIQUIDITY_MODE_CHOICES):
+            return JsonResponse({'error': 'liquidity_mode must be FIXED, LS_LMSR or POOL'}, status=400)
+        if liquidity_alpha < 0 or (liquidity_mode == 'LS_LMSR' and liquidity_alpha <= 0):
+            return JsonResponse({'error': 'LS_LMSR markets need a positive liquidity_alpha'}, status=400)
+        
         market = Market.objects.get(id=market_id)
         
         # Check if already bootstrapped
         if market.q_yes != 0 or market.q_no != 0:
             return JsonResponse({'error': 'Market already bootstrapped'}, status=400)
         
+        if liquidity_mode == 'POOL':
+            # POOL markets take b from LP capital; bootstrap at that b so a
+            # later rescale (which changes only b) starts from it
+            from .liquidity_service import pool_liquidity_b
+            b = pool_liquidity_b(market)
+        
         # Calculate q_yes and q_no for desired probability
         from .bootstrap import bootstrap_market
         q_yes, q_no = bootstrap_market(initial_prob / 100.0, b)
@@ -963,12 +1157,15 @@ def bootstrap_market_liquidity(request):
         market.q_yes = q_yes
         market.q_no = q_no
         market.b = b
+        market.liquidity_mode = liquidity_mode
+        market.liquidity_alpha = liquidity_alpha
         market.yes_probability = int(initial_prob)
+        market.trade_seq += 1
         market.save()
         
         logger.info(
             f"Bootstrapped market {market_id} with "
-            f"q_yes={q_yes}, q_no={q_no}, b={b}, initial_prob={initial_prob}%"
+            f"q_yes={q_yes}, q_no={q_no}, b={b}, mode={liquidity_mode}, initial_prob={initial_prob}%"
         )
         
         return JsonResponse({
@@ -977,6 +1174,8 @@ def bootstrap_market_liquidity(request):
             'q_yes': round(q_yes, 6),
             'q_no': round(q_no, 6),
             'b': b,
+            'liquidity_mode': liquidity_mode,
+            'liquidity_alpha': liquidity_alpha,
             'initial_probability': initial_prob,
             'message': f'Market bootstrapped with {initial_prob}% YES probability'
         })
@@ -1014,31 +1213,35 @@ def get_bitcoin_market(request):
 
 
 @require_http_methods(["GET"])
-def get_bitcoin_price(request):
+async def get_bitcoin_price(request):
     """
     Get current Bitcoin price only (lightweight endpoint)
     
     Endpoint: GET /api/markets/bitcoin/price/
     
+    Served from the cached feed kept fresh by the price poller, so the
+    request never waits on CoinGecko/Binance. Async, so polling clients
+    don't occupy a worker under the ASGI server.
+    
     Returns:
         - current_price: Bitcoin price in USD
         - timestamp: When the price was fetched
         - source: Which API provided the data
     """
     try:
-        price = BitcoinPriceService.get_current_bitcoin_price()
+        tick = await BitcoinPriceService.aget_latest_tick()
         
-        if price is None:
+        if tick is None:
             return JsonResponse(
                 {'error': 'Unable to fetch Bitcoin price'},
                 status=503
             )
         
         return JsonResponse({
-            'current_price': price,
-            'formatted_price': f"${price:,.2f}",
-            'timestamp': timezone.now().isoformat(),
-            'source': 'coingecko'
+            'current_price': tick['price'],
+            'formatted_price': f"${tick['price']:,.2f}",
+            'timestamp': tick['timestamp'],
+            'source': tick['source']
         }, status=200)
     except Exception as e:
         logger.error(f"Error fetching Bitcoin price: {str(e)}")
@@ -1048,3 +1251,15 @@ def get_bitcoin_price(request):
         )
 
 
+@require_http_methods(["GET"])
+def get_bitcoin_price_history(request):
+    """
+    Get recent Bitcoin price ticks from the cached ring buffer
+    
+    Endpoint: GET /api/markets/bitcoin/price/history/
+    """
+    ticks = BitcoinPriceService.get_price_history()
+    return JsonResponse({
+        'ticks': ticks,
+        'count': len(ticks),
+    }, status=200)
@@ -0,0 +1,135 @@
+"""
+Market Volume Counters
+
+Traded volume is kept in integer cents (KES minor units):
+- Market.volume_cents: all-time total, bumped with an F() expression so
+  concurrent trades never lose an update (indexed for sorting by volume)
+- MarketVolumeBucket: per-market hourly totals, summed for the rolling 24h
+  and 7d volume; buckets past VOLUME_BUCKET_RETENTION_DAYS are pruned daily
+
+The "KES 1.2M" display string is only built when a market is serialized
+(`format_volume`, Market.volume).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import Market, MarketVolumeBucket
+from .money import CENTS_PER_KES, to_cents
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600
+ROLLING_WINDOWS = {
+    'volume_24h': timedelta(hours=24),
+    'volume_7d': timedelta(days=7),
+}
+
+
+def format_volume(cents: int) -> str:
+    """Format a volume in cents as a display string ("KES 1.2M", "KES 950K")."""
+    amount = cents // CENTS_PER_KES
+    if amount >= 1_000_000:
+        return f"KES {amount / 1_000_000:.1f}M".replace('.0M', 'M')
+    if amount >= 1_000:
+        return f"KES {amount / 1_000:.1f}K".replace('.0K', 'K')
+    return f"KES {amount}"
+
+
+def bucket_start(at=None):
+    at = at or timezone.now()
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+def add_bucket_volume_cents(market_id: int, cents: int, at=None) -> None:
+    """Add `cents` to a market's hourly bucket (the total is the caller's)."""
+    if not cents:
+        return
+    start = bucket_start(at)
+    bucket = MarketVolumeBucket.objects.filter(market_id=market_id, bucket_start=start)
+    if bucket.update(volume_cents=F('volume_cents') + cents):
+        return
+    try:
+        with transaction.atomic():
+            MarketVolumeBucket.objects.create(market_id=market_id, bucket_start=start, volume_cents=cents)
+    except IntegrityError:
+        # Another trade opened the bucket first
+        bucket.update(volume_cents=F('volume_cents') + cents)
+
+
+def add_volume_cents(market_id: int, cents: int, at=None) -> None:
+    """Add `cents` to a market's total and to its current hourly bucket."""
+    if not cents:
+        return
+    Market.objects.filter(id=market_id).update(volume_cents=F('volume_cents') + cents)
+    add_bucket_volume_cents(market_id, cents, at)
+
+
+def record_volume(market, amount) -> int:
+    """
+    Count a trade's amount (KES) in the market's volume.
+
+    The in-memory market's volume_cents moves by the same amount so the
+    caller can serialize it without reloading.
+
+    Returns:
+        The amount in cents
+    """
+    cents = to_cents(amount)
+    add_volume_cents(market.id, cents)
+    market.volume_cents += cents
+    return cents
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def rolling_volumes(market_ids) -> dict:
+    """
+    Rolling 24h and 7d volume in cents, in one grouped query.
+
+    Returns:
+        {market_id: {'volume_24h': cents, 'volume_7d': cents}}; markets
+        without recent trades are left out
+    """
+    now = timezone.now()
+    annotations = {
+        name: Sum('volume_cents', filter=Q(bucket_start__gt=bucket_start(now - window)))
+        for name, window in ROLLING_WINDOWS.items()
+    }
+    rows = (
+        MarketVolumeBucket.objects
+        .filter(market_id__in=list(market_ids), bucket_start__gt=bucket_start(now - ROLLING_WINDOWS['volume_7d']))
+        .values('market_id')
+        .annotate(**annotations)
+    )
+    return {row.pop('market_id'): {name: value or 0 for name, value in row.items()} for row in rows}
+
+
+def volume_fields(market, rolling: dict = None) -> dict:
+    """Volume fields of a serialized market (display strings plus cents)."""
+    rolling = rolling or {}
+    fields = {'volume': format_volume(market.volume_cents), 'volume_cents': market.volume_cents}
+    for name in ROLLING_WINDOWS:
+        cents = rolling.get(name, 0)
+        fields[name] = format_volume(cents)
+        fields[f"{name}_cents"] = cents
+    return fields
+
+
+def prune_volume_buckets() -> int:
+    """Delete buckets older than VOLUME_BUCKET_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.VOLUME_BUCKET_RETENTION_DAYS)
+    deleted, _ = MarketVolumeBucket.objects.filter(bucket_start__lt=cutoff).delete()
+    logger.info(f"Pruned {deleted} volume buckets")
+    return deleted
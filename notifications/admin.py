@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, PriceAlert
 
 
 @admin.register(Notification)
@@ -28,3 +28,12 @@ class NotificationAdmin(admin.ModelAdmin):
         }),
     )
     date_hierarchy = 'created_at'
+
+
+@admin.register(PriceAlert)
+class PriceAlertAdmin(admin.ModelAdmin):
+    list_display = ('user', 'market', 'direction', 'threshold', 'is_active', 'triggered_at', 'created_at')
+    list_filter = ('direction', 'is_active', 'created_at')
+    search_fields = ('user__phone_number', 'market__question')
+    raw_id_fields = ('user', 'market')
+    readonly_fields = ('triggered_at', 'created_at')
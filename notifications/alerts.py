@@ -0,0 +1,132 @@
+"""
+Price Alerts
+
+Users subscribe to "tell me when market X rises above / falls below p%".
+Active alerts of each market sit in a sorted threshold index
+(markets.threshold_books), consulted by markets.triggers.on_price_change
+after every committed trade: two bisections find the alerts the new price
+crossed, O(log n + k), so thousands of alerts on a popular market cost the
+trade path nothing until they fire.
+
+Crossed alerts are claimed with one UPDATE and delivered with one batched
+Notification bulk_create.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from api.validators import validate_amount, ValidationError
+from markets.threshold_books import ThresholdBooks
+from markets.utils.threshold_index import FALLS, RISES
+from .models import Notification, PriceAlert
+
+logger = logging.getLogger(__name__)
+
+MAX_ACTIVE_ALERTS_PER_USER = 100
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def _active_alerts(market_id: int):
+    return PriceAlert.objects.filter(market_id=market_id, is_active=True)
+
+
+def _load_alert_book(market_id: int):
+    alerts = _active_alerts(market_id).values_list('id', 'direction', 'threshold')
+    return [
+        (alert_id, RISES if direction == 'ABOVE' else FALLS, threshold)
+        for alert_id, direction, threshold in alerts
+    ]
+
+
+def _alert_book_version(market_id: int) -> tuple:
+    # Without a shared cache: any process creating an alert moves this
+    totals = _active_alerts(market_id).aggregate(top=Max('id'), count=Count('id'))
+    return totals['top'], totals['count']
+
+
+alert_books = ThresholdBooks('price_alert_book', _load_alert_book, _alert_book_version)
+
+
+def create_price_alert(user, market, threshold, direction: str = None) -> PriceAlert:
+    """
+    Subscribe a user to a market's YES probability crossing `threshold`.
+
+    Args:
+        direction: 'ABOVE' or 'BELOW' (default: whichever side of the
+            current probability the threshold is on)
+
+    Raises:
+        ValidationError: Invalid threshold/direction, closed market, an
+            alert that is already satisfied, or too many active alerts
+    """
+    from markets.services import get_market_prices
+
+    if market.status != 'OPEN':
+        raise ValidationError(f'Market is {market.status}')
+    if market.market_type != 'BINARY':
+        raise ValidationError('Price alerts are only available on binary markets')
+
+    threshold = validate_amount(threshold, min_amount=Decimal('0.01'), max_amount=Decimal('99.99'))
+    current = get_market_prices(market)['yes_price_pct']
+
+    if direction in (None, ''):
+        direction = 'ABOVE' if float(threshold) > current else 'BELOW'
+    direction = str(direction).upper()
+    if direction not in ('ABOVE', 'BELOW'):
+        raise ValidationError('direction must be ABOVE or BELOW')
+    if (direction == 'ABOVE' and current >= float(threshold)) or (direction == 'BELOW' and current <= float(threshold)):
+        raise ValidationError(f'Market is already at {current}%')
+
+    if PriceAlert.objects.filter(user=user, is_active=True).count() >= MAX_ACTIVE_ALERTS_PER_USER:
+        raise ValidationError(f'You can have at most {MAX_ACTIVE_ALERTS_PER_USER} active price alerts')
+
+    alert = PriceAlert.objects.create(user=user, market=market, threshold=threshold, direction=direction)
+    transaction.on_commit(lambda: alert_books.bump(market.id))
+    return alert
+
+
+def deliver_price_alerts(market_id: int, yes_price_pct: float) -> int:
+    """
+    Fire the alerts a new YES price crossed.
+
+    Returns:
+        Number of notifications sent
+    """
+    crossed = alert_books.crossed(market_id, yes_price_pct)
+    if not crossed:
+        return 0
+
+    from markets.models import Market
+
+    with transaction.atomic():
+        # Another worker may have fired some of them already
+        rows = list(
+            PriceAlert.objects.select_for_update(skip_locked=True)
+            .filter(id__in=crossed, is_active=True)
+            .values_list('id', 'user_id', 'direction', 'threshold')
+        )
+        if rows:
+            PriceAlert.objects.filter(id__in=[row[0] for row in rows]).update(
+                is_active=False, triggered_at=timezone.now()
+            )
+            question = Market.objects.filter(id=market_id).values_list('question', flat=True).first() or ''
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id,
+                    type='PRICE_ALERT',
+                    title='Price Alert',
+                    message=f'"{question}" is now at {yes_price_pct:.0f}% YES ({"above" if direction == "ABOVE" else "below"} your {threshold}% alert)',
+                    color_class='blue',
+                    related_market_id=market_id,
+                )
+                for _, user_id, direction, threshold in rows
+            ], batch_size=NOTIFICATION_BATCH_SIZE)
+
+    alert_books.discard(market_id, crossed)
+    if rows:
+        logger.info(f"Delivered {len(rows)} price alerts on market {market_id}")
+    return len(rows)
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('markets', '0025_bet_trigger_orders'),
+        ('notifications', '0002_rename_notification_user_id_created_idx_notificatio_user_id_05b4bc_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('WELCOME', 'Welcome'), ('ACCOUNT_VERIFIED', 'Account Verified'), ('DEPOSIT_CONFIRMED', 'Deposit Confirmed'), ('DEPOSIT_FAILED', 'Deposit Failed'), ('WITHDRAWAL_CONFIRMED', 'Withdrawal Confirmed'), ('WITHDRAWAL_FAILED', 'Withdrawal Failed'), ('BET_PLACED', 'Bet Placed'), ('BET_WON', 'Bet Won'), ('BET_LOST', 'Bet Lost'), ('MARKET_RESOLVED', 'Market Resolved'), ('NEW_MARKET', 'New Market Available'), ('PAYOUT_PROCESSED', 'Payout Processed'), ('KYC_REQUIRED', 'KYC Required'), ('KYC_APPROVED', 'KYC Approved'), ('KYC_REJECTED', 'KYC Rejected'), ('SYSTEM_MESSAGE', 'System Message'), ('PRICE_ALERT', 'Price Alert')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.DecimalField(decimal_places=2, help_text='YES probability in %', max_digits=5)),
+                ('direction', models.CharField(choices=[('ABOVE', 'Rises to or above'), ('BELOW', 'Falls to or below')], max_length=5)),
+                ('is_active', models.BooleanField(default=True)),
+                ('triggered_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_alerts', to='markets.market')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['market', 'is_active'], name='notificatio_market__40b7e9_idx'), models.Index(fields=['user', 'is_active'], name='notificatio_user_id_3e55f6_idx')],
+            },
+        ),
+    ]
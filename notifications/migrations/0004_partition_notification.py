@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    """Convert Notification to monthly range partitions (PostgreSQL only)."""
+    from api.partitioning import partition_table
+
+    partition_table(schema_editor, 'notifications_notification', 'created_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_price_alert'),
+    ]
+
+    operations = [
+        # Reversing keeps the partitioned table; it holds the same columns
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -20,6 +20,7 @@ class Notification(models.Model):
         ('KYC_APPROVED', 'KYC Approved'),
         ('KYC_REJECTED', 'KYC Rejected'),
         ('SYSTEM_MESSAGE', 'System Message'),
+        ('PRICE_ALERT', 'Price Alert'),
     ]
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
@@ -46,3 +47,30 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"{self.user.phone_number} - {self.type} - {self.title}"
+
+
+class PriceAlert(models.Model):
+    """One-shot alert when a market's YES probability crosses a threshold."""
+
+    DIRECTION_CHOICES = [
+        ('ABOVE', 'Rises to or above'),
+        ('BELOW', 'Falls to or below'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='price_alerts')
+    market = models.ForeignKey('markets.Market', on_delete=models.CASCADE, related_name='price_alerts')
+    threshold = models.DecimalField(max_digits=5, decimal_places=2, help_text='YES probability in %')
+    direction = models.CharField(max_length=5, choices=DIRECTION_CHOICES)
+    is_active = models.BooleanField(default=True)
+    triggered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['market', 'is_active']),  # Loading a market's threshold index
+            models.Index(fields=['user', 'is_active']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.phone_number} - market {self.market_id} {self.direction} {self.threshold}%"
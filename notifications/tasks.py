@@ -0,0 +1,32 @@
+"""
+Celery tasks for notification fan-out
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import celery - will be available in production
+try:
+    from celery import shared_task
+except ImportError:
+    # Development mode without Celery
+    def shared_task(*args, **kwargs):
+        """Dummy decorator when Celery is not installed"""
+        def decorator(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def deliver_price_alerts(market_id, yes_price_pct):
+        """Notify the users whose price alerts a trade crossed"""
+        from notifications.alerts import deliver_price_alerts as deliver
+        return deliver(market_id, yes_price_pct)
+except:
+    def deliver_price_alerts(market_id, yes_price_pct):
+        from notifications.alerts import deliver_price_alerts as deliver
+        return deliver(market_id, yes_price_pct)
@@ -1,8 +1,10 @@
 from django.urls import path
-from notifications.views import get_notifications, mark_notification_read, mark_all_read
+from notifications.views import get_notifications, mark_notification_read, mark_all_read, price_alerts, delete_price_alert
 
 urlpatterns = [
     path('notifications/', get_notifications, name='get_notifications'),
     path('notifications/<int:notification_id>/read/', mark_notification_read, name='mark_notification_read'),
     path('notifications/mark-all-read/', mark_all_read, name='mark_all_read'),
+    path('notifications/price-alerts/', price_alerts, name='price_alerts'),
+    path('notifications/price-alerts/<int:alert_id>/', delete_price_alert, name='delete_price_alert'),
 ]
@@ -3,42 +3,14 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 import json
 import logging
-from notifications.models import Notification
-from users.models import CustomUser
-from api.validators import normalize_phone_number
+from notifications.models import Notification, PriceAlert
+from users.identity import get_authenticated_user
 
 logger = logging.getLogger(__name__)
 
 # add africa talking notifications especially for payouts and market resolved. 
 
 
-def get_authenticated_user(request):
-    """Get authenticated user from session or X-User-Phone-Number/X-User-Email header"""
-    # Try session-based auth first
-    if request.user and request.user.is_authenticated:
-        return request.user
-    
-    # Fall back to phone number header-based auth
-    phone_number = request.headers.get('X-User-Phone-Number')
-    if phone_number:
-        try:
-            # Normalize phone number
-            phone_number = normalize_phone_number(phone_number)
-            return CustomUser.objects.get(phone_number=phone_number)
-        except CustomUser.DoesNotExist:
-            return None
-    
-    # Fall back to email header-based auth (for Google OAuth users)
-    email = request.headers.get('X-User-Email')
-    if email:
-        try:
-            return CustomUser.objects.get(email=email)
-        except CustomUser.DoesNotExist:
-            return None
-    
-    return None
-
-
 @require_http_methods(["GET"])
 def get_notifications(request):
     """Get notifications for authenticated user"""
@@ -141,6 +113,85 @@ def mark_all_read(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _serialize_price_alert(alert) -> dict:
+    return {
+        'id': alert.id,
+        'market_id': alert.market_id,
+        'threshold': str(alert.threshold),
+        'direction': alert.direction,
+        'is_active': alert.is_active,
+        'triggered_at': alert.triggered_at.isoformat() if alert.triggered_at else None,
+        'created_at': alert.created_at.isoformat(),
+    }
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def price_alerts(request):
+    """
+    List or create price alerts.
+    
+    GET /api/notifications/price-alerts/ - the user's alerts (active first)
+    POST /api/notifications/price-alerts/
+    {"market_id": int, "threshold": float, "direction": "ABOVE" | "BELOW" (optional)}
+    """
+    from markets.models import Market
+    from api.validators import ValidationError
+    from notifications.alerts import create_price_alert
+    
+    try:
+        user = get_authenticated_user(request)
+        if not user:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        
+        if request.method == 'GET':
+            alerts = PriceAlert.objects.filter(user=user).order_by('-is_active', '-created_at')[:100]
+            return JsonResponse({'price_alerts': [_serialize_price_alert(alert) for alert in alerts]})
+        
+        data = json.loads(request.body)
+        if not data.get('market_id') or data.get('threshold') in (None, ''):
+            return JsonResponse({'error': 'market_id and threshold are required'}, status=400)
+        
+        try:
+            market = Market.objects.get(id=data['market_id'])
+        except Market.DoesNotExist:
+            return JsonResponse({'error': 'Market not found'}, status=404)
+        
+        try:
+            alert = create_price_alert(user, market, data['threshold'], data.get('direction'))
+        except ValidationError as e:
+            return JsonResponse({'error': e.message}, status=400)
+        
+        return JsonResponse({'price_alert': _serialize_price_alert(alert)}, status=201)
+    
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        logger.error(f"Error handling price alerts: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["DELETE"])
+def delete_price_alert(request, alert_id):
+    """Deactivate a price alert"""
+    try:
+        user = get_authenticated_user(request)
+        if not user:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        
+        # Other workers' threshold indexes drop the entry on their next crossing
+        updated = PriceAlert.objects.filter(id=alert_id, user=user, is_active=True).update(is_active=False)
+        if not updated:
+            return JsonResponse({'error': 'Price alert not found'}, status=404)
+        
+        return JsonResponse({'message': 'Price alert removed'})
+    
+    except Exception as e:
+        logger.error(f"Error deleting price alert: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 def create_notification(user, type_choice, title, message, color_class='blue', 
                        related_market_id=None, related_transaction_id=None, related_bet_id=None):
     """Helper function to create notifications"""
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Transaction
+from .models import Transaction, OutboxMessage
 
 
 @admin.register(Transaction)
@@ -24,3 +24,11 @@ class TransactionAdmin(admin.ModelAdmin):
         }),
     )
     date_hierarchy = 'created_at'
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'dedup_key', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'task')
+    search_fields = ('dedup_key',)
+    readonly_fields = ('created_at', 'sent_at')
@@ -14,6 +14,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Sum
 from decimal import Decimal
 import logging
+from api.db_router import replica_reads
 from payments.transaction_safety import verify_user_balance_consistency
 from users.models import CustomUser
 from payments.models import Transaction
@@ -42,6 +43,11 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        # Report-only runs read a replica; --fix corrects balances from primary reads
+        with replica_reads(not options['fix']):
+            self._reconcile(options)
+
+    def _reconcile(self, options):
         self.stdout.write(self.style.SUCCESS('\n' + '='*70))
         self.stdout.write(self.style.SUCCESS('BALANCE RECONCILIATION REPORT'))
         self.stdout.write(self.style.SUCCESS('='*70 + '\n'))
@@ -25,7 +25,8 @@ class Transaction(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     reference = models.CharField(max_length=50, null=True, blank=True)
     description = models.CharField(max_length=200, null=True, blank=True)
-    related_bet = models.ForeignKey('markets.Bet', on_delete=models.SET_NULL, null=True, blank=True)
+    # No DB constraint: Bet is partitioned, its key is (id, timestamp)
+    related_bet = models.ForeignKey('markets.Bet', on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False)
     mpesa_response = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -35,3 +36,39 @@ class Transaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+
+
+class OutboxMessage(models.Model):
+    """
+    Celery task dispatch recorded in the same DB transaction as the state it
+    refers to; payments.outbox relays it to the broker after commit.
+    """
+
+    PENDING = 'PENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),  # Gave up after OUTBOX_MAX_ATTEMPTS
+    ]
+
+    task = models.CharField(max_length=200)  # Dotted path, e.g. payments.settlement_tasks.send_b2c_payout
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    dedup_key = models.CharField(max_length=200, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),  # Relay scans pending entries in order
+        ]
+
+    def __str__(self):
+        return f"{self.task}{tuple(self.args)} - {self.status}"
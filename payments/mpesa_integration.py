@@ -6,9 +6,16 @@ from decimal import Decimal
 from datetime import datetime
 import logging
 from decouple import config
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+# Daraja tokens live 3600 s; shared by every process and request
+TOKEN_CACHE_KEY = 'mpesa_integration_access_token'
+TOKEN_CACHE_SECONDS = 3300
+TOKEN_MAX_RETRIES = 3
+HTTP_TIMEOUT_SECONDS = 30
+
 class MpesaIntegration:
     """
     M-Pesa integration for STK Push payments
@@ -26,7 +33,7 @@ class MpesaIntegration:
     
     def get_access_token(self):
         """Get OAuth access token from M-Pesa"""
-        max_retries = 3
+        max_retries = TOKEN_MAX_RETRIES
         
         for attempt in range(max_retries):
             try:
@@ -37,7 +44,7 @@ class MpesaIntegration:
                 auth = (self.consumer_key, self.consumer_secret)
                 endpoint = f"{self.base_url}/oauth/v1/generate?grant_type=client_credentials"
                 
-                response = requests.get(endpoint, auth=auth, timeout=30)  # Increased timeout
+                response = requests.get(endpoint, auth=auth, timeout=HTTP_TIMEOUT_SECONDS)
                 
                 logger.info(f"Token response status: {response.status_code}")
                 logger.info(f"Token response text: {response.text}")
@@ -52,6 +59,7 @@ class MpesaIntegration:
                     logger.error(f"No access_token in response: {data}")
                     raise Exception(f"M-Pesa response missing access_token: {data}")
                 
+                cache.set(TOKEN_CACHE_KEY, self.access_token, TOKEN_CACHE_SECONDS)
                 logger.info(f"✅ M-Pesa access token generated successfully")
                 logger.info(f"Token (first 20 chars): {self.access_token[:20]}...")
                 return self.access_token
@@ -80,20 +88,173 @@ class MpesaIntegration:
         raise Exception("Failed to get M-Pesa token after all retries")
     
     def get_valid_token(self):
-        """Get valid access token, refresh if needed"""
-        if not self.access_token or not self.token_expiry:
-            logger.info("No cached token, fetching new one...")
-            return self.get_access_token()
+        """Get valid access token from the shared cache, refresh if needed"""
+        token = cache.get(TOKEN_CACHE_KEY)
+        if token:
+            return token
+        logger.info("No cached token, fetching new one...")
+        return self.get_access_token()
+    
+    async def aget_access_token(self):
+        """Async get_access_token over the pooled HTTP client"""
+        import httpx
+        from api.http_client import get_async_client
+        
+        endpoint = f"{self.base_url}/oauth/v1/generate?grant_type=client_credentials"
+        for attempt in range(TOKEN_MAX_RETRIES):
+            last_attempt = attempt == TOKEN_MAX_RETRIES - 1
+            try:
+                response = await get_async_client().get(endpoint, auth=(self.consumer_key, self.consumer_secret))
+                response.raise_for_status()
+                data = response.json()
+                self.access_token = data.get('access_token')
+                self.token_expiry = datetime.now()
+                if not self.access_token:
+                    logger.error(f"No access_token in response: {data}")
+                    raise Exception(f"M-Pesa response missing access_token: {data}")
+                await cache.aset(TOKEN_CACHE_KEY, self.access_token, TOKEN_CACHE_SECONDS)
+                logger.info(f"✅ M-Pesa access token generated successfully")
+                return self.access_token
+            except httpx.TimeoutException:
+                logger.warning(f"⏱️ Attempt {attempt + 1}: Timeout. Retrying...")
+                if last_attempt:
+                    raise Exception(f"M-Pesa API timeout after {TOKEN_MAX_RETRIES} attempts (Safaricom API is slow or unreachable)")
+            except httpx.HTTPStatusError as e:
+                error_msg = f"HTTP Error {e.response.status_code}: {e.response.text}"
+                logger.error(f"❌ Attempt {attempt + 1}: {error_msg}")
+                if last_attempt:
+                    raise Exception(error_msg)
+            except Exception as e:
+                logger.error(f"❌ Attempt {attempt + 1}: {str(e)}")
+                if last_attempt:
+                    raise
+        
+        raise Exception("Failed to get M-Pesa token after all retries")
+    
+    async def aget_valid_token(self):
+        """Async get_valid_token"""
+        token = await cache.aget(TOKEN_CACHE_KEY)
+        if token:
+            return token
+        return await self.aget_access_token()
+    
+    @staticmethod
+    def _normalize_msisdn(phone_number):
+        """Normalize phone number (remove +, add 254 if not present)"""
+        phone_number = str(phone_number).replace('+', '').replace(' ', '')
+        if phone_number.startswith('0'):
+            return '254' + phone_number[1:]
+        elif not phone_number.startswith('254'):
+            return '254' + phone_number
+        return phone_number
+    
+    @staticmethod
+    def _auth_headers(token):
+        return {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {token}'
+        }
+    
+    @staticmethod
+    def _error_response(description, customer_message):
+        return {
+            'ResponseCode': '1',
+            'ResponseDescription': description,
+            'CustomerMessage': customer_message
+        }
+    
+    def _stk_push_payload(self, phone_number, amount, account_reference):
+        """
+        Build the STK push request.
+        
+        Returns:
+            (payload, None) or (None, error response)
+        """
+        phone_number = self._normalize_msisdn(phone_number)
+        if not self._validate_phone_number(phone_number):
+            return None, self._error_response('Invalid phone number format', 'Please enter a valid M-Pesa phone number')
         
-        # Token expires in 3600 seconds, refresh at 59 minute mark
-        from datetime import timedelta
-        time_diff = datetime.now() - self.token_expiry
-        if time_diff > timedelta(minutes=59):
-            logger.info(f"Token expired ({time_diff.total_seconds()}s ago), fetching new one...")
-            return self.get_access_token()
+        amount = Decimal(str(amount))
+        if amount < 1 or amount > 150000:
+            return None, self._error_response('Invalid amount', 'Amount must be between 1 and 150,000 KES')
         
-        logger.info(f"Using cached token (generated {time_diff.total_seconds():.0f}s ago)")
-        return self.access_token
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        return {
+            'BusinessShortCode': self.shortcode,
+            'Password': self._generate_password(timestamp),
+            'Timestamp': timestamp,
+            'TransactionType': 'CustomerPayBillOnline',
+            'Amount': int(amount),
+            'PartyA': phone_number,
+            'PartyB': self.shortcode,
+            'PhoneNumber': phone_number,
+            'CallBackURL': self._get_callback_url(),
+            'AccountReference': account_reference,
+            'TransactionDesc': f'Kibeezy deposit: {account_reference}'
+        }, None
+    
+    @staticmethod
+    def _stk_push_result(data):
+        return {
+            'CheckoutRequestID': data.get('CheckoutRequestID'),
+            'ResponseCode': data.get('ResponseCode'),
+            'ResponseDescription': data.get('ResponseDescription'),
+            'CustomerMessage': data.get('CustomerMessage'),
+            'MerchantRequestID': data.get('MerchantRequestID')
+        }
+    
+    def new_originator_conversation_id(self):
+        """Unique OriginatorConversationID for a B2C request."""
+        return f"{self.shortcode}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{str(uuid.uuid4())[:8]}"
+    
+    def _b2c_payload(self, phone_number, amount, description, originator_conv_id=None):
+        """
+        Build the B2C v3 request.
+        
+        Args:
+            originator_conv_id: Caller-assigned OriginatorConversationID, so
+                the transaction can be matched before the request is sent
+                (default: a new one)
+        
+        Returns:
+            (payload, None) or (None, error response)
+        """
+        phone_number = self._normalize_msisdn(phone_number)
+        if not self._validate_phone_number(phone_number):
+            return None, self._error_response('Invalid phone number format', 'Please enter a valid M-Pesa phone number')
+        
+        amount = Decimal(str(amount))
+        if amount < 10 or amount > 150000:
+            return None, self._error_response('Invalid amount', 'Amount must be between 10 and 150,000 KES')
+        
+        # Unique OriginatorConversationID (REQUIRED per Safaricom spec for idempotency)
+        originator_conv_id = originator_conv_id or self.new_originator_conversation_id()
+        
+        # Payload per official Safaricom B2C API v3 specification
+        return {
+            'OriginatorConversationID': originator_conv_id,  # REQUIRED: Unique ID to avoid double disbursement
+            'InitiatorName': config('MPESA_INITIATOR_NAME', default='testapi'),
+            'SecurityCredential': self._get_security_credential(),
+            'CommandID': 'BusinessPayment',  # Or SalaryPayment, PromotionPayment
+            'Amount': int(amount),  # Integer amount in KES
+            'PartyA': self.shortcode,  # B2C shortcode/paybill
+            'PartyB': phone_number,  # Customer phone (254XXXXXXXXX)
+            'Remarks': description,  # 2-100 characters
+            'QueueTimeOutURL': self._get_b2c_callback_url(),
+            'ResultURL': self._get_b2c_callback_url(),
+            'Occasion': 'Market Winnings'  # 1-100 characters
+        }, None
+    
+    @staticmethod
+    def _b2c_result(data):
+        logger.info(f"✅ B2C Acknowledgment: ResponseCode={data.get('ResponseCode')}, ConversationID={data.get('ConversationID')}")
+        return {
+            'ConversationID': data.get('ConversationID'),
+            'OriginatorConversationID': data.get('OriginatorConversationID'),
+            'ResponseCode': data.get('ResponseCode'),
+            'ResponseDescription': data.get('ResponseDescription'),
+            'RequestId': data.get('RequestId')
+        }
     
     def initiate_stk_push(self, phone_number, amount, account_reference='Kibeezy'):
         """
@@ -113,68 +274,21 @@ class MpesaIntegration:
                 'MerchantRequestID': '...'
             }
         """
+        payload = None
         try:
-            # Normalize phone number (remove +, add 254 if not present)
-            phone_number = str(phone_number).replace('+', '').replace(' ', '')
-            if phone_number.startswith('0'):
-                phone_number = '254' + phone_number[1:]
-            elif not phone_number.startswith('254'):
-                phone_number = '254' + phone_number
-            
-            # Validate phone number
-            if not self._validate_phone_number(phone_number):
-                return {
-                    'ResponseCode': '1',
-                    'ResponseDescription': 'Invalid phone number format',
-                    'CustomerMessage': 'Please enter a valid M-Pesa phone number'
-                }
-            
-            # Validate amount
-            amount = Decimal(str(amount))
-            if amount < 1 or amount > 150000:
-                return {
-                    'ResponseCode': '1',
-                    'ResponseDescription': 'Invalid amount',
-                    'CustomerMessage': 'Amount must be between 1 and 150,000 KES'
-                }
-            
-            # Generate timestamp and password
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            password = self._generate_password(timestamp)
+            payload, error = self._stk_push_payload(phone_number, amount, account_reference)
+            if error:
+                return error
             
             logger.info(f"Getting valid token for STK push...")
             token = self.get_valid_token()
-            logger.info(f"Using token (first 20 chars): {token[:20]}...")
-            
             endpoint = f"{self.base_url}/mpesa/stkpush/v1/processrequest"
             
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
-            
-            logger.info(f"Authorization header: Bearer {token[:20]}...")
-            
-            payload = {
-                'BusinessShortCode': self.shortcode,
-                'Password': password,
-                'Timestamp': timestamp,
-                'TransactionType': 'CustomerPayBillOnline',
-                'Amount': int(amount),
-                'PartyA': phone_number,
-                'PartyB': self.shortcode,
-                'PhoneNumber': phone_number,
-                'CallBackURL': self._get_callback_url(),
-                'AccountReference': account_reference,
-                'TransactionDesc': f'Kibeezy deposit: {account_reference}'
-            }
-            
             logger.info(f"📤 Sending STK Push request to: {endpoint}")
-            logger.info(f"   Phone: {phone_number}, Amount: {amount}")
-            logger.info(f"   Token: {token[:30]}...")
+            logger.info(f"   Phone: {payload['PhoneNumber']}, Amount: {payload['Amount']}")
             logger.info(f"   Callback: {payload.get('CallBackURL')}")
             
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=30)  # Increased timeout
+            response = requests.post(endpoint, json=payload, headers=self._auth_headers(token), timeout=HTTP_TIMEOUT_SECONDS)
             
             logger.info(f"📥 STK Push response status: {response.status_code}")
             logger.info(f"   Response: {response.text}")
@@ -183,14 +297,7 @@ class MpesaIntegration:
             
             data = response.json()
             logger.info(f"✅ STK Push initiated successfully: {data}")
-            
-            return {
-                'CheckoutRequestID': data.get('CheckoutRequestID'),
-                'ResponseCode': data.get('ResponseCode'),
-                'ResponseDescription': data.get('ResponseDescription'),
-                'CustomerMessage': data.get('CustomerMessage'),
-                'MerchantRequestID': data.get('MerchantRequestID')
-            }
+            return self._stk_push_result(data)
             
         except requests.exceptions.HTTPError as e:
             # Log the response body for debugging
@@ -223,7 +330,7 @@ class MpesaIntegration:
                 'CustomerMessage': 'An error occurred. Please try again.'
             }
     
-    def b2c_payment(self, phone_number, amount, description='Kibeezy Withdrawal'):
+    def b2c_payment(self, phone_number, amount, description='Kibeezy Withdrawal', originator_conversation_id=None):
         """
         B2C payment for withdrawals/payouts
         
@@ -231,6 +338,7 @@ class MpesaIntegration:
             phone_number: Receiving phone number (0xxxxxxxxx or 254xxxxxxxxx)
             amount: Amount in KES
             description: Transaction description
+            originator_conversation_id: Pre-assigned request id (optional)
             
         Returns:
             {
@@ -241,82 +349,25 @@ class MpesaIntegration:
             }
         """
         try:
-            # Normalize phone number (remove +, add 254 if not present)
-            phone_number = str(phone_number).replace('+', '').replace(' ', '')
-            if phone_number.startswith('0'):
-                phone_number = '254' + phone_number[1:]
-            elif not phone_number.startswith('254'):
-                phone_number = '254' + phone_number
-            
-            # Validate phone number
-            if not self._validate_phone_number(phone_number):
-                return {
-                    'ResponseCode': '1',
-                    'ResponseDescription': 'Invalid phone number format',
-                    'CustomerMessage': 'Please enter a valid M-Pesa phone number'
-                }
-            
-            # Validate amount
-            amount = Decimal(str(amount))
-            if amount < 10 or amount > 150000:
-                return {
-                    'ResponseCode': '1',
-                    'ResponseDescription': 'Invalid amount',
-                    'CustomerMessage': 'Amount must be between 10 and 150,000 KES'
-                }
+            payload, error = self._b2c_payload(phone_number, amount, description, originator_conversation_id)
+            if error:
+                return error
             
             token = self.get_valid_token()
             
             # B2C v3 endpoint per official Safaricom spec
             endpoint = f"{self.base_url}/mpesa/b2c/v3/paymentrequest"
             
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
-            
-            # Generate unique OriginatorConversationID (REQUIRED per Safaricom spec for idempotency)
-            originator_conv_id = f"{self.shortcode}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{str(uuid.uuid4())[:8]}"
-            
-            # Payload per official Safaricom B2C API v3 specification
-            payload = {
-                'OriginatorConversationID': originator_conv_id,  # REQUIRED: Unique ID to avoid double disbursement
-                'InitiatorName': config('MPESA_INITIATOR_NAME', default='testapi'),
-                'SecurityCredential': self._get_security_credential(),
-                'CommandID': 'BusinessPayment',  # Or SalaryPayment, PromotionPayment
-                'Amount': int(amount),  # Integer amount in KES
-                'PartyA': self.shortcode,  # B2C shortcode/paybill
-                'PartyB': phone_number,  # Customer phone (254XXXXXXXXX)
-                'Remarks': description,  # 2-100 characters
-                'QueueTimeOutURL': self._get_b2c_callback_url(),
-                'ResultURL': self._get_b2c_callback_url(),
-                'Occasion': 'Market Winnings'  # 1-100 characters
-            }
-            
-            logger.info(f"📤 B2C v3 Request: recipient={phone_number}, amount={amount}")
-            logger.info(f"   OriginatorConversationID={originator_conv_id}")
-            logger.info(f"   PartyA={self.shortcode}, PartyB={phone_number}")
+            logger.info(f"📤 B2C v3 Request: recipient={payload['PartyB']}, amount={payload['Amount']}")
+            logger.info(f"   OriginatorConversationID={payload['OriginatorConversationID']}")
             
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=30)
+            response = requests.post(endpoint, json=payload, headers=self._auth_headers(token), timeout=HTTP_TIMEOUT_SECONDS)
             
             logger.info(f"📥 B2C v3 Immediate Acknowledgment: {response.status_code}")
             
             response.raise_for_status()
             
-            data = response.json()
-            logger.info(f"✅ B2C Acknowledgment Response:")
-            logger.info(f"   ResponseCode={data.get('ResponseCode')}")
-            logger.info(f"   ConversationID={data.get('ConversationID')}")
-            logger.info(f"   OriginatorConversationID={data.get('OriginatorConversationID')}")
-            logger.info(f"   (Actual transaction result will be sent via callback)")
-            
-            return {
-                'ConversationID': data.get('ConversationID'),
-                'OriginatorConversationID': data.get('OriginatorConversationID'),
-                'ResponseCode': data.get('ResponseCode'),
-                'ResponseDescription': data.get('ResponseDescription'),
-                'RequestId': data.get('RequestId')
-            }
+            return self._b2c_result(response.json())
             
         except requests.exceptions.HTTPError as e:
             error_response = ""
@@ -347,6 +398,80 @@ class MpesaIntegration:
                 'CustomerMessage': 'An error occurred. Please try again.'
             }
     
+    async def ainitiate_stk_push(self, phone_number, amount, account_reference='Kibeezy'):
+        """Async initiate_stk_push over the pooled HTTP client (same response shape)"""
+        import httpx
+        from api.http_client import get_async_client
+        
+        payload = None
+        try:
+            payload, error = self._stk_push_payload(phone_number, amount, account_reference)
+            if error:
+                return error
+            
+            token = await self.aget_valid_token()
+            endpoint = f"{self.base_url}/mpesa/stkpush/v1/processrequest"
+            logger.info(f"📤 Sending STK Push request to: {endpoint}")
+            logger.info(f"   Phone: {payload['PhoneNumber']}, Amount: {payload['Amount']}")
+            
+            response = await get_async_client().post(endpoint, json=payload, headers=self._auth_headers(token))
+            logger.info(f"📥 STK Push response status: {response.status_code}")
+            response.raise_for_status()
+            
+            data = response.json()
+            logger.info(f"✅ STK Push initiated successfully: {data}")
+            return self._stk_push_result(data)
+            
+        except httpx.HTTPStatusError as e:
+            try:
+                error_response = e.response.json()
+            except ValueError:
+                error_response = e.response.text
+            logger.error(f"M-Pesa API HTTP Error {e.response.status_code}: {error_response}")
+            logger.error(f"Request payload was: {payload}")
+            return self._error_response(f'M-Pesa API Error: {error_response}', 'Payment service error. Please contact support.')
+        except httpx.RequestError as e:
+            logger.error(f"M-Pesa API request failed: {str(e)}")
+            return self._error_response('Network error', 'Payment service temporarily unavailable. Please try again.')
+        except Exception as e:
+            logger.error(f"STK Push error: {str(e)}")
+            return self._error_response(str(e), 'An error occurred. Please try again.')
+    
+    async def ab2c_payment(self, phone_number, amount, description='Kibeezy Withdrawal', originator_conversation_id=None):
+        """Async b2c_payment over the pooled HTTP client (same response shape)"""
+        import httpx
+        from api.http_client import get_async_client
+        
+        try:
+            payload, error = self._b2c_payload(phone_number, amount, description, originator_conversation_id)
+            if error:
+                return error
+            
+            token = await self.aget_valid_token()
+            endpoint = f"{self.base_url}/mpesa/b2c/v3/paymentrequest"
+            logger.info(f"📤 B2C v3 Request: recipient={payload['PartyB']}, amount={payload['Amount']}")
+            logger.info(f"   OriginatorConversationID={payload['OriginatorConversationID']}")
+            
+            response = await get_async_client().post(endpoint, json=payload, headers=self._auth_headers(token))
+            logger.info(f"📥 B2C v3 Immediate Acknowledgment: {response.status_code}")
+            response.raise_for_status()
+            
+            return self._b2c_result(response.json())
+            
+        except httpx.HTTPStatusError as e:
+            try:
+                error_response = e.response.json()
+            except ValueError:
+                error_response = e.response.text
+            logger.error(f"M-Pesa B2C v3 API HTTP Error {e.response.status_code}: {error_response}")
+            return self._error_response(f'M-Pesa API Error: {error_response}', 'Withdrawal service error. Please contact support.')
+        except httpx.RequestError as e:
+            logger.error(f"M-Pesa B2C v3 API request failed: {str(e)}")
+            return self._error_response('Network error', 'Withdrawal service temporarily unavailable. Please try again.')
+        except Exception as e:
+            logger.error(f"B2C v3 Payment error: {str(e)}")
+            return self._error_response(str(e), 'An error occurred. Please try again.')
+    
     def _get_security_credential(self):
         """Get security credential for B2C - encrypted password from settings"""
         # Use the encrypted credential from environment
@@ -373,11 +498,6 @@ class MpesaIntegration:
             
             endpoint = f"{self.base_url}/mpesa/stkpushquery/v1/query"
             
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
-            
             payload = {
                 'BusinessShortCode': self.shortcode,
                 'Password': password,
@@ -385,7 +505,7 @@ class MpesaIntegration:
                 'CheckoutRequestID': checkout_request_id
             }
             
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=30)
+            response = requests.post(endpoint, json=payload, headers=self._auth_headers(token), timeout=HTTP_TIMEOUT_SECONDS)
             response.raise_for_status()
             
             return response.json()
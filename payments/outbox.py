@@ -0,0 +1,180 @@
+"""
+Transactional Outbox for Celery Dispatch
+
+Instead of calling task.delay() inside a DB transaction (which enqueues work
+even if the transaction later rolls back, and costs one broker round trip per
+call while row locks are held), callers write OutboxMessage rows with
+`enqueue` / `enqueue_many` in the same transaction as the state the task
+acts on.
+
+After commit, `relay_outbox` publishes pending rows in batches over a single
+broker connection and marks them SENT. The `relay_outbox` beat task is the
+safety net for rows whose post-commit relay never ran (process crash, broker
+outage).
+
+Every message carries a dedup key (unique in the table), so enqueuing the
+same dispatch twice is a no-op. Delivery to Celery is at-least-once (a crash
+between publishing and marking SENT republishes the batch); the tasks fed
+through here are idempotent, which makes dispatch exactly-once-effective.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_size() -> int:
+    return getattr(settings, 'OUTBOX_RELAY_BATCH_SIZE', 500)
+
+
+def _max_attempts() -> int:
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 10)
+
+
+def _default_dedup_key(task: str, args) -> str:
+    return f"{task}:{':'.join(str(arg) for arg in args)}"
+
+
+def enqueue(task: str, args: list = None, kwargs: dict = None, dedup_key: str = None) -> str:
+    """
+    Record one task dispatch in the current transaction.
+
+    Args:
+        task: Dotted path of the Celery task
+        args / kwargs: JSON-serializable task arguments
+        dedup_key: Unique key for this dispatch (default: task + args)
+
+    Returns:
+        The dedup key, which is also the Celery task id once relayed
+    """
+    args = args or []
+    dedup_key = dedup_key or _default_dedup_key(task, args)
+    enqueue_many(task, [(args, kwargs or {}, dedup_key)])
+    return dedup_key
+
+
+def enqueue_many(task: str, calls: list) -> None:
+    """
+    Record many dispatches of one task with a single INSERT.
+
+    Args:
+        task: Dotted path of the Celery task
+        calls: [(args, kwargs, dedup_key)]; dedup_key may be None
+    """
+    messages = [
+        OutboxMessage(
+            task=task,
+            args=list(args),
+            kwargs=dict(kwargs),
+            dedup_key=dedup_key or _default_dedup_key(task, args),
+        )
+        for args, kwargs, dedup_key in calls
+    ]
+    if not messages:
+        return
+
+    OutboxMessage.objects.bulk_create(messages, batch_size=_batch_size(), ignore_conflicts=True)
+    # Relay as soon as the enclosing transaction commits (immediately in autocommit)
+    transaction.on_commit(relay_outbox_after_commit)
+
+
+def relay_outbox_after_commit() -> None:
+    try:
+        relay_outbox()
+    except Exception as e:
+        logger.error(f"Outbox relay failed: {str(e)}")
+
+
+def _publish(messages: list) -> tuple:
+    """
+    Publish a batch over one broker connection.
+
+    Returns:
+        (sent_ids, {message_id: error})
+    """
+    sent, failed = [], {}
+    producer_context = None
+    try:
+        from celery import current_app
+        producer_context = current_app.producer_or_acquire()
+    except ImportError:
+        pass  # Development without Celery: tasks run inline below
+
+    def _send(producer):
+        for message in messages:
+            try:
+                task = import_string(message.task)
+                if hasattr(task, 'apply_async'):
+                    task.apply_async(
+                        args=message.args,
+                        kwargs=message.kwargs,
+                        task_id=message.dedup_key,
+                        producer=producer,
+                    )
+                else:
+                    task(*message.args, **message.kwargs)
+                sent.append(message.id)
+            except Exception as e:
+                failed[message.id] = str(e)
+
+    if producer_context is None:
+        _send(None)
+    else:
+        with producer_context as producer:
+            _send(producer)
+    return sent, failed
+
+
+def relay_outbox(batch_size: int = None) -> dict:
+    """
+    Publish pending outbox messages in batches until none are left.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+    relays (post-commit hooks, the beat task) never publish the same batch.
+
+    Returns:
+        {'sent': int, 'failed': int}
+    """
+    batch_size = batch_size or _batch_size()
+    total_sent = total_failed = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxMessage.PENDING)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+
+            sent, failed = _publish(batch)
+            if sent:
+                OutboxMessage.objects.filter(id__in=sent).update(
+                    status=OutboxMessage.SENT, sent_at=timezone.now(), attempts=F('attempts') + 1
+                )
+            for message in batch:
+                if message.id in failed:
+                    message.attempts += 1
+                    message.last_error = failed[message.id][:1000]
+                    if message.attempts >= _max_attempts():
+                        message.status = OutboxMessage.FAILED
+                        logger.error(f"Outbox message {message.id} ({message.task}) failed permanently: {message.last_error}")
+                    message.save(update_fields=['attempts', 'last_error', 'status'])
+
+        total_sent += len(sent)
+        total_failed += len(failed)
+        if failed or len(batch) < batch_size:
+            break  # Broker trouble or drained; the beat task picks up the rest
+
+    if total_sent or total_failed:
+        logger.info(f"Outbox relay: sent={total_sent}, failed={total_failed}")
+    return {'sent': total_sent, 'failed': total_failed}
@@ -4,20 +4,58 @@ LMSR-based settlement: payouts = shares × 100 KES per share
 """
 import logging
 from decimal import Decimal
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from celery import shared_task
+from api.task_queues import payout_slots, singleton_lock
 from markets.models import Market, Bet
 from payments.models import Transaction
 from users.models import CustomUser
 from payments.daraja_b2c import call_b2c, normalize_phone
-from markets.lmsr import PAYOUT_PER_SHARE
+from markets.money import from_cents, payout_cents, to_cents, to_share_units
+from payments.outbox import enqueue, enqueue_many
 
 logger = logging.getLogger(__name__)
 
 # Minimum payout threshold
 MIN_PAYOUT = Decimal('10')  # Don't send payouts < KES 10
 
+SETTLE_MARKET_TASK = 'payments.settlement_tasks.settle_market'
+SEND_B2C_PAYOUT_TASK = 'payments.settlement_tasks.send_b2c_payout'
+
+
+def enqueue_settlement(market_id, attempt: str = '') -> str:
+    """
+    Dispatch settle_market through the outbox.
+
+    Args:
+        attempt: Distinguishes deliberate re-dispatches (an admin resolving
+            the market again after a settlement ran out of retries) from the
+            original dispatch, which the dedup key otherwise suppresses
+
+    Returns:
+        The Celery task id
+    """
+    return enqueue(
+        SETTLE_MARKET_TASK, [market_id],
+        dedup_key=f"settle_market:{market_id}{':' + attempt if attempt else ''}",
+    )
+
+
+def enqueue_payouts(transaction_ids, attempt: str = '') -> None:
+    """
+    Dispatch send_b2c_payout for many transactions with one outbox INSERT.
+
+    Args:
+        attempt: Distinguishes deliberate re-sends (admin retries) from the
+            original dispatch, which the dedup key otherwise suppresses
+    """
+    enqueue_many(SEND_B2C_PAYOUT_TASK, [
+        ([tx_id], {}, f"send_b2c_payout:{tx_id}{':' + attempt if attempt else ''}")
+        for tx_id in transaction_ids
+    ])
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def settle_market(self, market_id):
@@ -77,13 +115,16 @@ def settle_market(self, market_id):
             # Create payout transactions for each winner
             # In LMSR, payout = shares × 100 KES (fixed per share)
             payout_count = 0
-            payout_amount_total = Decimal('0')
+            payout_cents_total = 0
+            payout_tx_ids = []  # Dispatched through the outbox when this transaction commits
             
             for bet in winning_bets:
-                # LMSR payout: shares × 100 KES
-                shares = Decimal(str(bet.quantity))
-                payout_amount = shares * PAYOUT_PER_SHARE
-                profit = payout_amount - Decimal(str(bet.amount))
+                # LMSR payout: shares × 100 KES, rounded to the cent once so
+                # the bet, its transaction and the total agree
+                shares = bet.quantity
+                bet_payout_cents = payout_cents(to_share_units(shares))
+                payout_amount = from_cents(bet_payout_cents)
+                profit = from_cents(bet_payout_cents - to_cents(bet.amount))
                 
                 # Create transaction record
                 external_ref = f"CACHE-{market.id}-{bet.id}-{timezone.now().timestamp()}"
@@ -112,7 +153,7 @@ def settle_market(self, market_id):
                 
                 # Enqueue B2C call
                 if payout_amount >= MIN_PAYOUT:
-                    send_b2c_payout.delay(tx.id)
+                    payout_tx_ids.append(tx.id)
                     payout_count += 1
                 else:
                     logger.info(f"Payout {payout_amount} below minimum {MIN_PAYOUT}, marking as failed")
@@ -120,7 +161,7 @@ def settle_market(self, market_id):
                     tx.mpesa_response = {'error': 'payout_below_minimum'}
                     tx.save()
                 
-                payout_amount_total += payout_amount
+                payout_cents_total += bet_payout_cents
             
             # Mark losing bets - explicitly set payout to zero
             for bet in losing_bets:
@@ -130,7 +171,7 @@ def settle_market(self, market_id):
                 
                 logger.info(
                     f"Bet {bet.id} loser: "
-                    f"shares={Decimal(str(bet.quantity))}, payout=0"
+                    f"shares={bet.quantity}, payout=0"
                 )
             
             # Update market
@@ -138,13 +179,16 @@ def settle_market(self, market_id):
             market.resolved_at = timezone.now()
             market.save()
             
+            # Written in this transaction, relayed to Celery in batches after commit
+            enqueue_payouts(payout_tx_ids)
+            
             return {
                 'status': 'settled',
                 'market_id': market_id,
                 'winner_count': winning_bets.count(),
                 'loser_count': losing_bets.count(),
                 'payout_transactions_created': payout_count,
-                'payout_amount_total': str(payout_amount_total)
+                'payout_amount_total': str(from_cents(payout_cents_total))
             }
     
     except Market.DoesNotExist:
@@ -162,10 +206,11 @@ def send_b2c_payout(self, transaction_id):
     Initiate B2C payout call for a payout transaction
     
     Flow:
-    1. Fetch transaction
-    2. Call B2C API
-    3. Store response metadata
-    4. Wait for callback to update status
+    1. Take a payout slot (at most PAYOUT_MAX_CONCURRENCY B2C calls in flight)
+    2. Fetch transaction
+    3. Call B2C API
+    4. Store response metadata
+    5. Wait for callback to update status
     
     Args:
         transaction_id: Transaction.id of type PAYOUT
@@ -173,6 +218,15 @@ def send_b2c_payout(self, transaction_id):
     Returns:
         dict with B2C response metadata
     """
+    with payout_slots.slot() as acquired:
+        if not acquired:
+            # Re-queue instead of retrying so the wait does not use up B2C retries
+            send_b2c_payout.apply_async(args=[transaction_id], countdown=settings.PAYOUT_SLOT_RETRY_SECONDS)
+            return {'status': 'deferred', 'transaction_id': transaction_id}
+        return _send_b2c_payout(self, transaction_id)
+
+
+def _send_b2c_payout(task, transaction_id):
     try:
         tx = Transaction.objects.get(id=transaction_id, type='PAYOUT')
         
@@ -180,6 +234,11 @@ def send_b2c_payout(self, transaction_id):
             logger.warning(f"Transaction {transaction_id} already processed, status: {tx.status}")
             return {'status': 'already_processed', 'tx_status': tx.status}
         
+        # Outbox delivery is at-least-once; never call B2C twice for one attempt
+        if (tx.mpesa_response or {}).get('conversation_id'):
+            logger.warning(f"Transaction {transaction_id} already sent to B2C, awaiting callback")
+            return {'status': 'already_sent', 'conversation_id': tx.mpesa_response['conversation_id']}
+        
         logger.info(f"Initiating B2C payout for transaction {transaction_id}, amount={tx.amount}")
         
         # Call B2C API
@@ -213,7 +272,7 @@ def send_b2c_payout(self, transaction_id):
     except Exception as e:
         logger.error(f"B2C payout error for transaction {transaction_id}: {e}")
         # Retry with exponential backoff
-        raise self.retry(exc=e, countdown=120 * (2 ** self.request.retries))
+        raise task.retry(exc=e, countdown=120 * (2 ** task.request.retries))
 
 
 @shared_task
@@ -230,7 +289,14 @@ def retry_failed_payouts(hours=24):
     """
     from datetime import timedelta
     
-    cutoff = timezone.now() - timedelta(hours=hours)
+    with singleton_lock('retry_failed_payouts') as acquired:
+        if not acquired:
+            logger.info("retry_failed_payouts already running, skipping this run")
+            return {'status': 'skipped', 'count': 0}
+        return _retry_failed_payouts(timezone.now() - timedelta(hours=hours))
+
+
+def _retry_failed_payouts(cutoff):
     failed_txs = Transaction.objects.filter(
         type='PAYOUT',
         status=Transaction.FAILED,
@@ -238,11 +304,11 @@ def retry_failed_payouts(hours=24):
         mpesa_response__isnull=False
     )
     
-    retry_count = 0
-    for tx in failed_txs:
-        logger.info(f"Retrying failed payout transaction {tx.id}")
-        send_b2c_payout.delay(tx.id)
-        retry_count += 1
+    retry_ids = list(failed_txs.values_list('id', flat=True))
+    for tx_id in retry_ids:
+        logger.info(f"Retrying failed payout transaction {tx_id}")
+    enqueue_payouts(retry_ids, attempt=f"retry-{timezone.now().timestamp()}")
+    retry_count = len(retry_ids)
     
     logger.info(f"Enqueued {retry_count} failed payouts for retry")
     return {'status': 'retried', 'count': retry_count}
@@ -267,5 +333,12 @@ def _create_refund_transaction(bet):
     )
     
     # Enqueue B2C call for refund
-    send_b2c_payout.delay(tx.id)
+    enqueue_payouts([tx.id])
     logger.info(f"Created refund transaction {tx.id} for bet {bet.id}")
+
+
+@shared_task(ignore_result=True)
+def relay_outbox():
+    """Safety net: publish outbox messages whose post-commit relay never ran"""
+    from payments.outbox import relay_outbox as relay
+    return relay()
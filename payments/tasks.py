@@ -0,0 +1,60 @@
+"""
+Celery tasks for user-initiated withdrawals
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import celery - will be available in production
+try:
+    from celery import shared_task
+except ImportError:
+    # Development mode without Celery
+    def shared_task(*args, **kwargs):
+        """Dummy decorator when Celery is not installed"""
+        def decorator(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+def process_withdrawal_impl(transaction_id):
+    """Send a queued withdrawal to B2C within the payout concurrency cap."""
+    from django.conf import settings
+    from api.task_queues import payout_slots
+    from payments.withdrawals import process_withdrawal as process
+
+    with payout_slots.slot() as acquired:
+        if not acquired and hasattr(process_withdrawal, 'apply_async'):
+            # Wait for a slot on the queue, not in the worker
+            process_withdrawal.apply_async(args=[transaction_id], countdown=settings.PAYOUT_SLOT_RETRY_SECONDS)
+            return {'status': 'deferred', 'transaction_id': transaction_id}
+        return process(transaction_id)
+
+
+# Apply Celery decorator if available
+try:
+    @shared_task(ignore_result=True)
+    def process_withdrawal(transaction_id):
+        """Celery wrapper for process_withdrawal_impl"""
+        return process_withdrawal_impl(transaction_id)
+except:
+    def process_withdrawal(transaction_id):
+        return process_withdrawal_impl(transaction_id)
+
+
+def sweep_stale_withdrawals_impl():
+    """Fail withdrawals that never got a B2C result and release their holds."""
+    from payments.withdrawals import sweep_stale_withdrawals as sweep
+    return {'status': 'success', 'swept': sweep()}
+
+
+try:
+    @shared_task(ignore_result=True)
+    def sweep_stale_withdrawals():
+        """Celery wrapper for sweep_stale_withdrawals_impl"""
+        return sweep_stale_withdrawals_impl()
+except:
+    def sweep_stale_withdrawals():
+        return sweep_stale_withdrawals_impl()
@@ -1,11 +1,12 @@
 from django.urls import path
-from .views import initiate_stk_push, initiate_withdrawal, mpesa_callback, b2c_result_callback, test_mpesa_credentials, get_transaction_status, get_user_transactions, sync_withdrawal_status
+from .views import initiate_stk_push, initiate_withdrawal, mpesa_callback, b2c_result_callback, test_mpesa_credentials, get_transaction_status, get_user_transactions, sync_withdrawal_status, get_withdrawal_status
 
 urlpatterns = [
     path('test-credentials/', test_mpesa_credentials, name='test_credentials'),
     path('stk-push/', initiate_stk_push, name='stk_push'),
     path('withdraw/', initiate_withdrawal, name='withdraw'),
     path('withdraw/sync/', sync_withdrawal_status, name='sync_withdrawal_status'),
+    path('withdraw/<int:transaction_id>/', get_withdrawal_status, name='withdrawal_status'),
     path('transaction/<int:transaction_id>/status/', get_transaction_status, name='transaction_status'),
     path('transactions/', get_user_transactions, name='user_transactions'),
     path('callback/', mpesa_callback, name='mpesa_callback'),
@@ -1,5 +1,6 @@
 import json
 import logging
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.views.decorators.http import require_http_methods
@@ -7,13 +8,15 @@ from django.utils import timezone
 from decimal import Decimal
 from .mpesa_integration import get_mpesa_client
 from .models import Transaction
+from .withdrawals import InsufficientBalance, is_held, place_withdrawal, release_hold, withdrawal_status
 from .transaction_safety import (
     safe_process_deposit, 
     safe_process_withdrawal,
     verify_user_balance_consistency,
     TransactionError
 )
-from api.validators import validate_amount, normalize_phone_number, ValidationError
+from api.validators import validate_amount, ValidationError
+from users.identity import get_authenticated_user
 from users.models import CustomUser
 from notifications.views import create_notification
 
@@ -45,39 +48,12 @@ def test_mpesa_credentials(request):
             'message': f'Credential validation failed: {str(e)}'
         }, status=400)
 
-def get_authenticated_user(request):
-    """Get authenticated user from session or X-User-Phone-Number/X-User-Email header"""
-    # Try session-based auth first
-    if request.user and request.user.is_authenticated:
-        return request.user
-    
-    # Fall back to phone number header-based auth
-    phone_number = request.headers.get('X-User-Phone-Number')
-    if phone_number:
-        try:
-            # Normalize phone number
-            phone_number = normalize_phone_number(phone_number)
-            return CustomUser.objects.get(phone_number=phone_number)
-        except CustomUser.DoesNotExist:
-            return None
-    
-    # Fall back to email header-based auth (for Google OAuth users)
-    email = request.headers.get('X-User-Email')
-    if email:
-        try:
-            return CustomUser.objects.get(email=email)
-        except CustomUser.DoesNotExist:
-            return None
-    
-    return None
-
-
-
 @csrf_exempt
 @require_http_methods(["POST"])
-def initiate_stk_push(request):
-    # Get authenticated user from session or header
-    user = get_authenticated_user(request)
+async def initiate_stk_push(request):
+    # Native async: the Daraja round trip awaits on the pooled client
+    # instead of holding a worker (see api/http_client.py)
+    user = await sync_to_async(get_authenticated_user)(request)
     if not user:
         logger.warning(f"Unauthorized STK push attempt")
         return JsonResponse({'error': 'Authentication required'}, status=401)
@@ -102,7 +78,7 @@ def initiate_stk_push(request):
         client = get_mpesa_client()
         
         # Initiate STK push
-        response = client.initiate_stk_push(
+        response = await client.ainitiate_stk_push(
             user.phone_number,
             amount,
             account_reference=f"CACHE_{user.id}"
@@ -110,7 +86,7 @@ def initiate_stk_push(request):
         
         if response.get('ResponseCode') == '0':
             # Create a pending transaction
-            transaction = Transaction.objects.create(
+            transaction = await Transaction.objects.acreate(
                 user=user,
                 type='DEPOSIT',
                 amount=amount,
@@ -145,10 +121,16 @@ def initiate_stk_push(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def initiate_withdrawal(request):
-    """Initiate B2C withdrawal/payout to user's M-Pesa account"""
+async def initiate_withdrawal(request):
+    """
+    Queue a B2C withdrawal/payout to user's M-Pesa account
+    
+    Holds the amount and returns the job (transaction) id at once; a payouts
+    worker makes the B2C call (payments/withdrawals.py). Poll
+    GET /api/payments/withdraw/<transaction_id>/ for progress.
+    """
     # Get authenticated user from session or header
-    user = get_authenticated_user(request)
+    user = await sync_to_async(get_authenticated_user)(request)
     if not user:
         logger.warning(f"Unauthorized withdrawal attempt")
         return JsonResponse({'error': 'Authentication required'}, status=401)
@@ -166,14 +148,6 @@ def initiate_withdrawal(request):
         except ValidationError as e:
             return JsonResponse({'error': e.message}, status=400)
         
-        # Check user has sufficient balance
-        if user.balance < amount:
-            return JsonResponse({
-                'error': 'Insufficient balance',
-                'current_balance': float(user.balance),
-                'requested_amount': float(amount)
-            }, status=400)
-        
         # Validate user has phone number
         if not user.phone_number:
             return JsonResponse({
@@ -181,62 +155,25 @@ def initiate_withdrawal(request):
                 'action': 'update_profile'
             }, status=400)
         
-        # Create pending withdrawal transaction with user's phone number
-        transaction = Transaction.objects.create(
-            user=user,
-            type='WITHDRAWAL',
-            amount=amount,
-            phone_number=user.phone_number,  # User receiving the funds
-            status='PENDING',
-            description=f'M-Pesa withdrawal of KES {amount}'
-        )
-        
-        # Get M-Pesa client and initiate B2C payment
-        client = get_mpesa_client()
-        
-        response = client.b2c_payment(
-            user.phone_number,  # User's phone receives the payout
-            amount,
-            description=f'CACHE withdrawal'
-        )
-        
-        if response.get('ResponseCode') == '0':
-            # Update transaction with B2C details
-            transaction.merchant_request_id = response.get('ConversationID')
-            transaction.checkout_request_id = response.get('OriginatorConversationID')
-            transaction.save()
-            
-            # DO NOT deduct balance yet - wait for callback to confirm success
-            # Balance will be deducted in b2c_result_callback when result_code == 0
-            
-            # Create notification
-            create_notification(
-                user=user,
-                type_choice='WITHDRAWAL_INITIATED',
-                title='Withdrawal Initiated',
-                message=f'Your withdrawal of KES {amount} has been initiated to {user.phone_number}',
-                color_class='blue',
-                related_transaction_id=transaction.id
-            )
-            
-            logger.info(f"Withdrawal initiated for user {user.phone_number}, amount: {amount}, balance NOT yet deducted")
-            return JsonResponse({
-                'message': 'Withdrawal initiated successfully',
-                'transaction_id': transaction.id,
-                'conversation_id': response.get('ConversationID'),
-                'amount': float(amount),
-                'status': 'PENDING'
-            })
-        else:
-            # B2C initiation failed
-            transaction.status = 'FAILED'
-            transaction.description = response.get('ResponseDescription', 'B2C payment initiation failed')
-            transaction.save()
-            
+        try:
+            transaction = await sync_to_async(place_withdrawal)(user, amount)
+        except InsufficientBalance:
+            current = await CustomUser.objects.filter(id=user.id).values_list('balance', flat=True).afirst()
             return JsonResponse({
-                'error': response.get('ResponseDescription', 'Failed to process withdrawal'),
-                'customer_message': response.get('CustomerMessage', 'Withdrawal processing failed')
+                'error': 'Insufficient balance',
+                'current_balance': float(current or 0),
+                'requested_amount': float(amount)
             }, status=400)
+        
+        return JsonResponse({
+            'message': 'Withdrawal queued',
+            'transaction_id': transaction.id,
+            'job_id': transaction.id,
+            'amount': float(amount),
+            'status': 'PENDING',
+            'job_status': transaction.mpesa_response['job_status'],
+            'status_url': f'/api/payments/withdraw/{transaction.id}/'
+        }, status=202)
             
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -247,6 +184,19 @@ def initiate_withdrawal(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@require_http_methods(["GET"])
+def get_withdrawal_status(request, transaction_id):
+    """Progress of a queued withdrawal (cheap to poll: one primary key lookup)"""
+    user = get_authenticated_user(request)
+    if not user:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    status = withdrawal_status(user, transaction_id)
+    if status is None:
+        return JsonResponse({'error': 'Withdrawal transaction not found'}, status=404)
+    return JsonResponse(status)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def b2c_result_callback(request):
@@ -371,10 +321,21 @@ def b2c_result_callback(request):
         is_success = result_code == 0 or result_code == '0'
         
         with db_transaction.atomic():
+            tx = Transaction.objects.select_for_update().select_related('user').get(id=tx.id)
+            
             # Idempotency: check if already processed
             if tx.status == 'COMPLETED':
                 logger.info(f"Transaction {tx.id} already marked COMPLETED, skipping")
                 return JsonResponse({'status': 'ok', 'message': 'already_processed'})
+            if tx.status == 'FAILED' and 'callback_time' in (tx.mpesa_response or {}):
+                # Daraja retries callbacks; refund a failed payout only once
+                logger.info(f"Transaction {tx.id} already marked FAILED by a callback, skipping")
+                return JsonResponse({'status': 'ok', 'message': 'already_processed'})
+            if tx.status == 'FAILED' and not is_success and (tx.mpesa_response or {}).get('swept'):
+                # Failed by sweep_stale_withdrawals, which already released the hold
+                # (a late success instead completes it and debits again below)
+                logger.info(f"Transaction {tx.id} already failed by the withdrawal sweeper, skipping")
+                return JsonResponse({'status': 'ok', 'message': 'already_processed'})
             
             if is_success:
                 # Payment successful
@@ -390,15 +351,19 @@ def b2c_result_callback(request):
                 })
                 tx.save()
                 
-                # NOW deduct balance upon successful callback confirmation
                 user = tx.user
-                user.balance -= tx.amount
-                user.save()
-                
-                logger.info(
-                    f"Withdrawal completed and balance deducted: tx_id={tx.id}, user={tx.user.phone_number}, "
-                    f"amount={tx.amount}, new_balance={user.balance}"
-                )
+                if is_held(tx):
+                    # Debited when the withdrawal was placed; the hold becomes final
+                    logger.info(f"Withdrawal completed: tx_id={tx.id}, user={user.phone_number}, amount={tx.amount}")
+                else:
+                    # NOW deduct balance upon successful callback confirmation
+                    user.balance -= tx.amount
+                    user.save()
+                    
+                    logger.info(
+                        f"Withdrawal completed and balance deducted: tx_id={tx.id}, user={tx.user.phone_number}, "
+                        f"amount={tx.amount}, new_balance={user.balance}"
+                    )
                 
                 # Send notification
                 _send_payout_notification(tx.user, tx)
@@ -418,17 +383,22 @@ def b2c_result_callback(request):
                     'callback_description': response_description,
                     'callback_time': timezone.now().isoformat()
                 })
-                tx.save()
                 
                 # Refund user balance since payout failed
                 user = tx.user
-                user.balance += tx.amount
-                user.save()
-                
-                logger.info(
-                    f"User {user.phone_number} refunded KES {tx.amount} due to failed payout, "
-                    f"new balance: {user.balance}"
-                )
+                if is_held(tx):
+                    release_hold(tx)
+                    tx.save()
+                    logger.info(f"User {user.phone_number} refunded KES {tx.amount} due to failed payout (hold released)")
+                else:
+                    tx.save()
+                    user.balance += tx.amount
+                    user.save()
+                    
+                    logger.info(
+                        f"User {user.phone_number} refunded KES {tx.amount} due to failed payout, "
+                        f"new balance: {user.balance}"
+                    )
                 
                 # Log for manual review / retry
                 logger.error(
@@ -0,0 +1,235 @@
+"""
+Withdrawal Jobs
+
+A withdrawal request only does database work:
+1. Hold the amount: one conditional UPDATE debits the balance if it covers
+   the withdrawal, so parallel requests can never overdraw
+2. Create the PENDING WITHDRAWAL transaction (its id is the job id)
+3. Enqueue `payments.tasks.process_withdrawal` through the outbox
+
+The B2C call runs on the payouts queue (payout_slots caps the calls in
+flight), so request latency does not depend on Daraja. Job progress is kept
+in mpesa_response['job_status']:
+    QUEUED -> SUBMITTED (claimed by a worker; B2C accepted or in flight)
+The transaction then ends COMPLETED (callback success, hold kept) or FAILED
+(B2C rejected it or the callback failed, hold released).
+
+The OriginatorConversationID is assigned and stored with the SUBMITTED
+claim, before the B2C call, so a result callback that beats the call's own
+response still finds the transaction. A job left SUBMITTED with no result
+(worker killed mid-call, callback never delivered) is failed and its hold
+released by `sweep_stale_withdrawals` after WITHDRAWAL_RESULT_TIMEOUT_MINUTES;
+a success callback arriving after that debits the balance again.
+
+Clients poll GET /api/payments/withdraw/<id>/ (primary key lookup).
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.validators import ValidationError
+from users.models import CustomUser
+from .models import Transaction
+from .outbox import enqueue
+
+logger = logging.getLogger(__name__)
+
+PROCESS_WITHDRAWAL_TASK = 'payments.tasks.process_withdrawal'
+
+JOB_QUEUED = 'QUEUED'
+JOB_SUBMITTED = 'SUBMITTED'
+
+
+class InsufficientBalance(ValidationError):
+    pass
+
+
+def is_held(tx: Transaction) -> bool:
+    """Whether the withdrawal's amount was debited when it was placed."""
+    return bool((tx.mpesa_response or {}).get('balance_held'))
+
+
+def _adjust_balance(user, delta: Decimal) -> None:
+    CustomUser.objects.filter(id=user.id).update(balance=F('balance') + delta)
+
+
+def place_withdrawal(user, amount: Decimal) -> Transaction:
+    """
+    Hold `amount` of the user's balance and queue the B2C payout.
+
+    Raises:
+        InsufficientBalance: The balance does not cover the amount
+    """
+    with transaction.atomic():
+        # Check and debit in one statement: no read-then-write race
+        held = CustomUser.objects.filter(id=user.id, balance__gte=amount).update(
+            balance=F('balance') - amount
+        )
+        if not held:
+            raise InsufficientBalance('Insufficient balance')
+
+        tx = Transaction.objects.create(
+            user=user,
+            type='WITHDRAWAL',
+            amount=amount,
+            phone_number=user.phone_number,  # User receiving the funds
+            status='PENDING',
+            description=f'M-Pesa withdrawal of KES {amount}',
+            mpesa_response={'balance_held': True, 'job_status': JOB_QUEUED},
+        )
+        enqueue(PROCESS_WITHDRAWAL_TASK, [tx.id], dedup_key=f"process_withdrawal:{tx.id}")
+
+    logger.info(f"Withdrawal {tx.id} queued for user {user.phone_number}, amount: {amount}, balance held")
+    return tx
+
+
+def release_hold(tx: Transaction) -> None:
+    """Give a failed withdrawal's held amount back (caller holds the row lock)."""
+    if is_held(tx):
+        _adjust_balance(tx.user, tx.amount)
+        tx.mpesa_response['balance_held'] = False
+
+
+def process_withdrawal(transaction_id: int) -> dict:
+    """
+    Send a queued withdrawal to M-Pesa B2C (worker side).
+
+    Idempotent: outbox delivery is at-least-once, so a job that already left
+    QUEUED is skipped.
+    """
+    from notifications.views import create_notification
+    from .mpesa_integration import get_mpesa_client
+
+    client = get_mpesa_client()
+    originator_conversation_id = client.new_originator_conversation_id()
+
+    with transaction.atomic():
+        tx = Transaction.objects.select_for_update().filter(
+            id=transaction_id, type='WITHDRAWAL'
+        ).select_related('user').first()
+        if tx is None:
+            logger.error(f"Withdrawal {transaction_id} not found")
+            return {'status': 'error', 'error': 'transaction_not_found'}
+        if tx.status != 'PENDING' or tx.mpesa_response.get('job_status') != JOB_QUEUED:
+            return {'status': 'already_processed', 'tx_status': tx.status}
+        # Claimed before the B2C call so a redelivered job cannot pay twice;
+        # the request id goes in with the claim so an early callback matches
+        tx.mpesa_response['job_status'] = JOB_SUBMITTED
+        tx.checkout_request_id = originator_conversation_id
+        tx.save(update_fields=['mpesa_response', 'checkout_request_id', 'updated_at'])
+
+    try:
+        response = client.b2c_payment(
+            tx.phone_number, tx.amount, description='CACHE withdrawal',
+            originator_conversation_id=originator_conversation_id,
+        )
+    except Exception as e:
+        # b2c_payment reports request failures itself; anything raised here
+        # happened before the request was sent
+        logger.error(f"Withdrawal {transaction_id} B2C call error: {str(e)}")
+        response = {'ResponseCode': '1', 'ResponseDescription': 'B2C payment initiation failed'}
+
+    with transaction.atomic():
+        tx = Transaction.objects.select_for_update().select_related('user').get(id=transaction_id)
+        if response.get('ResponseCode') == '0':
+            tx.merchant_request_id = response.get('ConversationID')
+            tx.save(update_fields=['merchant_request_id', 'updated_at'])
+            if tx.status != 'PENDING':
+                # The result callback got here first
+                return {'status': 'submitted', 'transaction_id': tx.id}
+            create_notification(
+                user=tx.user,
+                type_choice='WITHDRAWAL_INITIATED',
+                title='Withdrawal Initiated',
+                message=f'Your withdrawal of KES {tx.amount} has been initiated to {tx.phone_number}',
+                color_class='blue',
+                related_transaction_id=tx.id
+            )
+            logger.info(f"Withdrawal {tx.id} submitted to B2C, conversation_id={response.get('ConversationID')}")
+            return {'status': 'submitted', 'transaction_id': tx.id}
+
+        if tx.status == 'PENDING':
+            tx.status = 'FAILED'
+            tx.description = (response.get('ResponseDescription') or 'B2C payment initiation failed')[:200]
+            release_hold(tx)
+            tx.save(update_fields=['status', 'description', 'mpesa_response', 'updated_at'])
+            create_notification(
+                user=tx.user,
+                type_choice='WITHDRAWAL_FAILED',
+                title='Withdrawal Failed',
+                message=f'Your withdrawal of KES {tx.amount} could not be processed. The amount is back in your balance.',
+                color_class='red',
+                related_transaction_id=tx.id
+            )
+        logger.warning(f"Withdrawal {tx.id} rejected by B2C: {response.get('ResponseDescription')}")
+        return {'status': 'failed', 'transaction_id': tx.id}
+
+
+def sweep_stale_withdrawals() -> int:
+    """
+    Fail withdrawals stuck in SUBMITTED without a B2C result and release
+    their holds.
+
+    Returns:
+        Number of withdrawals failed
+    """
+    from notifications.views import create_notification
+
+    cutoff = timezone.now() - timedelta(minutes=settings.WITHDRAWAL_RESULT_TIMEOUT_MINUTES)
+    stale_ids = list(Transaction.objects.filter(
+        type='WITHDRAWAL', status='PENDING',
+        mpesa_response__job_status=JOB_SUBMITTED, updated_at__lt=cutoff,
+    ).values_list('id', flat=True))
+
+    swept = 0
+    for tx_id in stale_ids:
+        with transaction.atomic():
+            tx = Transaction.objects.select_for_update().select_related('user').get(id=tx_id)
+            if tx.status != 'PENDING' or tx.mpesa_response.get('job_status') != JOB_SUBMITTED:
+                continue  # Settled by a callback meanwhile
+            tx.status = 'FAILED'
+            tx.description = 'No M-Pesa result received'
+            release_hold(tx)
+            # A late failure callback must not refund again
+            tx.mpesa_response['swept'] = True
+            tx.save(update_fields=['status', 'description', 'mpesa_response', 'updated_at'])
+            create_notification(
+                user=tx.user,
+                type_choice='WITHDRAWAL_FAILED',
+                title='Withdrawal Failed',
+                message=f'Your withdrawal of KES {tx.amount} could not be confirmed. The amount is back in your balance.',
+                color_class='red',
+                related_transaction_id=tx.id
+            )
+            swept += 1
+        logger.warning(f"Withdrawal {tx_id} had no B2C result, failed and hold released")
+    return swept
+
+
+def withdrawal_status(user, transaction_id: int):
+    """
+    Poll payload of a user's withdrawal job (None if it isn't theirs).
+    """
+    row = Transaction.objects.filter(
+        id=transaction_id, user=user, type='WITHDRAWAL'
+    ).values('id', 'status', 'amount', 'description', 'mpesa_response', 'created_at', 'updated_at').first()
+    if row is None:
+        return None
+
+    status = {
+        'transaction_id': row['id'],
+        'status': row['status'],
+        'job_status': (row['mpesa_response'] or {}).get('job_status'),
+        'amount': float(row['amount']),
+        'created_at': row['created_at'].isoformat(),
+        'updated_at': row['updated_at'].isoformat(),
+    }
+    if row['status'] == 'FAILED' and row['description']:
+        status['error_message'] = row['description']
+    return status
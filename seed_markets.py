@@ -12,7 +12,7 @@ def seed():
             "question": "Chelsea vs Manchester City - Premier League",
             "category": "Sports",
             "market_type": "OPTION_LIST",
-            "volume": "KES 0",
+            "volume_cents": 0,
             "end_date": "Apr 12, 2026, 4:30pm",
             "description": "Premier League match: Chelsea vs Manchester City at Stamford Bridge. Kickoff: 4:30pm GMT, Sunday 12th April 2026.",
             "image_url": "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?q=80&w=1000&auto=format&fit=crop",
@@ -43,7 +43,7 @@ def seed():
                 defaults={
                     'category': m['category'],
                     'yes_probability': 50,  # Not used for OPTION_LIST
-                    'volume': m['volume'],
+                    'volume_cents': m['volume_cents'],
                     'end_date': m['end_date'],
                     'description': m.get('description', ''),
                     'image_url': m['image_url'],
@@ -59,7 +59,7 @@ def seed():
                 defaults={
                     'category': m['category'],
                     'yes_probability': m['yes_probability'],
-                    'volume': m['volume'],
+                    'volume_cents': m['volume_cents'],
                     'end_date': m['end_date'],
                     'description': m.get('description', ''),
                     'image_url': m['image_url'],
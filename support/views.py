@@ -6,7 +6,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from .models import SupportMessage, SupportTicket
 from .serializers import SupportMessageSerializer, SupportTicketSerializer, SupportTicketListSerializer
 from users.models import CustomUser
-from api.validators import normalize_phone_number
+from users.identity import get_authenticated_user
 
 # ============ USER SUPPORT ENDPOINTS ============
 
@@ -14,26 +14,13 @@ from api.validators import normalize_phone_number
 def get_my_tickets(request):
     """Get all support tickets for the authenticated user"""
     try:
-        # Get user from phone number in header or from authenticated user
-        phone_number = request.headers.get('X-User-Phone-Number')
-        
-        if phone_number:
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                return Response(
-                    {'error': 'User not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            if not request.user.is_authenticated:
-                return Response(
-                    {'error': 'User not authenticated'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            user = request.user
+        # Get user from authenticated session or phone/email header
+        user = get_authenticated_user(request)
+        if not user:
+            return Response(
+                {'error': 'User not authenticated'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
 
         tickets = SupportTicket.objects.filter(user=user).prefetch_related('messages')
         serializer = SupportTicketListSerializer(tickets, many=True)
@@ -51,25 +38,13 @@ def get_my_tickets(request):
 def get_ticket_detail(request, ticket_id):
     """Get a specific support ticket with all messages"""
     try:
-        phone_number = request.headers.get('X-User-Phone-Number')
-        
-        if phone_number:
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                return Response(
-                    {'error': 'User not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            if not request.user.is_authenticated:
-                return Response(
-                    {'error': 'User not authenticated'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            user = request.user
+        # Get user from authenticated session or phone/email header
+        user = get_authenticated_user(request)
+        if not user:
+            return Response(
+                {'error': 'User not authenticated'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
 
         try:
             ticket = SupportTicket.objects.prefetch_related('messages').get(ticket_id=ticket_id, user=user)
@@ -94,25 +69,13 @@ def get_ticket_detail(request, ticket_id):
 def create_support_ticket(request):
     """Create a new support ticket"""
     try:
-        phone_number = request.headers.get('X-User-Phone-Number')
-        
-        if phone_number:
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                return Response(
-                    {'error': 'User not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            if not request.user.is_authenticated:
-                return Response(
-                    {'error': 'User not authenticated'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            user = request.user
+        # Get user from authenticated session or phone/email header
+        user = get_authenticated_user(request)
+        if not user:
+            return Response(
+                {'error': 'User not authenticated'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
 
         subject = request.data.get('subject', '').strip()
         message_text = request.data.get('message', '').strip()
@@ -161,25 +124,13 @@ def create_support_ticket(request):
 def add_message_to_ticket(request, ticket_id):
     """Add a message to an existing ticket"""
     try:
-        phone_number = request.headers.get('X-User-Phone-Number')
-        
-        if phone_number:
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                return Response(
-                    {'error': 'User not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            if not request.user.is_authenticated:
-                return Response(
-                    {'error': 'User not authenticated'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            user = request.user
+        # Get user from authenticated session or phone/email header
+        user = get_authenticated_user(request)
+        if not user:
+            return Response(
+                {'error': 'User not authenticated'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
 
         try:
             ticket = SupportTicket.objects.get(ticket_id=ticket_id, user=user)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Adaptive Liquidity Test (LS-LMSR and LP-capital b)
+
+Tests:
+1. alpha = 0 prices exactly like the fixed-b LMSR
+2. LS-LMSR prices are the gradient of the LS-LMSR cost function
+3. Deep LS-LMSR markets absorb the same trade with less price impact
+4. Young LS-LMSR markets (alpha * volume below the floor) keep the fixed b
+5. Pool capital maps to b through the worst-case loss b * ln(2) * 100
+"""
+
+import math
+
+from markets.utils.price_calculations import (
+    cost,
+    price_yes,
+    price_no,
+    effective_b,
+    b_for_pool_capital,
+    calculate_cost_to_buy_shares,
+)
+
+B = 100.0
+ALPHA = 0.05
+
+
+def test_alpha_zero_matches_fixed():
+    for q_yes, q_no in ((0.0, 0.0), (250.0, 40.0), (-30.0, 10.0)):
+        assert price_yes(q_yes, q_no, B, 0.0) == price_yes(q_yes, q_no, B)
+        assert cost(q_yes, q_no, B, 0.0) == cost(q_yes, q_no, B)
+    print("✓ alpha = 0 is the fixed-b LMSR")
+
+
+def test_prices_are_cost_gradient():
+    h = 1e-4
+    for q_yes, q_no in ((3000.0, 1000.0), (1500.0, 2500.0), (8000.0, 8000.0)):
+        d_yes = (cost(q_yes + h, q_no, B, ALPHA) - cost(q_yes - h, q_no, B, ALPHA)) / (2 * h)
+        d_no = (cost(q_yes, q_no + h, B, ALPHA) - cost(q_yes, q_no - h, B, ALPHA)) / (2 * h)
+        assert abs(d_yes - price_yes(q_yes, q_no, B, ALPHA)) < 1e-6, (q_yes, q_no)
+        assert abs(d_no - price_no(q_yes, q_no, B, ALPHA)) < 1e-6, (q_yes, q_no)
+        total = price_yes(q_yes, q_no, B, ALPHA) + price_no(q_yes, q_no, B, ALPHA)
+        assert 1.0 <= total <= 1.0 + 2 * ALPHA * math.log(2) + 1e-9, total
+    print("✓ LS-LMSR prices match the cost gradient; spread stays bounded")
+
+
+def test_deep_markets_absorb_trades():
+    shallow = price_yes(1500.0, 1000.0, B, ALPHA) - price_yes(1000.0, 1000.0, B, ALPHA)
+    deep = price_yes(10500.0, 10000.0, B, ALPHA) - price_yes(10000.0, 10000.0, B, ALPHA)
+    assert deep < shallow / 2, (shallow, deep)
+    print("✓ Deep LS-LMSR market moves less on the same trade")
+
+
+def test_floor_for_young_markets():
+    assert effective_b(500.0, 500.0, B, ALPHA) == B
+    assert calculate_cost_to_buy_shares(500.0, 500.0, 50.0, "YES", B, ALPHA) == \
+        calculate_cost_to_buy_shares(500.0, 500.0, 50.0, "YES", B)
+    print("✓ b stays at the floor until alpha * volume exceeds it")
+
+
+def test_pool_capital_b():
+    assert b_for_pool_capital(0.0, B) == B
+    b = b_for_pool_capital(100000.0, B)
+    assert abs(b * math.log(2) * 100 - 100000.0) < 1e-6, b
+    print("✓ Pool capital covers the market maker's worst-case loss")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("ADAPTIVE LIQUIDITY TESTS")
+    print("=" * 60)
+    test_alpha_zero_matches_fixed()
+    test_prices_are_cost_gradient()
+    test_deep_markets_absorb_trades()
+    test_floor_for_young_markets()
+    test_pool_capital_b()
+    print("\nAll adaptive liquidity tests passed")
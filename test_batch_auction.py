@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Batch Auction Clearing Test
+
+Tests:
+1. The batch pays exactly the LMSR cost of its net trade
+2. Offsetting orders cross at the current price and leave q unchanged
+3. Net sells beyond the issued shares are rejected, other orders still fill
+4. Bootstrapped markets (negative q) clear buys instead of looping
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from markets.lmsr import PAYOUT_PER_SHARE, calculate_q_for_probability, cost, price_yes
+from markets.services import clear_binary_auction
+
+B = 100.0
+
+
+def _paid(result, orders) -> float:
+    total = 0.0
+    for (outcome, action, shares), fill in zip(orders, result['fills']):
+        if fill is None:
+            continue
+        price = result['yes_clearing_price'] if outcome == 'YES' else result['no_clearing_price']
+        total += (shares if action == 'BUY' else -shares) * price * PAYOUT_PER_SHARE
+    return total
+
+
+def test_batch_pays_lmsr_cost():
+    orders = [('YES', 'BUY', 30.0), ('NO', 'BUY', 10.0), ('YES', 'BUY', 5.0)]
+    result = clear_binary_auction(20.0, 10.0, B, 0.0, orders)
+    assert (result['q_yes'], result['q_no']) == (55.0, 20.0)
+    expected = (cost(55.0, 20.0, B) - cost(20.0, 10.0, B)) * PAYOUT_PER_SHARE
+    assert abs(_paid(result, orders) - expected) < 1e-6
+    print("✓ The batch pays the LMSR cost of its net trade")
+
+
+def test_offsetting_orders_cross_at_current_price():
+    orders = [('YES', 'BUY', 10.0), ('YES', 'SELL', 10.0)]
+    result = clear_binary_auction(40.0, 0.0, B, 0.0, orders)
+    assert (result['q_yes'], result['q_no']) == (40.0, 0.0)
+    assert abs(result['yes_clearing_price'] - price_yes(40.0, 0.0, B)) < 1e-12
+    print("✓ Offsetting orders cross at the current price")
+
+
+def test_oversold_side_rejected():
+    orders = [('YES', 'SELL', 8.0), ('NO', 'BUY', 4.0), ('YES', 'BUY', 1.0)]
+    result = clear_binary_auction(5.0, 0.0, B, 0.0, orders)
+    assert result['fills'][0] is None
+    assert result['fills'][1] is not None and result['fills'][2] is not None
+    assert (result['q_yes'], result['q_no']) == (6.0, 4.0)
+    print("✓ Sells beyond the issued shares are rejected")
+
+
+def test_negative_q_market_clears():
+    q_yes = calculate_q_for_probability(0.3, B)
+    assert q_yes < 0
+    result = clear_binary_auction(q_yes, 0.0, B, 0.0, [('YES', 'BUY', 10.0)])
+    assert result['fills'][0] is not None and result['q_yes'] == q_yes + 10.0
+
+    orders = [('YES', 'SELL', 2.0), ('YES', 'BUY', 5.0), ('NO', 'SELL', 1.0)]
+    result = clear_binary_auction(q_yes, 0.0, B, 0.0, orders)
+    # Net YES is a buy, so the YES sell nets against it; NO has nothing issued
+    assert result['fills'][0] is not None and result['fills'][2] is None
+    assert result['q_yes'] == q_yes + 3.0 and result['q_no'] == 0.0
+    print("✓ Bootstrapped markets clear")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("BATCH AUCTION TESTS")
+    print("=" * 60)
+    test_batch_pays_lmsr_cost()
+    test_offsetting_orders_cross_at_current_price()
+    test_oversold_side_rejected()
+    test_negative_q_market_clears()
+    print("\nAll batch auction tests passed")
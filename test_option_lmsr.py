@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Multi-Outcome LMSR Test (OPTION_LIST markets)
+
+Tests:
+1. Bootstrapped quantities reproduce the requested option probabilities
+2. Option prices always sum to 1
+3. Buying then selling the same shares round-trips the cost
+4. NO shares on an option cost the same as YES shares on every other option
+5. A two-option market prices exactly like the binary LMSR
+"""
+
+import math
+
+from markets.utils.price_calculations import (
+    prices_multi,
+    cost_multi,
+    calculate_cost_to_buy_option_shares,
+    calculate_payout_from_selling_option_shares,
+    calculate_q_for_probabilities,
+    calculate_cost_to_buy_shares,
+)
+
+B = 100.0
+
+
+def test_bootstrap_probabilities():
+    q = calculate_q_for_probabilities([50, 30, 20], B)
+    prices = prices_multi(q, B)
+    assert all(abs(p - t) < 1e-9 for p, t in zip(prices, [0.5, 0.3, 0.2])), prices
+    print("✓ Bootstrapped quantities reproduce 50/30/20")
+
+
+def test_prices_sum_to_one():
+    q = [120.0, -40.0, 3.5, 900.0]
+    assert abs(sum(prices_multi(q, B)) - 1.0) < 1e-12
+    assert math.isfinite(cost_multi([100000.0, 0.0], B))  # log-sum-exp does not overflow
+    print("✓ Prices sum to 1 and large quantities do not overflow")
+
+
+def test_buy_sell_round_trip():
+    q = calculate_q_for_probabilities([40, 35, 25], B)
+    for outcome, delta in (("YES", 25.0), ("NO", -25.0)):
+        cost_kes = calculate_cost_to_buy_option_shares(q, 1, 25.0, outcome, B)
+        q_after = list(q)
+        q_after[1] += delta
+        payout_kes = calculate_payout_from_selling_option_shares(q_after, 1, 25.0, outcome, B)
+        assert abs(cost_kes - payout_kes) < 0.02, (outcome, cost_kes, payout_kes)
+    print("✓ Buy/sell round trip is cost-neutral for YES and NO")
+
+
+def test_no_equals_complement_bundle():
+    q = calculate_q_for_probabilities([40, 35, 25], B)
+    no_cost = calculate_cost_to_buy_option_shares(q, 0, 10.0, "NO", B)
+    bundle = [q[0], q[1] + 10.0, q[2] + 10.0]
+    bundle_cost = round((cost_multi(bundle, B) - cost_multi(q, B)) * 100, 2)
+    assert abs(no_cost - bundle_cost) < 0.02, (no_cost, bundle_cost)
+    print("✓ NO on one option costs the same as YES on all the others")
+
+
+def test_two_options_match_binary():
+    binary = calculate_cost_to_buy_shares(0.0, 0.0, 10.0, "YES", B)
+    multi = calculate_cost_to_buy_option_shares([0.0, 0.0], 0, 10.0, "YES", B)
+    assert binary == multi, (binary, multi)
+    print("✓ Two-option market matches binary LMSR")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("MULTI-OUTCOME LMSR TESTS")
+    print("=" * 60)
+    test_bootstrap_probabilities()
+    test_prices_sum_to_one()
+    test_buy_sell_round_trip()
+    test_no_equals_complement_bundle()
+    test_two_options_match_binary()
+    print("\nAll multi-outcome LMSR tests passed")
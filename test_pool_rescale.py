@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+POOL Liquidity Rescale Test
+
+Tests:
+1. A withdrawal shrinks b without touching the issued shares (q)
+2. Shares bought before a shrinking rescale can all be sold afterwards
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from decimal import Decimal
+
+from markets.liquidity_service import deposit_liquidity, withdraw_liquidity
+from markets.models import Market
+from markets.services import buy_yes_shares, sell_yes_shares
+from users.models import CustomUser
+
+
+def test_sell_after_shrinking_rescale():
+    lp = CustomUser.objects.create(phone_number='254700990001', full_name='Pool LP', balance=Decimal('1000000'))
+    market = Market.objects.create(
+        question='Will the pool rescale keep sells working?',
+        category='Other',
+        end_date='2030-01-01',
+        liquidity_mode='POOL',
+    )
+    try:
+        deposit_liquidity(market, lp, 100000)
+        market.refresh_from_db()
+        deep_b = float(market.b)
+
+        buy_yes_shares(market, 500.0)
+        market.refresh_from_db()
+        q_yes, q_no = float(market.q_yes), float(market.q_no)
+
+        withdraw_liquidity(lp.lp_positions.get(pool__market=market))
+        market.refresh_from_db()
+        assert float(market.b) < deep_b, (deep_b, market.b)
+        assert (float(market.q_yes), float(market.q_no)) == (q_yes, q_no)
+
+        # Scaling q by new_b / old_b would leave fewer issued shares than sold
+        sold = sell_yes_shares(market, 500.0)
+        market.refresh_from_db()
+        assert sold['payout_kes'] > 0
+        assert abs(float(market.q_yes) - (q_yes - 500.0)) < 1e-9
+    finally:
+        market.delete()
+        lp.delete()
+    print("✓ Shares bought before a shrinking rescale can still be sold")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("POOL RESCALE TESTS")
+    print("=" * 60)
+    test_sell_after_shrinking_rescale()
+    print("\nAll POOL rescale tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+LMSR Slippage Curve Test
+
+Tests:
+1. calculate_shares_for_cost inverts calculate_cost_to_buy_shares (fixed b and LS-LMSR)
+2. Bigger trades never get a better average price or a smaller price impact
+3. Sell rows are capped at the shares the market has issued
+"""
+
+from markets.utils.price_calculations import (
+    calculate_cost_to_buy_shares,
+    calculate_shares_for_cost,
+    calculate_slippage_curve,
+)
+
+B = 100.0
+
+
+def test_shares_for_cost_inverts_cost():
+    for alpha in (0.0, 0.05):
+        for q_yes, q_no in ((0.0, 0.0), (3000.0, 2500.0), (-40.0, 10.0)):
+            for outcome in ("YES", "NO"):
+                shares = calculate_shares_for_cost(q_yes, q_no, 5000.0, outcome, B, alpha)
+                spent = calculate_cost_to_buy_shares(q_yes, q_no, shares, outcome, B, alpha)
+                assert abs(spent - 5000.0) < 0.01, (alpha, q_yes, q_no, outcome, spent)
+    print("✓ Shares bought for a budget cost exactly that budget")
+
+
+def test_curve_is_monotonic():
+    curve = calculate_slippage_curve(120.0, 40.0, B)
+    for outcome in ("YES", "NO"):
+        rows = curve[outcome]['buy']
+        for smaller, larger in zip(rows, rows[1:]):
+            assert larger['average_price'] >= smaller['average_price'], (outcome, smaller, larger)
+            assert larger['price_impact'] >= smaller['price_impact'], (outcome, smaller, larger)
+    print("✓ Larger buys pay more on average and move the price further")
+
+
+def test_sells_capped_by_issued_shares():
+    curve = calculate_slippage_curve(10.0, 0.0, B, sizes_kes=[100, 100000])
+    assert curve['YES']['sell'][-1]['shares'] == 10.0
+    assert curve['NO']['sell'][-1]['shares'] == 0.0
+    print("✓ Sell depth stops at the shares issued")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("SLIPPAGE CURVE TESTS")
+    print("=" * 60)
+    test_shares_for_cost_inverts_cost()
+    test_curve_is_monotonic()
+    test_sells_capped_by_issued_shares()
+    print("\nAll slippage curve tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Threshold Index Test
+
+Tests:
+1. crossed() returns exactly the entries a price reached, in both directions
+2. Entries exactly at the price fire; discard() removes entries
+3. crossed() matches a brute-force scan on random books
+4. Without a shared cache, a book sees entries another process added
+"""
+
+import os
+import random
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from django.test import override_settings
+
+from markets.threshold_books import ThresholdBooks
+from markets.utils.threshold_index import FALLS, RISES, ThresholdIndex
+
+
+def test_crossed_both_directions():
+    index = ThresholdIndex([(1, FALLS, 40), (2, FALLS, 30), (3, RISES, 60), (4, RISES, 70)])
+    assert index.crossed(50) == []
+    assert sorted(index.crossed(35)) == [1]
+    assert sorted(index.crossed(25)) == [1, 2]
+    assert sorted(index.crossed(65)) == [3]
+    assert sorted(index.crossed(99)) == [3, 4]
+    print("✓ Only crossed thresholds fire")
+
+
+def test_boundaries_and_discard():
+    index = ThresholdIndex([(1, FALLS, 40), (2, RISES, 40)])
+    assert sorted(index.crossed(40)) == [1, 2]
+    index.discard([1, 99])
+    assert index.crossed(40) == [2] and len(index) == 1 and 1 not in index
+    index.add(2, FALLS, 10)  # Re-adding moves the entry
+    assert index.crossed(40) == [] and index.crossed(10) == [2]
+    print("✓ Thresholds at the price fire and discarded entries do not")
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    entries = [(i, rng.choice((FALLS, RISES)), round(rng.uniform(1, 99), 2)) for i in range(2000)]
+    index = ThresholdIndex(entries)
+    for _ in range(200):
+        price = round(rng.uniform(0, 100), 2)
+        expected = {
+            entry_id for entry_id, direction, threshold in entries
+            if (direction == FALLS and price <= threshold) or (direction == RISES and price >= threshold)
+        }
+        assert set(index.crossed(price)) == expected, price
+    print("✓ Index agrees with a full scan")
+
+
+def test_books_without_shared_cache():
+    rows = {1: [(1, FALLS, 40)]}
+
+    def loader(market_id):
+        return list(rows.get(market_id, []))
+
+    def db_version(market_id):
+        entries = rows.get(market_id, [])
+        return max((entry[0] for entry in entries), default=None), len(entries)
+
+    with override_settings(SHARED_CACHE=False):
+        # Different namespaces: neither sees the other's cache counter, like
+        # two processes with their own LocMem caches
+        worker = ThresholdBooks('test_book_worker', loader, db_version)
+        web = ThresholdBooks('test_book_web', loader, db_version)
+        assert worker.crossed(1, 65) == []
+
+        rows[1].append((2, RISES, 60))  # Placed through the other process
+        web.bump(1)
+        assert worker.crossed(1, 65) == [2]
+
+        unversioned = ThresholdBooks('test_book_plain', loader)
+        assert unversioned.crossed(1, 65) == [2]
+        rows[1].append((3, RISES, 62))
+        assert sorted(unversioned.crossed(1, 65)) == [2, 3]
+    print("✓ Books reload from the database without a shared cache")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("THRESHOLD INDEX TESTS")
+    print("=" * 60)
+    test_crossed_both_directions()
+    test_boundaries_and_discard()
+    test_matches_brute_force()
+    test_books_without_shared_cache()
+    print("\nAll threshold index tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Trade Sequencer Test
+
+Tests:
+1. Commands are applied in order with one trade_seq each, matching the
+   direct LMSR trade functions
+2. An invalid sell is rejected without touching the book
+3. A command whose caller timed out while it was queued is cancelled and
+   never executed
+4. A command the sequencer already took is waited for, not cancelled
+"""
+
+import os
+import threading
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+django.setup()
+
+from markets.sequencer import LocalQueue, MarketBook, TradeCommand, TradeSequencer, await_fill
+from markets.services import apply_binary_trade
+
+B = 100.0
+
+
+def _sequencer(*books) -> TradeSequencer:
+    sequencer = TradeSequencer(0, LocalQueue('test'))
+    for book in books:
+        sequencer.books[book.market_id] = book
+    return sequencer
+
+
+def test_applies_in_order():
+    sequencer = _sequencer(MarketBook(1, 0.0, 0.0, B, 0.0, 0, trade_seq=7))
+    commands = [
+        TradeCommand(1, None, 'Yes', 'buy', 10, 50),
+        TradeCommand(1, None, 'No', 'buy', 4, 20),
+        TradeCommand(1, None, 'Yes', 'sell', 3, 15),
+    ]
+    fills, errors, touched = sequencer._apply(commands)
+
+    q_yes, q_no = 0.0, 0.0
+    for command, (filled, result) in zip(commands, fills):
+        expected, q_yes, q_no = apply_binary_trade(q_yes, q_no, B, 0.0, command.outcome, command.action, command.shares)
+        assert filled is command and result['new_yes_price'] == expected['new_yes_price']
+    assert not errors and list(touched) == [1]
+    assert [result['trade_seq'] for _, result in fills] == [8, 9, 10]
+    book = touched[1]
+    assert (book.q_yes, book.q_no) == (q_yes, q_no)
+    assert book.pending_volume_cents == 8500
+    print("✓ Trades are sequenced like the direct LMSR path")
+
+
+def test_invalid_sell_rejected():
+    sequencer = _sequencer(MarketBook(1, 2.0, 0.0, B, 0.0, 0, trade_seq=0))
+    fills, errors, _ = sequencer._apply([TradeCommand(1, None, 'Yes', 'sell', 5, 1)])
+    assert not fills and isinstance(errors[0][1], ValueError)
+    assert sequencer.books[1].q_yes == 2.0 and sequencer.books[1].trade_seq == 0
+    print("✓ Overselling is rejected")
+
+
+def test_timed_out_command_is_cancelled():
+    sequencer = _sequencer()
+    command = TradeCommand(1, None, 'Yes', 'buy', 10, 50)
+    sequencer.queue.put(command)
+    try:
+        await_fill(command, timeout=0.01)
+        assert False, 'expected TimeoutError'
+    except TimeoutError:
+        pass
+    assert command.reply.cancelled()
+    # The worker drops it: nothing reaches the (empty) books
+    assert sequencer.run_once(timeout=0) == 1
+    assert sequencer.books == {}
+    print("✓ A timed-out queued command never executes")
+
+
+def test_taken_command_is_awaited():
+    command = TradeCommand(1, None, 'Yes', 'buy', 10, 50)
+    assert command.reply.set_running_or_notify_cancel()
+    threading.Timer(0.05, command.reply.set_result, args=({'trade_seq': 1},)).start()
+    assert await_fill(command, timeout=0.01) == {'trade_seq': 1}
+    print("✓ A command already being committed is waited for")
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("TRADE SEQUENCER TESTS")
+    print("=" * 60)
+    test_applies_in_order()
+    test_invalid_sell_rejected()
+    test_timed_out_command_is_cancelled()
+    test_taken_command_is_awaited()
+    print("\nAll trade sequencer tests passed")
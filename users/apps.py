@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        """Register signal handlers when app loads"""
+        import users.signals  # Keep cached request identities fresh
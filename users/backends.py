@@ -22,10 +22,8 @@ class PhoneNumberBackend(ModelBackend):
         return None
 
     def get_user(self, user_id):
-        try:
-            return CustomUser.objects.get(pk=user_id)
-        except CustomUser.DoesNotExist:
-            return None
+        from .identity import get_user_by_id
+        return get_user_by_id(user_id)
 
     def user_can_authenticate(self, user):
         """
@@ -59,7 +57,5 @@ class AdminPhoneBackend(ModelBackend):
         return None
 
     def get_user(self, user_id):
-        try:
-            return CustomUser.objects.get(pk=user_id)
-        except CustomUser.DoesNotExist:
-            return None
+        from .identity import get_user_by_id
+        return get_user_by_id(user_id)
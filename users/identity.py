@@ -0,0 +1,185 @@
+"""
+Request Identity
+
+One resolver for "who is calling" shared by every app:
+1. Session (request.user, set by AuthenticationMiddleware)
+2. X-User-Phone-Number header (phone auth), normalized
+3. X-User-Email header (Google OAuth users)
+
+The result is memoized on the request, so a view that checks auth and admin
+status resolves the caller once. Header lookups cache only the normalized
+phone or email -> user id mapping (IDENTITY_CACHE_TTL_SECONDS, shared cache
+only); the user row itself is always read fresh by primary key, so views can
+debit and save the returned user safely. A cached id is checked against the
+row it loads, so a changed phone or email, or a deleted user, just falls
+back to the full lookup.
+"""
+
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from api.validators import normalize_phone_number
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+_UNRESOLVED = object()
+
+
+def _ttl() -> int:
+    """Mapping lifetime in seconds; 0 (no caching) without a shared cache."""
+    if not settings.SHARED_CACHE:
+        return 0
+    return getattr(settings, 'IDENTITY_CACHE_TTL_SECONDS', 300)
+
+
+def _cache_key(field: str, value: str) -> str:
+    return f"identity:{field}:{value}"
+
+
+def _cached_user(field: str, value):
+    key = _cache_key(field, value)
+    if _ttl():
+        user_id = cache.get(key)
+        if user_id is not None:
+            # Fresh row by primary key, still matching the header value
+            user = CustomUser.objects.filter(id=user_id, **{field: value}).first()
+            if user is not None:
+                return user
+            cache.delete(key)
+
+    user = CustomUser.objects.filter(**{field: value}).first()
+    if user is not None and _ttl():
+        cache.set(key, user.id, _ttl())
+    return user
+
+
+def _lookup(field: str, value: str):
+    user = _cached_user(field, value)
+    return user if user and user.is_active else None
+
+
+def get_user_by_id(user_id):
+    """
+    A user by primary key (session auth backends).
+
+    Returns:
+        CustomUser or None; activity checks are left to the caller
+    """
+    return CustomUser.objects.filter(id=user_id).first()
+
+
+def invalidate_user_identity(user) -> None:
+    """Drop the cached header mappings of a user's current phone and email."""
+    keys = []
+    if user.phone_number:
+        keys.append(_cache_key('phone_number', user.phone_number))
+    if user.email:
+        keys.append(_cache_key('email', user.email.strip()))
+    if keys:
+        cache.delete_many(keys)
+
+
+def _resolve_header_user(request):
+    phone_number = request.headers.get('X-User-Phone-Number')
+    if phone_number:
+        user = _lookup('phone_number', normalize_phone_number(phone_number))
+        if user:
+            return user
+
+    email = request.headers.get('X-User-Email')
+    if email:
+        return _lookup('email', email.strip())
+
+    return None
+
+
+def _http_request(request):
+    # DRF wraps the HttpRequest; memoize on the underlying one so plain and
+    # DRF views in the same request share the result
+    return getattr(request, '_request', request)
+
+
+def get_header_user(request):
+    """The user named by the X-User-* headers (None if absent or unknown)."""
+    request = _http_request(request)
+    user = getattr(request, '_header_identity', _UNRESOLVED)
+    if user is _UNRESOLVED:
+        user = _resolve_header_user(request)
+        request._header_identity = user
+    return user
+
+
+def get_authenticated_user(request):
+    """
+    Get the calling user from the session or the X-User-* headers.
+
+    Returns:
+        CustomUser, or None when the request is anonymous
+    """
+    request = _http_request(request)
+    user = getattr(request, '_identity', _UNRESOLVED)
+    if user is _UNRESOLVED:
+        session_user = getattr(request, 'user', None)
+        if session_user is not None and session_user.is_authenticated:
+            user = session_user
+        else:
+            user = get_header_user(request)
+        request._identity = user
+    return user
+
+
+def is_admin(user, request=None) -> bool:
+    """
+    Check if the caller is an admin.
+
+    A staff session qualifies; header-authenticated callers must be staff and
+    superuser.
+    """
+    if user and user.is_authenticated and user.is_staff:
+        return True
+
+    if request is not None:
+        header_user = get_header_user(request)
+        return bool(header_user and header_user.is_staff and header_user.is_superuser)
+
+    return False
+
+
+class IdentityMiddleware:
+    """
+    Attach `request.identity`: the caller resolved lazily on first access
+    (AnonymousUser when nobody is authenticated). Must come after
+    AuthenticationMiddleware.
+
+    Runs natively under sync and async request handling. Resolving the
+    identity queries the database, so async views read it through
+    sync_to_async (or call get_authenticated_user that way).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._attach(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def _attach(request) -> None:
+        request.identity = SimpleLazyObject(lambda: get_authenticated_user(request) or AnonymousUser())
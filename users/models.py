@@ -61,11 +61,17 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     
     def get_user_statistics(self):
         """Get user statistics: total wagered, wins, losses"""
+        from django.db.models import Sum
         from markets.models import Bet
         bets = Bet.objects.filter(user=self)
         total_wagered = sum(float(bet.amount) for bet in bets if bet.result != 'PENDING')
         won_bets = bets.filter(result='WON').count()
         lost_bets = bets.filter(result='LOST').count()
+        # Archived markets keep per-user totals
+        archived = self.archived_markets.aggregate(wagered=Sum('total_wagered'), wins=Sum('wins'), losses=Sum('losses'))
+        total_wagered += float(archived['wagered'] or 0)
+        won_bets += archived['wins'] or 0
+        lost_bets += archived['losses'] or 0
         win_rate = (won_bets / (won_bets + lost_bets) * 100) if (won_bets + lost_bets) > 0 else 0
         return {
             'total_wagered': total_wagered,
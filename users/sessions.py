@@ -0,0 +1,114 @@
+"""
+Cache-First Session Engine
+
+SESSION_ENGINE = 'users.sessions'. Sessions live in the shared cache and are
+written through to the database only where durability matters:
+- creating a session and changing who it belongs to (login, logout, key
+  cycling, expiry changes) always hits the database
+- other modifications update the cache, and reach the database at most once
+  per SESSION_DB_WRITE_INTERVAL_SECONDS per session
+
+A session-authenticated request costs one cache GET for the session and a
+primary-key SELECT for the user (users.identity.get_user_by_id) instead of
+two SELECTs.
+The database copy is the fallback when the cache loses the entry, so at
+worst the last few non-auth changes of a session are lost.
+
+The engine needs a cache shared by every web process (CACHE_URL): on a
+per-process cache a logout or flush only clears the worker that handled it
+while the others keep serving the cached session, so it refuses to run
+without one (the default engine is then plain database sessions).
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Session keys whose changes must survive a cache flush
+DURABLE_KEYS = ('_auth_user_id', '_auth_user_backend', '_auth_user_hash', '_session_expiry')
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'users.sessions'
+
+    def __init__(self, session_key=None):
+        if not settings.SHARED_CACHE:
+            raise ImproperlyConfigured(
+                'users.sessions needs a shared cache (CACHE_URL); use '
+                'django.contrib.sessions.backends.db without one'
+            )
+        super().__init__(session_key)
+
+    def _db_synced_key(self) -> str:
+        return f"{self.cache_key}:db"
+
+    def _durable_values(self, data: dict) -> tuple:
+        return tuple(data.get(key) for key in DURABLE_KEYS)
+
+    def load(self):
+        data = super().load()
+        self._loaded_durable = self._durable_values(data)
+        return data
+
+    def _needs_db_write(self, must_create: bool) -> bool:
+        if must_create or self.session_key is None:
+            return True
+        if not getattr(settings, 'SESSION_LAZY_DB_WRITES', False):
+            return True
+        loaded = getattr(self, '_loaded_durable', None)
+        if loaded is None or loaded != self._durable_values(self._session):
+            return True
+        # Refresh the database copy once per interval; add() succeeds only
+        # when no write happened within it
+        interval = getattr(settings, 'SESSION_DB_WRITE_INTERVAL_SECONDS', 300)
+        return self._cache.add(self._db_synced_key(), 1, interval)
+
+    def save(self, must_create=False):
+        if self._needs_db_write(must_create):
+            super().save(must_create)
+            self._loaded_durable = self._durable_values(self._session)
+            return
+
+        try:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        except Exception:
+            logger.exception("Session cache write failed, writing through to the database")
+            super().save(must_create)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        session_key = session_key or self.session_key
+        if session_key:
+            self._cache.delete(f"{self.cache_key_prefix}{session_key}:db")
+
+    @classmethod
+    def clear_expired(cls, batch_size: int = None) -> int:
+        """
+        Delete expired session rows in batches (also used by `clearsessions`).
+
+        One unbounded DELETE on a large table holds its locks for the whole
+        run; deleting batch_size keys at a time keeps each statement short.
+
+        Returns:
+            Number of rows deleted
+        """
+        batch_size = batch_size or getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 5000)
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+        return deleted
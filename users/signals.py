@@ -0,0 +1,17 @@
+"""
+User signal handlers.
+
+Drop a deleted user's cached header mappings (users/identity.py). Saves need
+no handler: only ids are cached and every lookup reloads the row.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .identity import invalidate_user_identity
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=CustomUser)
+def drop_cached_identity(sender, instance, **kwargs):
+    invalidate_user_identity(instance)
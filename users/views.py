@@ -8,6 +8,8 @@ from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.middleware.csrf import get_token
 from .models import CustomUser
+from .identity import get_authenticated_user, get_header_user
+from api.db_router import replica_reads_view
 from api.validators import validate_phone_number, validate_password, validate_full_name, normalize_phone_number, ValidationError
 from notifications.views import create_notification
 from markets.utils.price_calculations import PAYOUT_PER_SHARE
@@ -94,9 +96,7 @@ def login_view(request):
         user = authenticate(request, phone_number=phone_number, password=password)
         if user is not None:
             logger.info(f"User authenticated: {user.phone_number}, User ID: {user.id}")
-            login(request, user)  # This sets the session cookie
-            # Force session save to database
-            request.session.save()
+            login(request, user)  # SessionMiddleware saves the session and sets the cookie
             logger.info(f"Session key after login: {request.session.session_key}")
             # Get CSRF token
             csrf_token = get_token(request)
@@ -170,29 +170,7 @@ def logout_view(request):
 @require_http_methods(["POST"])
 def update_profile_view(request):
     """Update user profile information"""
-    # Try session-based auth first
-    user = request.user if request.user and request.user.is_authenticated else None
-    
-    # Fall back to phone header auth
-    if not user:
-        phone_number = request.headers.get('X-User-Phone-Number')
-        if phone_number:
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.get(phone_number=phone_number)
-            except CustomUser.DoesNotExist:
-                user = None
-    
-    # Fall back to email header auth (for Google OAuth users)
-    if not user:
-        email = request.headers.get('X-User-Email')
-        if email:
-            try:
-                user = CustomUser.objects.get(email=email)
-            except CustomUser.DoesNotExist:
-                user = None
-    
+    user = get_authenticated_user(request)
     if not user:
         return JsonResponse({'error': 'Authentication required'}, status=401)
     
@@ -244,6 +222,7 @@ def update_profile_view(request):
 
 
 @require_http_methods(["GET"])
+@replica_reads_view
 def leaderboard_view(request):
     """Return the top payout winners by total completed payout amount and top wins."""
     try:
@@ -297,24 +276,7 @@ def admin_list_users(request):
     """List all users with their support staff status (admin only)"""
     try:
         # Check if user is admin (via session or phone header)
-        is_admin = False
-        
-        # Check Django authenticated user (for direct Django requests)
-        if request.user.is_authenticated and request.user.is_staff:
-            is_admin = True
-        # Check phone header (for API requests from frontend)
-        elif request.headers.get('X-User-Phone-Number'):
-            phone_number = request.headers.get('X-User-Phone-Number')
-            try:
-                # Normalize phone number
-                phone_number = normalize_phone_number(phone_number)
-                user_obj = CustomUser.objects.get(phone_number=phone_number)
-                if user_obj.is_staff or user_obj.is_superuser:
-                    is_admin = True
-            except CustomUser.DoesNotExist:
-                pass
-        
-        if not is_admin:
+        if not _check_admin_access(request):
             return JsonResponse({'error': 'Unauthorized'}, status=403)
         
         users = CustomUser.objects.values(
@@ -337,22 +299,7 @@ def admin_toggle_support_staff(request, user_id):
     """Toggle support staff status for a user (admin only)"""
     try:
         # Check if user is admin (via session or phone header)
-        is_admin = False
-        
-        # Check Django authenticated user
-        if request.user.is_authenticated and request.user.is_staff:
-            is_admin = True
-        # Check phone header
-        elif request.headers.get('X-User-Phone-Number'):
-            phone_number = request.headers.get('X-User-Phone-Number')
-            try:
-                user_obj = CustomUser.objects.get(phone_number=phone_number)
-                if user_obj.is_staff or user_obj.is_superuser:
-                    is_admin = True
-            except CustomUser.DoesNotExist:
-                pass
-        
-        if not is_admin:
+        if not _check_admin_access(request):
             return JsonResponse({'error': 'Unauthorized'}, status=403)
         
         # Get the target user
@@ -517,11 +464,10 @@ def add_phone_number_view(request):
     """
     try:
         # Authenticate using email header (for Google OAuth users)
-        email = request.headers.get('X-User-Email')
-        if not email:
+        if not request.headers.get('X-User-Email'):
             return JsonResponse({'error': 'Authentication required (X-User-Email header)'}, status=401)
         
-        user = CustomUser.objects.filter(email=email).first()
+        user = get_header_user(request)
         if not user:
             return JsonResponse({'error': 'User not found'}, status=404)
         
@@ -586,20 +532,7 @@ def lock_phone_after_deposit_view(request):
     """
     try:
         # Authenticate user
-        user = None
-        phone_number = request.headers.get('X-User-Phone-Number')
-        email = request.headers.get('X-User-Email')
-        
-        if phone_number:
-            try:
-                phone_number = normalize_phone_number(phone_number)
-                user = CustomUser.objects.filter(phone_number=phone_number).first()
-            except:
-                pass
-        
-        if not user and email:
-            user = CustomUser.objects.filter(email=email).first()
-        
+        user = get_header_user(request)
         if not user:
             return JsonResponse({'error': 'Authentication required'}, status=401)
         
@@ -621,17 +554,10 @@ def lock_phone_after_deposit_view(request):
 
 def _check_admin_access(request):
     """Helper to check if user is admin"""
-    try:
-        if request.user.is_authenticated and request.user.is_staff:
-            return True
-        elif request.headers.get('X-User-Phone-Number'):
-            phone_number = request.headers.get('X-User-Phone-Number')
-            phone_number = normalize_phone_number(phone_number)
-            user_obj = CustomUser.objects.get(phone_number=phone_number)
-            return user_obj.is_staff or user_obj.is_superuser
-    except:
-        pass
-    return False
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    user_obj = get_header_user(request)
+    return bool(user_obj and (user_obj.is_staff or user_obj.is_superuser))
 
 
 @require_http_methods(["GET"])
@@ -651,7 +577,8 @@ def admin_get_user_portfolio(request, user_id):
         from decimal import Decimal
         
         # Get all bets for this user and aggregate by market/outcome
-        bets = Bet.objects.filter(user=target_user).select_related('market')
+        from markets.archive import archived_bets_for_user
+        bets = [*Bet.objects.filter(user=target_user).select_related('market'), *archived_bets_for_user(target_user)]
         
         portfolio_positions = {}  # {market_id: {outcome: {bought: X, sold: Y, ...}}}
         
@@ -762,8 +689,9 @@ def admin_get_user_activity(request, user_id):
         activity_log = []
         
         # Get all bets
+        from markets.archive import archived_bets_for_user
         bets = Bet.objects.filter(user=target_user).select_related('market').order_by('-timestamp')[:100]
-        for bet in bets:
+        for bet in [*bets, *archived_bets_for_user(target_user, limit=100)]:
             activity_log.append({
                 'type': 'BET',
                 'action': bet.action,  # BUY or SELL